@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Statistics Rollup Backfill for ZephyrGate
+
+Rebuilds the minute, hour and day statistics rollups from the message
+history and node tables of an existing database, so stats commands and
+leaderboards cover activity from before the rollups existed. Run it with
+ZephyrGate stopped; existing rollup rows are replaced.
+
+    python scripts/backfill-stats.py
+    python scripts/backfill-stats.py --database /opt/zephyrgate/data/zephyrgate.db
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.database import DatabaseManager
+from core.stats_rollup import backfill_rollups
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild ZephyrGate statistics rollups")
+    parser.add_argument('--database', default=str(ROOT / "data" / "zephyrgate.db"),
+                        help="Database file (default: data/zephyrgate.db)")
+    parser.add_argument('--minute-retention-hours', type=float, default=48,
+                        help="Minute buckets to rebuild, in hours back from now")
+    parser.add_argument('--hour-retention-days', type=float, default=90,
+                        help="Hour buckets to rebuild, in days back from now")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if not Path(args.database).exists():
+        print(f"Database not found: {args.database}", file=sys.stderr)
+        return 1
+
+    # Opening the database applies any pending migrations, including the rollup tables
+    db = DatabaseManager(args.database)
+    try:
+        started = time.perf_counter()
+        rows = backfill_rollups(
+            db,
+            minute_retention_hours=args.minute_retention_hours,
+            hour_retention_days=args.hour_retention_days
+        )
+        print(f"Rebuilt {rows} node rollup rows in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,6 +17,7 @@ from .plugin_scheduler import (
     ScheduledTask,
     CronParser
 )
+from .job_scheduler import MisfirePolicy
 
 __all__ = [
     'EnhancedPlugin',
@@ -26,5 +27,6 @@ __all__ = [
     'PluginStorage',
     'PluginScheduler',
     'ScheduledTask',
-    'CronParser'
+    'CronParser',
+    'MisfirePolicy'
 ]
\ No newline at end of file
@@ -0,0 +1,375 @@
+"""
+Airtime-aware Transmission Scheduling for ZephyrGate
+
+Estimates LoRa time-on-air for outgoing packets from the modem settings and
+payload length, and paces transmissions per interface. Each interface has a
+rolling duty-cycle budget, and the gap after each packet grows with the
+channel utilization reported by the radio. Short replies go out immediately
+on an idle channel, while long multi-chunk responses are spread out so
+rebroadcasts and other nodes get a chance to transmit.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .logging import get_logger
+
+
+# Meshtastic packet header (to, from, id, flags, channel, next hop, relay) plus
+# encrypted Data protobuf framing around the text payload
+MESH_HEADER_BYTES = 16
+DATA_OVERHEAD_BYTES = 6
+
+
+@dataclass(frozen=True)
+class LoRaModemConfig:
+    """LoRa modulation parameters"""
+    spreading_factor: int
+    bandwidth_hz: float
+    coding_rate: int = 5  # denominator of 4/x (5-8)
+    preamble_symbols: int = 16  # Meshtastic uses a 16 symbol preamble
+    explicit_header: bool = True
+    crc: bool = True
+
+    @property
+    def symbol_time(self) -> float:
+        """Duration of one symbol in seconds"""
+        return (2 ** self.spreading_factor) / self.bandwidth_hz
+
+    @property
+    def low_data_rate_optimize(self) -> bool:
+        """LDRO is mandated when symbols are longer than 16 ms"""
+        return self.symbol_time > 0.016
+
+
+# Meshtastic modem presets
+MODEM_PRESETS: Dict[str, LoRaModemConfig] = {
+    'SHORT_TURBO': LoRaModemConfig(spreading_factor=7, bandwidth_hz=500_000, coding_rate=5),
+    'SHORT_FAST': LoRaModemConfig(spreading_factor=7, bandwidth_hz=250_000, coding_rate=5),
+    'SHORT_SLOW': LoRaModemConfig(spreading_factor=8, bandwidth_hz=250_000, coding_rate=5),
+    'MEDIUM_FAST': LoRaModemConfig(spreading_factor=9, bandwidth_hz=250_000, coding_rate=5),
+    'MEDIUM_SLOW': LoRaModemConfig(spreading_factor=10, bandwidth_hz=250_000, coding_rate=5),
+    'LONG_FAST': LoRaModemConfig(spreading_factor=11, bandwidth_hz=250_000, coding_rate=5),
+    'LONG_MODERATE': LoRaModemConfig(spreading_factor=11, bandwidth_hz=125_000, coding_rate=8),
+    'LONG_SLOW': LoRaModemConfig(spreading_factor=12, bandwidth_hz=125_000, coding_rate=8),
+    'VERY_LONG_SLOW': LoRaModemConfig(spreading_factor=12, bandwidth_hz=62_500, coding_rate=8),
+}
+
+# Config.LoRaConfig.ModemPreset enum values reported by the radio
+MODEM_PRESET_NUMBERS: Dict[int, str] = {
+    0: 'LONG_FAST',
+    1: 'LONG_SLOW',
+    2: 'VERY_LONG_SLOW',
+    3: 'MEDIUM_SLOW',
+    4: 'MEDIUM_FAST',
+    5: 'SHORT_SLOW',
+    6: 'SHORT_FAST',
+    7: 'LONG_MODERATE',
+    8: 'SHORT_TURBO',
+}
+
+
+def modem_from_lora_config(lora: Any) -> Optional[LoRaModemConfig]:
+    """Modem parameters from a radio's LoRa config (``localConfig.lora``)"""
+    if lora is None:
+        return None
+    if getattr(lora, 'use_preset', True):
+        name = MODEM_PRESET_NUMBERS.get(getattr(lora, 'modem_preset', 0))
+        return MODEM_PRESETS.get(name) if name else None
+
+    spreading_factor = getattr(lora, 'spread_factor', 0)
+    bandwidth_khz = getattr(lora, 'bandwidth', 0)
+    coding_rate = getattr(lora, 'coding_rate', 0)
+    if not spreading_factor or not bandwidth_khz or not coding_rate:
+        return None
+    # Custom bandwidths are configured in kHz; 31 means 31.25 kHz
+    bandwidth_hz = 31_250 if bandwidth_khz == 31 else bandwidth_khz * 1000
+    return LoRaModemConfig(spreading_factor=spreading_factor, bandwidth_hz=bandwidth_hz,
+                           coding_rate=coding_rate)
+
+
+def estimate_airtime(payload_bytes: int, modem: LoRaModemConfig, include_overhead: bool = True) -> float:
+    """
+    Estimate time-on-air in seconds for a packet (Semtech SX127x/SX126x formula).
+
+    Args:
+        payload_bytes: Application payload length (e.g. UTF-8 text length)
+        modem: LoRa modulation parameters
+        include_overhead: Add the Meshtastic header and protobuf framing
+    """
+    length = payload_bytes + (MESH_HEADER_BYTES + DATA_OVERHEAD_BYTES if include_overhead else 0)
+    sf = modem.spreading_factor
+    de = 1 if modem.low_data_rate_optimize else 0
+    ih = 0 if modem.explicit_header else 1
+    crc = 1 if modem.crc else 0
+
+    numerator = 8 * length - 4 * sf + 28 + 16 * crc - 20 * ih
+    payload_symbols = 8 + max(math.ceil(numerator / (4 * (sf - 2 * de))) * modem.coding_rate, 0)
+    preamble_time = (modem.preamble_symbols + 4.25) * modem.symbol_time
+    return preamble_time + payload_symbols * modem.symbol_time
+
+
+class DutyCycleBudget:
+    """Rolling-window transmit time budget"""
+
+    def __init__(self, duty_cycle_percent: float = 10.0, window_seconds: float = 3600.0):
+        self.duty_cycle_percent = duty_cycle_percent
+        self.window = window_seconds
+        self.limit = window_seconds * duty_cycle_percent / 100.0
+        self.transmissions: Deque[Tuple[float, float]] = deque()  # (start, airtime)
+        self.used = 0.0
+
+    def _expire(self, now: float):
+        # Compare on start + window so a slot returned by earliest_start lines up exactly
+        while self.transmissions and self.transmissions[0][0] + self.window <= now:
+            _, airtime = self.transmissions.popleft()
+            self.used -= airtime
+        if not self.transmissions:
+            self.used = 0.0
+
+    def earliest_start(self, airtime: float, now: float) -> float:
+        """Earliest time at or after ``now`` when ``airtime`` fits in the budget"""
+        self._expire(now)
+        if self.used + airtime <= self.limit or airtime > self.limit:
+            return now
+
+        # Walk forward through the window until enough old transmissions age out
+        used = self.used
+        for start, spent in self.transmissions:
+            used -= spent
+            if used + airtime <= self.limit:
+                return start + self.window
+        return now
+
+    def record(self, start: float, airtime: float):
+        """Account for a transmission"""
+        self._expire(start)
+        self.transmissions.append((start, airtime))
+        self.used += airtime
+
+    def utilization(self, now: float) -> float:
+        """Fraction of the window's airtime used, in percent"""
+        self._expire(now)
+        return (self.used / self.window * 100.0) if self.window else 0.0
+
+
+@dataclass
+class InterfaceAirtime:
+    """Airtime state for one interface"""
+    interface_id: str
+    modem: LoRaModemConfig
+    budget: DutyCycleBudget
+    channel_utilization: float = 0.0  # percent, as reported by the radio
+    utilization_updated: Optional[float] = None
+    next_start: float = 0.0
+    packets: int = 0
+    airtime_total: float = 0.0
+    delay_total: float = 0.0
+    budget_delays: int = 0
+
+
+class AirtimeScheduler:
+    """
+    Per-interface transmission pacing based on estimated time-on-air.
+
+    ``reserve`` books the next transmission slot for a packet and returns
+    when it may start; ``acquire`` waits for that slot. After each packet the
+    interface is held for its airtime plus a gap of ``gap_factor`` times the
+    airtime, rising to ``max_gap_factor`` as reported channel utilization
+    goes from ``utilization_low`` to ``utilization_high`` percent. The rolling
+    duty-cycle budget is enforced on top of that pacing.
+    """
+
+    def __init__(self, modem_preset: str = 'LONG_FAST', duty_cycle_percent: float = 10.0,
+                 window_seconds: float = 3600.0, gap_factor: float = 0.5, max_gap_factor: float = 4.0,
+                 utilization_low: float = 25.0, utilization_high: float = 50.0,
+                 utilization_max_age: float = 900.0,
+                 interface_overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.logger = get_logger('airtime_scheduler')
+        self.default_modem = self._resolve_modem(modem_preset)
+        self.duty_cycle_percent = duty_cycle_percent
+        self.window_seconds = window_seconds
+        self.gap_factor = gap_factor
+        self.max_gap_factor = max_gap_factor
+        self.utilization_low = utilization_low
+        self.utilization_high = utilization_high
+        self.utilization_max_age = utilization_max_age
+        self.interface_overrides = interface_overrides or {}
+        self.clock = clock
+
+        self.interfaces: Dict[str, InterfaceAirtime] = {}
+        self._lock = threading.Lock()
+
+    def _resolve_modem(self, preset: Any) -> LoRaModemConfig:
+        if isinstance(preset, LoRaModemConfig):
+            return preset
+        if isinstance(preset, dict):
+            return LoRaModemConfig(**preset)
+        modem = MODEM_PRESETS.get(str(preset).upper())
+        if modem is None:
+            self.logger.warning(f"Unknown modem preset {preset}, using LONG_FAST")
+            modem = MODEM_PRESETS['LONG_FAST']
+        return modem
+
+    def _state(self, interface_id: str) -> InterfaceAirtime:
+        state = self.interfaces.get(interface_id)
+        if state is None:
+            overrides = self.interface_overrides.get(interface_id, {})
+            if not isinstance(overrides, dict):
+                overrides = {}
+            modem = overrides.get('modem') or overrides.get('modem_preset')
+            state = InterfaceAirtime(
+                interface_id=interface_id,
+                modem=self._resolve_modem(modem) if modem else self.default_modem,
+                budget=DutyCycleBudget(
+                    overrides.get('duty_cycle_percent', self.duty_cycle_percent),
+                    self.window_seconds
+                )
+            )
+            self.interfaces[interface_id] = state
+        return state
+
+    def configure_interface(self, interface_id: str, modem_preset: Any = None,
+                            duty_cycle_percent: Optional[float] = None):
+        """Set modem parameters or duty cycle for an interface"""
+        with self._lock:
+            state = self._state(interface_id)
+            if modem_preset is not None:
+                state.modem = self._resolve_modem(modem_preset)
+            if duty_cycle_percent is not None:
+                state.budget = DutyCycleBudget(duty_cycle_percent, self.window_seconds)
+
+    def has_override(self, interface_id: str) -> bool:
+        """Whether modem settings for an interface come from configuration"""
+        overrides = self.interface_overrides.get(interface_id)
+        return isinstance(overrides, dict) and bool(overrides.get('modem') or overrides.get('modem_preset'))
+
+    def report_channel_utilization(self, interface_id: str, utilization_percent: Optional[float]):
+        """Record channel utilization reported by the radio (safe from any thread)"""
+        if utilization_percent is None:
+            return
+        with self._lock:
+            state = self._state(interface_id)
+            state.channel_utilization = float(utilization_percent)
+            state.utilization_updated = self.clock()
+
+    def estimate(self, interface_id: str, payload_bytes: int) -> float:
+        """Estimated airtime of a packet on an interface"""
+        with self._lock:
+            return estimate_airtime(payload_bytes, self._state(interface_id).modem)
+
+    def _current_gap_factor(self, state: InterfaceAirtime, now: float) -> float:
+        utilization = state.channel_utilization
+        if state.utilization_updated is None or now - state.utilization_updated > self.utilization_max_age:
+            utilization = 0.0
+        if utilization <= self.utilization_low:
+            return self.gap_factor
+        if utilization >= self.utilization_high:
+            return self.max_gap_factor
+        span = self.utilization_high - self.utilization_low
+        fraction = (utilization - self.utilization_low) / span
+        return self.gap_factor + fraction * (self.max_gap_factor - self.gap_factor)
+
+    def reserve(self, interface_id: str, payload_bytes: int, now: Optional[float] = None) -> Tuple[float, float]:
+        """
+        Book the next transmission slot for a packet.
+
+        Returns:
+            ``(start_time, airtime)`` on the scheduler's clock
+        """
+        with self._lock:
+            now = self.clock() if now is None else now
+            state = self._state(interface_id)
+            airtime = estimate_airtime(payload_bytes, state.modem)
+
+            start = max(now, state.next_start)
+            budget_start = state.budget.earliest_start(airtime, start)
+            if budget_start > start:
+                state.budget_delays += 1
+                start = budget_start
+
+            state.budget.record(start, airtime)
+            state.next_start = start + airtime * (1.0 + self._current_gap_factor(state, start))
+            state.packets += 1
+            state.airtime_total += airtime
+            state.delay_total += start - now
+            return start, airtime
+
+    def backlog(self, interface_id: str, now: Optional[float] = None) -> float:
+        """Seconds until the next transmission slot on an interface is free"""
+        with self._lock:
+            state = self.interfaces.get(interface_id)
+            if state is None:
+                return 0.0
+            now = self.clock() if now is None else now
+            return max(0.0, state.next_start - now)
+
+    async def acquire(self, interface_id: str, payload_bytes: int) -> float:
+        """Wait for a transmission slot; returns the estimated airtime"""
+        start, airtime = self.reserve(interface_id, payload_bytes)
+        delay = start - self.clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return airtime
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-interface airtime statistics"""
+        with self._lock:
+            now = self.clock()
+            return {
+                interface_id: {
+                    'spreading_factor': state.modem.spreading_factor,
+                    'bandwidth_hz': state.modem.bandwidth_hz,
+                    'packets': state.packets,
+                    'airtime_seconds': state.airtime_total,
+                    'duty_cycle_percent': state.budget.utilization(now),
+                    'duty_cycle_limit_percent': state.budget.duty_cycle_percent,
+                    'channel_utilization': state.channel_utilization,
+                    'gap_factor': self._current_gap_factor(state, now),
+                    'average_delay_seconds': (state.delay_total / state.packets) if state.packets else 0.0,
+                    'budget_delays': state.budget_delays,
+                    'next_slot_in_seconds': max(0.0, state.next_start - now)
+                }
+                for interface_id, state in self.interfaces.items()
+            }
+
+
+def create_airtime_scheduler(config: Optional[Dict[str, Any]] = None) -> AirtimeScheduler:
+    """Build a scheduler from the ``meshtastic.airtime`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    return AirtimeScheduler(
+        modem_preset=config.get('modem_preset', 'LONG_FAST'),
+        duty_cycle_percent=config.get('duty_cycle_percent', 10.0),
+        window_seconds=config.get('window_seconds', 3600.0),
+        gap_factor=config.get('gap_factor', 0.5),
+        max_gap_factor=config.get('max_gap_factor', 4.0),
+        utilization_low=config.get('utilization_low', 25.0),
+        utilization_high=config.get('utilization_high', 50.0),
+        interface_overrides=config.get('interfaces', {})
+    )
+
+
+# Global airtime scheduler instance (created on first use or by the application)
+airtime_scheduler: Optional[AirtimeScheduler] = None
+
+
+def initialize_airtime_scheduler(config: Optional[Dict[str, Any]] = None) -> AirtimeScheduler:
+    """Initialize the global airtime scheduler"""
+    global airtime_scheduler
+    airtime_scheduler = create_airtime_scheduler(config)
+    return airtime_scheduler
+
+
+def get_airtime_scheduler() -> AirtimeScheduler:
+    """Get the global airtime scheduler, creating one with defaults if needed"""
+    global airtime_scheduler
+    if airtime_scheduler is None:
+        airtime_scheduler = create_airtime_scheduler()
+    return airtime_scheduler
@@ -0,0 +1,424 @@
+"""
+Compact Chunk Framing for ZephyrGate
+
+Multi-part text messages are framed with a short printable header:
+
+    [2/5:AbCd] payload...
+
+``2/5`` is the 1-based part index and part count. The four base-64 characters
+carry a 12-bit sequence ID (``Ab``) and a 12-bit CRC (``Cd``) of the sequence
+ID, index, count and payload. The header stays readable in Meshtastic
+clients and costs 11 bytes for messages of up to 9 parts.
+
+A receiver that is missing parts can ask for just those parts with a
+re-request frame:
+
+    [?Ab:2,4]
+
+Frames are produced by ``ChunkFramer``, which also keeps recently sent frames
+so re-requests can be answered, and collected by ``ReassemblyBuffer``, which
+bounds pending state by count, bytes and age.
+"""
+
+import binascii
+import random
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .logging import get_logger
+
+try:
+    from ..models.message import Message
+except ImportError:
+    from models.message import Message
+
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+_ALPHABET_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+
+SEQ_BITS = 12
+CRC_BITS = 12
+MAX_PARTS = 999
+MAX_REREQUEST_PARTS = 48  # keeps a re-request frame within one packet
+
+BROADCAST_IDS = {'', '^all', '!ffffffff'}
+
+FRAME_PATTERN = re.compile(r'^\[(\d{1,3})/(\d{1,3}):([A-Za-z0-9_-]{2})([A-Za-z0-9_-]{2})\] ')
+REREQUEST_PATTERN = re.compile(r'^\[\?([A-Za-z0-9_-]{2}):(\d{1,3}(?:,\d{1,3})*)\]$')
+
+
+class FrameCorrupted(ValueError):
+    """A chunk header was recognised but its CRC does not match"""
+
+
+def encode_base64(value: int, width: int) -> str:
+    """Encode a non-negative integer as ``width`` base-64 characters"""
+    chars = []
+    for _ in range(width):
+        chars.append(ALPHABET[value & 0x3F])
+        value >>= 6
+    return ''.join(reversed(chars))
+
+
+def decode_base64(text: str) -> int:
+    """Decode base-64 characters produced by ``encode_base64``"""
+    value = 0
+    for char in text:
+        value = (value << 6) | _ALPHABET_INDEX[char]
+    return value
+
+
+def frame_crc(seq_id: int, index: int, total: int, payload: str) -> int:
+    """12-bit CRC over the frame fields and payload"""
+    data = f"{seq_id}:{index}/{total}:".encode('utf-8') + payload.encode('utf-8')
+    return binascii.crc_hqx(data, 0xFFFF) & ((1 << CRC_BITS) - 1)
+
+
+def header_size(total: int) -> int:
+    """Worst-case header length in bytes for a message of ``total`` parts"""
+    digits = len(str(total))
+    return len('[/:XXXX] ') + 2 * digits
+
+
+@dataclass
+class ChunkFrame:
+    """One part of a framed message"""
+    seq_id: int
+    index: int  # 0-based
+    total: int
+    payload: str
+
+    @property
+    def crc(self) -> int:
+        return frame_crc(self.seq_id, self.index, self.total, self.payload)
+
+    def encode(self) -> str:
+        """Render the frame as message text"""
+        tag = encode_base64(self.seq_id, 2) + encode_base64(self.crc, 2)
+        return f"[{self.index + 1}/{self.total}:{tag}] {self.payload}"
+
+
+@dataclass
+class RerequestFrame:
+    """Request for specific missing parts of a framed message"""
+    seq_id: int
+    indices: List[int]  # 0-based
+
+    def encode(self) -> str:
+        parts = ','.join(str(i + 1) for i in sorted(self.indices))
+        return f"[?{encode_base64(self.seq_id, 2)}:{parts}]"
+
+
+def parse_frame(text: str) -> Optional[ChunkFrame]:
+    """
+    Parse a chunk frame from message text.
+
+    Returns None if the text is not framed; raises FrameCorrupted if the
+    header is present but the CRC does not match.
+    """
+    match = FRAME_PATTERN.match(text)
+    if not match:
+        return None
+
+    index, total = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= total:
+        return None
+
+    frame = ChunkFrame(
+        seq_id=decode_base64(match.group(3)),
+        index=index - 1,
+        total=total,
+        payload=text[match.end():]
+    )
+    if frame.crc != decode_base64(match.group(4)):
+        raise FrameCorrupted(f"CRC mismatch in part {index}/{total}")
+    return frame
+
+
+def parse_rerequest(text: str) -> Optional[RerequestFrame]:
+    """Parse a re-request frame from message text"""
+    match = REREQUEST_PATTERN.match(text.strip())
+    if not match:
+        return None
+    indices = sorted({int(i) - 1 for i in match.group(2).split(',') if int(i) > 0})
+    return RerequestFrame(seq_id=decode_base64(match.group(1)), indices=indices)
+
+
+def split_payload(content: str, max_size: int) -> List[str]:
+    """
+    Split text into payloads that fit in ``max_size`` bytes once framed.
+
+    Splits on UTF-8 character boundaries. The header size depends on the
+    number of parts, so the split is repeated until the count is stable.
+    """
+    data = content.encode('utf-8')
+    total = 1
+    while True:
+        room = max_size - header_size(total)
+        if room < 4:
+            raise ValueError(f"max_size {max_size} is too small for framed chunks")
+
+        payloads = []
+        start = 0
+        while start < len(data):
+            end = min(start + room, len(data))
+            # Never cut inside a multi-byte character
+            while end < len(data) and end > start and (data[end] & 0xC0) == 0x80:
+                end -= 1
+            payloads.append(data[start:end].decode('utf-8'))
+            start = end
+
+        if len(str(len(payloads))) <= len(str(total)):
+            break
+        total = len(payloads)
+
+    if len(payloads) > MAX_PARTS:
+        raise ValueError(f"Message needs {len(payloads)} parts (max {MAX_PARTS})")
+    return payloads
+
+
+@dataclass
+class SentMessage:
+    """Frames kept for answering re-requests"""
+    recipient_id: Optional[str]
+    frames: List[ChunkFrame]
+    sent_at: float
+
+
+class ChunkFramer:
+    """Splits outgoing messages into framed chunks and remembers them for re-requests"""
+
+    def __init__(self, max_size: int = 228, sent_cache_size: int = 32, sent_cache_ttl: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.sent_cache_size = sent_cache_size
+        self.sent_cache_ttl = sent_cache_ttl
+        self.clock = clock
+        self.logger = get_logger('chunk_framer')
+
+        self._next_seq = random.randrange(1 << SEQ_BITS)
+        self.sent: "OrderedDict[int, SentMessage]" = OrderedDict()
+
+    def next_seq_id(self) -> int:
+        seq_id = self._next_seq
+        self._next_seq = (self._next_seq + 1) % (1 << SEQ_BITS)
+        return seq_id
+
+    def fits(self, content: str) -> bool:
+        """Whether content can be sent as a single unframed packet"""
+        return len(content.encode('utf-8')) <= self.max_size
+
+    def split(self, content: str, seq_id: Optional[int] = None) -> List[ChunkFrame]:
+        """Split content into frames"""
+        if seq_id is None:
+            seq_id = self.next_seq_id()
+        payloads = split_payload(content, self.max_size)
+        return [ChunkFrame(seq_id, i, len(payloads), payload) for i, payload in enumerate(payloads)]
+
+    def frame_message(self, message: Message, seq_id: Optional[int] = None) -> List[Message]:
+        """Split a message into framed chunk messages (or return it unchanged if it fits)"""
+        if self.fits(message.content):
+            return [message]
+
+        frames = self.split(message.content, seq_id)
+        self.remember(frames, message.recipient_id)
+        chunk_id = encode_base64(frames[0].seq_id, 2)
+
+        chunks = [
+            Message(
+                id=f"{message.id}_chunk_{frame.index}",
+                sender_id=message.sender_id,
+                recipient_id=message.recipient_id,
+                channel=message.channel,
+                content=frame.encode(),
+                message_type=message.message_type,
+                priority=message.priority,
+                interface_id=message.interface_id,
+                metadata={
+                    **message.metadata,
+                    'is_chunk': True,
+                    'chunk_id': chunk_id,
+                    'chunk_index': frame.index,
+                    'total_chunks': frame.total,
+                    'original_message_id': message.id
+                }
+            )
+            for frame in frames
+        ]
+        self.logger.debug(f"Framed message {message.id} as {chunk_id} in {len(chunks)} parts")
+        return chunks
+
+    def remember(self, frames: List[ChunkFrame], recipient_id: Optional[str] = None):
+        """Keep frames so missing parts can be resent"""
+        if not frames or self.sent_cache_size <= 0:
+            return
+        self._expire()
+        seq_id = frames[0].seq_id
+        self.sent.pop(seq_id, None)
+        self.sent[seq_id] = SentMessage(recipient_id, frames, self.clock())
+        while len(self.sent) > self.sent_cache_size:
+            self.sent.popitem(last=False)
+
+    def get_frames(self, seq_id: int, indices: List[int], requester_id: Optional[str] = None) -> List[ChunkFrame]:
+        """Frames to resend for a re-request; direct messages are only resent to their recipient"""
+        self._expire()
+        sent = self.sent.get(seq_id)
+        if sent is None:
+            return []
+        recipient = sent.recipient_id or ''
+        if recipient not in BROADCAST_IDS and requester_id is not None and requester_id != recipient:
+            return []
+        return [sent.frames[i] for i in indices if 0 <= i < len(sent.frames)]
+
+    def _expire(self):
+        cutoff = self.clock() - self.sent_cache_ttl
+        while self.sent:
+            seq_id, sent = next(iter(self.sent.items()))
+            if sent.sent_at > cutoff:
+                break
+            self.sent.popitem(last=False)
+
+
+@dataclass
+class PartialMessage:
+    """Parts received so far for one framed message"""
+    sender_id: str
+    seq_id: int
+    total: int
+    parts: Dict[int, str] = field(default_factory=dict)
+    size: int = 0
+    created: float = 0.0
+    updated: float = 0.0
+    rerequests: int = 0
+    interface_id: Optional[str] = None
+    channel: Optional[int] = None
+
+    def missing(self) -> List[int]:
+        return [i for i in range(self.total) if i not in self.parts]
+
+
+@dataclass
+class ReassemblyStats:
+    """Reassembly buffer statistics"""
+    completed: int = 0
+    duplicates: int = 0
+    corrupted: int = 0
+    expired: int = 0
+    evicted: int = 0
+    rerequests: int = 0
+
+
+class ReassemblyBuffer:
+    """
+    Collects framed parts per (sender, sequence ID) until a message is complete.
+
+    Pending messages are bounded by count and total bytes (oldest dropped
+    first) and expire after ``timeout`` seconds without progress. Messages
+    idle for ``rerequest_after`` seconds with parts missing are reported by
+    ``due_rerequests`` so the caller can ask for just those parts.
+    """
+
+    def __init__(self, timeout: float = 300.0, max_messages: int = 64, max_bytes: int = 65536,
+                 rerequest_after: float = 30.0, max_rerequests: int = 2,
+                 clock: Callable[[], float] = time.monotonic):
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.rerequest_after = rerequest_after
+        self.max_rerequests = max_rerequests
+        self.clock = clock
+
+        self.pending: "OrderedDict[Tuple[str, int], PartialMessage]" = OrderedDict()
+        self.pending_bytes = 0
+        self.stats = ReassemblyStats()
+
+    def add(self, sender_id: str, frame: ChunkFrame, interface_id: Optional[str] = None,
+            channel: Optional[int] = None) -> Optional[str]:
+        """Store a part; returns the full content once every part has arrived"""
+        now = self.clock()
+        self.expire(now)
+
+        if frame.total == 1:
+            self.stats.completed += 1
+            return frame.payload
+
+        key = (sender_id, frame.seq_id)
+        partial = self.pending.get(key)
+        if partial is not None and partial.total != frame.total:
+            # Sequence ID reused for a different message
+            self._drop(key)
+            partial = None
+        if partial is None:
+            partial = PartialMessage(sender_id, frame.seq_id, frame.total, created=now,
+                                     interface_id=interface_id, channel=channel)
+            self.pending[key] = partial
+
+        if frame.index in partial.parts:
+            self.stats.duplicates += 1
+            return None
+
+        size = len(frame.payload.encode('utf-8'))
+        partial.parts[frame.index] = frame.payload
+        partial.size += size
+        partial.updated = now
+        self.pending_bytes += size
+        self.pending.move_to_end(key)
+
+        if len(partial.parts) == partial.total:
+            self._drop(key)
+            self.stats.completed += 1
+            return ''.join(partial.parts[i] for i in range(partial.total))
+
+        while self.pending and (len(self.pending) > self.max_messages or self.pending_bytes > self.max_bytes):
+            oldest = next(iter(self.pending))
+            self._drop(oldest)
+            self.stats.evicted += 1
+        return None
+
+    def record_corrupted(self):
+        """Count a part dropped for a CRC mismatch"""
+        self.stats.corrupted += 1
+
+    def _drop(self, key: Tuple[str, int]):
+        partial = self.pending.pop(key)
+        self.pending_bytes -= partial.size
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop messages with no new parts for ``timeout`` seconds"""
+        now = self.clock() if now is None else now
+        expired = [key for key, partial in self.pending.items() if now - partial.updated >= self.timeout]
+        for key in expired:
+            self._drop(key)
+        self.stats.expired += len(expired)
+        return len(expired)
+
+    def due_rerequests(self, now: Optional[float] = None) -> List[Tuple[PartialMessage, RerequestFrame]]:
+        """Pending messages that should re-request their missing parts now"""
+        now = self.clock() if now is None else now
+        self.expire(now)
+
+        due = []
+        for partial in self.pending.values():
+            if partial.rerequests >= self.max_rerequests or now - partial.updated < self.rerequest_after:
+                continue
+            partial.rerequests += 1
+            partial.updated = now
+            self.stats.rerequests += 1
+            due.append((partial, RerequestFrame(partial.seq_id, partial.missing()[:MAX_REREQUEST_PARTS])))
+        return due
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reassembly statistics"""
+        return {
+            'pending_messages': len(self.pending),
+            'pending_bytes': self.pending_bytes,
+            'completed': self.stats.completed,
+            'duplicates': self.stats.duplicates,
+            'corrupted': self.stats.corrupted,
+            'expired': self.stats.expired,
+            'evicted': self.stats.evicted,
+            'rerequests': self.stats.rerequests
+        }
@@ -53,12 +53,100 @@ class ConfigurationManager:
                 "interfaces": [],
                 "retry_interval": 30,
                 "message_timeout": 300,
-                "max_message_size": 228
+                "max_message_size": 228,
+                "chunking": {
+                    "reassembly_timeout": 300,
+                    "max_pending": 64,
+                    "max_pending_bytes": 65536,
+                    "rerequest_after": 30,
+                    "max_rerequests": 2,
+                    "sent_cache_size": 32,
+                    "sent_cache_ttl": 600
+                },
+                "airtime": {
+                    "modem_preset": "LONG_FAST",
+                    "duty_cycle_percent": 10,
+                    "window_seconds": 3600,
+                    "gap_factor": 0.5,
+                    "max_gap_factor": 4.0,
+                    "utilization_low": 25,
+                    "utilization_high": 50,
+                    "interfaces": {}
+                }
             },
             "database": {
                 "path": "data/zephyrgate.db",
                 "backup_interval": 3600,
-                "max_connections": 10
+                "max_connections": 10,
+                "async_writes": True,
+                "write_queue_size": 1000,
+                "write_batch_size": 100
+            },
+            "routing": {
+                "workers": 4,
+                "dispatch": {
+                    "timeout": 30,
+                    "max_concurrency": 4,
+                    "max_pending": 100,
+                    "max_retries": 3,
+                    "retry_delay": 30,
+                    "services": {}
+                },
+                "rate_limit": {
+                    "mode": "drop",
+                    "max_delay": 30,
+                    "max_delayed": 100,
+                    "global": {"capacity": 10, "refill_rate": 1.0},
+                    "channel": {"capacity": 20, "refill_rate": 1.0},
+                    "sender": {"capacity": 5, "refill_rate": 0.2},
+                    "tiers": {"emergency": {"capacity": 10, "refill_rate": 2.0}},
+                    "max_senders": 10000
+                },
+                "dedup": {
+                    "enabled": True,
+                    "ttl": 600,
+                    "payload_ttl": 0,
+                    "max_entries": 10000
+                },
+                "outbound": {
+                    "policy": "all",
+                    "affinity": {},
+                    "failure_threshold": 3,
+                    "recovery_time": 30,
+                    "max_reroutes": 2
+                }
+            },
+            "metrics": {
+                "namespace": "zephyrgate",
+                "max_series": 1000,
+                "histogram": {"lowest": 0.000001, "highest": 3600, "precision_bits": 6}
+            },
+            "tracing": {
+                "enabled": True,
+                "sample_rate": 1.0,
+                "max_traces": 500,
+                "max_slow_traces": 50,
+                "slow_threshold": 5.0,
+                "max_spans": 100
+            },
+            "scheduler": {
+                "max_sleep": 300,
+                "misfire_grace": 1.0,
+                "timezone": "UTC"
+            },
+            "health_monitor": {
+                "check_interval": 30,
+                "alert_cooldown": 300,
+                "max_alerts": 100,
+                "loop_monitor": {
+                    "enabled": True,
+                    "interval": 0.25,
+                    "slow_callback_threshold": 0.1,
+                    "max_events": 100,
+                    "stack_depth": 20,
+                    "lag_warning": 0.1,
+                    "lag_critical": 1.0
+                }
             },
             "services": {
                 "bbs": {"enabled": True},
@@ -66,7 +154,7 @@ class ConfigurationManager:
                 "bot": {"enabled": True},
                 "weather": {"enabled": True},
                 "email": {"enabled": False},
-                "web": {"enabled": True, "port": 8080}
+                "web": {"enabled": True, "port": 8080, "metrics_endpoint": True}
             },
             "logging": {
                 "level": "INFO",
@@ -80,6 +168,42 @@ class ConfigurationManager:
                 "auto_load": True,
                 "enabled_plugins": [],
                 "disabled_plugins": [],
+                "parallel_startup": True,
+                "lazy": {
+                    "enabled": False,
+                    "plugins": [],
+                    "idle_ttl": 1800,
+                    "check_interval": 60
+                },
+                "isolation": {
+                    "plugins": [],
+                    "call_timeout": 30,
+                    "start_timeout": 60,
+                    "max_pending": 100,
+                    "max_memory_mb": 0,
+                    "max_restarts": 5,
+                    "restart_window": 300,
+                    "monitor_interval": 10
+                },
+                "http": {
+                    "max_connections": 100,
+                    "max_connections_per_host": 8,
+                    "dns_cache_ttl": 300,
+                    "keepalive_timeout": 30,
+                    "cache": {
+                        "enabled": True,
+                        "max_entries": 512,
+                        "max_bytes": 8388608,
+                        "max_entry_bytes": 1048576
+                    }
+                },
+                "storage": {
+                    "cache_max_entries": 4096,
+                    "cache_max_bytes": 4194304,
+                    "write_delay": 0.5,
+                    "max_pending": 500,
+                    "sweep_interval": 60
+                },
                 "health_check_interval": 60,
                 "failure_threshold": 5,
                 "restart_backoff_base": 2,
@@ -0,0 +1,234 @@
+"""
+Cron Expressions for ZephyrGate
+
+Parses standard 5-field cron expressions (minute hour day month weekday) and
+6-field ones with a trailing seconds field, as croniter accepts, and computes
+fire times by advancing field by field rather than minute by minute.
+
+Supported syntax:
+    *  ?          any value
+    5  1-5  */15  10-50/10  5/15  1,15,30
+    JAN-DEC       month names
+    SUN-SAT       weekday names; 0 and 7 are both Sunday
+    L             last day of the month (day field)
+    5L  L5        last Friday of the month (weekday field)
+    1#2           second Monday of the month (weekday field)
+    @yearly @annually @monthly @weekly @daily @midnight @hourly
+
+As in Vixie cron, when both the day and weekday fields are restricted a time
+matches if either one does. If either field starts with ``*`` (e.g. ``*/2``)
+a time must match both.
+"""
+
+import calendar
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+
+MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+MONTH_NAMES = {name.lower(): number for number, name in enumerate(calendar.month_abbr) if name}
+WEEKDAY_NAMES = {'sun': 0, 'mon': 1, 'tue': 2, 'wed': 3, 'thu': 4, 'fri': 5, 'sat': 6}
+
+# Years searched before deciding an expression can never fire (e.g. "0 0 30 2 *")
+SEARCH_YEARS = 8
+
+
+def _parse_value(token: str, low: int, high: int, names: Optional[Dict[str, int]], field_name: str) -> int:
+    key = token.lower()
+    if names and key in names:
+        return names[key]
+    try:
+        value = int(token)
+    except ValueError:
+        raise ValueError(f"Invalid {field_name} value '{token}'")
+    if not low <= value <= high:
+        raise ValueError(f"{field_name.capitalize()} value {value} out of range {low}-{high}")
+    return value
+
+
+def _parse_field(spec: str, low: int, high: int, field_name: str,
+                 names: Optional[Dict[str, int]] = None) -> Set[int]:
+    """Parse one comma-separated cron field into the set of values it allows"""
+    values: Set[int] = set()
+    for part in spec.split(','):
+        if not part:
+            raise ValueError(f"Empty item in {field_name} field '{spec}'")
+        base, _, step_text = part.partition('/')
+        step = 1
+        if step_text:
+            try:
+                step = int(step_text)
+            except ValueError:
+                raise ValueError(f"Invalid step '{step_text}' in {field_name} field")
+            if step <= 0:
+                raise ValueError(f"Step must be positive in {field_name} field")
+
+        if base in ('*', '?'):
+            start, end = low, high
+        elif '-' in base:
+            first, _, last = base.partition('-')
+            start = _parse_value(first, low, high, names, field_name)
+            end = _parse_value(last, low, high, names, field_name)
+            if start > end:
+                raise ValueError(f"Invalid {field_name} range '{base}'")
+        else:
+            start = _parse_value(base, low, high, names, field_name)
+            end = high if step_text else start
+
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """A parsed cron expression that can compute its next fire time"""
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        text = MACROS.get(self.expression.lower(), self.expression)
+        parts = text.split()
+        if len(parts) not in (5, 6):
+            raise ValueError(
+                f"Invalid cron expression: {expression}. Expected 5 fields (or 6 with seconds)."
+            )
+
+        self.fields: Dict[str, str] = dict(zip(('minute', 'hour', 'day', 'month', 'weekday'), parts))
+        if len(parts) == 6:
+            self.fields['second'] = parts[5]
+
+        self.seconds = sorted(_parse_field(self.fields.get('second', '0'), 0, 59, 'second'))
+        self.minutes = sorted(_parse_field(parts[0], 0, 59, 'minute'))
+        self.hours = sorted(_parse_field(parts[1], 0, 23, 'hour'))
+        self.months = sorted(_parse_field(parts[3], 1, 12, 'month', MONTH_NAMES))
+        self._second_set = set(self.seconds)
+        self._minute_set = set(self.minutes)
+        self._hour_set = set(self.hours)
+        self._month_set = set(self.months)
+
+        self.day_any = parts[2].startswith(('*', '?'))
+        self.weekday_any = parts[4].startswith(('*', '?'))
+        self.last_day = False
+        self.days = self._parse_days(parts[2])
+        self.nth_weekdays: Set[Tuple[int, int]] = set()
+        self.last_weekdays: Set[int] = set()
+        self.weekdays = self._parse_weekdays(parts[4])
+
+    def _parse_days(self, spec: str) -> Set[int]:
+        items = []
+        for item in spec.split(','):
+            if item.upper() == 'L':
+                self.last_day = True
+            else:
+                items.append(item)
+        return _parse_field(','.join(items), 1, 31, 'day') if items else set()
+
+    def _parse_weekdays(self, spec: str) -> Set[int]:
+        items = []
+        for item in spec.split(','):
+            if '#' in item:
+                day, _, nth = item.partition('#')
+                weekday = _parse_value(day, 0, 7, WEEKDAY_NAMES, 'weekday') % 7
+                occurrence = _parse_value(nth, 1, 5, None, 'weekday occurrence')
+                self.nth_weekdays.add((weekday, occurrence))
+            elif len(item) > 1 and item.upper().endswith('L'):
+                self.last_weekdays.add(_parse_value(item[:-1], 0, 7, WEEKDAY_NAMES, 'weekday') % 7)
+            elif len(item) > 1 and item.upper().startswith('L'):
+                self.last_weekdays.add(_parse_value(item[1:], 0, 7, WEEKDAY_NAMES, 'weekday') % 7)
+            else:
+                items.append(item)
+        values = _parse_field(','.join(items), 0, 7, 'weekday', WEEKDAY_NAMES) if items else set()
+        return {value % 7 for value in values}
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        month_length = calendar.monthrange(moment.year, moment.month)[1]
+        day = moment.day
+        day_match = day in self.days or (self.last_day and day == month_length)
+        weekday = (moment.weekday() + 1) % 7  # Sunday is 0
+        weekday_match = (
+            weekday in self.weekdays or
+            (weekday, (day - 1) // 7 + 1) in self.nth_weekdays or
+            (weekday in self.last_weekdays and day + 7 > month_length)
+        )
+        if self.day_any or self.weekday_any:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    @staticmethod
+    def _next_value(values: List[int], current: int) -> Optional[int]:
+        index = bisect_left(values, current)
+        return values[index] if index < len(values) else None
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Get the first fire time strictly after ``after``.
+
+        Times are computed on the wall clock of ``after``; the result has the
+        same tzinfo.
+
+        Raises:
+            ValueError: If the expression never fires (e.g. February 30th)
+        """
+        tzinfo = after.tzinfo
+        moment = after.replace(tzinfo=None, microsecond=0) + timedelta(seconds=1)
+        limit = moment.year + SEARCH_YEARS
+
+        while moment.year <= limit:
+            if moment.month not in self._month_set:
+                month = self._next_value(self.months, moment.month)
+                if month is None:
+                    moment = datetime(moment.year + 1, self.months[0], 1)
+                else:
+                    moment = datetime(moment.year, month, 1)
+                continue
+
+            if not self._day_matches(moment):
+                moment = datetime(moment.year, moment.month, moment.day) + timedelta(days=1)
+                continue
+
+            if moment.hour not in self._hour_set:
+                hour = self._next_value(self.hours, moment.hour)
+                if hour is None:
+                    moment = datetime(moment.year, moment.month, moment.day) + timedelta(days=1)
+                else:
+                    moment = moment.replace(hour=hour, minute=0, second=0)
+                continue
+
+            if moment.minute not in self._minute_set:
+                minute = self._next_value(self.minutes, moment.minute)
+                if minute is None:
+                    moment = moment.replace(minute=0, second=0) + timedelta(hours=1)
+                else:
+                    moment = moment.replace(minute=minute, second=0)
+                continue
+
+            if moment.second not in self._second_set:
+                second = self._next_value(self.seconds, moment.second)
+                if second is None:
+                    moment = moment.replace(second=0) + timedelta(minutes=1)
+                else:
+                    moment = moment.replace(second=second)
+                continue
+
+            return moment.replace(tzinfo=tzinfo)
+
+        raise ValueError(f"Cron expression '{self.expression}' never fires")
+
+    def next_times(self, after: datetime, count: int) -> List[datetime]:
+        """Get the next ``count`` fire times after ``after``"""
+        times = []
+        for _ in range(count):
+            after = self.next_after(after)
+            times.append(after)
+        return times
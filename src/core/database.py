@@ -7,6 +7,7 @@ and transaction management for all ZephyrGate services.
 
 import sqlite3
 import logging
+import re
 import threading
 import time
 from contextlib import contextmanager
@@ -16,6 +17,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import json
 
+from .metrics import get_metrics_registry
+
 
 @dataclass
 class Migration:
@@ -31,6 +34,22 @@ class DatabaseError(Exception):
     pass
 
 
+def fts_match_query(text: str, prefix: bool = True) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression from free text typed by a user.
+    
+    Every word must appear. With prefix set a word also matches the start of
+    a longer one, so "mesh rep" finds "Mesh repeater down"; without it words
+    match whole unless typed with a trailing "*" ("rep*"). Words are quoted,
+    so FTS5 operators and punctuation in the text are matched literally
+    rather than parsed. Returns None when the text has no searchable words.
+    """
+    words = re.findall(r'(\w+)(\*?)', text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' if prefix or star else f'"{word}"' for word, star in words)
+
+
 class ConnectionPool:
     """Simple SQLite connection pool"""
     
@@ -97,6 +116,14 @@ class DatabaseManager:
         self.logger = logging.getLogger(__name__)
         self.migrations = self._get_migrations()
         
+        call_latency = get_metrics_registry().histogram(
+            'db_call_seconds', 'Database call latency by operation', ['operation']
+        )
+        self._call_latency = {
+            operation: call_latency.labels(operation=operation)
+            for operation in ('query', 'update', 'many', 'batch')
+        }
+        
         # Ensure database directory exists
         self.database_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -465,6 +492,172 @@ class DatabaseManager:
                 -- Create index for last_seen to improve stats queries
                 CREATE INDEX IF NOT EXISTS idx_users_last_seen ON users (last_seen);
                 """
+            ),
+            Migration(
+                version=9,
+                name="add_bbs_full_text_search",
+                sql="""
+                -- Full-text indexes over bulletins and mail. They are external
+                -- content tables: text is read from the base tables, and the
+                -- triggers below keep the index in step with every change.
+                CREATE VIRTUAL TABLE bulletins_fts USING fts5 (
+                    subject, content, sender_name,
+                    content='bulletins', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                );
+                
+                CREATE VIRTUAL TABLE mail_fts USING fts5 (
+                    subject, content, sender_name,
+                    content='mail', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                );
+                
+                CREATE TRIGGER bulletins_fts_insert AFTER INSERT ON bulletins BEGIN
+                    INSERT INTO bulletins_fts (rowid, subject, content, sender_name)
+                    VALUES (new.id, new.subject, new.content, new.sender_name);
+                END;
+                
+                CREATE TRIGGER bulletins_fts_delete AFTER DELETE ON bulletins BEGIN
+                    INSERT INTO bulletins_fts (bulletins_fts, rowid, subject, content, sender_name)
+                    VALUES ('delete', old.id, old.subject, old.content, old.sender_name);
+                END;
+                
+                CREATE TRIGGER bulletins_fts_update AFTER UPDATE OF subject, content, sender_name ON bulletins BEGIN
+                    INSERT INTO bulletins_fts (bulletins_fts, rowid, subject, content, sender_name)
+                    VALUES ('delete', old.id, old.subject, old.content, old.sender_name);
+                    INSERT INTO bulletins_fts (rowid, subject, content, sender_name)
+                    VALUES (new.id, new.subject, new.content, new.sender_name);
+                END;
+                
+                CREATE TRIGGER mail_fts_insert AFTER INSERT ON mail BEGIN
+                    INSERT INTO mail_fts (rowid, subject, content, sender_name)
+                    VALUES (new.id, new.subject, new.content, new.sender_name);
+                END;
+                
+                CREATE TRIGGER mail_fts_delete AFTER DELETE ON mail BEGIN
+                    INSERT INTO mail_fts (mail_fts, rowid, subject, content, sender_name)
+                    VALUES ('delete', old.id, old.subject, old.content, old.sender_name);
+                END;
+                
+                CREATE TRIGGER mail_fts_update AFTER UPDATE OF subject, content, sender_name ON mail BEGIN
+                    INSERT INTO mail_fts (mail_fts, rowid, subject, content, sender_name)
+                    VALUES ('delete', old.id, old.subject, old.content, old.sender_name);
+                    INSERT INTO mail_fts (rowid, subject, content, sender_name)
+                    VALUES (new.id, new.subject, new.content, new.sender_name);
+                END;
+                
+                -- Index bulletins and mail stored before this migration
+                INSERT INTO bulletins_fts (bulletins_fts) VALUES ('rebuild');
+                INSERT INTO mail_fts (mail_fts) VALUES ('rebuild');
+                """
+            ),
+            Migration(
+                version=10,
+                name="add_message_history_search",
+                sql="""
+                -- Full-text index over message content, kept in step with the
+                -- table by triggers like the BBS indexes. History searches
+                -- match whole words, so no prefix indexes are kept.
+                CREATE VIRTUAL TABLE message_history_fts USING fts5 (
+                    content,
+                    content='message_history', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                
+                CREATE TRIGGER message_history_fts_insert AFTER INSERT ON message_history BEGIN
+                    INSERT INTO message_history_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+                
+                CREATE TRIGGER message_history_fts_delete AFTER DELETE ON message_history BEGIN
+                    INSERT INTO message_history_fts (message_history_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END;
+                
+                CREATE TRIGGER message_history_fts_update AFTER UPDATE OF content ON message_history BEGIN
+                    INSERT INTO message_history_fts (message_history_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                    INSERT INTO message_history_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+                
+                -- Per-channel pages; like the sender index this also orders
+                -- each channel's rows by id
+                CREATE INDEX IF NOT EXISTS idx_message_history_channel ON message_history (channel);
+                
+                INSERT INTO message_history_fts (message_history_fts) VALUES ('rebuild');
+                """
+            ),
+            Migration(
+                version=11,
+                name="add_stats_rollups",
+                sql="""
+                -- Per-node activity in minute, hour and day buckets, added to
+                -- as packets arrive. Buckets are keyed by their start time
+                -- (naive UTC, ISO format). There is no foreign key to users:
+                -- node rows are written before the node registry flushes.
+                CREATE TABLE IF NOT EXISTS node_stats_rollup (
+                    period TEXT NOT NULL, -- minute, hour or day
+                    bucket TEXT NOT NULL,
+                    node_id TEXT NOT NULL,
+                    packets INTEGER NOT NULL DEFAULT 0,
+                    messages INTEGER NOT NULL DEFAULT 0,
+                    snr_sum REAL NOT NULL DEFAULT 0,
+                    snr_count INTEGER NOT NULL DEFAULT 0,
+                    rssi_sum REAL NOT NULL DEFAULT 0,
+                    rssi_count INTEGER NOT NULL DEFAULT 0,
+                    battery_sum REAL NOT NULL DEFAULT 0,
+                    battery_count INTEGER NOT NULL DEFAULT 0,
+                    battery_last INTEGER,
+                    PRIMARY KEY (period, bucket, node_id)
+                ) WITHOUT ROWID;
+
+                -- Network totals per bucket, kept in step with the node rows
+                -- by triggers; active_nodes counts the bucket's node rows
+                CREATE TABLE IF NOT EXISTS network_stats_rollup (
+                    period TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    active_nodes INTEGER NOT NULL DEFAULT 0,
+                    packets INTEGER NOT NULL DEFAULT 0,
+                    messages INTEGER NOT NULL DEFAULT 0,
+                    snr_sum REAL NOT NULL DEFAULT 0,
+                    snr_count INTEGER NOT NULL DEFAULT 0,
+                    rssi_sum REAL NOT NULL DEFAULT 0,
+                    rssi_count INTEGER NOT NULL DEFAULT 0,
+                    battery_sum REAL NOT NULL DEFAULT 0,
+                    battery_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (period, bucket)
+                ) WITHOUT ROWID;
+
+                CREATE TRIGGER IF NOT EXISTS node_stats_rollup_insert AFTER INSERT ON node_stats_rollup BEGIN
+                    INSERT INTO network_stats_rollup
+                    (period, bucket, active_nodes, packets, messages, snr_sum, snr_count,
+                     rssi_sum, rssi_count, battery_sum, battery_count)
+                    VALUES (new.period, new.bucket, 1, new.packets, new.messages, new.snr_sum, new.snr_count,
+                            new.rssi_sum, new.rssi_count, new.battery_sum, new.battery_count)
+                    ON CONFLICT (period, bucket) DO UPDATE SET
+                        active_nodes = active_nodes + 1,
+                        packets = packets + excluded.packets,
+                        messages = messages + excluded.messages,
+                        snr_sum = snr_sum + excluded.snr_sum,
+                        snr_count = snr_count + excluded.snr_count,
+                        rssi_sum = rssi_sum + excluded.rssi_sum,
+                        rssi_count = rssi_count + excluded.rssi_count,
+                        battery_sum = battery_sum + excluded.battery_sum,
+                        battery_count = battery_count + excluded.battery_count;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS node_stats_rollup_update AFTER UPDATE ON node_stats_rollup BEGIN
+                    UPDATE network_stats_rollup SET
+                        packets = packets + new.packets - old.packets,
+                        messages = messages + new.messages - old.messages,
+                        snr_sum = snr_sum + new.snr_sum - old.snr_sum,
+                        snr_count = snr_count + new.snr_count - old.snr_count,
+                        rssi_sum = rssi_sum + new.rssi_sum - old.rssi_sum,
+                        rssi_count = rssi_count + new.rssi_count - old.rssi_count,
+                        battery_sum = battery_sum + new.battery_sum - old.battery_sum,
+                        battery_count = battery_count + new.battery_count - old.battery_count
+                    WHERE period = new.period AND bucket = new.bucket;
+                END;
+                """
             )
         ]
     
@@ -517,19 +710,19 @@ class DatabaseManager:
     
     def execute_query(self, query: str, params: Tuple = ()) -> List[sqlite3.Row]:
         """Execute a SELECT query and return results"""
-        with self.get_connection() as conn:
+        with self._call_latency['query'].time(), self.get_connection() as conn:
             cursor = conn.execute(query, params)
             return cursor.fetchall()
     
     def execute_update(self, query: str, params: Tuple = ()) -> int:
         """Execute an INSERT/UPDATE/DELETE query and return affected rows"""
-        with self.transaction() as conn:
+        with self._call_latency['update'].time(), self.transaction() as conn:
             cursor = conn.execute(query, params)
             return cursor.rowcount
     
     def execute_many(self, query: str, params_list: List[Tuple]) -> int:
         """Execute a query with multiple parameter sets"""
-        with self.transaction() as conn:
+        with self._call_latency['many'].time(), self.transaction() as conn:
             cursor = conn.executemany(query, params_list)
             return cursor.rowcount
     
@@ -551,6 +744,11 @@ class DatabaseManager:
     
     def upsert_user(self, user_data: Dict[str, Any]) -> None:
         """Insert or update user data"""
+        query, params = self.build_user_upsert(user_data)
+        self.execute_update(query, params)
+
+    def build_user_upsert(self, user_data: Dict[str, Any]) -> Tuple[str, Tuple]:
+        """Build the upsert query and parameters for a user record"""
         # Convert JSON fields to strings
         user_data = user_data.copy()
         if 'tags' in user_data:
@@ -573,8 +771,8 @@ class DatabaseManager:
             VALUES ({placeholders})
             ON CONFLICT(node_id) DO UPDATE SET {update_clause}
         """
-        
-        self.execute_update(query, tuple(user_data.values()))
+
+        return query, tuple(user_data.values())
     
     def cleanup_expired_data(self) -> None:
         """Clean up expired data from the database"""
@@ -0,0 +1,309 @@
+"""
+Asynchronous Database Writer for ZephyrGate
+
+Moves SQLite writes off the asyncio event loop. Write intents are accepted
+through a bounded queue and committed by a dedicated writer thread in grouped
+transactions, so message routing latency no longer depends on commit/fsync time.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import DatabaseManager, DatabaseError
+from .logging import get_logger
+from .metrics import get_metrics_registry
+
+
+@dataclass
+class WriteIntent:
+    """A single pending write operation"""
+    query: str
+    params: Tuple = ()
+    future: Optional[asyncio.Future] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class WriterStats:
+    """Database writer statistics"""
+    intents_submitted: int = 0
+    intents_committed: int = 0
+    intents_failed: int = 0
+    batches_committed: int = 0
+    batch_rollbacks: int = 0
+    backpressure_waits: int = 0
+    max_queue_depth: int = 0
+    total_commit_time: float = 0.0
+    last_commit_time: float = 0.0
+    total_queue_latency: float = 0.0
+
+    def get_average_batch_size(self) -> float:
+        """Average number of intents committed per transaction"""
+        if self.batches_committed == 0:
+            return 0.0
+        return self.intents_committed / self.batches_committed
+
+    def get_average_commit_time(self) -> float:
+        """Average transaction commit time in seconds"""
+        if self.batches_committed == 0:
+            return 0.0
+        return self.total_commit_time / self.batches_committed
+
+    def get_average_queue_latency(self) -> float:
+        """Average time between submit and commit in seconds"""
+        completed = self.intents_committed + self.intents_failed
+        if completed == 0:
+            return 0.0
+        return self.total_queue_latency / completed
+
+
+class AsyncDatabaseWriter:
+    """
+    Off-loop database writer with grouped transactions and backpressure.
+
+    Callers on the event loop submit write intents with ``submit()``, which
+    only waits while the queue is full (backpressure) and returns a future that
+    resolves with the affected row count once the intent has been committed.
+    ``execute()`` waits for that commit. A single writer thread drains the queue
+    and commits up to ``batch_size`` intents per transaction.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_manager: DatabaseManager, max_queue_size: int = 1000,
+                 batch_size: int = 100, batch_wait: float = 0.01):
+        self.db = db_manager
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.logger = get_logger('db_writer')
+
+        self.queue: queue.Queue = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        self.stats = WriterStats()
+
+        # Bounds outstanding intents; acquired on the event loop, released on completion
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats_lock = threading.Lock()
+
+        metrics = get_metrics_registry()
+        self._queue_depth = metrics.gauge('queue_depth', 'Messages waiting in each queue', ['queue']).labels(
+            queue='db_writer'
+        )
+        self._commit_latency = metrics.histogram(
+            'db_call_seconds', 'Database call latency by operation', ['operation']
+        ).labels(operation='batch')
+
+    def start(self):
+        """Start the writer thread"""
+        if self.running:
+            return
+
+        self._loop = asyncio.get_event_loop()
+        self._slots = asyncio.Semaphore(self.max_queue_size)
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._writer_loop,
+            name='zephyrgate-db-writer',
+            daemon=True
+        )
+        self.thread.start()
+        self.logger.info(f"Database writer started (queue={self.max_queue_size}, batch={self.batch_size})")
+
+    async def stop(self, timeout: float = 30.0):
+        """Flush pending writes and stop the writer thread"""
+        if not self.running:
+            return
+
+        self.running = False
+        self.queue.put(self._STOP)
+
+        if self.thread:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.thread.join, timeout)
+            if self.thread.is_alive():
+                self.logger.warning("Database writer did not stop within timeout")
+            self.thread = None
+
+        self.logger.info("Database writer stopped")
+
+    async def submit(self, query: str, params: Tuple = ()) -> asyncio.Future:
+        """
+        Queue a write intent.
+
+        Waits only while the queue is full. Returns a future that resolves to
+        the affected row count once the write is committed.
+        """
+        if not self.running:
+            raise DatabaseError("Database writer is not running")
+
+        if self._slots.locked():
+            self.stats.backpressure_waits += 1
+        await self._slots.acquire()
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        future.add_done_callback(self._on_intent_done)
+
+        self.queue.put(WriteIntent(query=query, params=params, future=future, loop=loop))
+
+        with self._stats_lock:
+            self.stats.intents_submitted += 1
+            depth = self.queue.qsize()
+            if depth > self.stats.max_queue_depth:
+                self.stats.max_queue_depth = depth
+        self._queue_depth.set(depth)
+
+        return future
+
+    async def execute(self, query: str, params: Tuple = ()) -> int:
+        """Queue a write intent and wait until it has been committed"""
+        future = await self.submit(query, params)
+        return await future
+
+    async def flush(self):
+        """Wait until every intent submitted so far has been committed"""
+        if not self.running:
+            return
+        # Intents are committed in FIFO order, so a no-op marker is enough
+        await self.execute("SELECT 1")
+
+    def _on_intent_done(self, future: asyncio.Future):
+        """Release a queue slot and log failed intents (runs on the event loop)"""
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.debug(f"Write intent failed: {future.exception()}")
+
+    def _writer_loop(self):
+        """Writer thread: drain the queue and commit grouped transactions"""
+        stopping = False
+
+        while not stopping:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+
+            # Group whatever arrives within the batch window
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(batch)
+
+        # Drain anything queued before the stop marker was observed
+        remaining = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                remaining.append(item)
+
+        for start in range(0, len(remaining), self.batch_size):
+            self._commit_batch(remaining[start:start + self.batch_size])
+
+    def _commit_batch(self, batch: List[WriteIntent]):
+        """Commit a batch in one transaction, isolating failures on rollback"""
+        start = time.monotonic()
+
+        try:
+            results = []
+            with self.db.transaction() as conn:
+                for intent in batch:
+                    cursor = conn.execute(intent.query, intent.params)
+                    results.append(cursor.rowcount)
+        except Exception as e:
+            with self._stats_lock:
+                self.stats.batch_rollbacks += 1
+
+            if len(batch) == 1:
+                self._record_failure(batch[0], e)
+                return
+
+            # One bad intent must not discard the rest of the group
+            self.logger.warning(f"Batch of {len(batch)} writes rolled back ({e}), retrying individually")
+            for intent in batch:
+                self._commit_batch([intent])
+            return
+
+        elapsed = time.monotonic() - start
+        now = time.monotonic()
+
+        with self._stats_lock:
+            self.stats.batches_committed += 1
+            self.stats.intents_committed += len(batch)
+            self.stats.total_commit_time += elapsed
+            self.stats.last_commit_time = elapsed
+            for intent in batch:
+                self.stats.total_queue_latency += now - intent.enqueued_at
+        self._commit_latency.observe(elapsed)
+        self._queue_depth.set(self.queue.qsize())
+
+        for intent, rowcount in zip(batch, results):
+            self._resolve(intent, result=rowcount)
+
+    def _record_failure(self, intent: WriteIntent, error: Exception):
+        """Record a failed intent and propagate the error to its future"""
+        with self._stats_lock:
+            self.stats.intents_failed += 1
+            self.stats.total_queue_latency += time.monotonic() - intent.enqueued_at
+
+        self.logger.error(f"Database write failed: {error}")
+        self._resolve(intent, error=error)
+
+    def _resolve(self, intent: WriteIntent, result: Any = None, error: Optional[Exception] = None):
+        """Complete an intent's future on its owning event loop"""
+        if intent.future is None or intent.loop is None:
+            return
+
+        def _set():
+            if intent.future.done():
+                return
+            if error is not None:
+                intent.future.set_exception(error)
+            else:
+                intent.future.set_result(result)
+
+        try:
+            intent.loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics, including backpressure metrics"""
+        with self._stats_lock:
+            return {
+                'running': self.running,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_size': self.max_queue_size,
+                'max_queue_depth': self.stats.max_queue_depth,
+                'intents_submitted': self.stats.intents_submitted,
+                'intents_committed': self.stats.intents_committed,
+                'intents_failed': self.stats.intents_failed,
+                'batches_committed': self.stats.batches_committed,
+                'batch_rollbacks': self.stats.batch_rollbacks,
+                'backpressure_waits': self.stats.backpressure_waits,
+                'average_batch_size': self.stats.get_average_batch_size(),
+                'average_commit_ms': self.stats.get_average_commit_time() * 1000,
+                'last_commit_ms': self.stats.last_commit_time * 1000,
+                'average_queue_latency_ms': self.stats.get_average_queue_latency() * 1000
+            }
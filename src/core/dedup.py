@@ -0,0 +1,161 @@
+"""
+Duplicate Packet Suppression for ZephyrGate
+
+A gateway hears the same packet more than once: rebroadcasts by other
+nodes, and the same packet arriving on several interfaces. Each copy would
+otherwise be stored, classified and dispatched again, and answered twice.
+
+``DuplicateFilter`` remembers recently seen packets and reports repeats.
+Packets are keyed on (sender, Meshtastic packet ID), which also separates
+a user deliberately repeating a command. Only interfaces that supply a
+packet ID (currently the serial interface) are deduplicated this way.
+Messages without one can optionally fall back to a hash of sender,
+recipient, channel and content over a short window; that fallback is off by
+default because it cannot tell a rebroadcast from a repeated command.
+
+Each key set is an insertion-ordered map with a TTL and a size cap, so
+memory stays bounded and expiry is O(1) per entry.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .logging import get_logger
+
+
+Clock = Callable[[], float]
+
+
+class SeenSet:
+    """Keys seen within the last ``ttl`` seconds, capped at ``max_entries`` (oldest dropped first)"""
+
+    def __init__(self, ttl: float, max_entries: int = 10000, clock: Clock = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        # key -> (first seen, interface that first saw it); oldest first
+        self._entries: "OrderedDict[Any, Tuple[float, Optional[str]]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def check_and_add(self, key: Any, interface_id: Optional[str] = None,
+                      now: Optional[float] = None) -> Optional[Tuple[float, Optional[str]]]:
+        """Record ``key``; returns the earlier sighting if it was already seen"""
+        now = self.clock() if now is None else now
+        self.expire(now)
+
+        seen = self._entries.get(key)
+        if seen is not None:
+            return seen
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = (now, interface_id)
+        return None
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop keys first seen more than ``ttl`` seconds ago"""
+        now = self.clock() if now is None else now
+        cutoff = now - self.ttl
+        expired = 0
+        while self._entries:
+            first_seen = next(iter(self._entries.values()))[0]
+            if first_seen > cutoff:
+                break
+            self._entries.popitem(last=False)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def clear(self):
+        self._entries.clear()
+
+
+@dataclass
+class DedupStats:
+    """Duplicate filter statistics"""
+    checked: int = 0
+    suppressed_packet_id: int = 0
+    suppressed_payload: int = 0
+    cross_interface: int = 0  # duplicates first heard on a different interface
+
+    @property
+    def suppressed(self) -> int:
+        return self.suppressed_packet_id + self.suppressed_payload
+
+
+class DuplicateFilter:
+    """Reports packets already seen recently, on any interface"""
+
+    def __init__(self, enabled: bool = True, ttl: float = 600.0, payload_ttl: float = 0.0,
+                 max_entries: int = 10000, clock: Clock = time.monotonic):
+        self.enabled = enabled
+        self.payload_fallback = payload_ttl > 0
+        self.packet_ids = SeenSet(ttl, max_entries, clock)
+        self.payloads = SeenSet(payload_ttl, max_entries, clock)
+        self.stats = DedupStats()
+        self.logger = get_logger('dedup')
+
+    def key_for(self, message: Any) -> Tuple[str, Any]:
+        """The key type and key identifying a message's packet"""
+        packet_id = message.metadata.get('packet_id')
+        if packet_id is not None:
+            return 'packet_id', (message.sender_id, packet_id)
+        return 'payload', hash((message.sender_id, message.recipient_id, message.channel,
+                                message.message_type, message.content))
+
+    def is_duplicate(self, message: Any) -> bool:
+        """Record a received message; True if the same packet was seen within the window"""
+        if not self.enabled:
+            return False
+        self.stats.checked += 1
+
+        key_type, key = self.key_for(message)
+        if key_type == 'payload' and not self.payload_fallback:
+            return False
+        seen_set = self.packet_ids if key_type == 'packet_id' else self.payloads
+        seen = seen_set.check_and_add(key, message.interface_id)
+        if seen is None:
+            return False
+
+        if key_type == 'packet_id':
+            self.stats.suppressed_packet_id += 1
+        else:
+            self.stats.suppressed_payload += 1
+        first_interface = seen[1]
+        if first_interface is not None and first_interface != message.interface_id:
+            self.stats.cross_interface += 1
+        self.logger.debug(f"Suppressed duplicate from {message.sender_id} on {message.interface_id} "
+                          f"(first heard on {first_interface}, by {key_type})")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get duplicate filter statistics"""
+        return {
+            'enabled': self.enabled,
+            'checked': self.stats.checked,
+            'suppressed': self.stats.suppressed,
+            'suppressed_packet_id': self.stats.suppressed_packet_id,
+            'suppressed_payload': self.stats.suppressed_payload,
+            'cross_interface': self.stats.cross_interface,
+            'tracked_packet_ids': len(self.packet_ids),
+            'tracked_payloads': len(self.payloads),
+            'evictions': self.packet_ids.evictions + self.payloads.evictions
+        }
+
+
+def create_duplicate_filter(config: Optional[Dict[str, Any]] = None) -> DuplicateFilter:
+    """Build a duplicate filter from the ``routing.dedup`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    return DuplicateFilter(
+        enabled=bool(config.get('enabled', True)),
+        ttl=float(config.get('ttl', 600.0)),
+        payload_ttl=float(config.get('payload_ttl', 0.0)),
+        max_entries=int(config.get('max_entries', 10000))
+    )
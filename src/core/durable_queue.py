@@ -0,0 +1,251 @@
+"""
+Durable Outbound Queue Storage for ZephyrGate
+
+Keeps queued outbound messages in a dedicated SQLite database so they
+survive a crash or restart. The database runs in WAL mode with
+``synchronous=NORMAL``: a commit appends to the write-ahead log without an
+fsync, and committed data survives the process being killed.
+
+All statements run on one writer thread and are committed in groups.
+Enqueues wait for the commit that contains them, so a message reported as
+queued is on disk; concurrent enqueues share one commit. Deletes and retry
+updates are write-behind: if the process dies first, a message is sent
+again after restart (at-least-once delivery).
+"""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging import get_logger
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbound_queue (
+    queue_id TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL,
+    enqueued_at REAL NOT NULL,
+    due_at REAL,
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 3,
+    chunk_id TEXT,
+    chunks_sent INTEGER NOT NULL DEFAULT 0,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbound_queue_order
+    ON outbound_queue(priority DESC, enqueued_at) WHERE due_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_outbound_queue_due
+    ON outbound_queue(due_at) WHERE due_at IS NOT NULL;
+"""
+
+
+@dataclass
+class QueueRecord:
+    """A stored outbound queue entry"""
+    queue_id: str
+    priority: int
+    enqueued_at: float  # epoch seconds
+    message: str  # Message.to_dict() as JSON
+    due_at: Optional[float] = None  # retry due time (epoch seconds), None when ready
+    retry_count: int = 0
+    max_retries: int = 3
+    chunk_id: Optional[str] = None  # chunk sequence tag once a chunked send has started
+    chunks_sent: int = 0
+
+
+@dataclass
+class DurableQueueStats:
+    """Durable queue statistics"""
+    commits: int = 0
+    statements: int = 0
+    commit_errors: int = 0
+    total_commit_time: float = 0.0
+    max_batch: int = 0
+    restored: int = 0
+    restore_time: float = 0.0
+
+
+class DurableQueueStore:
+    """
+    SQLite-backed storage for the outbound queue with group commit.
+
+    ``put`` waits until its batch is committed; ``update`` and ``delete``
+    return immediately and are committed with the next batch. Rows are
+    loaded once by ``start`` in priority order (ready items) and due-time
+    order (retries).
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, synchronous: str = 'NORMAL'):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.synchronous = synchronous
+        self.logger = get_logger('durable_queue')
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='durable-queue')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[str, Tuple]] = []
+        self._waiters: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.stats = DurableQueueStats()
+
+    # Writer thread
+
+    def _open(self) -> List[QueueRecord]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+        rows = conn.execute(
+            "SELECT queue_id, priority, enqueued_at, message, due_at, retry_count, max_retries, "
+            "chunk_id, chunks_sent FROM outbound_queue "
+            "ORDER BY due_at IS NOT NULL, priority DESC, enqueued_at, due_at"
+        ).fetchall()
+        return [QueueRecord(*row) for row in rows]
+
+    def _commit(self, statements: List[Tuple[str, Tuple]]):
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # Event loop side
+
+    async def start(self) -> List[QueueRecord]:
+        """Open the database and return the stored records for restoring"""
+        loop = asyncio.get_event_loop()
+        started = time.perf_counter()
+        records = await loop.run_in_executor(self._executor, self._open)
+        self.stats.restored = len(records)
+        self.stats.restore_time = time.perf_counter() - started
+
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._writer_task = asyncio.create_task(self._writer())
+        self.logger.info(f"Opened durable queue {self.path} with {len(records)} stored messages "
+                         f"in {self.stats.restore_time * 1000:.1f}ms")
+        return records
+
+    async def stop(self):
+        """Commit outstanding changes and close the database"""
+        if self._writer_task is not None:
+            await self.flush()
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+        await asyncio.get_event_loop().run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait=True)
+
+    def _submit(self, sql: str, params: Tuple):
+        self._pending.append((sql, params))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def put(self, record: QueueRecord):
+        """Store a record; returns once it has been committed"""
+        self._submit(
+            "INSERT OR REPLACE INTO outbound_queue (queue_id, priority, enqueued_at, message, due_at, "
+            "retry_count, max_retries, chunk_id, chunks_sent) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.queue_id, record.priority, record.enqueued_at, record.message, record.due_at,
+             record.retry_count, record.max_retries, record.chunk_id, record.chunks_sent)
+        )
+        await self.flush()
+
+    def update_retry(self, queue_id: str, retry_count: int, due_at: float, chunks_sent: int = 0):
+        """Record a scheduled retry (write-behind)"""
+        self._submit(
+            "UPDATE outbound_queue SET retry_count = ?, due_at = ?, chunks_sent = ? WHERE queue_id = ?",
+            (retry_count, due_at, chunks_sent, queue_id)
+        )
+
+    def update_progress(self, queue_id: str, chunk_id: Optional[str], chunks_sent: int):
+        """Record how many chunks of a message have been sent (write-behind)"""
+        self._submit(
+            "UPDATE outbound_queue SET chunk_id = ?, chunks_sent = ? WHERE queue_id = ?",
+            (chunk_id, chunks_sent, queue_id)
+        )
+
+    def delete(self, queue_id: str):
+        """Remove a delivered or abandoned message (write-behind)"""
+        self._submit("DELETE FROM outbound_queue WHERE queue_id = ?", (queue_id,))
+
+    async def flush(self):
+        """Wait until everything submitted so far has been committed"""
+        if not self._pending and not self._waiters:
+            return
+        if self._writer_task is None:
+            raise RuntimeError("Durable queue is not started")
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        self._wakeup.set()
+        await future
+
+    async def _writer(self):
+        """Commit submitted statements in batches"""
+        loop = asyncio.get_event_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending or self._waiters:
+                statements = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                waiters = []
+                if not self._pending:
+                    waiters, self._waiters = self._waiters, []
+
+                error = None
+                if statements:
+                    started = time.perf_counter()
+                    try:
+                        await loop.run_in_executor(self._executor, self._commit, statements)
+                        self.stats.commits += 1
+                        self.stats.statements += len(statements)
+                        self.stats.max_batch = max(self.stats.max_batch, len(statements))
+                    except Exception as e:
+                        error = e
+                        self.stats.commit_errors += 1
+                        self.logger.error(f"Durable queue commit of {len(statements)} statements failed: {e}")
+                    self.stats.total_commit_time += time.perf_counter() - started
+
+                for future in waiters:
+                    if future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get durable queue statistics"""
+        return {
+            'path': str(self.path),
+            'commits': self.stats.commits,
+            'statements': self.stats.statements,
+            'commit_errors': self.stats.commit_errors,
+            'average_batch': (self.stats.statements / self.stats.commits) if self.stats.commits else 0.0,
+            'max_batch': self.stats.max_batch,
+            'average_commit_ms': (self.stats.total_commit_time / self.stats.commits * 1000)
+                                 if self.stats.commits else 0.0,
+            'pending_statements': len(self._pending),
+            'restored': self.stats.restored,
+            'restore_ms': self.stats.restore_time * 1000
+        }
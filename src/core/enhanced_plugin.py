@@ -29,6 +29,9 @@ try:
 except ImportError:
     from models.message import Message, MessageType
 from .logging import log_plugin_error
+from .http_pool import get_http_pool
+from .database import get_database
+from .storage_cache import get_storage_cache
 from .plugin_core_services import PermissionDeniedError
 
 
@@ -135,7 +138,13 @@ class RateLimitExceeded(Exception):
 
 
 class PluginHTTPClient:
-    """HTTP client for plugins with rate limiting and error handling"""
+    """
+    HTTP client for plugins with rate limiting and error handling.
+
+    Requests go through the process-wide shared HTTP pool, which reuses
+    connections across plugins, caches GET responses and coalesces identical
+    in-flight GETs. Fresh cache hits do not count against the rate limit.
+    """
     
     def __init__(self, plugin_name: str, rate_limit: int = 100, max_retries: int = 3):
         """
@@ -148,6 +157,7 @@ class PluginHTTPClient:
         """
         self.plugin_name = plugin_name
         self.max_retries = max_retries
+        self.pool = get_http_pool()
         self.session: Optional[aiohttp.ClientSession] = None
         
         # Token bucket rate limiter: rate_limit requests per minute
@@ -156,9 +166,9 @@ class PluginHTTPClient:
         self.rate_limiter = TokenBucket(rate=tokens_per_second, capacity=rate_limit)
     
     async def _ensure_session(self):
-        """Ensure HTTP session is created"""
+        """Ensure HTTP session is set, using the shared pool's session"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = self.pool.get_session()
     
     async def _make_request(self, method: str, url: str, 
                            params: Optional[Dict] = None,
@@ -185,6 +195,12 @@ class PluginHTTPClient:
             RateLimitExceeded: If rate limit is exceeded
             HTTPRequestError: If request fails after all retries
         """
+        # Fresh cached responses are served without a request
+        if method == "GET":
+            cached = self.pool.lookup(url, params, headers)
+            if cached is not None:
+                return cached
+        
         # Check rate limit
         if not await self.rate_limiter.acquire():
             raise RateLimitExceeded(f"Rate limit exceeded for plugin {self.plugin_name}")
@@ -193,23 +209,13 @@ class PluginHTTPClient:
         
         try:
             if method == "GET":
-                async with self.session.get(
-                    url,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=timeout),
-                    headers=headers
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+                return await self.pool.get_json(
+                    self.session, url, params=params, headers=headers, timeout=timeout
+                )
             elif method == "POST":
-                async with self.session.post(
-                    url,
-                    json=data,
-                    timeout=aiohttp.ClientTimeout(total=timeout),
-                    headers=headers
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+                return await self.pool.post_json(
+                    self.session, url, data=data, headers=headers, timeout=timeout
+                )
             else:
                 raise HTTPRequestError(f"Unsupported HTTP method: {method}")
                 
@@ -313,13 +319,20 @@ class PluginHTTPClient:
                                        timeout=timeout, headers=headers)
     
     async def close(self):
-        """Close HTTP session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Release the HTTP session; the shared pool's session stays open for other plugins"""
+        session, self.session = self.session, None
+        if session is not None and session is not self.pool.session and not session.closed:
+            await session.close()
 
 
 class PluginStorage:
-    """Storage interface for plugin data with database persistence"""
+    """
+    Storage interface for plugin data with database persistence.
+    
+    Database access goes through the shared plugin storage cache (see
+    core.storage_cache): repeated reads are served from memory and writes are
+    committed in batches shortly after they are made.
+    """
     
     def __init__(self, plugin_name: str, plugin_manager: PluginManager):
         self.plugin_name = plugin_name
@@ -330,11 +343,12 @@ class PluginStorage:
     def _init_storage(self):
         """Initialize plugin storage table if needed"""
         try:
-            from src.core.database import get_database
             self.db = get_database()
+            self.cache = get_storage_cache(self.db)
         except Exception as e:
             self.logger.warning(f"Database not available, using in-memory storage: {e}")
             self.db = None
+            self.cache = None
             self._storage: Dict[str, Any] = {}
             self._expiry: Dict[str, datetime] = {}
     
@@ -347,31 +361,32 @@ class PluginStorage:
             data: Data to store (must be JSON serializable)
             ttl: Time to live in seconds (optional)
         """
+        await self.store_many({key: data}, ttl)
+    
+    async def store_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """
+        Store several keys at once, committed together.
+        
+        Args:
+            items: Data to store by key (values must be JSON serializable)
+            ttl: Time to live in seconds for every key (optional)
+        """
         if self.db is None:
             # Fallback to in-memory storage
-            namespaced_key = f"{self.plugin_name}:{key}"
-            self._storage[namespaced_key] = data
-            if ttl:
-                self._expiry[namespaced_key] = datetime.utcnow() + timedelta(seconds=ttl)
-            elif namespaced_key in self._expiry:
-                del self._expiry[namespaced_key]
+            for key, data in items.items():
+                namespaced_key = f"{self.plugin_name}:{key}"
+                self._storage[namespaced_key] = data
+                if ttl:
+                    self._expiry[namespaced_key] = datetime.utcnow() + timedelta(seconds=ttl)
+                elif namespaced_key in self._expiry:
+                    del self._expiry[namespaced_key]
             return
         
-        # Calculate expiry time
-        expires_at = None
-        if ttl:
-            expires_at = (datetime.utcnow() + timedelta(seconds=ttl)).isoformat()
-        
         # Serialize data to JSON
-        value_json = json.dumps(data)
+        values = {key: json.dumps(data) for key, data in items.items()}
         
-        # Store in database
         try:
-            self.db.execute_update("""
-                INSERT OR REPLACE INTO plugin_storage 
-                (plugin_name, key, value, expires_at, updated_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (self.plugin_name, key, value_json, expires_at))
+            await self.cache.set_many(self.plugin_name, values, ttl)
         except Exception as e:
             self.logger.error(f"Error storing data: {e}")
             raise
@@ -387,43 +402,41 @@ class PluginStorage:
         Returns:
             Stored data or default value
         """
+        return (await self.retrieve_many([key])).get(key, default)
+    
+    async def retrieve_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Retrieve several keys at once.
+        
+        Args:
+            keys: Storage keys
+            
+        Returns:
+            Stored data by key, for the keys that exist and have not expired
+        """
         if self.db is None:
             # Fallback to in-memory storage
-            namespaced_key = f"{self.plugin_name}:{key}"
-            if namespaced_key not in self._storage:
-                return default
-            if namespaced_key in self._expiry:
-                if datetime.utcnow() >= self._expiry[namespaced_key]:
-                    del self._storage[namespaced_key]
-                    del self._expiry[namespaced_key]
-                    return default
-            return self._storage[namespaced_key]
+            results = {}
+            for key in keys:
+                namespaced_key = f"{self.plugin_name}:{key}"
+                if namespaced_key not in self._storage:
+                    continue
+                if namespaced_key in self._expiry:
+                    if datetime.utcnow() >= self._expiry[namespaced_key]:
+                        del self._storage[namespaced_key]
+                        del self._expiry[namespaced_key]
+                        continue
+                results[key] = self._storage[namespaced_key]
+            return results
         
         try:
-            rows = self.db.execute_query("""
-                SELECT value, expires_at FROM plugin_storage
-                WHERE plugin_name = ? AND key = ?
-            """, (self.plugin_name, key))
-            
-            if not rows:
-                return default
-            
-            row = rows[0]
-            
-            # Check expiration
-            if row['expires_at']:
-                expires_at = datetime.fromisoformat(row['expires_at'])
-                if datetime.utcnow() >= expires_at:
-                    # Expired, delete and return default
-                    await self.delete_data(key)
-                    return default
-            
             # Deserialize and return data
-            return json.loads(row['value'])
+            found = self.cache.get_many(self.plugin_name, keys)
+            return {key: json.loads(value) for key, value in found.items()}
             
         except Exception as e:
             self.logger.error(f"Error retrieving data: {e}")
-            return default
+            return {}
     
     async def delete_data(self, key: str) -> bool:
         """
@@ -435,25 +448,34 @@ class PluginStorage:
         Returns:
             True if data was deleted, False if key didn't exist
         """
+        return await self.delete_many([key]) > 0
+    
+    async def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete several keys at once.
+        
+        Args:
+            keys: Storage keys
+            
+        Returns:
+            Number of keys that existed and were deleted
+        """
         if self.db is None:
             # Fallback to in-memory storage
-            namespaced_key = f"{self.plugin_name}:{key}"
-            if namespaced_key in self._storage:
-                del self._storage[namespaced_key]
-                if namespaced_key in self._expiry:
-                    del self._expiry[namespaced_key]
-                return True
-            return False
+            deleted = 0
+            for key in keys:
+                namespaced_key = f"{self.plugin_name}:{key}"
+                if namespaced_key in self._storage:
+                    del self._storage[namespaced_key]
+                    self._expiry.pop(namespaced_key, None)
+                    deleted += 1
+            return deleted
         
         try:
-            rowcount = self.db.execute_update("""
-                DELETE FROM plugin_storage
-                WHERE plugin_name = ? AND key = ?
-            """, (self.plugin_name, key))
-            return rowcount > 0
+            return await self.cache.delete_many(self.plugin_name, keys)
         except Exception as e:
             self.logger.error(f"Error deleting data: {e}")
-            return False
+            return 0
     
     async def list_keys(self, prefix: str = "") -> List[str]:
         """
@@ -476,18 +498,42 @@ class PluginStorage:
             return keys
         
         try:
-            # Use LIKE for prefix matching
-            pattern = f"{prefix}%"
-            rows = self.db.execute_query("""
-                SELECT key FROM plugin_storage
-                WHERE plugin_name = ? AND key LIKE ?
-            """, (self.plugin_name, pattern))
-            
-            return [row['key'] for row in rows]
+            return list(self.cache.scan(self.plugin_name, prefix, values=False))
             
         except Exception as e:
             self.logger.error(f"Error listing keys: {e}")
             return []
+    
+    async def scan(self, prefix: str = "") -> Dict[str, Any]:
+        """
+        Get all keys starting with a prefix and their data.
+        
+        Args:
+            prefix: Key prefix filter
+            
+        Returns:
+            Stored data by key, in key order
+        """
+        if self.db is None:
+            keys = sorted(await self.list_keys(prefix))
+            return await self.retrieve_many(keys)
+        
+        try:
+            found = self.cache.scan(self.plugin_name, prefix)
+            return {key: json.loads(value) for key, value in found.items()}
+            
+        except Exception as e:
+            self.logger.error(f"Error scanning keys: {e}")
+            return {}
+    
+    async def flush(self):
+        """Commit this process's pending storage writes now"""
+        if self.cache is not None:
+            await self.cache.flush()
+    
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Statistics of the shared storage cache, or None for in-memory storage"""
+        return self.cache.get_stats() if self.cache is not None else None
 
 
 class EnhancedPlugin(BasePlugin):
@@ -917,6 +963,34 @@ class EnhancedPlugin(BasePlugin):
         """
         return await self._storage.retrieve_data(key, default)
     
+    async def store_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """
+        Store several values in plugin storage at once.
+        
+        Args:
+            items: Values to store by key (must be JSON serializable)
+            ttl: Time to live in seconds for every key (optional)
+            
+        Example:
+            await self.store_many({"count:alice": 3, "count:bob": 5})
+        """
+        await self._storage.store_many(items, ttl)
+    
+    async def retrieve_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Retrieve several values from plugin storage at once.
+        
+        Args:
+            keys: Storage keys
+            
+        Returns:
+            Stored values by key; missing and expired keys are left out
+            
+        Example:
+            counts = await self.retrieve_many(["count:alice", "count:bob"])
+        """
+        return await self._storage.retrieve_many(keys)
+    
     async def http_get(self, url: str, params: Optional[Dict] = None,
                       timeout: int = 30, headers: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -1232,6 +1306,12 @@ class EnhancedPlugin(BasePlugin):
         # Close HTTP client
         await self._http_client.close()
         
+        # Commit storage writes still held for batching
+        try:
+            await self._storage.flush()
+        except Exception as e:
+            self.logger.error(f"Error flushing plugin storage: {e}")
+        
         return True
 
 
@@ -21,6 +21,8 @@ from typing import Any, Dict, List, Optional, Callable, Tuple
 import json
 
 from .logging import get_logger
+from .loop_monitor import LoopMonitor, initialize_loop_monitor
+from .metrics import LogHistogram, get_metrics_registry
 
 
 class HealthStatus(Enum):
@@ -128,17 +130,33 @@ class SystemHealth:
 
 
 class PerformanceTracker:
-    """Track performance metrics over time"""
+    """
+    Track performance metrics over time.
+    
+    Recent samples are kept for windowed queries and anomaly detection.
+    All-time statistics and percentiles come from a fixed-memory histogram
+    per metric, and the latest value is exported as a gauge.
+    """
     
     def __init__(self, max_samples: int = 1000):
         self.max_samples = max_samples
         self.metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_samples))
+        self.histograms: Dict[str, LogHistogram] = {}
         self.logger = get_logger('performance_tracker')
+        self._latest = get_metrics_registry().gauge(
+            'health_metric', 'Latest value of each health monitor metric', ['metric']
+        )
     
     def record_metric(self, name: str, value: float, timestamp: Optional[datetime] = None):
         """Record a performance metric"""
         timestamp = timestamp or datetime.utcnow()
         self.metrics[name].append((timestamp, value))
+        
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LogHistogram(lowest=1e-3, highest=1e9)
+        histogram.record(value)
+        self._latest.labels(metric=name).set(value)
     
     def get_metric_history(self, name: str, duration: Optional[timedelta] = None) -> List[Tuple[datetime, float]]:
         """Get metric history for a specific duration"""
@@ -152,7 +170,18 @@ class PerformanceTracker:
         return [(ts, val) for ts, val in self.metrics[name] if ts >= cutoff_time]
     
     def get_metric_stats(self, name: str, duration: Optional[timedelta] = None) -> Dict[str, float]:
-        """Get statistical summary of a metric"""
+        """
+        Get statistical summary of a metric.
+        
+        Without a duration, all-time statistics including percentiles are
+        read from the metric's histogram instead of scanning samples.
+        """
+        if duration is None:
+            histogram = self.histograms.get(name)
+            if histogram is None or not histogram.count:
+                return {}
+            return {**histogram.get_stats(), 'latest': self.metrics[name][-1][1]}
+        
         history = self.get_metric_history(name, duration)
         
         if not history:
@@ -219,6 +248,18 @@ class HealthMonitor:
         
         # System resource monitoring
         self.process = psutil.Process()
+        psutil.cpu_percent(interval=None)  # prime the non-blocking CPU measurement
+        
+        # Event loop lag and slow callback monitoring
+        loop_config = self.config.get('loop_monitor', {})
+        if not isinstance(loop_config, dict):
+            loop_config = {}
+        self.loop_monitor: Optional[LoopMonitor] = None
+        if loop_config.get('enabled', True):
+            self.loop_monitor = initialize_loop_monitor(loop_config)
+        self.loop_lag_warning = loop_config.get('lag_warning', 0.1)  # seconds, window p99
+        self.loop_lag_critical = loop_config.get('lag_critical', 1.0)
+        self._reported_loop_events = 0
         
         self.logger.info("Health monitor initialized")
     
@@ -229,6 +270,8 @@ class HealthMonitor:
             return
         
         self.logger.info("Starting health monitoring")
+        if self.loop_monitor:
+            await self.loop_monitor.start()
         self.monitoring_task = asyncio.create_task(self._monitoring_loop())
     
     async def stop(self):
@@ -240,6 +283,9 @@ class HealthMonitor:
             except asyncio.CancelledError:
                 pass
         
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+        
         self.logger.info("Health monitoring stopped")
     
     async def _monitoring_loop(self):
@@ -268,8 +314,8 @@ class HealthMonitor:
     async def _update_system_health(self):
         """Update system-level health metrics"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous check (interval=None does not block the loop)
+            cpu_percent = psutil.cpu_percent(interval=None)
             self.system_health.cpu_usage = cpu_percent
             self.performance_tracker.record_metric('cpu_usage', cpu_percent)
             
@@ -384,6 +430,9 @@ class HealthMonitor:
         
         # Performance anomaly alerts
         await self._check_performance_alerts()
+        
+        # Event loop lag and blocking alerts
+        await self._check_loop_alerts()
     
     async def _check_system_alerts(self):
         """Check for system-level alert conditions"""
@@ -502,6 +551,47 @@ class HealthMonitor:
                 f"Memory usage spike detected: {latest_anomaly[1]:.1f}%"
             )
     
+    async def _check_loop_alerts(self):
+        """Check event loop lag and blocked callbacks since the last check"""
+        if not self.loop_monitor:
+            return
+        
+        window = self.loop_monitor.take_window_stats()
+        if window.get('count'):
+            p99 = window['p99']
+            self.performance_tracker.record_metric('event_loop_lag_ms', p99 * 1000)
+            if p99 > self.loop_lag_critical:
+                await self._create_alert(
+                    AlertSeverity.CRITICAL,
+                    "event_loop",
+                    f"Event loop lag p99 {p99:.2f}s exceeds {self.loop_lag_critical}s",
+                    window
+                )
+            elif p99 > self.loop_lag_warning:
+                await self._create_alert(
+                    AlertSeverity.WARNING,
+                    "event_loop",
+                    f"Event loop lag p99 {p99:.2f}s exceeds {self.loop_lag_warning}s",
+                    window
+                )
+        
+        blocked = self.loop_monitor.stats.blocked
+        new_events = blocked - self._reported_loop_events
+        self._reported_loop_events = blocked
+        if new_events > 0:
+            events = self.loop_monitor.recent_events(min(new_events, self.loop_monitor.max_events))
+            worst = max(events, key=lambda event: event.lag)
+            await self._create_alert(
+                AlertSeverity.WARNING,
+                "event_loop",
+                f"Event loop blocked by {worst.source}",
+                {
+                    'episodes': new_events,
+                    'sources': sorted({event.source for event in events}),
+                    'worst': worst.to_dict()
+                }
+            )
+    
     async def _create_alert(self, severity: AlertSeverity, source: str, message: str, metadata: Dict[str, Any] = None):
         """Create a new alert with cooldown logic"""
         alert_key = f"{source}:{message}"
@@ -603,7 +693,8 @@ class HealthMonitor:
                     }
                     for alert in self.alerts[-10:]  # Last 10 alerts
                 ]
-            }
+            },
+            'event_loop': self.loop_monitor.get_stats() if self.loop_monitor else {'running': False}
         }
     
     def get_performance_metrics(self, duration: Optional[timedelta] = None) -> Dict[str, Any]:
@@ -611,7 +702,7 @@ class HealthMonitor:
         duration = duration or timedelta(hours=1)
         
         metrics = {}
-        for metric_name in ['cpu_usage', 'memory_usage', 'disk_usage']:
+        for metric_name in ['cpu_usage', 'memory_usage', 'disk_usage', 'event_loop_lag_ms']:
             stats = self.performance_tracker.get_metric_stats(metric_name, duration)
             if stats:
                 metrics[metric_name] = stats
@@ -0,0 +1,223 @@
+"""
+Message History Search for ZephyrGate
+
+Queries over the ``message_history`` table that stay fast as it grows to
+millions of rows. Results come newest first in arrival (id) order and are
+paged with a keyset cursor, the id of the last row of the previous page,
+so every page costs the same however deep it is.
+
+Each query is driven by whichever index narrows it best:
+
+- A time range becomes an id range through the timestamp index. Rows are
+  stored as messages arrive, so id order follows timestamp order.
+- Without search text, the sender or channel index (both of which keep
+  each value's rows in id order) or the primary key is walked backwards
+  from the cursor until the page is full.
+- With search text, the full-text index is walked in id order within the
+  id range and the other filters are checked on each hit. When a sender or
+  channel filter selects only a few rows in the range, those rows are
+  walked instead and the text is checked on each, since a common word
+  would otherwise be scanned through thousands of other senders' hits.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import DatabaseManager, fts_match_query
+
+
+# A sender or channel filter selecting at most this many rows in the
+# searched range drives a text search instead of the full-text index
+SPARSE_FILTER_ROWS = 500
+
+MAX_ID = 2 ** 63 - 1
+
+
+@dataclass
+class HistoryQuery:
+    """Filters and page position for a message history query"""
+    text: Optional[str] = None  # words that must all appear; "word*" matches a prefix
+    sender_id: Optional[str] = None
+    recipient_id: Optional[str] = None
+    channel: Optional[int] = None
+    interface_id: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    min_snr: Optional[float] = None
+    max_hop_count: Optional[int] = None
+    before_id: Optional[int] = None  # keyset cursor: only rows older than this id
+    limit: int = 50
+    offset: int = 0
+
+
+@dataclass
+class HistoryPage:
+    """One page of message history, newest first"""
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    next_before_id: Optional[int] = None  # cursor for the next page; None on the last page
+    plan: str = "empty"  # which index drove the query: index, fts, filter or empty
+
+
+def search_message_history(db: DatabaseManager, query: HistoryQuery) -> HistoryPage:
+    """
+    Run a message history query.
+
+    Args:
+        db: Database manager
+        query: Filters, cursor and page size
+
+    Returns:
+        HistoryPage whose messages are message_history rows as dictionaries
+    """
+    if query.limit <= 0:
+        return HistoryPage()
+
+    match = None
+    if query.text is not None:
+        match = fts_match_query(query.text, prefix=False)
+        if match is None:
+            return HistoryPage()
+
+    bounds = _id_bounds(db, query)
+    if bounds is None:
+        return HistoryPage()
+    low, high = bounds
+
+    conditions, params = _filter_conditions(query)
+    where = "".join(f" AND {condition}" for condition in conditions)
+    page = (query.limit, query.offset)
+
+    if match is None:
+        plan = "index"
+        sql = f"""
+            SELECT h.* FROM message_history h
+            WHERE h.id BETWEEN ? AND ?{where}
+            ORDER BY h.id DESC
+            LIMIT ? OFFSET ?
+        """
+        rows = db.execute_query(sql, (low, high, *params, *page))
+    elif _sparse_filter(db, query, low, high):
+        plan = "filter"
+        sql = f"""
+            SELECT h.* FROM message_history h
+            WHERE h.id BETWEEN ? AND ?{where}
+            AND EXISTS (
+                SELECT 1 FROM message_history_fts
+                WHERE message_history_fts MATCH ? AND message_history_fts.rowid = h.id
+            )
+            ORDER BY h.id DESC
+            LIMIT ? OFFSET ?
+        """
+        rows = db.execute_query(sql, (low, high, *params, match, *page))
+    else:
+        plan = "fts"
+        sql = f"""
+            SELECT h.* FROM message_history_fts
+            CROSS JOIN message_history h ON h.id = message_history_fts.rowid
+            WHERE message_history_fts MATCH ?
+            AND message_history_fts.rowid BETWEEN ? AND ?{where}
+            ORDER BY message_history_fts.rowid DESC
+            LIMIT ? OFFSET ?
+        """
+        rows = db.execute_query(sql, (match, low, high, *params, *page))
+
+    messages = [dict(row) for row in rows]
+    next_before_id = messages[-1]['id'] if len(messages) == query.limit else None
+    return HistoryPage(messages, next_before_id, plan)
+
+
+def _stored_time(value: datetime) -> str:
+    """A datetime as stored in message_history: naive UTC in ISO format"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _id_bounds(db: DatabaseManager, query: HistoryQuery) -> Optional[Tuple[int, int]]:
+    """Id range covering the query's time range and cursor; None when it is empty"""
+    low, high = 0, MAX_ID
+    if query.before_id is not None:
+        high = query.before_id - 1
+
+    if query.start_time is not None:
+        rows = db.execute_query(
+            "SELECT id FROM message_history WHERE timestamp >= ? ORDER BY timestamp, id LIMIT 1",
+            (_stored_time(query.start_time),)
+        )
+        if not rows:
+            return None
+        low = rows[0][0]
+
+    if query.end_time is not None:
+        rows = db.execute_query(
+            "SELECT id FROM message_history WHERE timestamp <= ? ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (_stored_time(query.end_time),)
+        )
+        if not rows:
+            return None
+        high = min(high, rows[0][0])
+
+    return (low, high) if low <= high else None
+
+
+def _filter_conditions(query: HistoryQuery) -> Tuple[List[str], List[Any]]:
+    """Exact column conditions on the history row ``h``"""
+    conditions: List[str] = []
+    params: List[Any] = []
+
+    if query.sender_id:
+        conditions.append("h.sender_id = ?")
+        params.append(query.sender_id)
+
+    if query.recipient_id:
+        conditions.append("h.recipient_id = ?")
+        params.append(query.recipient_id)
+
+    if query.channel is not None:
+        conditions.append("h.channel = ?")
+        params.append(query.channel)
+
+    # Time bounds are also applied exactly, in case arrival order and
+    # timestamps disagree near the ends of the range
+    if query.start_time is not None:
+        conditions.append("h.timestamp >= ?")
+        params.append(_stored_time(query.start_time))
+
+    if query.end_time is not None:
+        conditions.append("h.timestamp <= ?")
+        params.append(_stored_time(query.end_time))
+
+    if query.interface_id:
+        conditions.append("h.interface_id = ?")
+        params.append(query.interface_id)
+
+    if query.min_snr is not None:
+        conditions.append("h.snr >= ?")
+        params.append(query.min_snr)
+
+    if query.max_hop_count is not None:
+        conditions.append("h.hop_count <= ?")
+        params.append(query.max_hop_count)
+
+    return conditions, params
+
+
+def _sparse_filter(db: DatabaseManager, query: HistoryQuery, low: int, high: int) -> bool:
+    """Whether an indexed sender or channel filter selects few rows in the id range"""
+    if query.sender_id:
+        column, value = "sender_id", query.sender_id
+    elif query.channel is not None:
+        column, value = "channel", query.channel
+    else:
+        return False
+
+    rows = db.execute_query(
+        f"""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM message_history WHERE {column} = ? AND id BETWEEN ? AND ? LIMIT ?
+        )
+        """,
+        (value, low, high, SPARSE_FILTER_ROWS + 1)
+    )
+    return rows[0][0] <= SPARSE_FILTER_ROWS
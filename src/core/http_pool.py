@@ -0,0 +1,487 @@
+"""
+Shared HTTP Connection Pool for ZephyrGate Plugins
+
+One aiohttp session, with a single connector and per-host connection limits,
+serves every plugin's HTTP client. Keep-alive connections and DNS lookups
+are reused across plugins instead of each plugin opening its own sockets.
+
+GET responses are kept in a private HTTP cache (RFC 9111). Freshness comes
+from Cache-Control max-age, Expires, or the Last-Modified heuristic, aged by
+the Date and Age headers. Stale entries with an ETag or Last-Modified are
+revalidated with a conditional request, and a 304 reuses the stored body.
+no-store and ``Vary: *`` responses are never stored, no-cache ones are
+always revalidated, and a successful POST evicts cached responses for its
+URL. Identical GETs already in flight are coalesced: later callers wait for
+the first one's response instead of sending their own request.
+
+The cache key includes all request headers, so plugins sending different
+credentials never share a response.
+"""
+
+import asyncio
+import copy
+import functools
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+import aiohttp
+
+from .logging import get_logger
+from .metrics import get_metrics_registry
+
+
+# Response headers that affect freshness and validation
+CACHE_HEADERS = ('Cache-Control', 'Expires', 'Date', 'Age', 'ETag', 'Last-Modified', 'Vary')
+
+# Heuristic freshness: a fraction of the time since Last-Modified, capped
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_LIFETIME = 86400.0
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str], ...]]
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into lowercase directives and their values"""
+    directives: Dict[str, Optional[str]] = {}
+    if not value:
+        return directives
+    for part in value.split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(int(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP date to a Unix timestamp"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _response_headers(response: Any) -> Dict[str, str]:
+    """The caching-related headers of a response"""
+    headers = getattr(response, 'headers', None) or {}
+    found = {}
+    for name in CACHE_HEADERS:
+        try:
+            value = headers.get(name)
+        except AttributeError:
+            return {}
+        if isinstance(value, str):
+            found[name] = value
+    return found
+
+
+@dataclass
+class CacheEntry:
+    """A stored response body with what is needed to age and revalidate it"""
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+    stored_at: float  # monotonic
+    initial_age: float = 0.0  # corrected age when received, seconds
+    lifetime: float = 0.0  # freshness lifetime, seconds
+    revalidate: bool = False  # no-cache: always revalidate before use
+    hits: int = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @property
+    def age(self) -> float:
+        return self.initial_age + (time.monotonic() - self.stored_at)
+
+    def is_fresh(self) -> bool:
+        return not self.revalidate and self.lifetime > self.age
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        conditions = {}
+        if 'ETag' in self.headers:
+            conditions['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            conditions['If-Modified-Since'] = self.headers['Last-Modified']
+        return conditions
+
+    def refresh(self, headers: Dict[str, str], request_time: float, response_time: float):
+        """Apply the headers of a response received at ``response_time`` (wall clock)"""
+        self.headers.update(headers)
+        self.stored_at = time.monotonic()
+        self.initial_age, self.lifetime, self.revalidate = freshness(self.headers, request_time, response_time)
+
+    def value(self) -> Any:
+        self.hits += 1
+        return json.loads(self.body)
+
+
+def freshness(headers: Dict[str, str], request_time: float, response_time: float) -> Tuple[float, float, bool]:
+    """
+    Compute a response's age and freshness lifetime (RFC 9111 section 4.2).
+
+    Returns:
+        (corrected initial age, freshness lifetime, must revalidate)
+    """
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    date = _http_date(headers.get('Date'))
+
+    apparent_age = max(0.0, response_time - date) if date is not None else 0.0
+    corrected_age = (_seconds(headers.get('Age')) or 0.0) + (response_time - request_time)
+    initial_age = max(apparent_age, corrected_age)
+
+    lifetime = _seconds(directives.get('max-age'))
+    if lifetime is None and 'Expires' in headers:
+        expires = _http_date(headers['Expires'])
+        lifetime = max(0.0, expires - (date or response_time)) if expires is not None else 0.0
+    if lifetime is None:
+        last_modified = _http_date(headers.get('Last-Modified'))
+        if last_modified is not None:
+            lifetime = min(HEURISTIC_FRACTION * max(0.0, (date or response_time) - last_modified),
+                           HEURISTIC_MAX_LIFETIME)
+        else:
+            lifetime = 0.0
+
+    return initial_age, lifetime, 'no-cache' in directives
+
+
+class HTTPResponseCache:
+    """LRU cache of JSON response bodies bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 8 * 1024 * 1024,
+                 max_entry_bytes: int = 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries: 'OrderedDict[CacheKey, CacheEntry]' = OrderedDict()
+        self.by_url: Dict[str, Set[CacheKey]] = {}
+        self.bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, entry: CacheEntry) -> bool:
+        if entry.size > self.max_entry_bytes:
+            self.remove(key)
+            return False
+        self.remove(key)
+        self.entries[key] = entry
+        self.by_url.setdefault(entry.url, set()).add(key)
+        self.bytes += entry.size
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+        return True
+
+    def remove(self, key: CacheKey):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        keys = self.by_url.get(entry.url)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_url[entry.url]
+
+    def invalidate_url(self, url: str) -> int:
+        """Drop every stored response for a URL, whatever its query parameters"""
+        keys = list(self.by_url.get(url, ()))
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def clear(self):
+        self.entries.clear()
+        self.by_url.clear()
+        self.bytes = 0
+
+
+@dataclass
+class HTTPPoolStats:
+    """Shared HTTP pool statistics"""
+    requests: int = 0
+    network_requests: int = 0
+    cache_hits: int = 0
+    revalidations: int = 0
+    not_modified: int = 0
+    coalesced: int = 0
+    stored: int = 0
+    invalidated: int = 0
+    sessions_created: int = 0
+
+
+class SharedHTTPPool:
+    """Process-wide HTTP session with a response cache and request coalescing"""
+
+    def __init__(self, max_connections: int = 100, max_connections_per_host: int = 8,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 30.0,
+                 cache_enabled: bool = True, cache_max_entries: int = 512,
+                 cache_max_bytes: int = 8 * 1024 * 1024, cache_max_entry_bytes: int = 1024 * 1024):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.cache_enabled = cache_enabled
+        self.cache = HTTPResponseCache(cache_max_entries, cache_max_bytes, cache_max_entry_bytes)
+        self.stats = HTTPPoolStats()
+        self.logger = get_logger('http_pool')
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+
+        self._requests_metric = get_metrics_registry().counter(
+            'plugin_http_requests_total', 'Plugin HTTP requests by how they were answered', ['result']
+        )
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        return self._session
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it for the running event loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+            self._in_flight.clear()
+            self.stats.sessions_created += 1
+        return self._session
+
+    async def close(self):
+        """Close the shared session and its connections"""
+        session, self._session = self._session, None
+        self._session_loop = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> CacheKey:
+        return (
+            url,
+            tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+            tuple(sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items()))
+        )
+
+    def lookup(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Optional[Any]:
+        """
+        Get a fresh cached response body without any network request.
+
+        Returns:
+            The decoded JSON body, or None if there is no fresh entry
+        """
+        if not self.cache_enabled or self._bypass_cache(headers):
+            return None
+        entry = self.cache.get(self.cache_key(url, params, headers))
+        if entry is None or not entry.is_fresh():
+            return None
+        self.stats.requests += 1
+        self.stats.cache_hits += 1
+        self._requests_metric.labels('hit').inc()
+        return entry.value()
+
+    @staticmethod
+    def _bypass_cache(headers: Optional[Dict]) -> bool:
+        """Whether the request asks not to be answered from the cache"""
+        for name, value in (headers or {}).items():
+            if str(name).lower() == 'cache-control':
+                directives = parse_cache_control(str(value))
+                return 'no-store' in directives or 'no-cache' in directives or directives.get('max-age') == '0'
+        return False
+
+    async def get_json(self, session: Any, url: str, params: Optional[Dict] = None,
+                       headers: Optional[Dict] = None, timeout: float = 30) -> Any:
+        """
+        GET a JSON resource through the cache, coalescing identical in-flight requests.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: As raised by the request
+        """
+        cached = self.lookup(url, params, headers)
+        if cached is not None:
+            return cached
+
+        self.stats.requests += 1
+        key = self.cache_key(url, params, headers)
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            self.stats.coalesced += 1
+            self._requests_metric.labels('coalesced').inc()
+            return copy.deepcopy(await asyncio.shield(flight))
+
+        # Shielded so a cancelled caller does not abort the request for the others
+        flight = asyncio.ensure_future(self._fetch(session, key, url, params, headers, timeout))
+        self._in_flight[key] = flight
+        flight.add_done_callback(functools.partial(self._flight_done, key))
+        return await asyncio.shield(flight)
+
+    def _flight_done(self, key: CacheKey, flight: asyncio.Future):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved here in case every caller was cancelled
+
+    async def _fetch(self, session: Any, key: CacheKey, url: str, params: Optional[Dict],
+                     headers: Optional[Dict], timeout: float) -> Any:
+        use_cache = self.cache_enabled and not self._bypass_cache(headers)
+        entry = self.cache.get(key) if use_cache else None
+        request_headers = headers
+        if entry is not None and entry.validators:
+            request_headers = {**(headers or {}), **entry.validators}
+            self.stats.revalidations += 1
+
+        self.stats.network_requests += 1
+        request_time = time.time()
+        async with session.get(
+            url,
+            params=params,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            headers=request_headers
+        ) as response:
+            response_time = time.time()
+            if response.status == 304 and entry is not None:
+                self.stats.not_modified += 1
+                self._requests_metric.labels('revalidated').inc()
+                entry.refresh(_response_headers(response), request_time, response_time)
+                return entry.value()
+
+            response.raise_for_status()
+            data = await response.json()
+            self._requests_metric.labels('miss').inc()
+            if use_cache:
+                self._store(key, url, _response_headers(response), data, request_time, response_time)
+            return data
+
+    def _store(self, key: CacheKey, url: str, headers: Dict[str, str], data: Any,
+               request_time: float, response_time: float):
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives or headers.get('Vary', '').strip() == '*':
+            self.cache.remove(key)
+            return
+
+        initial_age, lifetime, revalidate = freshness(headers, request_time, response_time)
+        has_validator = 'ETag' in headers or 'Last-Modified' in headers
+        if lifetime <= initial_age and not has_validator:
+            return  # already stale and cannot be revalidated
+
+        try:
+            body = json.dumps(data).encode()
+        except (TypeError, ValueError):
+            return
+        entry = CacheEntry(url=url, body=body, headers=headers, stored_at=time.monotonic(),
+                           initial_age=initial_age, lifetime=lifetime, revalidate=revalidate)
+        if self.cache.put(key, entry):
+            self.stats.stored += 1
+
+    async def post_json(self, session: Any, url: str, data: Optional[Dict] = None,
+                        headers: Optional[Dict] = None, timeout: float = 30) -> Any:
+        """POST JSON and return the JSON response, invalidating cached GETs of the URL"""
+        self.stats.requests += 1
+        self.stats.network_requests += 1
+        async with session.post(
+            url,
+            json=data,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            headers=headers
+        ) as response:
+            response.raise_for_status()
+            self.stats.invalidated += self.cache.invalidate_url(url)
+            return await response.json()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats
+        return {
+            'requests': stats.requests,
+            'network_requests': stats.network_requests,
+            'cache_hits': stats.cache_hits,
+            'revalidations': stats.revalidations,
+            'not_modified': stats.not_modified,
+            'coalesced': stats.coalesced,
+            'stored': stats.stored,
+            'invalidated': stats.invalidated,
+            'cache_entries': len(self.cache),
+            'cache_bytes': self.cache.bytes,
+            'cache_evictions': self.cache.evictions,
+            'in_flight': len(self._in_flight),
+            'sessions_created': stats.sessions_created,
+            'network_saved_ratio': (
+                1 - stats.network_requests / stats.requests if stats.requests else 0.0
+            )
+        }
+
+
+def create_http_pool(config: Optional[Dict[str, Any]] = None) -> SharedHTTPPool:
+    """Build a shared HTTP pool from the ``plugins.http`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    cache = config.get('cache', {})
+    if not isinstance(cache, dict):
+        cache = {}
+    return SharedHTTPPool(
+        max_connections=int(config.get('max_connections', 100)),
+        max_connections_per_host=int(config.get('max_connections_per_host', 8)),
+        dns_cache_ttl=int(config.get('dns_cache_ttl', 300)),
+        keepalive_timeout=float(config.get('keepalive_timeout', 30.0)),
+        cache_enabled=bool(cache.get('enabled', True)),
+        cache_max_entries=int(cache.get('max_entries', 512)),
+        cache_max_bytes=int(cache.get('max_bytes', 8 * 1024 * 1024)),
+        cache_max_entry_bytes=int(cache.get('max_entry_bytes', 1024 * 1024))
+    )
+
+
+# Global HTTP pool shared by all plugins
+http_pool: Optional[SharedHTTPPool] = None
+
+
+def initialize_http_pool(config: Optional[Dict[str, Any]] = None) -> SharedHTTPPool:
+    """Initialize the global HTTP pool"""
+    global http_pool
+    http_pool = create_http_pool(config)
+    return http_pool
+
+
+def get_http_pool() -> SharedHTTPPool:
+    """Get the global HTTP pool, creating one with defaults if needed"""
+    global http_pool
+    if http_pool is None:
+        http_pool = create_http_pool()
+    return http_pool
+
+
+async def shutdown_http_pool():
+    """Close the global HTTP pool's session"""
+    if http_pool is not None:
+        await http_pool.close()
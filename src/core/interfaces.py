@@ -3,6 +3,8 @@ Meshtastic Interface Management for ZephyrGate
 
 Handles serial, TCP, and BLE connections to Meshtastic devices with
 automatic reconnection and multiple simultaneous interface support.
+Received packets can be recorded to a capture file and replayed later
+through ``ReplayInterface`` for offline load testing.
 """
 
 import asyncio
@@ -11,7 +13,7 @@ import time
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from dataclasses import dataclass, field
 import uuid
 
@@ -19,7 +21,14 @@ try:
     from ..models.message import Message, MessageType, InterfaceConfig
 except ImportError:
     from models.message import Message, MessageType, InterfaceConfig
+from .airtime import get_airtime_scheduler, modem_from_lora_config
 from .logging import get_logger
+from .metrics import get_metrics_registry
+from .node_registry import get_node_registry, shutdown_node_registry
+from .stats_rollup import get_stats_rollup
+from .outbound import OutboundSelector, SendHealth
+from .packet_capture import CaptureError, PacketCaptureWriter, SEND_TOPIC, read_capture
+from .tracing import get_tracer
 
 
 class InterfaceStatus(Enum):
@@ -79,10 +88,33 @@ class MeshtasticInterface(ABC):
         self.max_backoff = 300  # 5 minutes
         
         # Message processing
+        self.connection_task: Optional[asyncio.Task] = None
         self.receive_task: Optional[asyncio.Task] = None
         self.send_queue = asyncio.Queue()
         self.send_task: Optional[asyncio.Task] = None
         
+        # Send latency and outcomes, used for outbound interface selection
+        self.send_health = SendHealth()
+        # Called with messages this interface could not send (set by InterfaceManager)
+        self.reroute_callback: Optional[Callable[[Message, str], Awaitable[bool]]] = None
+        
+        # Exported RX/TX counters
+        metrics = get_metrics_registry()
+        packets = metrics.counter('interface_messages_total', 'Messages sent and received per interface',
+                                  ['interface', 'direction'])
+        payload = metrics.counter('interface_bytes_total', 'Payload bytes sent and received per interface',
+                                  ['interface', 'direction'])
+        self._metric_counts = {
+            direction: (packets.labels(config.id, direction), payload.labels(config.id, direction))
+            for direction in ('rx', 'tx')
+        }
+        self._send_errors = metrics.counter(
+            'interface_send_errors_total', 'Failed sends per interface', ['interface']
+        ).labels(interface=config.id)
+        
+        # Packet capture for offline replay (metadata['capture'] is the file path)
+        self.capture: Optional[PacketCaptureWriter] = None
+        
         self.logger.info(f"Initialized {self.config.type} interface: {self.config.id}")
     
     @abstractmethod
@@ -114,8 +146,17 @@ class MeshtasticInterface(ABC):
         
         self.logger.info(f"Starting interface {self.config.id}")
         
+        # Record received packets; strftime codes in the path give one file per run
+        capture_path = self.config.metadata.get('capture')
+        if capture_path and self.capture is None:
+            self.capture = PacketCaptureWriter(
+                datetime.now().strftime(capture_path), self.config.id,
+                capture_sends=self.config.metadata.get('capture_sends', True)
+            )
+            self.capture.open()
+        
         # Start connection task
-        asyncio.create_task(self._connection_manager())
+        self.connection_task = asyncio.create_task(self._connection_manager())
         
         # Start send task
         self.send_task = asyncio.create_task(self._send_worker())
@@ -124,7 +165,9 @@ class MeshtasticInterface(ABC):
         """Stop the interface"""
         self.logger.info(f"Stopping interface {self.config.id}")
         
-        # Cancel tasks
+        # Cancel tasks (the connection manager would otherwise reconnect)
+        if self.connection_task:
+            self.connection_task.cancel()
         if self.receive_task:
             self.receive_task.cancel()
         if self.send_task:
@@ -134,6 +177,14 @@ class MeshtasticInterface(ABC):
         await self._disconnect()
         self.status = InterfaceStatus.DISCONNECTED
         
+        # Hand messages still waiting to be sent to another interface
+        while not self.send_queue.empty():
+            await self._reroute(self.send_queue.get_nowait(), "interface stopped")
+        
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+        
         self.logger.info(f"Interface {self.config.id} stopped")
     
     async def send_message(self, message: Message) -> bool:
@@ -251,27 +302,61 @@ class MeshtasticInterface(ABC):
                 message = await self.send_queue.get()
                 
                 if self.status == InterfaceStatus.CONNECTED:
-                    success = await self._send_message(message)
+                    # Messages rerouted here from another interface skipped the router's
+                    # airtime wait for this radio; pace them on this worker instead
+                    if message.metadata.get('rerouted_from'):
+                        await get_airtime_scheduler().acquire(self.config.id, len(message.content.encode('utf-8')))
+                    
+                    tracer = get_tracer()
+                    start = time.perf_counter()
+                    with tracer.activate(tracer.trace_of(message)):
+                        with tracer.span(f"radio:{self.config.id}"):
+                            success = await self._send_message(message)
+                    self.send_health.record(success, time.perf_counter() - start)
                     
                     if success:
+                        size = len(message.content.encode('utf-8'))
                         self.stats.messages_sent += 1
-                        self.stats.bytes_sent += len(message.content.encode('utf-8'))
+                        self.stats.bytes_sent += size
+                        self._count_message('tx', size)
+                        if self.capture:
+                            self.capture.record(SEND_TOPIC, {
+                                'toId': message.recipient_id,
+                                'channel': message.channel,
+                                'text': message.content
+                            })
                         self.logger.debug(f"Sent message via {self.config.id}")
                     else:
+                        self._send_errors.inc()
                         self.logger.error(f"Failed to send message via {self.config.id}")
+                        await self._reroute(message, "send failed")
                 else:
-                    self.logger.warning(f"Dropped message - interface {self.config.id} not connected")
+                    await self._reroute(message, "not connected")
                 
             except Exception as e:
                 self.logger.error(f"Error in send worker: {e}")
                 await asyncio.sleep(1)
     
+    async def _reroute(self, message: Message, reason: str):
+        """Pass an unsent message to the reroute callback, or drop it"""
+        if self.reroute_callback is None:
+            self.logger.warning(f"Dropped message - interface {self.config.id} {reason}")
+            return
+        try:
+            if not await self.reroute_callback(message, self.config.id):
+                self.logger.warning(f"Dropped message from {self.config.id} - no interface to reroute to")
+        except Exception as e:
+            self.logger.error(f"Error rerouting message from {self.config.id}: {e}")
+    
     def _handle_received_message(self, message: Message):
         """Handle received message"""
         message.interface_id = self.config.id
+        size = len(message.content.encode('utf-8'))
         self.stats.messages_received += 1
-        self.stats.bytes_received += len(message.content.encode('utf-8'))
+        self.stats.bytes_received += size
         self.stats.last_message_time = datetime.utcnow()
+        self._count_message('rx', size)
+        get_tracer().start_trace(message, interface=self.config.id)
         
         # Call the message callback
         try:
@@ -279,6 +364,16 @@ class MeshtasticInterface(ABC):
         except Exception as e:
             self.logger.error(f"Error in message callback: {e}")
     
+    def _capture_packet(self, topic: str, packet: Dict[str, Any]):
+        """Record a raw received packet if capture is enabled"""
+        if self.capture:
+            self.capture.record(topic, packet)
+    
+    def _count_message(self, direction: str, size: int):
+        messages, payload = self._metric_counts[direction]
+        messages.inc()
+        payload.inc(size)
+    
     def get_status(self) -> Dict[str, Any]:
         """Get interface status information"""
         return {
@@ -306,7 +401,10 @@ class MeshtasticInterface(ABC):
                     'error': attempt.error
                 }
                 for attempt in self.connection_history[-10:]  # Last 10 attempts
-            ]
+            ],
+            'send_queue': self.send_queue.qsize(),
+            'send_health': self.send_health.get_stats(),
+            'capture': self.capture.get_stats() if self.capture else None
         }
 
 
@@ -343,15 +441,19 @@ class SerialInterface(MeshtasticInterface):
             
             # Create wrapper functions for different packet types
             def text_message_handler(packet, interface=None):
+                self._capture_packet("meshtastic.receive.text", packet)
                 self._on_meshtastic_text(packet, interface)
             
             def nodeinfo_handler(packet, interface=None):
+                self._capture_packet("meshtastic.receive.nodeinfo", packet)
                 self._on_meshtastic_nodeinfo(packet, interface)
             
             def position_handler(packet, interface=None):
+                self._capture_packet("meshtastic.receive.position", packet)
                 self._on_meshtastic_position(packet, interface)
             
             def telemetry_handler(packet, interface=None):
+                self._capture_packet("meshtastic.receive.telemetry", packet)
                 self._on_meshtastic_telemetry(packet, interface)
             
             # Store references to prevent garbage collection
@@ -370,6 +472,7 @@ class SerialInterface(MeshtasticInterface):
             
             # Test connection
             if self.connection.myInfo:
+                self._configure_airtime()
                 return True
             else:
                 return False
@@ -413,6 +516,8 @@ class SerialInterface(MeshtasticInterface):
                 snr=packet.get('rxSnr'),
                 rssi=packet.get('rxRssi')
             )
+            if packet.get('id') is not None:
+                message.metadata['packet_id'] = packet['id']  # identifies rebroadcasts for dedup
             
             self.logger.info(f"✓ Converted to Message object, routing to message router")
             
@@ -485,41 +590,59 @@ class SerialInterface(MeshtasticInterface):
                 
                 # Update node tracking with telemetry
                 self._update_node_from_packet(packet, telemetry=device_metrics)
+                self._report_channel_utilization(packet, device_metrics)
             
         except Exception as e:
             self.logger.error(f"Error processing telemetry packet: {e}")
             import traceback
             self.logger.error(traceback.format_exc())
     
+    def _configure_airtime(self):
+        """Use the radio's modem settings for airtime estimates"""
+        try:
+            scheduler = get_airtime_scheduler()
+            if scheduler.has_override(self.config.id):
+                return
+            local_node = getattr(self.connection, 'localNode', None)
+            local_config = getattr(local_node, 'localConfig', None)
+            modem = modem_from_lora_config(getattr(local_config, 'lora', None))
+            if modem:
+                scheduler.configure_interface(self.config.id, modem)
+                self.logger.info(
+                    f"Airtime pacing for {self.config.id}: SF{modem.spreading_factor} "
+                    f"{modem.bandwidth_hz / 1000:g} kHz CR 4/{modem.coding_rate}"
+                )
+        except Exception as e:
+            self.logger.debug(f"Could not read LoRa config for airtime pacing: {e}")
+    
+    def _report_channel_utilization(self, packet, device_metrics):
+        """Feed channel utilization heard by our radio (or a direct neighbour) to the airtime scheduler"""
+        utilization = device_metrics.get('channelUtilization')
+        if utilization is None:
+            return
+        
+        my_info = getattr(self.connection, 'myInfo', None) if self.connection else None
+        local = my_info is not None and packet.get('from') == getattr(my_info, 'my_node_num', None)
+        direct = 'hopStart' in packet and packet.get('hopStart') == packet.get('hopLimit')
+        if local or direct:
+            get_airtime_scheduler().report_channel_utilization(self.config.id, utilization)
+    
     def _update_node_from_packet(self, packet, user_info=None, position=None, telemetry=None):
-        """Update node information in database from packet data"""
+        """Record node information from packet data in the write-behind node registry"""
         try:
-            from core.database import get_database
-            from datetime import datetime
-            
             node_id = packet.get('fromId', '')
             if not node_id:
                 return
             
-            db = get_database()
-            
             # Prepare user data
             user_data = {
-                'node_id': node_id,
                 'last_seen': datetime.utcnow().isoformat()
             }
             
-            # Add user info if available
+            # Add user info if available (otherwise the known short name is kept)
             if user_info:
                 user_data['short_name'] = user_info.get('shortName', node_id[-4:])
                 user_data['long_name'] = user_info.get('longName')
-            else:
-                # Get existing user or use default
-                existing = db.get_user(node_id)
-                if existing:
-                    user_data['short_name'] = existing.get('short_name', node_id[-4:])
-                else:
-                    user_data['short_name'] = node_id[-4:]
             
             # Add position if available
             if position:
@@ -537,15 +660,10 @@ class SerialInterface(MeshtasticInterface):
                 user_data['battery_level'] = telemetry.get('batteryLevel')
                 user_data['voltage'] = telemetry.get('voltage')
             
-            # Upsert user record
-            db.upsert_user(user_data)
-            
-            # Update node_hardware table if we have hardware info
+            # Hardware info for the node_hardware table
+            hardware_data = {}
             if user_info or telemetry:
-                hardware_data = {
-                    'node_id': node_id,
-                    'last_updated': datetime.utcnow().isoformat()
-                }
+                hardware_data['last_updated'] = datetime.utcnow().isoformat()
                 
                 if user_info:
                     hardware_data['hardware_model'] = user_info.get('hwModel', '')
@@ -557,19 +675,17 @@ class SerialInterface(MeshtasticInterface):
                     hardware_data['channel_utilization'] = telemetry.get('channelUtilization')
                     hardware_data['air_util_tx'] = telemetry.get('airUtilTx')
                     hardware_data['uptime_seconds'] = telemetry.get('uptimeSeconds')
-                
-                # Build update query
-                columns = list(hardware_data.keys())
-                placeholders = ', '.join(['?' for _ in columns])
-                update_clause = ', '.join([f"{col} = excluded.{col}" for col in columns if col != 'node_id'])
-                
-                query = f"""
-                    INSERT INTO node_hardware ({', '.join(columns)})
-                    VALUES ({placeholders})
-                    ON CONFLICT(node_id) DO UPDATE SET {update_clause}
-                """
-                
-                db.execute_update(query, tuple(hardware_data[col] for col in columns))
+            
+            # Coalesced in memory and flushed to the database in batches
+            get_node_registry().update_node(node_id, user_data, hardware_data)
+            
+            # Per-minute/hour/day network statistics
+            get_stats_rollup().record_packet(
+                node_id,
+                snr=user_data['snr'],
+                rssi=user_data['rssi'],
+                battery_level=user_data.get('battery_level')
+            )
             
             self.logger.debug(f"Updated node tracking for {node_id}")
             
@@ -657,6 +773,107 @@ class SerialInterface(MeshtasticInterface):
                 break
 
 
+class ReplayInterface(SerialInterface):
+    """
+    Replays a packet capture through the serial interface's packet handlers.
+    
+    Packets go through the same conversion, node tracking and message
+    callback as packets from a radio, so the routing stack sees production
+    traffic without hardware. Handlers are called directly rather than via
+    pubsub so a replay never reaches other interfaces in the process.
+    
+    ``connection_string`` is the capture file. ``metadata['speed']`` sets
+    the pace: 1.0 keeps the recorded timing, N replays N times faster and 0
+    replays as fast as possible. With ``metadata['loop']`` the capture
+    repeats until the interface is stopped. Transmissions are counted and
+    discarded.
+    """
+    
+    def __init__(self, config, message_callback):
+        super().__init__(config, message_callback)
+        self.speed = max(0.0, float(config.metadata.get('speed', 1.0)))
+        self.loop = bool(config.metadata.get('loop', False))
+        self.packet_handlers = {
+            "meshtastic.receive.text": self._on_meshtastic_text,
+            "meshtastic.receive.nodeinfo": self._on_meshtastic_nodeinfo,
+            "meshtastic.receive.position": self._on_meshtastic_position,
+            "meshtastic.receive.telemetry": self._on_meshtastic_telemetry,
+        }
+        self.packets_replayed = 0
+        self.packets_skipped = 0
+        self.passes = 0
+        self.max_lag = 0.0  # furthest behind the recorded timing, in seconds
+        self.finished = False
+    
+    async def _connect(self) -> bool:
+        """Check the capture file can be read"""
+        path = self.config.get_connection_params()['path']
+        try:
+            next(read_capture(path), None)
+        except CaptureError as e:
+            self.logger.error(f"Cannot replay capture: {e}")
+            return False
+        self.finished = False
+        self.logger.info(f"Replaying {path} at {'max' if self.speed == 0 else f'{self.speed:g}x'} speed")
+        return True
+    
+    async def _disconnect(self):
+        """Nothing to close; the capture is reopened for each pass"""
+        pass
+    
+    async def _send_message(self, message: Message) -> bool:
+        """Discard outgoing messages (counted in the interface stats)"""
+        return True
+    
+    async def _receive_messages(self):
+        """Feed captured packets to the packet handlers at the configured speed"""
+        path = self.config.get_connection_params()['path']
+        while self.status == InterfaceStatus.CONNECTED:
+            self.passes += 1
+            start = time.monotonic()
+            for captured in read_capture(path):
+                if self.status != InterfaceStatus.CONNECTED:
+                    return
+                handler = self.packet_handlers.get(captured.topic)
+                if handler is None:
+                    self.packets_skipped += 1  # e.g. our own recorded transmissions
+                    continue
+                
+                delay = start + captured.offset / self.speed - time.monotonic() if self.speed else 0.0
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+                    await asyncio.sleep(0)  # let routing keep up when behind or unpaced
+                
+                packet = captured.packet
+                if self.passes > 1 and 'id' in packet:
+                    # Give repeated passes fresh packet IDs so they are not suppressed as duplicates
+                    packet = {**packet, 'id': (packet['id'] + (self.passes - 1) * 0x9E3779B1) & 0xFFFFFFFF}
+                handler(packet, self)
+                self.packets_replayed += 1
+            
+            if not self.loop:
+                break
+        
+        self.finished = True
+        self.logger.info(f"Replay of {path} finished: {self.packets_replayed} packets in {self.passes} pass(es)")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get interface status, including replay progress"""
+        status = super().get_status()
+        status['replay'] = {
+            'speed': self.speed,
+            'loop': self.loop,
+            'passes': self.passes,
+            'packets_replayed': self.packets_replayed,
+            'packets_skipped': self.packets_skipped,
+            'max_lag_seconds': self.max_lag,
+            'finished': self.finished
+        }
+        return status
+
+
 class TCPInterface(MeshtasticInterface):
     """TCP interface for Meshtastic devices"""
     
@@ -828,6 +1045,8 @@ class InterfaceFactory:
             return TCPInterface(config, message_callback)
         elif config.type == 'ble':
             return BLEInterface(config, message_callback)
+        elif config.type == 'replay':
+            return ReplayInterface(config, message_callback)
         else:
             raise ValueError(f"Unsupported interface type: {config.type}")
 
@@ -835,11 +1054,16 @@ class InterfaceFactory:
 class InterfaceManager:
     """Manages multiple Meshtastic interfaces"""
     
-    def __init__(self, message_callback: Callable[[Message, str], None]):
+    def __init__(self, message_callback: Callable[[Message, str], None],
+                 outbound: Optional[OutboundSelector] = None):
         self.message_callback = message_callback
         self.interfaces: Dict[str, MeshtasticInterface] = {}
         self.logger = get_logger('interface_manager')
         
+        # Outbound policy; with a balanced policy, messages an interface could
+        # not send are rerouted to another one
+        self.outbound = outbound or OutboundSelector()
+        
         self.logger.info("Interface manager initialized")
     
     async def add_interface(self, config: InterfaceConfig):
@@ -850,6 +1074,8 @@ class InterfaceManager:
         
         try:
             interface = InterfaceFactory.create_interface(config, self.message_callback)
+            if self.outbound.balanced:
+                interface.reroute_callback = self.reroute_message
             self.interfaces[config.id] = interface
             
             await interface.start()
@@ -885,6 +1111,15 @@ class InterfaceManager:
             else:
                 self.logger.error(f"Interface {interface_id} not found")
                 return False
+        elif self.outbound.balanced:
+            # Send through the interface chosen by the outbound policy
+            for attempt, iface_id in enumerate(self.outbound.candidates(message, self.interfaces)):
+                interface = self.interfaces[iface_id]
+                if await interface.send_message(message):
+                    self.outbound.record_selection(iface_id, failovers=attempt)
+                    return True
+                self.outbound.record_failure(interface)
+            return False
         else:
             # Send through all connected interfaces
             success = False
@@ -893,6 +1128,26 @@ class InterfaceManager:
                     success = True
             return success
     
+    async def reroute_message(self, message: Message, failed_interface_id: str) -> bool:
+        """Send a message that an interface dropped or failed to send on another interface"""
+        rerouted_from = message.metadata.setdefault('rerouted_from', [])
+        rerouted_from.append(failed_interface_id)
+        if len(rerouted_from) > self.outbound.max_reroutes:
+            self.outbound.stats.reroute_failures += 1
+            return False
+        
+        # Only enqueue here: this runs on the failed interface's send worker, and the
+        # target's own worker waits for its airtime before sending
+        for iface_id in self.outbound.candidates(message, self.interfaces, exclude=rerouted_from):
+            interface = self.interfaces[iface_id]
+            if await interface.send_message(message):
+                self.outbound.stats.reroutes += 1
+                self.logger.info(f"Rerouted message from {failed_interface_id} to {iface_id}")
+                return True
+        
+        self.outbound.stats.reroute_failures += 1
+        return False
+    
     def get_interface_status(self, interface_id: Optional[str] = None) -> Dict[str, Any]:
         """Get status of interfaces"""
         if interface_id:
@@ -924,6 +1179,13 @@ class InterfaceManager:
                 self.logger.error(f"Error stopping interface: {e}")
         
         self.interfaces.clear()
+        
+        # Write out node updates still held by the registry
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, shutdown_node_registry)
+        except Exception as e:
+            self.logger.error(f"Error flushing node registry: {e}")
+        
         self.logger.info("All interfaces stopped")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -935,6 +1197,7 @@ class InterfaceManager:
             'total_messages_received': 0,
             'total_bytes_sent': 0,
             'total_bytes_received': 0,
+            'outbound': self.outbound.get_stats(),
             'interfaces': {}
         }
         
@@ -948,4 +1211,9 @@ class InterfaceManager:
             total_stats['total_bytes_received'] += stats['bytes_received']
             total_stats['interfaces'][iface_id] = status
         
+        # Node registry cache statistics (only once packets have been tracked)
+        from . import node_registry as registry_module
+        if registry_module.node_registry is not None:
+            total_stats['node_registry'] = registry_module.node_registry.get_stats()
+        
         return total_stats
\ No newline at end of file
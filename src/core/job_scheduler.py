@@ -0,0 +1,558 @@
+"""
+Shared Job Scheduler for ZephyrGate
+
+One asyncio task drives every timed job in the process: plugin tasks,
+scheduling service tasks and scheduled broadcasts. Jobs sit in a min-heap
+keyed by their due time. The driver sleeps until the earliest one is due,
+starts every job that is due, and goes back to sleep. Any number of idle
+jobs cost a single timer, and adding a job only wakes the driver when it is
+due before the current head.
+
+A job fires on a fixed interval, on a cron expression (see core.cron), or
+once at a given time. Interval jobs run at a fixed rate from their first due
+time, so a slow handler does not push later runs back. Each fire can be
+delayed by a random jitter so jobs sharing a schedule do not all transmit at
+once.
+
+A job more than ``misfire_grace`` seconds late (the process was suspended,
+the clock jumped, or the loop was blocked) follows its misfire policy:
+
+    skip      drop the missed runs and wait for the next scheduled time
+    run_once  run once now for any number of missed runs, then resume
+    run_all   run every missed occurrence, one after another
+
+A job never runs concurrently with itself. A fire that comes due while the
+previous run is still going is counted as an overlap and dropped, or queued
+behind it under ``run_all``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone, tzinfo
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .cron import CronExpression
+from .logging import get_logger
+from .metrics import get_metrics_registry
+
+
+TimeSpec = Union[float, int, datetime]
+
+
+class MisfirePolicy(Enum):
+    """What to do with a job that comes due later than its misfire grace"""
+    SKIP = "skip"
+    RUN_ONCE = "run_once"
+    RUN_ALL = "run_all"
+
+
+@dataclass
+class JobStats:
+    """Per-job timing statistics"""
+    runs: int = 0
+    failures: int = 0
+    misfires: int = 0  # fires skipped for being too late
+    overlaps: int = 0  # fires dropped because the previous run was still going
+    last_run: Optional[float] = None  # epoch seconds
+    last_duration: float = 0.0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    last_lateness: float = 0.0  # seconds between due time and start
+    max_lateness: float = 0.0
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'misfires': self.misfires,
+            'overlaps': self.overlaps,
+            'last_run': datetime.fromtimestamp(self.last_run, timezone.utc).isoformat() if self.last_run else None,
+            'last_duration_ms': round(self.last_duration * 1000, 3),
+            'mean_duration_ms': round(self.total_duration / self.runs * 1000, 3) if self.runs else 0.0,
+            'max_duration_ms': round(self.max_duration * 1000, 3),
+            'last_lateness_ms': round(self.last_lateness * 1000, 3),
+            'max_lateness_ms': round(self.max_lateness * 1000, 3),
+            'last_error': self.last_error
+        }
+
+
+class Job:
+    """A callback scheduled on the shared job scheduler"""
+
+    def __init__(self, scheduler: 'JobScheduler', job_id: int, callback: Callable, name: str, owner: str,
+                 interval: Optional[float], cron: Optional[CronExpression], tz: tzinfo,
+                 jitter: float, misfire: MisfirePolicy, misfire_grace: float,
+                 max_runs: Optional[int], end_at: Optional[float]):
+        self.scheduler = scheduler
+        self.id = job_id
+        self.callback = callback
+        self.name = name
+        self.owner = owner
+        self.interval = interval
+        self.cron = cron
+        self.tz = tz
+        self.jitter = jitter
+        self.misfire = misfire
+        self.misfire_grace = misfire_grace
+        self.max_runs = max_runs
+        self.end_at = end_at
+        self.stats = JobStats()
+
+        self.nominal: Optional[float] = None  # scheduled time of the next fire, before jitter
+        self.due: Optional[float] = None  # when the next fire starts, after jitter
+        self.fires = 0
+        self.paused = False
+        self.cancelled = False
+        self.running: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._entry: Optional[list] = None
+        self._backlog = 0
+
+    @property
+    def trigger(self) -> str:
+        if self.cron is not None:
+            return f"cron '{self.cron.expression}'"
+        if self.interval is not None:
+            return f"every {self.interval:g}s"
+        return "once"
+
+    @property
+    def scheduled(self) -> bool:
+        """Whether the job has a pending fire"""
+        return self._entry is not None
+
+    @property
+    def next_fire(self) -> Optional[datetime]:
+        """Due time of the next fire (UTC), or None if nothing is pending"""
+        if self._entry is None or self.due is None:
+            return None
+        return datetime.fromtimestamp(self.due, timezone.utc)
+
+    def following(self, nominal: float) -> Optional[float]:
+        """Nominal time of the fire after the one at ``nominal``"""
+        if self.cron is not None:
+            return self.cron.next_after(datetime.fromtimestamp(nominal, self.tz)).timestamp()
+        if self.interval is not None:
+            return nominal + self.interval
+        return None
+
+    def following_after(self, nominal: float, now: float) -> Optional[float]:
+        """First nominal fire time after ``now``, skipping the ones in between"""
+        if self.cron is not None:
+            return self.cron.next_after(datetime.fromtimestamp(max(nominal, now), self.tz)).timestamp()
+        if self.interval is not None:
+            missed = int((now - nominal) // self.interval) + 1
+            return nominal + max(missed, 1) * self.interval
+        return None
+
+    def cancel(self):
+        """Remove the job from its scheduler"""
+        self.scheduler.remove_job(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'owner': self.owner,
+            'trigger': self.trigger,
+            'next_fire': self.next_fire.isoformat() if self.next_fire else None,
+            'paused': self.paused,
+            'running': self.running is not None and not self.running.done(),
+            'misfire': self.misfire.value,
+            'jitter': self.jitter,
+            'stats': self.stats.to_dict()
+        }
+
+
+class JobScheduler:
+    """Min-heap timer queue with a single driver task"""
+
+    def __init__(self, max_sleep: float = 300.0, misfire_grace: float = 1.0,
+                 tz: tzinfo = timezone.utc, clock: Callable[[], float] = time.time):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_sleep: Longest the driver sleeps without checking the clock,
+                so wall clock changes are noticed
+            misfire_grace: Default seconds a fire may be late before its
+                misfire policy applies
+            tz: Default timezone for cron expressions
+            clock: Wall clock in epoch seconds
+        """
+        self.max_sleep = max_sleep
+        self.misfire_grace = misfire_grace
+        self.tz = tz
+        self.clock = clock
+        self.logger = get_logger('job_scheduler')
+
+        self.jobs: Dict[int, Job] = {}
+        self._heap: List[list] = []
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._driver: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._head_due: Optional[float] = None
+
+        self.wakeups = 0
+        self.dispatched = 0
+
+        registry = get_metrics_registry()
+        self._duration_metric = registry.histogram(
+            'scheduler_job_duration_seconds', 'Scheduled job run time', ['owner']
+        )
+        self._lateness_metric = registry.histogram(
+            'scheduler_job_lateness_seconds', 'Delay between a job coming due and starting', ['owner']
+        )
+        self._runs_metric = registry.counter(
+            'scheduler_job_runs_total', 'Scheduled job fires by outcome', ['owner', 'result']
+        )
+
+    # Job management
+
+    def add_job(self, callback: Callable, *, interval: Optional[float] = None, cron: Optional[str] = None,
+                at: Optional[TimeSpec] = None, name: str = "", owner: str = "",
+                start_at: Optional[TimeSpec] = None, end_at: Optional[TimeSpec] = None,
+                max_runs: Optional[int] = None, jitter: float = 0.0,
+                misfire: MisfirePolicy = MisfirePolicy.RUN_ONCE,
+                misfire_grace: Optional[float] = None, tz: Optional[tzinfo] = None) -> Job:
+        """
+        Schedule a callback.
+
+        Exactly one of ``interval``, ``cron`` or ``at`` must be given. The
+        callback takes no arguments and may be a coroutine function.
+
+        Args:
+            callback: Function to call
+            interval: Seconds between fires
+            cron: Cron expression
+            at: Time of a single fire
+            name: Job name for logs and stats
+            owner: Plugin or service the job belongs to
+            start_at: First fire (default: one interval from now, or the next cron time)
+            end_at: No fires after this time
+            max_runs: Stop after this many fires
+            jitter: Delay each fire by up to this many seconds, chosen at random
+            misfire: What to do when a fire is later than the misfire grace
+            misfire_grace: Seconds a fire may be late (default: scheduler setting)
+            tz: Timezone for the cron expression (default: scheduler setting)
+
+        Returns:
+            The scheduled Job
+
+        Raises:
+            ValueError: If the trigger is missing, ambiguous or invalid
+        """
+        if sum(option is not None for option in (interval, cron, at)) != 1:
+            raise ValueError("Exactly one of interval, cron or at must be provided")
+        if interval is not None and interval <= 0:
+            raise ValueError(f"Interval must be positive, got: {interval}")
+        if jitter < 0:
+            raise ValueError(f"Jitter must not be negative, got: {jitter}")
+
+        job = Job(
+            self, next(self._ids), callback, name or getattr(callback, '__name__', 'job'), owner,
+            interval=float(interval) if interval is not None else None,
+            cron=CronExpression(cron) if cron is not None else None,
+            tz=tz or self.tz,
+            jitter=jitter,
+            misfire=misfire,
+            misfire_grace=self.misfire_grace if misfire_grace is None else misfire_grace,
+            max_runs=max_runs,
+            end_at=self._timestamp(end_at) if end_at is not None else None
+        )
+
+        now = self.clock()
+        if at is not None:
+            first = self._timestamp(at)
+        elif start_at is not None:
+            first = self._timestamp(start_at)
+        else:
+            first = job.following(now)
+
+        self.jobs[job.id] = job
+        self._schedule(job, first)
+        return job
+
+    def remove_job(self, job: Job):
+        """Unschedule a job; a run already in progress is left to finish"""
+        job.cancelled = True
+        job._entry = None
+        job._backlog = 0
+        self.jobs.pop(job.id, None)
+
+    def reschedule_job(self, job: Job, at: TimeSpec):
+        """Move a job's next fire, re-arming it if it had finished"""
+        if job.cancelled:
+            raise ValueError(f"Job '{job.name}' has been removed")
+        self.jobs[job.id] = job
+        self._schedule(job, self._timestamp(at))
+
+    def pause_job(self, job: Job):
+        """Stop firing a job until it is resumed; a one-shot job missed while paused runs on resume"""
+        job.paused = True
+        job._entry = None
+
+    def resume_job(self, job: Job):
+        """Resume a paused job from its next scheduled time after now"""
+        if not job.paused or job.cancelled:
+            return
+        job.paused = False
+        nominal, now = job.nominal, self.clock()
+        if nominal is not None and nominal <= now and (job.interval is not None or job.cron is not None):
+            nominal = job.following_after(nominal, now)
+        self._schedule(job, nominal)
+
+    def get_jobs(self, owner: Optional[str] = None) -> List[Job]:
+        """Get scheduled jobs, optionally only those of one owner"""
+        return [job for job in self.jobs.values() if owner is None or job.owner == owner]
+
+    # Scheduling
+
+    @staticmethod
+    def _timestamp(value: TimeSpec) -> float:
+        """Epoch seconds for a time; naive datetimes are taken as UTC"""
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value.timestamp()
+        return float(value)
+
+    def _schedule(self, job: Job, nominal: Optional[float]):
+        """Queue a job's next fire at ``nominal`` (plus jitter), or finish it"""
+        if job.paused and nominal is not None and not job.cancelled:
+            # Kept for resume_job
+            job._entry = None
+            job.nominal, job.due = nominal, None
+            return
+        if nominal is None or job.cancelled or job.paused or (
+                job.max_runs is not None and job.fires >= job.max_runs) or (
+                job.end_at is not None and nominal > job.end_at):
+            job._entry = None
+            job.nominal = job.due = None
+            return
+
+        job.nominal = nominal
+        job.due = nominal + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        entry = [job.due, next(self._sequence), job]
+        job._entry = entry
+        heapq.heappush(self._heap, entry)
+        if job.loop is None:
+            job.loop = self._running_loop()
+
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self.jobs):
+            self._compact()
+
+        self._ensure_driver()
+        if self._wake is not None and (self._head_due is None or job.due < self._head_due):
+            self._wake.set()
+
+    def _compact(self):
+        """Drop heap entries of removed or rescheduled jobs"""
+        self._heap = [entry for entry in self._heap if entry[2]._entry is entry]
+        heapq.heapify(self._heap)
+
+    @staticmethod
+    def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    def _ensure_driver(self):
+        """Start the driver task on the running loop if it is not running there"""
+        loop = self._running_loop()
+        if loop is None:
+            return
+        if self._driver is not None and not self._driver.done() and self._loop is loop:
+            return
+
+        if self._loop is not loop:
+            # Jobs added on an event loop that has since closed cannot run here
+            for job in list(self.jobs.values()):
+                if job.loop is not None and job.loop is not loop and job.loop.is_closed():
+                    self.remove_job(job)
+                job.running = None
+                job._backlog = 0
+            self._compact()
+
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._driver = loop.create_task(self._run())
+
+    async def start(self):
+        """Start the driver task on the running loop"""
+        self._ensure_driver()
+
+    async def stop(self):
+        """Stop the driver and cancel runs in progress; jobs stay registered"""
+        driver, self._driver = self._driver, None
+        tasks = [job.running for job in self.jobs.values() if job.running is not None and not job.running.done()]
+        if driver is not None and not driver.done():
+            driver.cancel()
+            tasks.append(driver)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self):
+        """Driver: start due jobs, then sleep until the next one is due"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                job = entry[2]
+                if job._entry is not entry:
+                    continue  # removed or rescheduled
+                job._entry = None
+                try:
+                    self._fire(job, now)
+                except Exception as e:
+                    self.logger.error(f"Error scheduling job '{job.name}': {e}", exc_info=True)
+
+            self._wake.clear()
+            timer = None
+            if self._heap:
+                self._head_due = self._heap[0][0]
+                timer = loop.call_later(min(max(self._head_due - now, 0.0), self.max_sleep), self._wake.set)
+            else:
+                self._head_due = None
+            try:
+                await self._wake.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+            self.wakeups += 1
+
+    def _fire(self, job: Job, now: float):
+        """Start a due job and queue its next fire"""
+        lateness = now - job.due
+        nominal = job.nominal
+
+        if lateness > job.misfire_grace and job.misfire != MisfirePolicy.RUN_ALL:
+            next_nominal = job.following_after(nominal, now)
+            if job.misfire == MisfirePolicy.SKIP:
+                job.stats.misfires += 1
+                self._runs_metric.labels(job.owner, 'misfire').inc()
+                self.logger.warning(f"Job '{job.name}' missed its run by {lateness:.1f}s; skipped")
+                self._schedule(job, next_nominal)
+                return
+        else:
+            next_nominal = job.following(nominal)
+
+        job.fires += 1
+        if job.running is not None and not job.running.done():
+            if job.misfire == MisfirePolicy.RUN_ALL:
+                job._backlog += 1
+            else:
+                job.stats.overlaps += 1
+                self._runs_metric.labels(job.owner, 'overlap').inc()
+                self.logger.debug(f"Job '{job.name}' still running; fire dropped")
+        else:
+            job.running = asyncio.ensure_future(self._execute(job, lateness))
+            self.dispatched += 1
+
+        self._schedule(job, next_nominal)
+
+    async def _execute(self, job: Job, lateness: float):
+        """Run a job's callback, then any fires queued behind it"""
+        while True:
+            stats = job.stats
+            stats.last_run = self.clock()
+            stats.last_lateness = max(lateness, 0.0)
+            stats.max_lateness = max(stats.max_lateness, stats.last_lateness)
+            self._lateness_metric.labels(job.owner).observe(stats.last_lateness)
+            started = time.perf_counter()
+            result = 'ok'
+            try:
+                outcome = job.callback()
+                if asyncio.iscoroutine(outcome) or isinstance(outcome, asyncio.Future):
+                    await outcome
+                stats.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = 'error'
+                stats.failures += 1
+                stats.last_error = str(e)
+                self.logger.error(f"Scheduled job '{job.name}' failed: {e}", exc_info=True)
+            finally:
+                duration = time.perf_counter() - started
+                stats.runs += 1
+                stats.last_duration = duration
+                stats.total_duration += duration
+                stats.max_duration = max(stats.max_duration, duration)
+                self._duration_metric.labels(job.owner).observe(duration)
+                self._runs_metric.labels(job.owner, result).inc()
+
+            if job._backlog <= 0 or job.cancelled:
+                break
+            job._backlog -= 1
+            lateness = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics"""
+        head = self._heap[0][0] if self._heap else None
+        return {
+            'jobs': len(self.jobs),
+            'heap_size': len(self._heap),
+            'running': sum(1 for job in self.jobs.values() if job.running is not None and not job.running.done()),
+            'wakeups': self.wakeups,
+            'dispatched': self.dispatched,
+            'next_due_in': round(head - self.clock(), 3) if head is not None else None,
+            'driver_running': self._driver is not None and not self._driver.done()
+        }
+
+
+def _parse_timezone(name: Any) -> tzinfo:
+    if isinstance(name, tzinfo):
+        return name
+    if not name or str(name).upper() == 'UTC':
+        return timezone.utc
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(str(name))
+
+
+def create_job_scheduler(config: Optional[Dict[str, Any]] = None) -> JobScheduler:
+    """Build a job scheduler from the ``scheduler`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    return JobScheduler(
+        max_sleep=float(config.get('max_sleep', 300.0)),
+        misfire_grace=float(config.get('misfire_grace', 1.0)),
+        tz=_parse_timezone(config.get('timezone', 'UTC'))
+    )
+
+
+# Global job scheduler
+job_scheduler: Optional[JobScheduler] = None
+
+
+def initialize_job_scheduler(config: Optional[Dict[str, Any]] = None) -> JobScheduler:
+    """Initialize the global job scheduler"""
+    global job_scheduler
+    job_scheduler = create_job_scheduler(config)
+    return job_scheduler
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Get the global job scheduler, creating one with defaults if needed"""
+    global job_scheduler
+    if job_scheduler is None:
+        job_scheduler = create_job_scheduler()
+    return job_scheduler
+
+
+async def shutdown_job_scheduler():
+    """Stop the global job scheduler's driver and running jobs"""
+    if job_scheduler is not None:
+        await job_scheduler.stop()
@@ -0,0 +1,289 @@
+"""
+Event Loop Health Monitor for ZephyrGate
+
+Measures asyncio scheduling lag and catches callbacks that block the loop.
+
+A ticker task sleeps for a fixed interval and records how late it wakes
+up; that lateness is the time every other ready callback also had to
+wait. A watchdog thread checks the ticker's deadline: when the loop is
+overdue by more than ``slow_callback_threshold`` it samples the loop
+thread's stack with ``sys._current_frames()``, so the blocking call is
+caught while it is still running. Each episode records the task and
+coroutine being run, the plugin or service the blocking code belongs to,
+and the stack.
+
+The ticker wakes a few times a second and the watchdog thread only reads
+two attributes per check, so the monitor can stay on in production.
+"""
+
+import asyncio
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from .logging import get_logger
+from .metrics import LogHistogram, get_metrics_registry
+
+
+# plugins/<name>/... and src/services/<name>/... identify who owns a frame
+SOURCE_PATTERN = re.compile(r'[/\\](plugins|services)[/\\]([^/\\]+)[/\\]')
+
+
+@dataclass
+class SlowCallbackEvent:
+    """An episode where the event loop was blocked"""
+    started: datetime  # when the loop should have run the ticker
+    lag: float  # seconds the loop was late; grows until the loop resumes
+    task: Optional[str] = None
+    coroutine: Optional[str] = None
+    source: str = 'unknown'  # plugin:<name>, service:<name> or unknown
+    stack: List[str] = field(default_factory=list)  # innermost frame last
+    finished: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started': self.started.isoformat(),
+            'lag': self.lag,
+            'task': self.task,
+            'coroutine': self.coroutine,
+            'source': self.source,
+            'stack': self.stack,
+            'finished': self.finished
+        }
+
+
+@dataclass
+class LoopMonitorStats:
+    """Event loop monitor statistics"""
+    ticks: int = 0
+    blocked: int = 0
+    max_lag: float = 0.0
+    last_lag: float = 0.0
+    watchdog_checks: int = 0
+
+
+def _current_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+    """Get the task a loop is running, from any thread"""
+    current_tasks = getattr(asyncio.tasks, '_current_tasks', None)
+    if isinstance(current_tasks, dict):
+        return current_tasks.get(loop)
+    return None
+
+
+def _source_of(stack: traceback.StackSummary) -> str:
+    """Name the plugin or service owning the innermost frame that has one"""
+    for frame in reversed(stack):
+        match = SOURCE_PATTERN.search(frame.filename)
+        if match:
+            kind = 'plugin' if match.group(1) == 'plugins' else 'service'
+            return f"{kind}:{match.group(2)}"
+    return 'unknown'
+
+
+class LoopMonitor:
+    """
+    Continuous event loop lag measurement with slow-callback capture.
+
+    Lag is kept in an all-time histogram and in a window histogram that
+    the health monitor drains on each check; blocked episodes are kept in
+    a bounded list of recent events.
+    """
+
+    def __init__(self, interval: float = 0.25, slow_callback_threshold: float = 0.1,
+                 max_events: int = 100, stack_depth: int = 20):
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.max_events = max_events
+        self.stack_depth = stack_depth
+        self.logger = get_logger('loop_monitor')
+
+        self.lag = LogHistogram()
+        self.window = LogHistogram()
+        self.events: Deque[SlowCallbackEvent] = deque(maxlen=max_events)
+        self.blocked_by_source: Dict[str, int] = {}
+        self.stats = LoopMonitorStats()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._deadline: Optional[float] = None  # monotonic time the ticker is due
+        self._open_event: Optional[SlowCallbackEvent] = None
+        self._open_deadline: Optional[float] = None
+        self._lock = threading.Lock()
+        self._ticker_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        registry = get_metrics_registry()
+        self._lag_metric = registry.histogram('event_loop_lag_seconds', 'Event loop scheduling lag')
+        self._blocked_metric = registry.counter(
+            'event_loop_blocked_total', 'Blocked event loop episodes by owning plugin or service', ['source']
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._ticker_task is not None and not self._ticker_task.done()
+
+    async def start(self):
+        """Start measuring the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._ticker_task = asyncio.create_task(self._ticker())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        self.logger.info(f"Event loop monitor started (interval {self.interval}s, "
+                         f"slow callback threshold {self.slow_callback_threshold}s)")
+
+    async def stop(self):
+        """Stop the ticker and the watchdog thread"""
+        self._stopping.set()
+        if self._ticker_task is not None:
+            self._ticker_task.cancel()
+            await asyncio.gather(self._ticker_task, return_exceptions=True)
+            self._ticker_task = None
+        self._deadline = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    # Event loop side
+
+    async def _ticker(self):
+        """Sleep for the interval and record how late each wakeup is"""
+        while True:
+            expected = time.monotonic() + self.interval
+            self._deadline = expected
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._deadline = None
+            self._record_lag(max(0.0, now - expected), expected)
+
+    def _record_lag(self, lag: float, deadline: float):
+        self.stats.ticks += 1
+        self.stats.last_lag = lag
+        self.stats.max_lag = max(self.stats.max_lag, lag)
+        self.lag.record(lag)
+        self.window.record(lag)
+        self._lag_metric.observe(lag)
+
+        with self._lock:
+            event = self._open_event
+            if event is not None and self._open_deadline == deadline:
+                event.lag = lag
+                event.finished = True
+                self._open_event = None
+                self.logger.warning(
+                    f"Event loop blocked for {lag:.3f}s by {event.source}"
+                    f"{f' in {event.coroutine}' if event.coroutine else ''}"
+                    f"{f' at {event.stack[-1]}' if event.stack else ''}"
+                )
+
+    # Watchdog thread
+
+    def _watch(self):
+        """Sample the loop thread's stack when the ticker is overdue"""
+        poll = max(self.slow_callback_threshold / 2, 0.005)
+        while not self._stopping.wait(poll):
+            self.stats.watchdog_checks += 1
+            deadline = self._deadline
+            if deadline is None or deadline == self._open_deadline:
+                continue
+            overdue = time.monotonic() - deadline
+            if overdue >= self.slow_callback_threshold:
+                self._capture(deadline, overdue)
+
+    def _capture(self, deadline: float, overdue: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame, limit=self.stack_depth)
+        del frame
+
+        task = _current_task(self._loop)
+        coroutine = None
+        if task is not None:
+            coro = task.get_coro()
+            coroutine = getattr(coro, '__qualname__', None) or repr(coro)
+
+        event = SlowCallbackEvent(
+            started=datetime.utcnow(),
+            lag=overdue,
+            task=task.get_name() if task is not None else None,
+            coroutine=coroutine,
+            source=_source_of(stack),
+            stack=[f"{f.filename}:{f.lineno} in {f.name}" for f in stack]
+        )
+        with self._lock:
+            if self._deadline != deadline:
+                return  # the loop resumed while the stack was being read
+            self._open_event = event
+            self._open_deadline = deadline
+            self.events.append(event)
+            self.stats.blocked += 1
+            self.blocked_by_source[event.source] = self.blocked_by_source.get(event.source, 0) + 1
+        self._blocked_metric.labels(source=event.source).inc()
+
+    # Reporting
+
+    def recent_events(self, limit: int = 10) -> List[SlowCallbackEvent]:
+        """Get the most recent blocked episodes, newest last"""
+        with self._lock:
+            return list(self.events)[-limit:] if limit else []
+
+    def take_window_stats(self) -> Dict[str, Any]:
+        """Get lag statistics since the previous call and start a new window"""
+        stats = self.window.get_stats()
+        self.window.reset()
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event loop health statistics"""
+        with self._lock:
+            blocked_by_source = dict(self.blocked_by_source)
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'slow_callback_threshold': self.slow_callback_threshold,
+            'ticks': self.stats.ticks,
+            'current_lag': self.stats.last_lag,
+            'lag': self.lag.get_stats(),
+            'blocked': self.stats.blocked,
+            'blocked_by_source': blocked_by_source,
+            'recent_events': [event.to_dict() for event in self.recent_events()]
+        }
+
+
+def create_loop_monitor(config: Optional[Dict[str, Any]] = None) -> LoopMonitor:
+    """Build a monitor from the ``health_monitor.loop_monitor`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    return LoopMonitor(
+        interval=float(config.get('interval', 0.25)),
+        slow_callback_threshold=float(config.get('slow_callback_threshold', 0.1)),
+        max_events=int(config.get('max_events', 100)),
+        stack_depth=int(config.get('stack_depth', 20))
+    )
+
+
+# Global loop monitor (created by the health monitor)
+loop_monitor: Optional[LoopMonitor] = None
+
+
+def initialize_loop_monitor(config: Optional[Dict[str, Any]] = None) -> LoopMonitor:
+    """Initialize the global loop monitor"""
+    global loop_monitor
+    loop_monitor = create_loop_monitor(config)
+    return loop_monitor
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    """Get the global loop monitor, if one has been created"""
+    return loop_monitor
@@ -11,10 +11,9 @@ import logging
 import re
 import time
 from collections import defaultdict, deque
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
-import uuid
 
 try:
     from ..models.message import (
@@ -26,10 +25,23 @@ except ImportError:
         Message, MessageType, MessagePriority, QueuedMessage, 
         UserProfile, SOSType, InterfaceConfig
     )
+from .airtime import get_airtime_scheduler
+from .chunk_framing import (
+    ChunkFramer, FrameCorrupted, ReassemblyBuffer, RerequestFrame, parse_frame, parse_rerequest
+)
 from .config import ConfigurationManager
 from .database import DatabaseManager
+from .db_writer import AsyncDatabaseWriter
+from .dedup import DuplicateFilter, create_duplicate_filter
+from .outbound import OutboundSelector, create_outbound_selector
 from .logging import get_logger
+from .metrics import get_metrics_registry
+from .pattern_matcher import PatternMatcher
+from .rate_limiter import HierarchicalRateLimiter, create_rate_limiter
 from .plugin_command_handler import PluginCommandHandler
+from .service_dispatcher import ServiceDispatcher
+from .stats_rollup import get_stats_rollup
+from .tracing import get_tracer
 
 
 @dataclass
@@ -39,14 +51,21 @@ class RouteRule:
     service: str
     priority: int = 0
     conditions: Dict[str, Any] = field(default_factory=dict)
+    _regex: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
     
     def matches(self, message: Message, user: Optional[UserProfile] = None) -> bool:
         """Check if message matches this routing rule"""
         # Check content pattern
-        if self.pattern and not re.search(self.pattern, message.content, re.IGNORECASE):
-            return False
+        if self.pattern:
+            if self._regex is None or self._regex.pattern != self.pattern:
+                self._regex = re.compile(self.pattern, re.IGNORECASE)
+            if not self._regex.search(message.content):
+                return False
         
-        # Check conditions
+        return self.matches_conditions(message, user)
+    
+    def matches_conditions(self, message: Message, user: Optional[UserProfile] = None) -> bool:
+        """Check the non-content conditions of this routing rule"""
         for condition, value in self.conditions.items():
             if condition == 'message_type':
                 if message.message_type.value != value:
@@ -67,35 +86,6 @@ class RouteRule:
         return True
 
 
-@dataclass
-class RateLimitBucket:
-    """Rate limiting bucket for a specific key"""
-    tokens: float
-    last_refill: datetime
-    max_tokens: float
-    refill_rate: float  # tokens per second
-    
-    def can_consume(self, tokens: float = 1.0) -> bool:
-        """Check if tokens can be consumed"""
-        self._refill()
-        return self.tokens >= tokens
-    
-    def consume(self, tokens: float = 1.0) -> bool:
-        """Consume tokens if available"""
-        self._refill()
-        if self.tokens >= tokens:
-            self.tokens -= tokens
-            return True
-        return False
-    
-    def _refill(self):
-        """Refill tokens based on time elapsed"""
-        now = datetime.utcnow()
-        elapsed = (now - self.last_refill).total_seconds()
-        self.tokens = min(self.max_tokens, self.tokens + elapsed * self.refill_rate)
-        self.last_refill = now
-
-
 class MessageClassifier:
     """Classifies incoming messages for routing"""
     
@@ -127,36 +117,58 @@ class MessageClassifier:
             r'^email/',
             r'^(sms:|tagsend/|tagin/|tagout)',
         ]
+        
+        self.weather_patterns = [
+            r'\b(weather|wx|forecast|alert|storm|rain|snow|wind)\b',
+        ]
+        
+        self.greeting_patterns = [
+            r'\b(hello|hi|hey|new|help)\b',
+        ]
+        
+        self.compile_patterns()
+    
+    def compile_patterns(self):
+        """Compile all pattern lists into a single matcher (call again after changing them)"""
+        matcher = PatternMatcher()
+        matcher.add_all(self.sos_patterns, 'emergency')
+        matcher.add_all(self.bbs_patterns, 'bbs')
+        matcher.add_all(self.bot_patterns, 'bot')
+        matcher.add_all(self.email_patterns, 'email')
+        matcher.add_all(self.weather_patterns, 'weather')
+        matcher.add_all(self.greeting_patterns, 'greeting')
+        matcher.compile()
+        self.matcher = matcher
     
     def classify_message(self, message: Message, user: Optional[UserProfile] = None) -> List[str]:
         """Classify message and return list of target services"""
         services = []
         content = message.content.strip()
+        matched = self.matcher.match(content)
         
         # Emergency response - highest priority
-        if self._matches_patterns(content, self.sos_patterns):
+        if 'emergency' in matched:
             services.append('emergency')
             self.logger.info(f"Emergency message detected from {message.sender_id}")
         
         # BBS system
-        if self._matches_patterns(content, self.bbs_patterns):
+        if 'bbs' in matched:
             services.append('bbs')
         
         # Interactive bot
-        if self._matches_patterns(content, self.bot_patterns):
+        if 'bot' in matched:
             services.append('bot')
         
         # Email gateway
-        if self._matches_patterns(content, self.email_patterns):
+        if 'email' in matched:
             services.append('email')
         
         # Weather service (for weather-related keywords)
-        if re.search(r'\b(weather|wx|forecast|alert|storm|rain|snow|wind)\b', content, re.IGNORECASE):
+        if 'weather' in matched:
             services.append('weather')
         
         # Auto-response for new nodes or general queries
-        if not services and (message.message_type == MessageType.NODEINFO or 
-                           re.search(r'\b(hello|hi|hey|new|help)\b', content, re.IGNORECASE)):
+        if not services and (message.message_type == MessageType.NODEINFO or 'greeting' in matched):
             services.append('bot')
         
         # AI response for high-altitude nodes (potential aircraft)
@@ -170,13 +182,6 @@ class MessageClassifier:
         
         return services
     
-    def _matches_patterns(self, content: str, patterns: List[str]) -> bool:
-        """Check if content matches any of the patterns"""
-        for pattern in patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return True
-        return False
-    
     def extract_sos_type(self, content: str) -> SOSType:
         """Extract SOS type from message content"""
         content_upper = content.upper()
@@ -212,24 +217,53 @@ class CoreMessageRouter:
         # Message processing
         self.message_queue = asyncio.Queue()
         self.processing_tasks: Set[asyncio.Task] = set()
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+        workers = config_manager.get('routing.workers', 4)
+        self.routing_workers = workers if isinstance(workers, int) else 4
         self.route_rules: List[RouteRule] = []
-        
-        # Rate limiting
-        self.rate_limiters: Dict[str, RateLimitBucket] = {}
-        self.global_rate_limit = RateLimitBucket(
-            tokens=10.0,
-            last_refill=datetime.utcnow(),
-            max_tokens=10.0,
-            refill_rate=1.0  # 1 message per second globally
+        self._route_matcher: Optional[PatternMatcher] = None
+        self._compiled_routes: Optional[List[RouteRule]] = None
+        self._compiled_route_count = 0
+        
+        # Rate limiting (global -> channel -> sender)
+        rate_limit_config = config_manager.get('routing.rate_limit', {})
+        if not isinstance(rate_limit_config, dict):
+            rate_limit_config = {}
+        self.rate_limiter: HierarchicalRateLimiter = create_rate_limiter(rate_limit_config)
+        self.rate_limit_mode = rate_limit_config.get('mode', 'drop')
+        self.rate_limit_max_delay = rate_limit_config.get('max_delay', 30.0)
+        self.rate_limit_max_delayed = rate_limit_config.get('max_delayed', 100)
+        self._delayed_sends: Set[asyncio.Task] = set()
+        
+        # Message chunking with compact framing, reassembly and selective re-requests
+        self.max_message_size = config_manager.get('meshtastic.max_message_size', 228)
+        chunk_config = config_manager.get('meshtastic.chunking', {})
+        if not isinstance(chunk_config, dict):
+            chunk_config = {}
+        self.framer = ChunkFramer(
+            max_size=self.max_message_size,
+            sent_cache_size=chunk_config.get('sent_cache_size', 32),
+            sent_cache_ttl=chunk_config.get('sent_cache_ttl', 600)
+        )
+        self.reassembly = ReassemblyBuffer(
+            timeout=chunk_config.get('reassembly_timeout', 300),
+            max_messages=chunk_config.get('max_pending', 64),
+            max_bytes=chunk_config.get('max_pending_bytes', 65536),
+            rerequest_after=chunk_config.get('rerequest_after', 30),
+            max_rerequests=chunk_config.get('max_rerequests', 2)
         )
         
-        # Message chunking
-        self.max_message_size = config_manager.get('meshtastic.max_message_size', 228)
-        self.chunk_overhead = 20  # Overhead for chunk headers
+        # Suppression of rebroadcasts and packets heard on several interfaces
+        dedup_config = config_manager.get('routing.dedup', {})
+        self.dedup: DuplicateFilter = create_duplicate_filter(dedup_config)
+        
+        # Choice of interface for outbound messages when several are registered
+        self.outbound: OutboundSelector = create_outbound_selector(config_manager.get('routing.outbound', {}))
         
         # Statistics
         self.stats = {
             'messages_received': 0,
+            'messages_duplicate': 0,
             'messages_sent': 0,
             'messages_queued': 0,
             'messages_failed': 0,
@@ -241,6 +275,50 @@ class CoreMessageRouter:
         # Message history for debugging
         self.recent_messages = deque(maxlen=100)
         
+        # Exported metrics; series are resolved once so recording stays O(1)
+        metrics = get_metrics_registry()
+        stage_latency = metrics.histogram(
+            'router_stage_seconds', 'Time spent in each message routing stage', ['stage']
+        )
+        self._stage_latency = {
+            stage: stage_latency.labels(stage=stage)
+            for stage in ('reassemble', 'store_history', 'queue_wait', 'user_lookup', 'command',
+                          'classify', 'dispatch', 'routing_info', 'send')
+        }
+        message_counter = metrics.counter('router_messages_total', 'Messages handled by the router', ['event'])
+        self._message_counts = {
+            event: message_counter.labels(event=event)
+            for event in ('received', 'duplicate', 'queued', 'sent', 'failed')
+        }
+        self._queue_depth = metrics.gauge('queue_depth', 'Messages waiting in each queue', ['queue']).labels(
+            queue='router'
+        )
+        
+        # Per-message tracing; stages are timed once for both the metric and the trace
+        self.tracer = get_tracer()
+        
+        # Off-loop database writer for hot-path writes
+        self.db_writer: Optional[AsyncDatabaseWriter] = None
+        if config_manager.get('database.async_writes', True):
+            self.db_writer = AsyncDatabaseWriter(
+                db_manager,
+                max_queue_size=config_manager.get('database.write_queue_size', 1000),
+                batch_size=config_manager.get('database.write_batch_size', 100)
+            )
+        
+        # Concurrent per-service dispatch with timeouts, bulkheads and retries
+        dispatch_config = config_manager.get('routing.dispatch', {})
+        if not isinstance(dispatch_config, dict):
+            dispatch_config = {}
+        self.dispatcher = ServiceDispatcher(
+            default_timeout=dispatch_config.get('timeout', 30.0),
+            max_concurrency=dispatch_config.get('max_concurrency', 4),
+            max_pending=dispatch_config.get('max_pending', 100),
+            max_retries=dispatch_config.get('max_retries', 3),
+            retry_delay=dispatch_config.get('retry_delay', 30.0),
+            service_overrides=dispatch_config.get('services', {})
+        )
+        
         self._setup_default_routes()
         self.logger.info("Core message router initialized")
     
@@ -314,46 +392,91 @@ class CoreMessageRouter:
         
         # Sort routes by priority (highest first)
         self.route_rules.sort(key=lambda r: r.priority, reverse=True)
+        self._compile_route_rules()
+    
+    def _compile_route_rules(self):
+        """Compile route rule patterns into a single matcher keyed by rule index"""
+        matcher = PatternMatcher()
+        for index, rule in enumerate(self.route_rules):
+            matcher.add(rule.pattern, index)
+        matcher.compile()
+        
+        self._route_matcher = matcher
+        self._compiled_routes = self.route_rules
+        self._compiled_route_count = len(self.route_rules)
+    
+    def _match_route_rules(self, message: Message, user: Optional[UserProfile] = None) -> List[RouteRule]:
+        """Return matching route rules in priority order"""
+        if (self._route_matcher is None or self._compiled_routes is not self.route_rules
+                or self._compiled_route_count != len(self.route_rules)):
+            self._compile_route_rules()
+        
+        # Rules are kept sorted by priority, so ascending index is priority order
+        candidates = self._route_matcher.match(message.content)
+        return [
+            self.route_rules[index] for index in sorted(candidates)
+            if self.route_rules[index].matches_conditions(message, user)
+        ]
     
     async def start(self):
         """Start the message router"""
         self.logger.info("Starting core message router")
         
-        # Start message processing task
-        task = asyncio.create_task(self._process_message_queue())
-        self.processing_tasks.add(task)
-        task.add_done_callback(self.processing_tasks.discard)
+        # Start database writer
+        if self.db_writer:
+            self.db_writer.start()
+        
+        # Start message processing workers, so one slow message does not hold up the rest
+        for _ in range(max(1, self.routing_workers)):
+            task = asyncio.create_task(self._process_message_queue())
+            self.processing_tasks.add(task)
+            task.add_done_callback(self.processing_tasks.discard)
         
         # Start cleanup task
         cleanup_task = asyncio.create_task(self._cleanup_task())
         self.processing_tasks.add(cleanup_task)
         cleanup_task.add_done_callback(self.processing_tasks.discard)
         
+        # Start re-request task for incomplete chunked messages
+        reassembly_task = asyncio.create_task(self._reassembly_task())
+        self.processing_tasks.add(reassembly_task)
+        reassembly_task.add_done_callback(self.processing_tasks.discard)
+        
         self.logger.info("Message router started successfully")
     
     async def stop(self):
         """Stop the message router"""
         self.logger.info("Stopping core message router")
         
-        # Cancel all processing tasks
-        for task in self.processing_tasks:
+        # Cancel all processing tasks and rate-limited sends still waiting for tokens
+        tasks = [*self.processing_tasks, *self._dispatch_tasks, *self._delayed_sends]
+        for task in tasks:
             task.cancel()
         
         # Wait for tasks to complete
-        if self.processing_tasks:
-            await asyncio.gather(*self.processing_tasks, return_exceptions=True)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Cancel pending per-service retries
+        await self.dispatcher.stop()
+        
+        # Flush pending writes and stop the database writer
+        if self.db_writer:
+            await self.db_writer.stop()
         
         self.logger.info("Message router stopped")
     
     def register_service(self, name: str, service_instance: Any):
         """Register a service module"""
         self.services[name] = service_instance
+        self.dispatcher.register(name, service_instance)
         self.logger.info(f"Registered service: {name}")
     
     def unregister_service(self, name: str):
         """Unregister a service module"""
         if name in self.services:
             del self.services[name]
+            self.dispatcher.unregister(name)
             self.logger.info(f"Unregistered service: {name}")
     
     def register_plugin_command(self, plugin_name: str, command: str, handler: Callable,
@@ -415,10 +538,37 @@ class CoreMessageRouter:
             self.stats['interfaces_active'] = len(self.interfaces)
             self.logger.info(f"Unregistered interface: {interface_id}")
     
+    def _stage(self, name: str):
+        """Time a routing stage for the stage metric and the message's trace"""
+        return self.tracer.span(name, self._stage_latency[name])
+    
     async def process_message(self, message: Message, interface_id: str):
         """Process incoming message from Meshtastic interface"""
+        trace = self.tracer.trace_of(message)
+        if trace is not None:
+            # Started by the interface; account for the hand-off to the event loop
+            self.tracer.record_span('receive', time.perf_counter() - trace.start, trace=trace)
+        else:
+            trace = self.tracer.start_trace(message, interface=interface_id)
+        with self.tracer.activate(trace):
+            await self._process_incoming(message, interface_id)
+    
+    async def _process_incoming(self, message: Message, interface_id: str):
         message.interface_id = interface_id
         self.stats['messages_received'] += 1
+        self._message_counts['received'].inc()
+        
+        # Drop copies of a packet already heard (rebroadcasts, other interfaces)
+        if self.dedup.is_duplicate(message):
+            self.stats['messages_duplicate'] += 1
+            self._message_counts['duplicate'].inc()
+            return
+        
+        # Collect chunked messages; only complete messages are routed
+        with self._stage('reassemble'):
+            message = await self._reassemble(message)
+        if message is None:
+            return
         
         # Add to recent messages for debugging
         self.recent_messages.append({
@@ -429,7 +579,8 @@ class CoreMessageRouter:
         
         # Store message in database
         try:
-            await self._store_message_history(message)
+            with self._stage('store_history'):
+                await self._store_message_history(message)
         except Exception as e:
             self.logger.error(f"Failed to store message history: {e}")
         
@@ -437,6 +588,8 @@ class CoreMessageRouter:
         queued_msg = QueuedMessage(message=message)
         await self.message_queue.put(queued_msg)
         self.stats['messages_queued'] += 1
+        self._message_counts['queued'].inc()
+        self._queue_depth.set(self.message_queue.qsize())
         
         self.logger.debug(f"Queued message from {message.sender_id}: {message.content[:50]}...")
     
@@ -444,28 +597,49 @@ class CoreMessageRouter:
         """Send message through specified interface with rate limiting"""
         self.logger.debug(f"send_message called with interface_id={interface_id}, available interfaces={list(self.interfaces.keys())}")
         
-        # Apply rate limiting - properly consume tokens
-        sender_key = f"sender_{message.sender_id}"
-        if sender_key not in self.rate_limiters:
-            self.rate_limiters[sender_key] = RateLimitBucket(
-                tokens=5.0,
-                last_refill=datetime.utcnow(),
-                max_tokens=5.0,
-                refill_rate=0.2  # 1 message per 5 seconds per sender
-            )
-        
-        if not self.rate_limiters[sender_key].consume():
-            self.logger.warning(f"Rate limit exceeded for sender {message.sender_id}")
-            return False
-        
-        if not self.global_rate_limit.consume():
-            self.logger.warning("Global rate limit exceeded")
+        # Replies to a traced message share its trace
+        self.tracer.attach(message)
+        
+        # Apply rate limiting. Callers (including the routing task) never wait for
+        # tokens here: a limited message is dropped, or in delay mode handed to a
+        # background task that sends it once tokens are available.
+        tier = 'emergency' if message.priority == MessagePriority.EMERGENCY else None
+        if not self.rate_limiter.try_acquire(sender=message.sender_id, channel=message.channel, tier=tier):
+            if self.rate_limit_mode == 'delay' and len(self._delayed_sends) < self.rate_limit_max_delayed:
+                task = asyncio.create_task(self._send_delayed(message, interface_id, tier))
+                self._delayed_sends.add(task)
+                task.add_done_callback(self._delayed_sends.discard)
+                self.logger.debug(f"Rate limit reached for sender {message.sender_id}, message delayed")
+                return True
+            self.logger.warning(f"Rate limit exceeded for sender {message.sender_id}, message dropped")
             return False
         
+        return await self._deliver(message, interface_id)
+    
+    async def _send_delayed(self, message: Message, interface_id: Optional[str], tier: Optional[str]):
+        """Wait up to the configured delay for rate limit tokens, then send"""
+        with self.tracer.span('rate_limit'):
+            allowed = await self.rate_limiter.acquire(
+                sender=message.sender_id, channel=message.channel, tier=tier,
+                max_wait=self.rate_limit_max_delay
+            )
+        if not allowed:
+            self.logger.warning(f"Rate limit exceeded for sender {message.sender_id}, delayed message dropped")
+            return
+        try:
+            await self._deliver(message, interface_id)
+        except Exception as e:
+            self.logger.error(f"Failed to send delayed message: {e}")
+    
+    async def _deliver(self, message: Message, interface_id: Optional[str] = None) -> bool:
+        """Chunk and send a message that has passed rate limiting"""
         # Chunk message if too large
         chunks = self._chunk_message(message)
         self.logger.debug(f"Message chunked into {len(chunks)} chunk(s)")
         
+        if interface_id is None and self.outbound.balanced:
+            return await self._send_balanced(message, chunks)
+        
         # Send through interface(s)
         success = False
         interfaces_to_use = [interface_id] if interface_id else list(self.interfaces.keys())
@@ -479,13 +653,15 @@ class CoreMessageRouter:
             interface = self.interfaces[iface_id]
             
             try:
-                for i, chunk in enumerate(chunks):
-                    await self._send_through_interface(chunk, interface)
+                for chunk in chunks:
+                    # Wait for an airtime slot: immediate on an idle channel, spaced by
+                    # time-on-air and channel utilization, within the duty-cycle budget
+                    with self.tracer.span('airtime_wait'):
+                        await get_airtime_scheduler().acquire(iface_id, len(chunk.content.encode('utf-8')))
+                    with self._stage('send'):
+                        await self._send_through_interface(chunk, interface)
                     self.stats['messages_sent'] += 1
-                    
-                    # Add delay between chunks to avoid Meshtastic rate limiting
-                    if i < len(chunks) - 1:  # Don't delay after the last chunk
-                        await asyncio.sleep(2)  # 2 second delay between chunks
+                    self._message_counts['sent'].inc()
                 
                 success = True
                 self.logger.debug(f"Sent message to {message.recipient_id or 'broadcast'} via {iface_id}")
@@ -493,12 +669,48 @@ class CoreMessageRouter:
             except Exception as e:
                 self.logger.error(f"Failed to send message via {iface_id}: {e}")
                 self.stats['messages_failed'] += 1
+                self._message_counts['failed'].inc()
         
         if not success:
             self.logger.error(f"Failed to send message - no valid interfaces found")
         
         return success
     
+    async def _send_balanced(self, message: Message, chunks: List[Message]) -> bool:
+        """Send all chunks on one interface chosen by the outbound policy, failing over on errors"""
+        remaining = list(chunks)
+        candidates = self.outbound.candidates(message, self.interfaces)
+        
+        for attempt, iface_id in enumerate(candidates):
+            interface = self.interfaces[iface_id]
+            try:
+                while remaining:
+                    chunk = remaining[0]
+                    with self.tracer.span('airtime_wait'):
+                        await get_airtime_scheduler().acquire(iface_id, len(chunk.content.encode('utf-8')))
+                    with self._stage('send'):
+                        sent = await self._send_through_interface(chunk, interface)
+                    if not sent:
+                        break
+                    remaining.pop(0)
+                    self.stats['messages_sent'] += 1
+                    self._message_counts['sent'].inc()
+            except Exception as e:
+                self.logger.error(f"Failed to send message via {iface_id}: {e}")
+            
+            if not remaining:
+                self.outbound.record_selection(iface_id, failovers=attempt)
+                self.logger.debug(f"Sent message to {message.recipient_id or 'broadcast'} via {iface_id}")
+                return True
+            
+            self.outbound.record_failure(interface)
+            self.logger.warning(f"Send via {iface_id} failed, {len(remaining)} chunk(s) left; trying next interface")
+        
+        self.stats['messages_failed'] += 1
+        self._message_counts['failed'].inc()
+        self.logger.error("Failed to send message - no interface accepted it")
+        return False
+    
     async def _process_message_queue(self):
         """Process messages from the queue"""
         while True:
@@ -512,8 +724,14 @@ class CoreMessageRouter:
                 except asyncio.TimeoutError:
                     continue
                 
+                self._queue_depth.set(self.message_queue.qsize())
+                queue_wait = (datetime.utcnow() - queued_msg.created_at).total_seconds()
+                self._stage_latency['queue_wait'].observe(queue_wait)
+                
                 # Process the message
-                await self._route_message(queued_msg)
+                with self.tracer.activate(self.tracer.trace_of(queued_msg.message)):
+                    self.tracer.record_span('queue_wait', queue_wait)
+                    await self._route_message(queued_msg)
                 
             except Exception as e:
                 self.logger.error(f"Error processing message queue: {e}")
@@ -525,16 +743,18 @@ class CoreMessageRouter:
         
         try:
             # Get user profile
-            user = await self._get_user_profile(message.sender_id)
-            
-            # Update user's last seen
-            if user:
-                user.last_seen = datetime.utcnow()
-                await self._update_user_profile(user)
+            with self._stage('user_lookup'):
+                user = await self._get_user_profile(message.sender_id)
+                
+                # Update user's last seen
+                if user:
+                    user.last_seen = datetime.utcnow()
+                    await self._update_user_profile(user)
             
             # Try plugin command routing first (highest priority)
             if message.message_type == MessageType.TEXT:
-                command_response = await self.command_handler.route_command(message, user)
+                with self._stage('command'):
+                    command_response = await self.command_handler.route_command(message, user)
                 if command_response:
                     self.logger.debug(f"Got command response: {command_response[:100]}")
                     
@@ -557,19 +777,13 @@ class CoreMessageRouter:
                     return
             
             # Classify message to determine target services
-            target_services = self.classifier.classify_message(message, user)
-            
-            # Apply routing rules with priority ordering
-            matched_rules = []
-            for rule in self.route_rules:
-                if rule.matches(message, user):
-                    matched_rules.append(rule)
-            
-            # Sort by priority and add services
-            matched_rules.sort(key=lambda r: r.priority, reverse=True)
-            for rule in matched_rules:
-                if rule.service not in target_services:
-                    target_services.append(rule.service)
+            with self._stage('classify'):
+                target_services = self.classifier.classify_message(message, user)
+                
+                # Apply routing rules with priority ordering
+                for rule in self._match_route_rules(message, user):
+                    if rule.service not in target_services:
+                        target_services.append(rule.service)
             
             # Create routing context
             routing_context = {
@@ -581,62 +795,42 @@ class CoreMessageRouter:
                 'retry_count': queued_msg.retry_count
             }
             
-            # Route to services with enhanced error handling
-            successful_routes = []
-            failed_routes = []
+            # Hand delivery to the services off the processing worker; each service
+            # has its own bulkhead, timeout and retries
+            task = asyncio.create_task(self._dispatch_to_services(message, user, routing_context, target_services))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
             
+        except Exception as e:
+            self.logger.error(f"Error routing message: {e}")
+            self.stats['messages_failed'] += 1
+            self._message_counts['failed'].inc()
+    
+    async def _dispatch_to_services(self, message: Message, user: Optional[UserProfile],
+                                    routing_context: Dict[str, Any], target_services: List[str]):
+        """Deliver a classified message to its services concurrently and record the outcome"""
+        successful_routes = []
+        failed_routes = []
+        targets = []
+        
+        try:
             for service_name in target_services:
                 if service_name in self.services:
-                    try:
-                        service = self.services[service_name]
-                        
-                        # Call service with enhanced context
-                        self.logger.debug(f"Calling {service_name}.handle_message() for message: {message.content}")
-                        
-                        if hasattr(service, 'handle_message_with_context'):
-                            result = await service.handle_message_with_context(message, routing_context)
-                        elif hasattr(service, 'handle_message'):
-                            # Try calling with just message first (most common for plugins)
-                            try:
-                                result = await service.handle_message(message)
-                                self.logger.debug(f"{service_name}.handle_message() returned: {result}")
-                            except TypeError as e:
-                                # If that fails, try with (message, user)
-                                if 'positional argument' in str(e) or 'takes' in str(e):
-                                    result = await service.handle_message(message, user)
-                                    self.logger.debug(f"{service_name}.handle_message(message, user) returned: {result}")
-                                else:
-                                    raise
-                        else:
-                            # Fallback for services without proper interface
-                            self.logger.warning(f"Service {service_name} lacks proper message handling interface")
-                            continue
-                        
-                        successful_routes.append(service_name)
-                        self.stats['services_called'][service_name] += 1
-                        
-                        # Handle service responses
-                        if result:
-                            if isinstance(result, dict):
-                                await self._handle_service_response(service_name, result, message)
-                            elif hasattr(result, 'content'):  # Message object
-                                # Send the response message
-                                await self.send_message(result, message.interface_id)
-                                self.logger.debug(f"Sent response from {service_name}: {result.content[:50]}...")
-                        
-                    except Exception as e:
-                        self.logger.error(f"Service {service_name} failed to handle message: {e}")
-                        failed_routes.append((service_name, str(e)))
-                        
-                        # Retry logic for failed messages
-                        if queued_msg.should_retry():
-                            queued_msg.schedule_retry(delay_seconds=30)
-                            await self.message_queue.put(queued_msg)
-                            self.logger.info(f"Scheduled retry for message to {service_name}")
+                    targets.append((service_name, self.services[service_name]))
                 else:
                     self.logger.warning(f"Service {service_name} not registered")
                     failed_routes.append((service_name, "Service not registered"))
             
+            with self._stage('dispatch'):
+                outcomes = await self.dispatcher.dispatch(
+                    message, user, routing_context, targets, self._handle_service_result
+                )
+            for outcome in outcomes:
+                if outcome.success:
+                    successful_routes.append(outcome.service)
+                elif not outcome.skipped:
+                    failed_routes.append((outcome.service, outcome.error))
+            
             # Log routing results
             if successful_routes:
                 self.logger.debug(f"Message routed successfully to: {successful_routes}")
@@ -645,137 +839,108 @@ class CoreMessageRouter:
                 self.logger.warning(f"Message routing failures: {failed_routes}")
             
             # Store routing information for debugging
-            await self._store_routing_info(message, target_services, successful_routes, failed_routes)
+            with self._stage('routing_info'):
+                await self._store_routing_info(message, target_services, successful_routes, failed_routes)
             
         except Exception as e:
-            self.logger.error(f"Error routing message: {e}")
+            self.logger.error(f"Error dispatching message: {e}")
             self.stats['messages_failed'] += 1
+            self._message_counts['failed'].inc()
     
-    def _check_rate_limit(self, key: str) -> bool:
-        """Check rate limit for a specific key"""
-        if key not in self.rate_limiters:
-            self.rate_limiters[key] = RateLimitBucket(
-                tokens=5.0,
-                last_refill=datetime.utcnow(),
-                max_tokens=5.0,
-                refill_rate=0.2  # 1 message per 5 seconds per sender
-            )
-        
-        return self.rate_limiters[key].can_consume()
+    async def _handle_service_result(self, service_name: str, result: Any, message: Message):
+        """Record a successful service call and deliver its response"""
+        self.stats['services_called'][service_name] += 1
+        
+        if result:
+            if isinstance(result, dict):
+                await self._handle_service_response(service_name, result, message)
+            elif hasattr(result, 'content'):  # Message object
+                # Send the response message
+                await self.send_message(result, message.interface_id)
+                self.logger.debug(f"Sent response from {service_name}: {result.content[:50]}...")
+    
+    def _check_rate_limit(self, sender_id: str, channel: Optional[int] = None) -> bool:
+        """Check whether a message from a sender would currently be allowed"""
+        return self.rate_limiter.can_send(sender=sender_id, channel=channel)
     
     def _chunk_message(self, message: Message) -> List[Message]:
-        """Chunk large messages into smaller pieces with proper UTF-8 handling"""
-        content = message.content
-        
-        # Use actual Meshtastic limit (233 bytes for DATA_PAYLOAD_LEN)
-        # Leave some safety margin for encoding overhead
-        actual_max_size = 230
-        
-        # Calculate header size dynamically
-        # Format: "[X/Y:chunk_id] " where chunk_id is 8 chars
-        chunk_id = str(uuid.uuid4())[:8]
-        
-        # First pass: estimate total chunks to calculate actual header size
-        # Worst case: "[999/999:12345678] " = 21 bytes
-        max_header_size = len(f"[999/999:{chunk_id}] ".encode('utf-8'))
-        estimated_chunk_size = actual_max_size - max_header_size
-        
-        # Convert content to bytes for accurate size calculation
-        content_bytes = content.encode('utf-8')
-        estimated_total_chunks = (len(content_bytes) + estimated_chunk_size - 1) // estimated_chunk_size
-        
-        # Calculate actual header size based on estimated chunks
-        actual_header_size = len(f"[{estimated_total_chunks}/{estimated_total_chunks}:{chunk_id}] ".encode('utf-8'))
-        max_chunk_content_size = actual_max_size - actual_header_size
-        
-        # Recalculate total chunks with actual header size
-        total_chunks = (len(content_bytes) + max_chunk_content_size - 1) // max_chunk_content_size
+        """Split a large message into compactly framed chunks"""
+        chunks = self.framer.frame_message(message)
+        if len(chunks) > 1:
+            self.logger.info(f"Chunked message into {len(chunks)} parts")
+        return chunks
+    
+    async def _reassemble(self, message: Message) -> Optional[Message]:
+        """
+        Handle chunk framing on an incoming message.
         
-        # If message fits in one chunk, don't add chunking overhead
-        if total_chunks == 1 and len(content_bytes) <= actual_max_size:
-            return [message]
+        Returns the message to route: unchanged if it is not framed, with the
+        full content once the last missing part arrives, or None while parts
+        are still outstanding. Re-requests for parts we sent are answered here.
+        """
+        try:
+            frame = parse_frame(message.content)
+        except FrameCorrupted as e:
+            self.reassembly.record_corrupted()
+            self.logger.warning(f"Dropped chunk from {message.sender_id}: {e}")
+            return None
         
-        # Recalculate header size with final chunk count
-        actual_header_size = len(f"[{total_chunks}/{total_chunks}:{chunk_id}] ".encode('utf-8'))
-        max_chunk_content_size = actual_max_size - actual_header_size
+        if frame is None:
+            rerequest = parse_rerequest(message.content)
+            if rerequest is None:
+                return message
+            await self._resend_chunks(rerequest, message)
+            return None
         
-        chunks = []
-        byte_offset = 0
+        content = self.reassembly.add(message.sender_id, frame, message.interface_id, message.channel)
+        if content is None:
+            return None
         
-        for i in range(total_chunks):
-            # Extract chunk content by bytes, but respect UTF-8 character boundaries
-            chunk_end = min(byte_offset + max_chunk_content_size, len(content_bytes))
-            chunk_bytes = content_bytes[byte_offset:chunk_end]
-            
-            # Decode and handle potential UTF-8 boundary issues
-            try:
-                chunk_content = chunk_bytes.decode('utf-8')
-            except UnicodeDecodeError:
-                # We cut in the middle of a multi-byte character, back up
-                while chunk_end > byte_offset:
-                    chunk_end -= 1
-                    chunk_bytes = content_bytes[byte_offset:chunk_end]
-                    try:
-                        chunk_content = chunk_bytes.decode('utf-8')
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    # Couldn't decode, skip this problematic section
-                    self.logger.error(f"Failed to decode chunk {i+1}, skipping")
-                    byte_offset = chunk_end
-                    continue
-            
-            # Create chunk header
-            header = f"[{i+1}/{total_chunks}:{chunk_id}] "
-            full_content = f"{header}{chunk_content}"
-            
-            # Final safety check: ensure chunk doesn't exceed limit
-            full_content_bytes = full_content.encode('utf-8')
-            if len(full_content_bytes) > actual_max_size:
-                self.logger.warning(f"Chunk {i+1} size {len(full_content_bytes)} exceeds limit {actual_max_size}, truncating")
-                # Truncate content to fit (accounting for UTF-8 boundaries)
-                header_bytes = header.encode('utf-8')
-                available_size = actual_max_size - len(header_bytes)
-                
-                # Binary search for the right truncation point
-                left, right = 0, len(chunk_content)
-                while left < right:
-                    mid = (left + right + 1) // 2
-                    test_content = chunk_content[:mid]
-                    if len(test_content.encode('utf-8')) <= available_size:
-                        left = mid
-                    else:
-                        right = mid - 1
-                
-                chunk_content = chunk_content[:left]
-                full_content = f"{header}{chunk_content}"
-                full_content_bytes = full_content.encode('utf-8')
-            
-            # Create chunk message
-            chunk_msg = Message(
-                id=f"{message.id}_chunk_{i}",
-                sender_id=message.sender_id,
-                recipient_id=message.recipient_id,
-                channel=message.channel,
-                content=full_content,
-                message_type=message.message_type,
-                priority=message.priority,
-                metadata={
-                    **message.metadata,
-                    'is_chunk': True,
-                    'chunk_id': chunk_id,
-                    'chunk_index': i,
-                    'total_chunks': total_chunks
-                }
+        message.content = content
+        message.metadata['reassembled_from_chunks'] = True
+        message.metadata['total_chunks'] = frame.total
+        return message
+    
+    async def _resend_chunks(self, rerequest: RerequestFrame, request: Message):
+        """Resend only the parts a receiver reported missing"""
+        frames = self.framer.get_frames(rerequest.seq_id, rerequest.indices, request.sender_id)
+        if not frames:
+            self.logger.debug(f"No stored parts to resend for {rerequest.encode()} from {request.sender_id}")
+            return
+        
+        self.logger.info(f"Resending {len(frames)} part(s) to {request.sender_id}")
+        for frame in frames:
+            await self.send_message(Message(
+                sender_id=request.recipient_id or '',
+                recipient_id=request.sender_id,
+                channel=request.channel,
+                content=frame.encode(),
+                metadata={'is_chunk': True, 'retransmission': True}
+            ), request.interface_id or None)
+    
+    async def _send_rerequests(self):
+        """Ask senders for parts that have not arrived"""
+        for partial, rerequest in self.reassembly.due_rerequests():
+            self.logger.info(
+                f"Requesting {len(rerequest.indices)} missing part(s) from {partial.sender_id}"
             )
-            
-            chunks.append(chunk_msg)
-            byte_offset = chunk_end
-            self.logger.debug(f"Created chunk {i+1}/{total_chunks}: {len(full_content_bytes)} bytes")
-        
-        self.logger.info(f"Chunked message into {len(chunks)} parts (max {max_chunk_content_size} bytes per chunk)")
-        return chunks
+            await self.send_message(Message(
+                recipient_id=partial.sender_id,
+                channel=partial.channel or 0,
+                content=rerequest.encode()
+            ), partial.interface_id)
+    
+    async def _reassembly_task(self):
+        """Periodically re-request missing parts and drop stale partial messages"""
+        interval = max(1.0, self.reassembly.rerequest_after / 2)
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                await self._send_rerequests()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error in reassembly task: {e}")
     
     async def _send_through_interface(self, message: Message, interface: Any):
         """Send message through a specific interface"""
@@ -797,18 +962,25 @@ class CoreMessageRouter:
             self.logger.error(f"Error sending through interface: {e}", exc_info=True)
             return False
     
+    async def _write(self, query: str, params: Tuple = ()):
+        """Queue a write on the database writer, or execute it directly if unavailable"""
+        if self.db_writer and self.db_writer.running:
+            await self.db_writer.submit(query, params)
+        else:
+            self.db.execute_update(query, params)
+    
     async def _store_message_history(self, message: Message):
         """Store message in database history"""
         try:
             # Ensure sender exists in users table (to satisfy foreign key)
             if message.sender_id:
-                self._ensure_user_exists(message.sender_id)
+                await self._ensure_user_exists(message.sender_id)
             
             # Ensure recipient exists if specified
             if message.recipient_id:
-                self._ensure_user_exists(message.recipient_id)
+                await self._ensure_user_exists(message.recipient_id)
             
-            self.db.execute_update(
+            await self._write(
                 """
                 INSERT INTO message_history 
                 (message_id, sender_id, recipient_id, channel, content, timestamp, 
@@ -828,32 +1000,28 @@ class CoreMessageRouter:
                     message.rssi
                 )
             )
+            
+            if message.sender_id:
+                get_stats_rollup().record_message(message.sender_id, message.timestamp)
         except Exception as e:
             self.logger.error(f"Failed to store message history: {e}")
     
-    def _ensure_user_exists(self, node_id: str, short_name: str = None):
+    async def _ensure_user_exists(self, node_id: str, short_name: str = None):
         """Ensure user exists in database, create if not"""
         try:
-            # Check if user exists
-            existing = self.db.get_user(node_id)
-            if not existing:
-                # Create minimal user record
-                user_data = {
-                    'node_id': node_id,
-                    'short_name': short_name or node_id[-4:],  # Use last 4 chars of node_id as default
-                    'long_name': None,
-                    'email': None,
-                    'phone': None,
-                    'address': None,
-                    'tags': '[]',
-                    'permissions': '{}',
-                    'subscriptions': '{}',
-                    'last_seen': datetime.utcnow().isoformat(),
-                    'location_lat': None,
-                    'location_lon': None
-                }
-                self.db.upsert_user(user_data)
-                self.logger.debug(f"Created user record for {node_id}")
+            # Create a minimal user record; existing records are left untouched
+            await self._write(
+                """
+                INSERT INTO users (node_id, short_name, tags, permissions, subscriptions, last_seen)
+                VALUES (?, ?, '[]', '{}', '{}', ?)
+                ON CONFLICT(node_id) DO NOTHING
+                """,
+                (
+                    node_id,
+                    short_name or node_id[-4:],  # Use last 4 chars of node_id as default
+                    datetime.utcnow().isoformat()
+                )
+            )
         except Exception as e:
             self.logger.warning(f"Failed to ensure user exists for {node_id}: {e}")
     
@@ -898,7 +1066,8 @@ class CoreMessageRouter:
                 'location_lon': user.location[1] if user.location else None
             }
             
-            self.db.upsert_user(user_data)
+            query, params = self.db.build_user_upsert(user_data)
+            await self._write(query, params)
             
         except Exception as e:
             self.logger.error(f"Failed to update user profile for {user.node_id}: {e}")
@@ -909,18 +1078,10 @@ class CoreMessageRouter:
             try:
                 await asyncio.sleep(300)  # Run every 5 minutes
                 
-                # Clean up old rate limiters
-                cutoff_time = datetime.utcnow() - timedelta(hours=1)
-                expired_keys = [
-                    key for key, bucket in self.rate_limiters.items()
-                    if bucket.last_refill < cutoff_time
-                ]
-                
-                for key in expired_keys:
-                    del self.rate_limiters[key]
-                
-                if expired_keys:
-                    self.logger.debug(f"Cleaned up {len(expired_keys)} expired rate limiters")
+                # Drop idle rate limiter state (also expired lazily on access)
+                expired = self.rate_limiter.sweep()
+                if expired:
+                    self.logger.debug(f"Cleaned up {expired} idle rate limiters")
                 
                 # Clean up database (with error handling)
                 try:
@@ -941,10 +1102,18 @@ class CoreMessageRouter:
             **self.stats,
             'uptime_seconds': uptime.total_seconds(),
             'queue_size': self.message_queue.qsize(),
-            'active_rate_limiters': len(self.rate_limiters),
+            'active_rate_limiters': len(self.rate_limiter.senders),
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'delayed_sends': len(self._delayed_sends),
             'registered_services': list(self.services.keys()),
             'registered_interfaces': list(self.interfaces.keys()),
-            'recent_messages_count': len(self.recent_messages)
+            'recent_messages_count': len(self.recent_messages),
+            'db_writer': self.db_writer.get_stats() if self.db_writer else None,
+            'dispatch': self.dispatcher.get_stats(),
+            'airtime': get_airtime_scheduler().get_stats(),
+            'reassembly': self.reassembly.get_stats(),
+            'dedup': self.dedup.get_stats(),
+            'outbound': self.outbound.get_stats()
         }
     
     def get_recent_messages(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -1034,7 +1203,7 @@ class CoreMessageRouter:
             }
             
             # Store in database
-            self.db.execute_update(
+            await self._write(
                 """
                 INSERT INTO message_routing_log 
                 (message_id, sender_id, target_services, successful_routes, failed_routes, timestamp)
@@ -1086,6 +1255,7 @@ class CoreMessageRouter:
         """Add a new routing rule"""
         self.route_rules.append(rule)
         self.route_rules.sort(key=lambda r: r.priority, reverse=True)
+        self._compile_route_rules()
         self.logger.info(f"Added routing rule for service {rule.service} with priority {rule.priority}")
     
     def remove_route_rule(self, pattern: str, service: str):
@@ -1094,6 +1264,7 @@ class CoreMessageRouter:
             rule for rule in self.route_rules 
             if not (rule.pattern == pattern and rule.service == service)
         ]
+        self._compile_route_rules()
         self.logger.info(f"Removed routing rule for service {service}")
     
     async def get_service_status(self) -> Dict[str, Any]:
@@ -0,0 +1,464 @@
+"""
+Metrics Registry for ZephyrGate
+
+Counters, gauges and latency histograms with a Prometheus/OpenMetrics text
+exporter. Histograms use fixed-memory log-linear buckets (HDR style): each
+power of two is split into ``2 ** (precision_bits - 1)`` sub-buckets, so a
+recorded value lands in a bucket in O(1) and percentiles are read from the
+bucket counts with a relative error below ``2 ** -precision_bits``. No raw
+samples are kept.
+
+Components get their metrics from the global registry:
+
+    registry = get_metrics_registry()
+    stage = registry.histogram('router_stage_seconds', 'Routing stage latency', ['stage'])
+    with stage.labels(stage='dispatch').time():
+        ...
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logging import get_logger
+
+
+CONTENT_TYPE_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+CONTENT_TYPE_OPENMETRICS = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+OVERFLOW_LABEL = 'other'
+
+
+class LogHistogram:
+    """
+    Fixed-memory log-linear histogram.
+
+    Values from ``lowest`` to ``highest`` are tracked with a relative error
+    below ``2 ** -precision_bits``; larger values are counted in the last
+    bucket. Recording is O(1) and memory is fixed at construction.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600.0, precision_bits: int = 6):
+        if lowest <= 0 or highest <= lowest:
+            raise ValueError("Histogram range must satisfy 0 < lowest < highest")
+        if not 1 <= precision_bits <= 16:
+            raise ValueError("precision_bits must be between 1 and 16")
+
+        self.lowest = lowest
+        self.highest = highest
+        self.precision_bits = precision_bits
+        self._sub_count = 1 << precision_bits
+        self._half = self._sub_count >> 1
+        self._size = self._index(int(highest / lowest)) + 1
+        self.counts = array('Q', bytes(8 * self._size))
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, units: int) -> int:
+        shift = units.bit_length() - self.precision_bits
+        if shift <= 0:
+            return units
+        return self._sub_count + (shift - 1) * self._half + ((units >> shift) - self._half)
+
+    def _bucket_bounds(self, index: int) -> Tuple[float, float]:
+        """Lower and upper value of a bucket"""
+        if index < self._sub_count:
+            low, high = index, index + 1
+        else:
+            offset = index - self._sub_count
+            shift = offset // self._half + 1
+            mantissa = offset % self._half + self._half
+            low, high = mantissa << shift, (mantissa + 1) << shift
+        return low * self.lowest, high * self.lowest
+
+    def record(self, value: float):
+        """Record one value"""
+        units = int(value / self.lowest) if value > 0 else 0
+        index = self._index(units) if units < (1 << 62) else self._size - 1
+        self.counts[min(index, self._size - 1)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> float:
+        """Value at the given percentile (0-100); 0.0 if empty"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            if seen >= target:
+                if index == self._size - 1:
+                    return self.max  # overflow bucket
+                low, high = self._bucket_bounds(index)
+                return min(max((low + high) / 2, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def reset(self):
+        for index in range(self._size):
+            self.counts[index] = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def get_stats(self) -> Dict[str, float]:
+        """Summary statistics read from the bucket counts"""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'avg': self.mean,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99)
+        }
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.counts.itemsize * len(self.counts)
+
+
+# Metric series (one label combination)
+
+class CounterSeries:
+    """Monotonically increasing value"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class GaugeSeries:
+    """Value that can go up and down"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _Timer:
+    """Context manager recording elapsed time into a histogram series"""
+
+    __slots__ = ('series', 'start')
+
+    def __init__(self, series: 'HistogramSeries'):
+        self.series = series
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.start)
+        return False
+
+
+class HistogramSeries:
+    """Latency distribution backed by a ``LogHistogram``"""
+
+    def __init__(self, lowest: float, highest: float, precision_bits: int):
+        self.histogram = LogHistogram(lowest, highest, precision_bits)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.histogram.record(value)
+
+    def time(self) -> _Timer:
+        """Time a block: ``with series.time(): ...``"""
+        return _Timer(self)
+
+    def percentile(self, percent: float) -> float:
+        return self.histogram.percentile(percent)
+
+
+# Metric families
+
+class MetricFamily:
+    """A named metric with a fixed set of label names"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = 1000):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self.series: Dict[Tuple[str, ...], Any] = {}
+        self.overflowed = 0
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self.series[()] = self._new_series()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any, **labels: Any):
+        """Get the series for a label combination, creating it if needed"""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        series = self.series.get(key)
+        if series is not None:
+            return series
+
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                if len(self.series) >= self.max_series:
+                    # Bound memory: fold new label combinations into one series
+                    self.overflowed += 1
+                    key = (OVERFLOW_LABEL,) * len(self.labelnames)
+                    series = self.series.get(key)
+                if series is None:
+                    series = self._new_series()
+                    self.series[key] = series
+        return series
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels; use labels() first")
+        return self.series[()]
+
+
+class Counter(MetricFamily):
+    kind = 'counter'
+
+    def _new_series(self):
+        return CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class Gauge(MetricFamily):
+    kind = 'gauge'
+
+    def _new_series(self):
+        return GaugeSeries()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+
+class Histogram(MetricFamily):
+    """Latency histogram, exported as a summary with quantiles, sum and count"""
+
+    kind = 'summary'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = 1000, lowest: float = 1e-6, highest: float = 3600.0,
+                 precision_bits: int = 6):
+        self.lowest = lowest
+        self.highest = highest
+        self.precision_bits = precision_bits
+        super().__init__(name, documentation, labelnames, max_series)
+
+    def _new_series(self):
+        return HistogramSeries(self.lowest, self.highest, self.precision_bits)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Collection of metric families with text exposition"""
+
+    def __init__(self, namespace: str = 'zephyrgate', max_series: int = 1000,
+                 histogram_lowest: float = 1e-6, histogram_highest: float = 3600.0,
+                 histogram_precision_bits: int = 6):
+        self.namespace = namespace
+        self.max_series = max_series
+        self.histogram_lowest = histogram_lowest
+        self.histogram_highest = histogram_highest
+        self.histogram_precision_bits = histogram_precision_bits
+        self.families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+        self.logger = get_logger('metrics')
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        full_name = self._full_name(name)
+        family = self.families.get(full_name)
+        if family is None:
+            with self._lock:
+                family = self.families.get(full_name)
+                if family is None:
+                    family = cls(full_name, documentation, labelnames, max_series=self.max_series, **kwargs)
+                    self.families[full_name] = family
+        if not isinstance(family, cls) or family.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {full_name} already registered with a different type or labels")
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter; by convention its name ends in ``_total``"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  lowest: Optional[float] = None, highest: Optional[float] = None) -> Histogram:
+        """Get or create a latency histogram (values in seconds by default)"""
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames,
+            lowest=lowest or self.histogram_lowest,
+            highest=highest or self.histogram_highest,
+            precision_bits=self.histogram_precision_bits
+        )
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Render all metrics in Prometheus text format (or OpenMetrics)"""
+        lines: List[str] = []
+        for family in sorted(self.families.values(), key=lambda f: f.name):
+            name = family.name
+            if openmetrics and family.kind == 'counter' and name.endswith('_total'):
+                name = name[:-len('_total')]
+            lines.append(f"# HELP {name} {_escape(family.documentation)}")
+            lines.append(f"# TYPE {name} {family.kind}")
+
+            for key, series in sorted(family.series.items()):
+                if isinstance(series, HistogramSeries):
+                    lines.extend(self._render_histogram(family, key, series))
+                else:
+                    labels = _format_labels(family.labelnames, key)
+                    lines.append(f"{family.name}{labels} {_format_value(series.value)}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, family: MetricFamily, key: Tuple[str, ...],
+                          series: HistogramSeries) -> List[str]:
+        with series._lock:
+            histogram = series.histogram
+            quantiles = [(q, histogram.percentile(q * 100)) for q in SUMMARY_QUANTILES]
+            total, count = histogram.sum, histogram.count
+
+        names = family.labelnames + ('quantile',)
+        lines = [
+            f"{family.name}{_format_labels(names, key + (str(q),))} {_format_value(value)}"
+            for q, value in quantiles
+        ]
+        labels = _format_labels(family.labelnames, key)
+        lines.append(f"{family.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{family.name}_count{labels} {count}")
+        return lines
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics"""
+        histogram_bytes = sum(
+            series.histogram.memory_bytes
+            for family in self.families.values() if isinstance(family, Histogram)
+            for series in family.series.values()
+        )
+        return {
+            'families': len(self.families),
+            'series': sum(len(f.series) for f in self.families.values()),
+            'overflowed_series': sum(f.overflowed for f in self.families.values()),
+            'histogram_memory_bytes': histogram_bytes
+        }
+
+
+def create_metrics_registry(config: Optional[Dict[str, Any]] = None) -> MetricsRegistry:
+    """Build a metrics registry from the ``metrics`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    histogram = config.get('histogram', {})
+    if not isinstance(histogram, dict):
+        histogram = {}
+    return MetricsRegistry(
+        namespace=config.get('namespace', 'zephyrgate'),
+        max_series=int(config.get('max_series', 1000)),
+        histogram_lowest=float(histogram.get('lowest', 1e-6)),
+        histogram_highest=float(histogram.get('highest', 3600.0)),
+        histogram_precision_bits=int(histogram.get('precision_bits', 6))
+    )
+
+
+# Global metrics registry
+metrics_registry: Optional[MetricsRegistry] = None
+
+
+def initialize_metrics_registry(config: Optional[Dict[str, Any]] = None) -> MetricsRegistry:
+    """Initialize the global metrics registry"""
+    global metrics_registry
+    metrics_registry = create_metrics_registry(config)
+    return metrics_registry
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry, creating one with defaults if needed"""
+    global metrics_registry
+    if metrics_registry is None:
+        metrics_registry = create_metrics_registry()
+    return metrics_registry
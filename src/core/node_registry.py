@@ -0,0 +1,364 @@
+"""
+Write-behind Node Registry for ZephyrGate
+
+Keeps an in-memory view of mesh nodes built from received packets and
+writes it back to SQLite in batches. Repeated updates for the same node
+(position, telemetry and nodeinfo beacons) are coalesced so a busy node
+costs one write per flush instead of several writes per packet.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import DatabaseManager, get_database
+from .logging import get_logger
+
+
+@dataclass
+class NodeRecord:
+    """Cached node state with pending (unflushed) changes"""
+    node_id: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+    hardware: Dict[str, Any] = field(default_factory=dict)
+    pending_fields: Dict[str, Any] = field(default_factory=dict)
+    pending_hardware: Dict[str, Any] = field(default_factory=dict)
+    dirty_since: Optional[float] = None
+    update_count: int = 0
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self.pending_fields or self.pending_hardware)
+
+
+@dataclass
+class RegistryStats:
+    """Node registry statistics"""
+    updates: int = 0
+    updates_coalesced: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    flushes: int = 0
+    flush_failures: int = 0
+    rows_written: int = 0
+    evictions: int = 0
+    last_flush_lag: float = 0.0
+    max_flush_lag: float = 0.0
+    last_flush_duration: float = 0.0
+
+
+class NodeRegistry:
+    """
+    In-memory node registry with dirty tracking and write-behind flushing.
+
+    ``update_node`` may be called from any thread (Meshtastic pubsub callbacks
+    run on the library's reader thread). Dirty nodes are flushed by a
+    background thread every ``flush_interval`` seconds, or sooner once
+    ``flush_threshold`` nodes are dirty. ``stop`` performs a final flush so a
+    clean shutdown loses no data.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, flush_interval: float = 30.0,
+                 flush_threshold: int = 200, max_nodes: int = 10000):
+        self.db = db_manager
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.max_nodes = max_nodes
+        self.logger = get_logger('node_registry')
+
+        self.nodes: "OrderedDict[str, NodeRecord]" = OrderedDict()
+        self.dirty: Dict[str, NodeRecord] = {}
+        self.stats = RegistryStats()
+
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            name='zephyrgate-node-registry',
+            daemon=True
+        )
+        self._thread.start()
+        self.logger.info(
+            f"Node registry started (flush every {self.flush_interval}s or {self.flush_threshold} dirty nodes)"
+        )
+
+    def stop(self, timeout: float = 30.0):
+        """Stop the flush thread and write out all pending changes"""
+        self._stopping = True
+        self._wakeup.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+        # Final flush covers anything the thread did not get to
+        self.flush()
+        self.logger.info("Node registry stopped")
+
+    def update_node(self, node_id: str, fields: Optional[Dict[str, Any]] = None,
+                    hardware: Optional[Dict[str, Any]] = None):
+        """
+        Record new information about a node.
+
+        Args:
+            node_id: Meshtastic node ID
+            fields: Columns for the ``users`` table
+            hardware: Columns for the ``node_hardware`` table
+        """
+        if not node_id:
+            return
+
+        with self._lock:
+            record = self.nodes.get(node_id)
+            if record is None:
+                record = NodeRecord(node_id=node_id)
+                self.nodes[node_id] = record
+                self.stats.cache_misses += 1
+            else:
+                self.nodes.move_to_end(node_id)
+                self.stats.cache_hits += 1
+
+            if record.is_dirty:
+                self.stats.updates_coalesced += 1
+            else:
+                record.dirty_since = time.monotonic()
+
+            if fields:
+                record.fields.update(fields)
+                record.pending_fields.update(fields)
+            if hardware:
+                record.hardware.update(hardware)
+                record.pending_hardware.update(hardware)
+
+            record.update_count += 1
+            self.stats.updates += 1
+
+            if record.is_dirty:
+                self.dirty[node_id] = record
+
+            self._evict_clean_nodes()
+            should_flush = len(self.dirty) >= self.flush_threshold
+
+        if should_flush:
+            self._wakeup.set()
+
+    def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest known state of a node, including unflushed changes"""
+        with self._lock:
+            record = self.nodes.get(node_id)
+            if record is not None:
+                self.stats.cache_hits += 1
+                return {'node_id': node_id, **record.fields, 'hardware': dict(record.hardware)}
+            self.stats.cache_misses += 1
+
+        user = self.db.get_user(node_id)
+        if user is None:
+            return None
+        return {**user, 'hardware': {}}
+
+    def flush(self) -> int:
+        """Write all dirty nodes to the database; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                if not self.dirty:
+                    return 0
+                batch = []
+                oldest = None
+                for record in self.dirty.values():
+                    batch.append((record.node_id, record.pending_fields, record.pending_hardware))
+                    if record.dirty_since is not None and (oldest is None or record.dirty_since < oldest):
+                        oldest = record.dirty_since
+                    record.pending_fields = {}
+                    record.pending_hardware = {}
+                    record.dirty_since = None
+                self.dirty = {}
+
+            start = time.monotonic()
+            try:
+                rows = self._write_batch(batch)
+            except Exception as e:
+                self.logger.error(f"Node registry flush failed, will retry: {e}")
+                self._requeue(batch)
+                with self._lock:
+                    self.stats.flush_failures += 1
+                return 0
+
+            now = time.monotonic()
+            with self._lock:
+                self.stats.flushes += 1
+                self.stats.rows_written += rows
+                self.stats.last_flush_duration = now - start
+                if oldest is not None:
+                    self.stats.last_flush_lag = start - oldest
+                    self.stats.max_flush_lag = max(self.stats.max_flush_lag, self.stats.last_flush_lag)
+
+            self.logger.debug(f"Flushed {len(batch)} nodes ({rows} rows)")
+            return rows
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> int:
+        """Write a batch of node updates in a single transaction"""
+        rows = 0
+        with self.db.transaction() as conn:
+            # Users first: node_hardware references users(node_id)
+            for node_id, fields, hardware in batch:
+                if fields or hardware:
+                    conn.execute(*self._build_user_upsert(node_id, fields))
+                    rows += 1
+            for node_id, fields, hardware in batch:
+                if hardware:
+                    conn.execute(*self._build_hardware_upsert(node_id, hardware))
+                    rows += 1
+        return rows
+
+    def _build_user_upsert(self, node_id: str, fields: Dict[str, Any]) -> Tuple[str, Tuple]:
+        """Build a partial upsert for the users table"""
+        data = dict(fields)
+        data.setdefault('last_seen', datetime.utcnow().isoformat())
+        data['updated_at'] = datetime.utcnow().isoformat()
+
+        # A default short name is only used for new rows, never to overwrite a known one
+        has_short_name = 'short_name' in data
+        columns = ['node_id', 'short_name'] + [c for c in data if c != 'short_name']
+        values = [node_id, data.get('short_name') or node_id[-4:]] + [data[c] for c in columns[2:]]
+
+        update_columns = [c for c in columns[2:]]
+        if has_short_name:
+            update_columns.insert(0, 'short_name')
+        update_clause = ', '.join(f"{col} = excluded.{col}" for col in update_columns)
+
+        query = f"""
+            INSERT INTO users ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})
+            ON CONFLICT(node_id) DO UPDATE SET {update_clause}
+        """
+        return query, tuple(values)
+
+    def _build_hardware_upsert(self, node_id: str, hardware: Dict[str, Any]) -> Tuple[str, Tuple]:
+        """Build a partial upsert for the node_hardware table"""
+        data = {'node_id': node_id, **hardware}
+        data.setdefault('last_updated', datetime.utcnow().isoformat())
+
+        columns = list(data.keys())
+        update_clause = ', '.join(f"{col} = excluded.{col}" for col in columns if col != 'node_id')
+
+        query = f"""
+            INSERT INTO node_hardware ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})
+            ON CONFLICT(node_id) DO UPDATE SET {update_clause}
+        """
+        return query, tuple(data.values())
+
+    def _requeue(self, batch: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        """Put a failed batch back, letting newer updates win"""
+        with self._lock:
+            now = time.monotonic()
+            for node_id, fields, hardware in batch:
+                record = self.nodes.get(node_id)
+                if record is None:
+                    record = NodeRecord(node_id=node_id)
+                    self.nodes[node_id] = record
+                record.pending_fields = {**fields, **record.pending_fields}
+                record.pending_hardware = {**hardware, **record.pending_hardware}
+                if record.dirty_since is None:
+                    record.dirty_since = now
+                self.dirty[node_id] = record
+
+    def _evict_clean_nodes(self):
+        """Drop least recently updated clean nodes beyond the memory cap (lock held)"""
+        if len(self.nodes) <= self.max_nodes:
+            return
+        for node_id in list(self.nodes.keys()):
+            if len(self.nodes) <= self.max_nodes:
+                break
+            if not self.nodes[node_id].is_dirty:
+                del self.nodes[node_id]
+                self.stats.evictions += 1
+
+    def _flush_loop(self):
+        """Background thread: flush on interval or when the dirty threshold is hit"""
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Error in node registry flush loop: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics"""
+        with self._lock:
+            now = time.monotonic()
+            oldest_dirty = min(
+                (r.dirty_since for r in self.dirty.values() if r.dirty_since is not None),
+                default=None
+            )
+            lookups = self.stats.cache_hits + self.stats.cache_misses
+            return {
+                'cached_nodes': len(self.nodes),
+                'dirty_nodes': len(self.dirty),
+                'updates': self.stats.updates,
+                'updates_coalesced': self.stats.updates_coalesced,
+                'cache_hits': self.stats.cache_hits,
+                'cache_misses': self.stats.cache_misses,
+                'hit_rate': (self.stats.cache_hits / lookups * 100) if lookups else 0.0,
+                'flushes': self.stats.flushes,
+                'flush_failures': self.stats.flush_failures,
+                'rows_written': self.stats.rows_written,
+                'evictions': self.stats.evictions,
+                'current_flush_lag_seconds': (now - oldest_dirty) if oldest_dirty is not None else 0.0,
+                'last_flush_lag_seconds': self.stats.last_flush_lag,
+                'max_flush_lag_seconds': self.stats.max_flush_lag,
+                'last_flush_duration_ms': self.stats.last_flush_duration * 1000
+            }
+
+
+# Global node registry instance (created on first use or by the application)
+node_registry: Optional[NodeRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def initialize_node_registry(db_manager: DatabaseManager, flush_interval: float = 30.0,
+                             flush_threshold: int = 200, max_nodes: int = 10000) -> NodeRegistry:
+    """Initialize and start the global node registry"""
+    global node_registry
+    with _registry_lock:
+        if node_registry is not None:
+            node_registry.stop()
+        node_registry = NodeRegistry(db_manager, flush_interval, flush_threshold, max_nodes)
+        node_registry.start()
+        return node_registry
+
+
+def get_node_registry() -> NodeRegistry:
+    """Get the global node registry, creating it from the global database if needed"""
+    global node_registry
+    if node_registry is None:
+        with _registry_lock:
+            if node_registry is None:
+                node_registry = NodeRegistry(get_database())
+                node_registry.start()
+    return node_registry
+
+
+def shutdown_node_registry():
+    """Flush and stop the global node registry"""
+    global node_registry
+    with _registry_lock:
+        if node_registry is not None:
+            node_registry.stop()
+            node_registry = None
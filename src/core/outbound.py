@@ -0,0 +1,225 @@
+"""
+Outbound Interface Selection for ZephyrGate
+
+Chooses which interface transmits a message when a gateway has several
+radios. The default ``all`` policy sends every message on every connected
+interface. The balanced policies send each message once, on one interface,
+so two radios roughly double the outbound airtime available:
+
+- ``round_robin``: rotate through connected interfaces
+- ``least_loaded``: fewest seconds of queued work (airtime backlog plus TX
+  queue depth times recent send latency)
+- ``channel_affinity``: keep each channel on one interface (configured or
+  hashed), falling back to the least loaded
+- ``health_weighted``: random choice weighted by recent success rate,
+  latency and load
+
+Every policy returns the remaining interfaces as a failover order. Interfaces
+that have failed ``failure_threshold`` sends in a row are tried last until
+``recovery_time`` has passed since their last failure.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from .airtime import get_airtime_scheduler
+from .logging import get_logger
+
+
+POLICIES = ('all', 'round_robin', 'least_loaded', 'channel_affinity', 'health_weighted')
+
+
+class SendHealth:
+    """Recent send latency and outcomes for one interface"""
+
+    def __init__(self, window: int = 50, alpha: float = 0.2, clock: Callable[[], float] = time.monotonic):
+        self.alpha = alpha
+        self.clock = clock
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.latency = 0.0  # exponentially weighted seconds per send
+        self.consecutive_failures = 0
+        self.last_failure: Optional[float] = None
+        self.sends = 0
+        self.failures = 0
+
+    def record(self, ok: bool, latency: Optional[float] = None):
+        """Record the outcome (and duration, if measured) of one send"""
+        self.outcomes.append(ok)
+        if latency is not None:
+            self.latency = latency if self.sends == 0 else self.latency + self.alpha * (latency - self.latency)
+        self.sends += 1
+        if ok:
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_failure = self.clock()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'sends': self.sends,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate, 3),
+            'latency_ms': round(self.latency * 1000, 2),
+            'consecutive_failures': self.consecutive_failures
+        }
+
+
+@dataclass
+class OutboundStats:
+    """Outbound selection statistics"""
+    selections: int = 0
+    failovers: int = 0
+    reroutes: int = 0
+    reroute_failures: int = 0
+
+
+class OutboundSelector:
+    """Orders interfaces for sending a message according to a policy"""
+
+    def __init__(self, policy: str = 'all', affinity: Optional[Dict[Any, str]] = None,
+                 failure_threshold: int = 3, recovery_time: float = 30.0, max_reroutes: int = 2,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown outbound policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.affinity = {int(channel): iface_id for channel, iface_id in (affinity or {}).items()}
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.max_reroutes = max_reroutes
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.logger = get_logger('outbound')
+
+        self.stats = OutboundStats()
+        self.selected: Dict[str, int] = {}
+        self._next = 0
+
+    @property
+    def balanced(self) -> bool:
+        """Whether each message is sent on one interface rather than all"""
+        return self.policy != 'all'
+
+    @staticmethod
+    def is_available(interface: Any) -> bool:
+        """Interfaces without a status enum (e.g. simulated ones) are always available"""
+        status = getattr(interface, 'status', None)
+        if isinstance(status, Enum):
+            return status.value == 'connected'
+        return True
+
+    @staticmethod
+    def health_of(interface: Any) -> Optional[SendHealth]:
+        health = getattr(interface, 'send_health', None)
+        return health if isinstance(health, SendHealth) else None
+
+    def load(self, interface_id: str, interface: Any) -> float:
+        """Estimated seconds before a new message on this interface would be sent"""
+        backlog = get_airtime_scheduler().backlog(interface_id)
+        queue = getattr(interface, 'send_queue', None)
+        depth = queue.qsize() if isinstance(queue, asyncio.Queue) else 0
+        health = self.health_of(interface)
+        per_message = health.latency if health and health.latency > 0 else 0.001
+        return backlog + depth * per_message
+
+    def _suspect(self, interface: Any) -> bool:
+        health = self.health_of(interface)
+        if health is None or health.consecutive_failures < self.failure_threshold:
+            return False
+        return self.clock() - (health.last_failure or 0.0) < self.recovery_time
+
+    def candidates(self, message: Any, interfaces: Dict[str, Any],
+                   exclude: Iterable[str] = ()) -> List[str]:
+        """Interfaces to try for a message, preferred first"""
+        excluded = set(exclude)
+        available = [iface_id for iface_id, interface in interfaces.items()
+                     if iface_id not in excluded and self.is_available(interface)]
+        if not available:
+            return []
+
+        loads = {iface_id: self.load(iface_id, interfaces[iface_id]) for iface_id in available}
+        by_load = sorted(available, key=lambda iface_id: loads[iface_id])
+
+        if self.policy == 'round_robin':
+            start = self._next % len(available)
+            self._next += 1
+            ordered = available[start:] + available[:start]
+        elif self.policy == 'channel_affinity':
+            preferred = self.affinity.get(message.channel)
+            if preferred not in available:
+                ordered_ids = sorted(available)
+                preferred = ordered_ids[message.channel % len(ordered_ids)]
+            ordered = [preferred] + [iface_id for iface_id in by_load if iface_id != preferred]
+        elif self.policy == 'health_weighted':
+            ordered = self._weighted_order(available, interfaces, loads)
+        else:
+            ordered = by_load
+
+        # Interfaces that keep failing go last until they have had time to recover
+        healthy = [iface_id for iface_id in ordered if not self._suspect(interfaces[iface_id])]
+        return healthy + [iface_id for iface_id in ordered if iface_id not in healthy]
+
+    def _weighted_order(self, available: List[str], interfaces: Dict[str, Any],
+                        loads: Dict[str, float]) -> List[str]:
+        weights = {}
+        for iface_id in available:
+            health = self.health_of(interfaces[iface_id])
+            success = 1.0 - health.error_rate if health else 1.0
+            latency = health.latency if health else 0.0
+            weights[iface_id] = max(success ** 2, 0.01) / (1.0 + loads[iface_id] + latency)
+
+        ordered = []
+        remaining = list(available)
+        while remaining:
+            choice = self.rng.choices(remaining, [weights[iface_id] for iface_id in remaining])[0]
+            ordered.append(choice)
+            remaining.remove(choice)
+        return ordered
+
+    def record_selection(self, interface_id: str, failovers: int = 0):
+        """Count a message sent on an interface after ``failovers`` failed attempts"""
+        self.stats.selections += 1
+        self.stats.failovers += failovers
+        self.selected[interface_id] = self.selected.get(interface_id, 0) + 1
+
+    def record_failure(self, interface: Any):
+        """Count a failed send against an interface's health"""
+        health = self.health_of(interface)
+        if health is not None:
+            health.record(False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get outbound selection statistics"""
+        return {
+            'policy': self.policy,
+            'selections': self.stats.selections,
+            'failovers': self.stats.failovers,
+            'reroutes': self.stats.reroutes,
+            'reroute_failures': self.stats.reroute_failures,
+            'selected': dict(self.selected)
+        }
+
+
+def create_outbound_selector(config: Optional[Dict[str, Any]] = None) -> OutboundSelector:
+    """Build a selector from the ``routing.outbound`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    affinity = config.get('affinity', {})
+    return OutboundSelector(
+        policy=config.get('policy', 'all'),
+        affinity=affinity if isinstance(affinity, dict) else {},
+        failure_threshold=config.get('failure_threshold', 3),
+        recovery_time=config.get('recovery_time', 30.0),
+        max_reroutes=config.get('max_reroutes', 2)
+    )
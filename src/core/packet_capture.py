@@ -0,0 +1,201 @@
+"""
+Meshtastic Packet Capture for ZephyrGate
+
+Records the raw packets an interface receives (the dicts the meshtastic
+library publishes on ``meshtastic.receive.*``) with their arrival times, so
+real traffic can be replayed later through ``ReplayInterface`` without a
+radio.
+
+A capture is gzip-compressed JSON lines. The first line of each recording
+session is a header; every following line is ``[offset, topic, packet]``,
+where ``offset`` is seconds since the session started:
+
+    {"format": "zephyrgate-capture", "version": 1, "interface": "radio1", "started": "..."}
+    [0.0, "meshtastic.receive.text", {"fromId": "!a1b2c3d4", "decoded": {"text": "hi"}, ...}]
+    [1.284, "meshtastic.receive.telemetry", {...}]
+
+Bytes values are stored as ``{"__bytes__": "<base64>"}`` and restored on
+read. The protobuf ``raw`` field is dropped (it duplicates the decoded
+fields). Appending to an existing file starts a new session; readers keep
+offsets increasing across sessions.
+"""
+
+import base64
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from .logging import get_logger
+
+
+CAPTURE_FORMAT = 'zephyrgate-capture'
+CAPTURE_VERSION = 1
+
+# Published by zephyrgate itself (not meshtastic) when capturing transmissions
+SEND_TOPIC = 'zephyrgate.send'
+
+DROPPED_FIELDS = ('raw',)
+
+
+class CaptureError(Exception):
+    """A capture file is missing or malformed"""
+    pass
+
+
+@dataclass
+class CapturedPacket:
+    """A packet read back from a capture"""
+    offset: float  # seconds since the start of the capture
+    topic: str
+    packet: Dict[str, Any]
+
+
+def _encode(value: Any) -> Any:
+    """Make a packet value JSON-serializable"""
+    if isinstance(value, dict):
+        return {str(key): _encode(item) for key, item in value.items() if key not in DROPPED_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(bytes(value)).decode('ascii')}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def _decode(value: Any) -> Any:
+    """Restore values changed by ``_encode``"""
+    if isinstance(value, dict):
+        if len(value) == 1 and '__bytes__' in value:
+            return base64.b64decode(value['__bytes__'])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+class PacketCaptureWriter:
+    """
+    Appends packets to a capture file.
+
+    ``record`` is safe to call from the meshtastic reader thread. Output is
+    flushed at most every ``flush_interval`` seconds, which bounds what a
+    crash can lose without paying for a gzip flush per packet.
+    """
+
+    def __init__(self, path: str, interface_id: str, flush_interval: float = 1.0,
+                 capture_sends: bool = True):
+        self.path = Path(path)
+        self.interface_id = interface_id
+        self.flush_interval = flush_interval
+        self.capture_sends = capture_sends
+        self.logger = get_logger('packet_capture')
+
+        self.packets = 0
+        self.errors = 0
+        self._file = None
+        self._start = 0.0
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Open the file and write a session header"""
+        with self._lock:
+            if self._file is not None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.path, 'at', encoding='utf-8')
+            self._start = self._last_flush = time.monotonic()
+            self._write_line({
+                'format': CAPTURE_FORMAT,
+                'version': CAPTURE_VERSION,
+                'interface': self.interface_id,
+                'started': datetime.utcnow().isoformat()
+            })
+        self.logger.info(f"Capturing packets from {self.interface_id} to {self.path}")
+
+    def record(self, topic: str, packet: Dict[str, Any]):
+        """Append one packet with its arrival time"""
+        if topic == SEND_TOPIC and not self.capture_sends:
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            now = time.monotonic()
+            try:
+                self._write_line([round(now - self._start, 4), topic, _encode(packet)])
+                self.packets += 1
+                if now - self._last_flush >= self.flush_interval:
+                    self._file.flush()
+                    self._last_flush = now
+            except Exception as e:
+                self.errors += 1
+                self.logger.warning(f"Failed to capture packet: {e}")
+
+    def _write_line(self, record: Any):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def close(self):
+        """Flush and close the file"""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+        self.logger.info(f"Captured {self.packets} packets from {self.interface_id} to {self.path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get capture statistics"""
+        return {
+            'path': str(self.path),
+            'recording': self._file is not None,
+            'packets': self.packets,
+            'errors': self.errors
+        }
+
+
+def read_capture(path: str) -> Iterator[CapturedPacket]:
+    """
+    Read packets from a capture file in order.
+
+    Raises:
+        CaptureError: if the file does not exist or is not a capture
+    """
+    path = Path(path)
+    if not path.exists():
+        raise CaptureError(f"Capture file not found: {path}")
+
+    session_base = 0.0  # offsets restart in each appended session
+    last_offset = 0.0
+    seen_header = False
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    if record.get('format') != CAPTURE_FORMAT:
+                        raise CaptureError(f"{path}:{line_number}: not a {CAPTURE_FORMAT} header")
+                    if record.get('version', 0) > CAPTURE_VERSION:
+                        raise CaptureError(f"{path}: unsupported capture version {record.get('version')}")
+                    session_base = last_offset
+                    seen_header = True
+                    continue
+                if not seen_header:
+                    raise CaptureError(f"{path}: missing capture header")
+                offset, topic, packet = record
+                last_offset = session_base + offset
+                yield CapturedPacket(last_offset, topic, _decode(packet))
+    except (OSError, EOFError, ValueError) as e:
+        # Truncated gzip streams (e.g. after a crash) end the capture early
+        if not seen_header:
+            raise CaptureError(f"Unreadable capture file {path}: {e}")
+        get_logger('packet_capture').warning(f"Capture {path} ends early: {e}")
@@ -0,0 +1,362 @@
+"""
+Compiled Multi-Pattern Matcher for ZephyrGate
+
+Matches message content against many routing/classification patterns in a
+single pass. Patterns that are plain keyword alternations (the common case,
+e.g. ``^(help|cmd|ping)\\b`` or ``\\b(SOS|MAYDAY)\\b``) are decomposed into
+literal keywords and matched with a word-token index, a prefix trie and an
+Aho-Corasick automaton, so matching cost stays roughly flat as the number of
+patterns grows. Anything else falls back to precompiled regular expressions,
+combined into one alternation per tag.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+# Maximum number of literals a single pattern may expand to before falling back to regex
+MAX_EXPANSION = 64
+
+_WORD_RE = re.compile(r'\w+')
+_REGEX_META = set('.^$*+?{}[]\\|()')
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _at_boundary(text: str, index: int) -> bool:
+    """Equivalent of regex ``\\b`` at ``index`` in ``text``"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+class _PatternParseError(Exception):
+    """Pattern cannot be reduced to literal keywords"""
+
+
+def _split_alternation(body: str) -> List[str]:
+    """Split a group body on top-level ``|``"""
+    parts, current, escaped, depth = [], [], False, 0
+    for ch in body:
+        if escaped:
+            current.append('\\' + ch)
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '[':
+            depth += 1
+            current.append(ch)
+        elif ch == ']':
+            depth -= 1
+            current.append(ch)
+        elif ch == '|' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        elif ch in '()':
+            raise _PatternParseError("nested group")
+        else:
+            current.append(ch)
+    if escaped:
+        raise _PatternParseError("dangling escape")
+    parts.append(''.join(current))
+    return parts
+
+
+def _expand_literal(text: str) -> List[str]:
+    """
+    Expand a restricted regex fragment into the literal strings it matches.
+
+    Supports escaped metacharacters and simple character classes, optionally
+    followed by ``?`` (e.g. ``SOS[PFMH]?``).
+    """
+    results = ['']
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == '\\':
+            if i + 1 >= len(text):
+                raise _PatternParseError("dangling escape")
+            nxt = text[i + 1]
+            if nxt.isalnum():
+                # \b, \d, \w, \s ... are not literals
+                raise _PatternParseError(f"escape \\{nxt}")
+            options = [nxt]
+            i += 2
+        elif ch == '[':
+            end = text.find(']', i)
+            if end == -1:
+                raise _PatternParseError("unterminated class")
+            chars = text[i + 1:end]
+            if not chars or any(c in '^-\\[' for c in chars):
+                raise _PatternParseError("complex class")
+            options = list(chars)
+            i = end + 1
+        elif ch in _REGEX_META:
+            raise _PatternParseError(f"metacharacter {ch}")
+        else:
+            options = [ch]
+            i += 1
+
+        if i < len(text) and text[i] == '?':
+            options = options + ['']
+            i += 1
+        elif i < len(text) and text[i] in '*+{':
+            raise _PatternParseError("repetition")
+
+        results = [prefix + option for prefix in results for option in options]
+        if len(results) > MAX_EXPANSION:
+            raise _PatternParseError("expansion too large")
+
+    return results
+
+
+def decompose_pattern(pattern: str) -> Tuple[str, bool, List[str]]:
+    """
+    Reduce a regex to (anchor, trailing_boundary, keywords).
+
+    ``anchor`` is ``'start'`` for ``^``, ``'word'`` for a leading ``\\b`` or
+    ``'none'``. Raises ``_PatternParseError`` if the pattern is not a literal
+    keyword alternation.
+    """
+    body = pattern
+    anchor = 'none'
+    if body.startswith('^'):
+        anchor = 'start'
+        body = body[1:]
+    elif body.startswith('\\b'):
+        anchor = 'word'
+        body = body[2:]
+
+    trailing = False
+    if body.endswith('\\b') and not body.endswith('\\\\b'):
+        trailing = True
+        body = body[:-2]
+
+    if anchor == 'word' and not trailing:
+        raise _PatternParseError("unbalanced word boundary")
+
+    if body.startswith('(?:') and body.endswith(')'):
+        alternatives = _split_alternation(body[3:-1])
+    elif body.startswith('(') and body.endswith(')') and not body.startswith('(?'):
+        alternatives = _split_alternation(body[1:-1])
+    else:
+        alternatives = [body]
+
+    keywords: List[str] = []
+    for alternative in alternatives:
+        if '|' in alternative.replace('\\|', ''):
+            raise _PatternParseError("top-level alternation outside group")
+        keywords.extend(_expand_literal(alternative))
+
+    if not keywords or any(k == '' for k in keywords):
+        raise _PatternParseError("empty keyword")
+
+    return anchor, trailing, keywords
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over lowercase keywords"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, Hashable]]] = [[]]
+        self.built = False
+
+    def add(self, keyword: str, tag: Hashable):
+        """Add a keyword; ``tag`` is reported when the keyword occurs"""
+        node = 0
+        for ch in keyword:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append((len(keyword), tag))
+        self.built = False
+
+    def build(self):
+        """Compute failure links"""
+        queue = deque()
+        for node in self.goto[0].values():
+            self.fail[node] = 0
+            queue.append(node)
+
+        while queue:
+            current = queue.popleft()
+            for ch, nxt in self.goto[current].items():
+                queue.append(nxt)
+                state = self.fail[current]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                candidate = self.goto[state].get(ch, 0)
+                self.fail[nxt] = candidate if candidate != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+        self.built = True
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, Hashable]]:
+        """Yield ``(start, end, tag)`` for every keyword occurrence"""
+        if not self.built:
+            self.build()
+        node = 0
+        for index, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, tag in self.output[node]:
+                yield index + 1 - length, index + 1, tag
+
+
+class PatternMatcher:
+    """
+    Multi-pattern matcher returning the tags of all patterns that match.
+
+    Matching is case-insensitive, consistent with ``re.search(pattern,
+    content, re.IGNORECASE)`` for each registered pattern.
+    """
+
+    def __init__(self):
+        self.patterns: List[Tuple[str, Hashable]] = []
+        self._compiled = False
+
+        self._always: Set[Hashable] = set()
+        self._word_index: Dict[str, Set[Hashable]] = {}
+        self._prefix_trie: Dict = {}
+        self._substrings = AhoCorasick()
+        self._has_substrings = False
+        self._regexes: Dict[Hashable, re.Pattern] = {}
+        self._fallback_regexes: List[Tuple[re.Pattern, Hashable]] = []
+
+    def add(self, pattern: str, tag: Hashable):
+        """Register a pattern under ``tag``"""
+        self.patterns.append((pattern, tag))
+        self._compiled = False
+
+    def add_all(self, patterns: Iterable[str], tag: Hashable):
+        """Register several patterns under the same tag"""
+        for pattern in patterns:
+            self.add(pattern, tag)
+
+    def compile(self):
+        """Build the matching structures from the registered patterns"""
+        self._always = set()
+        self._word_index = {}
+        self._prefix_trie = {}
+        self._substrings = AhoCorasick()
+        self._has_substrings = False
+        fallback: Dict[Hashable, List[str]] = {}
+
+        for pattern, tag in self.patterns:
+            if not pattern:
+                self._always.add(tag)
+                continue
+
+            # Surface invalid patterns at compile time rather than per message
+            re.compile(pattern, re.IGNORECASE)
+
+            try:
+                anchor, trailing, keywords = decompose_pattern(pattern)
+            except _PatternParseError:
+                fallback.setdefault(tag, []).append(pattern)
+                continue
+
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if anchor == 'start':
+                    self._add_prefix(keyword, tag, trailing)
+                elif anchor == 'word' and all(_is_word_char(c) for c in keyword):
+                    # \bkw\b over word characters matches exactly a whole word token
+                    self._word_index.setdefault(keyword, set()).add(tag)
+                else:
+                    self._substrings.add(keyword, (tag, anchor == 'word', trailing))
+                    self._has_substrings = True
+
+        if self._has_substrings:
+            self._substrings.build()
+
+        self._fallback_regexes = [
+            (re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE), tag)
+            for tag, patterns in fallback.items()
+        ]
+
+        # Full regexes for content where lowercasing changes string length
+        combined: Dict[Hashable, List[str]] = {}
+        for pattern, tag in self.patterns:
+            if pattern:
+                combined.setdefault(tag, []).append(pattern)
+        self._regexes = {
+            tag: re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+            for tag, patterns in combined.items()
+        }
+
+        self._compiled = True
+
+    def _add_prefix(self, keyword: str, tag: Hashable, trailing: bool):
+        node = self._prefix_trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append((tag, trailing))
+
+    def match(self, content: str) -> Set[Hashable]:
+        """Return the set of tags whose patterns match ``content``"""
+        if not self._compiled:
+            self.compile()
+
+        matched = set(self._always)
+        text = content.lower()
+
+        if len(text) != len(content):
+            # Case folding changed offsets; use the regex path for exact semantics
+            for tag, regex in self._regexes.items():
+                if tag not in matched and regex.search(content):
+                    matched.add(tag)
+            return matched
+
+        # Start-anchored keywords: walk the prefix trie
+        node = self._prefix_trie
+        for index in range(len(text) + 1):
+            entries = node.get(None)
+            if entries:
+                for tag, trailing in entries:
+                    if not trailing or _at_boundary(text, index):
+                        matched.add(tag)
+            if index == len(text):
+                break
+            node = node.get(text[index])
+            if node is None:
+                break
+
+        # Whole-word keywords: one tokenisation, then dictionary lookups
+        if self._word_index:
+            for token in _WORD_RE.findall(text):
+                tags = self._word_index.get(token)
+                if tags:
+                    matched.update(tags)
+
+        # Unanchored or mixed-character keywords: Aho-Corasick scan
+        if self._has_substrings:
+            for start, end, (tag, leading, trailing) in self._substrings.iter_matches(text):
+                if tag in matched:
+                    continue
+                if leading and not _at_boundary(text, start):
+                    continue
+                if trailing and not _at_boundary(text, end):
+                    continue
+                matched.add(tag)
+
+        for regex, tag in self._fallback_regexes:
+            if tag not in matched and regex.search(content):
+                matched.add(tag)
+
+        return matched
+
+    def matches(self, content: str, tag: Hashable) -> bool:
+        """Check whether any pattern registered under ``tag`` matches"""
+        return tag in self.match(content)
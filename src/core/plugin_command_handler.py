@@ -7,6 +7,7 @@ Supports priority-based handler execution and context building.
 
 import asyncio
 import logging
+import time
 from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
@@ -17,6 +18,8 @@ except ImportError:
     from models.message import Message, MessageType
 from .plugin_interfaces import BaseCommandHandler
 from .logging import get_logger
+from .metrics import get_metrics_registry
+from .tracing import get_tracer
 
 
 @dataclass
@@ -78,6 +81,9 @@ class PluginCommandHandler:
         # Plugin registry: plugin_name -> List[command_names]
         self._plugin_commands: Dict[str, List[str]] = {}
         
+        # plugin_name -> monotonic time of its last command (for idle unloading)
+        self.last_used: Dict[str, float] = {}
+        
         # Statistics
         self.stats = {
             'commands_registered': 0,
@@ -86,6 +92,14 @@ class PluginCommandHandler:
             'total_plugins': 0
         }
         
+        metrics = get_metrics_registry()
+        self._handler_latency = metrics.histogram(
+            'plugin_command_seconds', 'Plugin command handler latency', ['plugin']
+        )
+        self._handler_calls = metrics.counter(
+            'plugin_commands_total', 'Plugin command handler calls by outcome', ['plugin', 'outcome']
+        )
+        
         self.logger.info("Plugin command handler initialized")
     
     def register_command(self, plugin_name: str, command: str, handler: Callable,
@@ -154,13 +168,15 @@ class PluginCommandHandler:
             self.logger.error(f"Failed to register command '{command}' for plugin '{plugin_name}': {e}")
             return False
     
-    def unregister_command(self, plugin_name: str, command: str) -> bool:
+    def unregister_command(self, plugin_name: str, command: str,
+                           handler: Optional[Callable] = None) -> bool:
         """
         Unregister a command handler for a plugin.
         
         Args:
             plugin_name: Name of the plugin
             command: Command name
+            handler: Only remove this handler, keeping the plugin's others for the command
             
         Returns:
             True if unregistration successful
@@ -175,15 +191,18 @@ class PluginCommandHandler:
             original_count = len(self._commands[command_lower])
             self._commands[command_lower] = [
                 cmd for cmd in self._commands[command_lower]
-                if cmd.plugin_name != plugin_name
+                if cmd.plugin_name != plugin_name or (handler is not None and cmd.handler is not handler)
             ]
+            still_registered = any(
+                cmd.plugin_name == plugin_name for cmd in self._commands[command_lower]
+            )
             
             # Remove empty command entries
             if not self._commands[command_lower]:
                 del self._commands[command_lower]
             
             # Update plugin commands
-            if plugin_name in self._plugin_commands:
+            if plugin_name in self._plugin_commands and not still_registered:
                 if command_lower in self._plugin_commands[plugin_name]:
                     self._plugin_commands[plugin_name].remove(command_lower)
                 
@@ -260,16 +279,21 @@ class PluginCommandHandler:
             handlers = self._commands[command]
             
             for registered_cmd in handlers:
+                plugin = registered_cmd.plugin_name
+                self.last_used[plugin] = time.monotonic()
                 try:
                     self.logger.debug(
-                        f"Executing command '{command}' via plugin '{registered_cmd.plugin_name}' "
+                        f"Executing command '{command}' via plugin '{plugin}' "
                         f"(priority {registered_cmd.priority})"
                     )
                     
                     # Execute handler
-                    response = await registered_cmd.handler(args, context.to_dict())
+                    with get_tracer().span(f"plugin:{plugin}", self._handler_latency.labels(plugin=plugin),
+                                           command=command):
+                        response = await registered_cmd.handler(args, context.to_dict())
                     
                     self.stats['commands_executed'] += 1
+                    self._handler_calls.labels(plugin, 'success').inc()
                     
                     # Return first successful response
                     if response:
@@ -277,9 +301,10 @@ class PluginCommandHandler:
                     
                 except Exception as e:
                     self.logger.error(
-                        f"Error executing command '{command}' in plugin '{registered_cmd.plugin_name}': {e}"
+                        f"Error executing command '{command}' in plugin '{plugin}': {e}"
                     )
                     self.stats['commands_failed'] += 1
+                    self._handler_calls.labels(plugin, 'failure').inc()
                     
                     # Continue to next handler
                     continue
@@ -320,6 +345,22 @@ class PluginCommandHandler:
             session_data={}
         )
     
+    def find_handler(self, plugin_name: str, command: str) -> Optional[Callable]:
+        """
+        Get a plugin's handler for a command.
+        
+        Args:
+            plugin_name: Name of the plugin
+            command: Command name
+            
+        Returns:
+            The handler function, or None if the plugin has not registered the command
+        """
+        for registered_cmd in self._commands.get(command.lower(), []):
+            if registered_cmd.plugin_name == plugin_name:
+                return registered_cmd.handler
+        return None
+    
     def get_command_info(self, command: str) -> List[Dict[str, Any]]:
         """
         Get information about a command and its handlers.
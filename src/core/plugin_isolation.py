@@ -0,0 +1,1159 @@
+"""
+Process Isolation for ZephyrGate Plugins
+
+Runs an ``EnhancedPlugin`` subclass in its own worker process, so CPU-heavy
+handlers or blocking third-party code cannot stall the main event loop.
+
+``IsolatedPlugin`` takes the plugin's place in the ``PluginManager``. It
+spawns the worker, registers forwarding command, menu and message handlers
+for everything the worker registers, and serves the worker's storage, HTTP,
+mesh messaging and core service calls in the main process. Host and worker
+exchange length-prefixed frames over a socket pair read by asyncio streams,
+so the host never blocks on a busy worker: calls have timeouts and a
+per-plugin cap on outstanding requests. Synchronous plugin APIs (system
+state queries, configuration lookups) use a second socket that the worker
+reads with a blocking receive.
+
+The worker is not trusted. Host-to-worker frames are pickled, but the host
+only ever decodes worker frames as data: JSON with tagged bytes, datetimes
+and messages, no larger than ``MAX_FRAME_BYTES``. Errors are mapped back to
+exception types by name, and a worker that stops reading cannot make the
+host buffer more than ``MAX_WRITE_BUFFER_BYTES`` for it.
+
+A monitor task samples the worker's memory and CPU time, pings it, and
+restarts it with backoff when it exits, stops answering or grows past its
+memory limit.
+"""
+
+import asyncio
+import base64
+import builtins
+import dataclasses
+import importlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import pickle
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import psutil
+
+from .enhanced_plugin import PluginHTTPClient, PluginStorage
+from .logging import get_logger
+from .metrics import LogHistogram, get_metrics_registry
+from .plugin_manager import (
+    BasePlugin, PluginDependency, PluginManager, PluginMetadata, PluginPriority
+)
+
+try:
+    from ..models.message import Message
+except ImportError:
+    from models.message import Message
+
+
+# Frame kinds
+CALL = 'call'        # request expecting a reply
+NOTIFY = 'notify'    # request without a reply
+REPLY = 'reply'
+ERROR = 'error'
+
+HEADER = struct.Struct('!I')
+
+# Largest worker frame the host accepts; a bigger length header closes the channel
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+# Unsent bytes the host queues for a worker before refusing further writes
+MAX_WRITE_BUFFER_BYTES = 4 * 1024 * 1024
+
+# Key marking a tagged (non-JSON) value in worker frames
+TAG = '__zephyrgate__'
+
+# What decoding a malformed, oversized or hostile frame can raise
+BAD_FRAME_ERRORS = (ValueError, TypeError, KeyError, RecursionError, pickle.UnpicklingError)
+
+# Core services a worker may call; the host supplies the plugin name argument
+SCOPED_METHODS = {
+    'message_routing': {'send_mesh_message'},
+    'system_state': {'get_node_info', 'get_network_status', 'get_plugin_list', 'get_plugin_status'},
+    'inter_plugin': {'send_to_plugin', 'broadcast_to_plugins'},
+    'config_manager': {'get_config_value', 'retrieve_secure_value', 'store_secure_value'},
+}
+
+class IsolatedPluginError(RuntimeError):
+    """Raised when a call to or from an isolated plugin's worker fails"""
+    pass
+
+
+def _encode(frame: tuple) -> bytes:
+    """Host-to-worker frame (pickle; only the worker unpickles it)"""
+    data = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+    return HEADER.pack(len(data)) + data
+
+
+def _to_data(value: Any) -> Any:
+    """Convert a value to JSON-compatible data, tagging bytes, datetimes and messages"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return _to_data(value.value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_data(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _to_data(item) for key, item in value.items()}
+    if isinstance(value, (bytes, bytearray)):
+        return {TAG: 'bytes', 'value': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, datetime):
+        return {TAG: 'datetime', 'value': value.isoformat()}
+    if isinstance(value, Message):
+        return {TAG: 'message', 'value': _to_data(value.to_dict())}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _to_data(dataclasses.asdict(value))
+    raise TypeError(f"{type(value).__name__} cannot be sent from an isolated plugin")
+
+
+def _from_data(item: Dict[str, Any]) -> Any:
+    """``json.loads`` object hook restoring tagged values"""
+    tag = item.get(TAG)
+    if tag is None:
+        return item
+    if tag == 'bytes':
+        return base64.b64decode(item['value'])
+    if tag == 'datetime':
+        return datetime.fromisoformat(item['value'])
+    if tag == 'message':
+        return Message.from_dict(item['value'])
+    raise ValueError(f"Unknown tagged value '{tag}'")
+
+
+def _encode_data(frame: tuple) -> bytes:
+    """Worker-to-host frame (JSON data only)"""
+    data = json.dumps(_to_data(frame), separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(len(data)) + data
+
+
+def _decode_data(data: bytes) -> tuple:
+    """Decode and validate a worker frame without executing anything from it"""
+    frame = json.loads(data.decode('utf-8'), object_hook=_from_data)
+    if not isinstance(frame, list) or len(frame) != 4:
+        raise ValueError("Malformed frame")
+    kind, call_id, op, payload = frame
+    if kind not in (CALL, NOTIFY, REPLY, ERROR) or not isinstance(call_id, int):
+        raise ValueError("Malformed frame header")
+    if kind in (CALL, NOTIFY):
+        if not isinstance(op, str) or not isinstance(payload, list):
+            raise ValueError("Malformed request")
+        payload = tuple(payload)
+    elif kind == ERROR and not (isinstance(payload, list) and len(payload) == 2
+                                and all(isinstance(part, str) for part in payload)):
+        raise ValueError("Malformed error")
+    return kind, call_id, op, payload
+
+
+def _frame_size(header: bytes) -> int:
+    size = HEADER.unpack(header)[0]
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {size} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    return size
+
+
+def _error_payload(error: BaseException) -> Tuple[str, str]:
+    return type(error).__name__, str(error)
+
+
+def _picklable(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop context entries that cannot cross the process boundary"""
+    try:
+        pickle.dumps(context, protocol=pickle.HIGHEST_PROTOCOL)
+        return context
+    except Exception:
+        pass
+    clean = {}
+    for key, value in context.items():
+        try:
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            clean[key] = value
+        except Exception:
+            continue
+    return clean
+
+
+class _Channel:
+    """
+    Asynchronous request/reply channel over a stream socket.
+
+    Either side can call the other. Incoming requests run as tasks, so a
+    slow handler does not hold up replies to this side's own calls.
+    ``encode`` and ``decode`` convert frames for each direction: the host
+    reads worker frames with ``_decode_data`` and never unpickles them.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 serve: Callable[[str, tuple], Awaitable[Any]],
+                 error_types: Optional[Dict[str, type]] = None,
+                 max_pending: int = 0,
+                 encode: Callable[[tuple], bytes] = _encode,
+                 decode: Callable[[bytes], tuple] = _decode_data):
+        self.reader = reader
+        self.writer = writer
+        self.serve = serve
+        self.encode = encode
+        self.decode = decode
+        self.error_types = error_types or {}
+        self.max_pending = max_pending
+        self.closed = asyncio.Event()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._tasks = set()
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _write(self, frame: tuple):
+        if self.closed.is_set():
+            raise IsolatedPluginError("Worker channel is closed")
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER_BYTES:
+            raise IsolatedPluginError("Channel write buffer is full; the other side is not reading")
+        data = self.encode(frame)
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+
+    async def _send(self, frame: tuple):
+        """Write a frame and wait for the transport's buffer to drain"""
+        self._write(frame)
+        await self.writer.drain()
+
+    async def _reply_to(self, future: asyncio.Future) -> Any:
+        await self.writer.drain()
+        return await future
+
+    async def call(self, op: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Call ``op`` on the other side and wait for its result"""
+        if self.max_pending and len(self._pending) >= self.max_pending:
+            raise IsolatedPluginError(f"Too many outstanding calls ({len(self._pending)})")
+        call_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        self.calls += 1
+        try:
+            self._write((CALL, call_id, op, args))
+            return await asyncio.wait_for(self._reply_to(future), timeout)
+        except asyncio.TimeoutError:
+            raise IsolatedPluginError(f"'{op}' timed out after {timeout}s") from None
+        finally:
+            self._pending.pop(call_id, None)
+
+    def notify(self, op: str, *args: Any):
+        """Send ``op`` to the other side without waiting for it"""
+        self._write((NOTIFY, 0, op, args))
+
+    def exception_for(self, payload: Tuple[str, str]) -> BaseException:
+        name, message = payload
+        error_type = self.error_types.get(name) or getattr(builtins, name, None)
+        if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+            return IsolatedPluginError(f"{name}: {message}")
+        return error_type(message)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                header = await self.reader.readexactly(HEADER.size)
+                data = await self.reader.readexactly(_frame_size(header))
+                self.bytes_received += len(data) + HEADER.size
+                self._dispatch(self.decode(data))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        except BAD_FRAME_ERRORS as e:
+            # A malformed or oversized frame; the monitor restarts the worker
+            get_logger('plugin_isolation').error(f"Closing plugin channel after a bad frame: {e}")
+        finally:
+            self._close()
+
+    def _dispatch(self, frame: tuple):
+        kind, call_id, op, payload = frame
+        if kind in (REPLY, ERROR):
+            future = self._pending.get(call_id)
+            if future is not None and not future.done():
+                if kind == REPLY:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(self.exception_for(payload))
+            return
+        task = asyncio.create_task(self._serve(kind, call_id, op, payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _serve(self, kind: str, call_id: int, op: str, args: tuple):
+        try:
+            result = await self.serve(op, args)
+        except Exception as e:
+            if kind == CALL and not self.closed.is_set():
+                await self._send_quietly((ERROR, call_id, None, _error_payload(e)))
+            return
+        if kind != CALL or self.closed.is_set():
+            return
+        try:
+            await self._send((REPLY, call_id, None, result))
+        except (ConnectionError, OSError):
+            pass
+        except Exception as e:
+            await self._send_quietly((ERROR, call_id, None, _error_payload(e)))
+
+    async def _send_quietly(self, frame: tuple):
+        try:
+            await self._send(frame)
+        except (IsolatedPluginError, ConnectionError, OSError):
+            pass
+
+    def _close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(IsolatedPluginError("Worker channel closed"))
+        self.writer.close()
+
+    async def close(self):
+        """Close the channel and stop serving requests"""
+        self._read_task.cancel()
+        await asyncio.gather(self._read_task, return_exceptions=True)
+        self._close()
+        for task in list(self._tasks):
+            task.cancel()
+
+
+@dataclass
+class WorkerStats:
+    """Resource accounting for an isolated plugin's worker process"""
+    pid: Optional[int] = None
+    started_at: Optional[float] = None  # monotonic
+    rss_bytes: int = 0
+    peak_rss_bytes: int = 0
+    cpu_percent: float = 0.0
+    cpu_seconds: float = 0.0  # user + system, current process
+    cpu_seconds_total: float = 0.0  # including replaced processes
+    threads: int = 0
+    restarts: int = 0
+    last_restart_reason: Optional[str] = None
+    calls: int = 0
+    call_errors: int = 0
+    call_timeouts: int = 0
+    rejected: int = 0
+
+
+class IsolatedPlugin(BasePlugin):
+    """
+    Stand-in for a plugin that runs in a worker process.
+
+    Lifecycle calls, commands, menu selections and routed messages are
+    forwarded to the worker. The worker's requests for storage, HTTP and
+    core services are served here with the plugin's own permissions.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any], plugin_manager: PluginManager,
+                 plugin_paths: Optional[List[Path]] = None, call_timeout: float = 30.0,
+                 start_timeout: float = 60.0, max_pending: int = 100, max_memory_mb: float = 0,
+                 max_restarts: int = 5, restart_window: float = 300.0,
+                 monitor_interval: float = 10.0):
+        super().__init__(name, config, plugin_manager)
+        self.plugin_paths = [Path(path) for path in (plugin_paths or plugin_manager.plugin_paths)]
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+        self.max_pending = max_pending
+        self.max_memory_mb = max_memory_mb
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.monitor_interval = monitor_interval
+
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.channel: Optional[_Channel] = None
+        self.stats = WorkerStats()
+        self.latency = LogHistogram()
+        self.failed = False  # gave up restarting
+        self._metadata: Optional[PluginMetadata] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._psutil_process: Optional[psutil.Process] = None
+        self._restart_times: Deque[float] = deque()
+        self._restart_lock = asyncio.Lock()
+        self._stopping = False
+
+        # Host-side helpers used on the worker's behalf
+        self._storage = PluginStorage(name, plugin_manager)
+        self._http_client = PluginHTTPClient(name)
+
+        registry = get_metrics_registry()
+        self._memory_metric = registry.gauge(
+            'plugin_process_memory_bytes', 'Resident memory of isolated plugin workers', ['plugin']
+        ).labels(name)
+        self._cpu_metric = registry.gauge(
+            'plugin_process_cpu_seconds', 'CPU time used by isolated plugin workers', ['plugin']
+        ).labels(name)
+        self._restart_metric = registry.counter(
+            'plugin_process_restarts_total', 'Isolated plugin worker restarts', ['plugin', 'reason']
+        )
+        self._call_metric = registry.histogram(
+            'plugin_ipc_call_seconds', 'Round-trip time of calls into isolated plugin workers', ['plugin']
+        ).labels(name)
+
+    # Worker process management
+
+    async def _spawn(self):
+        """Start a worker process and connect its channels"""
+        host_main, worker_main = socket.socketpair()
+        host_sync, worker_sync = socket.socketpair()
+        context = multiprocessing.get_context('spawn')
+        self.process = context.Process(
+            target=run_worker,
+            args=(worker_main, worker_sync, self.name, [str(p) for p in self.plugin_paths],
+                  self.config, self._features()),
+            name=f"plugin-{self.name}",
+            daemon=True
+        )
+        await asyncio.get_running_loop().run_in_executor(None, self.process.start)
+        worker_main.close()
+        worker_sync.close()
+
+        reader, writer = await asyncio.open_unix_connection(sock=host_main)
+        self.channel = _Channel(reader, writer, self._serve, max_pending=self.max_pending)
+        sync_reader, sync_writer = await asyncio.open_unix_connection(sock=host_sync)
+        self._sync_task = asyncio.create_task(self._serve_sync(sync_reader, sync_writer))
+
+        self.stats.pid = self.process.pid
+        self.stats.started_at = time.monotonic()
+        self.stats.rss_bytes = 0
+        self.stats.cpu_seconds = 0.0
+        try:
+            self._psutil_process = psutil.Process(self.process.pid)
+            self._psutil_process.cpu_percent(interval=None)  # prime the non-blocking measurement
+        except psutil.Error:
+            self._psutil_process = None
+        self.logger.info(f"Started worker process {self.process.pid} for isolated plugin {self.name}")
+
+    def _features(self) -> Dict[str, Any]:
+        """Host facilities the worker's stand-in plugin manager should offer"""
+        config_manager = getattr(self.plugin_manager, 'config_manager', None)
+        return {
+            'menu': hasattr(self.plugin_manager, 'plugin_menu_registry'),
+            'core_services': hasattr(self.plugin_manager, 'core_service_access'),
+            'config_manager': config_manager is not None,
+            'config_methods': [
+                method for method in SCOPED_METHODS['config_manager'] | {'register_config_change_callback'}
+                if callable(getattr(config_manager, method, None))
+            ]
+        }
+
+    async def _terminate(self):
+        """Close the channels and end the worker process"""
+        if self.channel is not None:
+            await self.channel.close()
+            self.channel = None
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+        process, self.process = self.process, None
+        if process is None:
+            return
+        self.stats.cpu_seconds_total += self.stats.cpu_seconds
+        loop = asyncio.get_running_loop()
+        # The worker exits when its channel closes; escalate if it does not
+        await loop.run_in_executor(None, process.join, 2.0)
+        if process.is_alive():
+            process.terminate()
+            await loop.run_in_executor(None, process.join, 2.0)
+        if process.is_alive():
+            process.kill()
+            await loop.run_in_executor(None, process.join, 1.0)
+        self._psutil_process = None
+
+    async def _call(self, op: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Call the worker, recording latency and failures"""
+        if self.channel is None:
+            raise IsolatedPluginError(f"Isolated plugin {self.name} has no worker")
+        start = time.perf_counter()
+        self.stats.calls += 1
+        try:
+            return await self.channel.call(op, *args, timeout=timeout or self.call_timeout)
+        except IsolatedPluginError as e:
+            if 'timed out' in str(e):
+                self.stats.call_timeouts += 1
+            elif 'outstanding' in str(e):
+                self.stats.rejected += 1
+            self.stats.call_errors += 1
+            raise
+        except Exception:
+            self.stats.call_errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.latency.record(elapsed)
+            self._call_metric.observe(elapsed)
+
+    # Plugin lifecycle
+
+    async def initialize(self) -> bool:
+        """Start the worker, which imports and initializes the plugin"""
+        try:
+            await self._spawn()
+            metadata = await self._call('initialize', timeout=self.start_timeout)
+        except Exception as e:
+            self.logger.error(f"Failed to initialize isolated plugin {self.name}: {e}")
+            await self._terminate()
+            return False
+        if metadata is None:
+            await self._terminate()
+            return False
+
+        self._metadata = self._build_metadata(metadata)
+        self._monitor_task = asyncio.create_task(self._monitor_loop())
+        return True
+
+    async def start(self) -> bool:
+        try:
+            self.is_running = bool(await self._call('start', timeout=self.start_timeout))
+        except Exception as e:
+            self.logger.error(f"Failed to start isolated plugin {self.name}: {e}")
+            self.is_running = False
+        return self.is_running
+
+    async def stop(self) -> bool:
+        self.is_running = False
+        try:
+            return bool(await self._call('stop'))
+        except Exception as e:
+            self.logger.error(f"Failed to stop isolated plugin {self.name}: {e}")
+            return False
+        finally:
+            self._unregister_entry_points()
+
+    async def cleanup(self) -> bool:
+        self._stopping = True
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        try:
+            if self.channel is not None and not self.channel.closed.is_set():
+                await self._call('cleanup')
+        except Exception as e:
+            self.logger.warning(f"Cleanup of isolated plugin {self.name} failed: {e}")
+        await self._terminate()
+        await self._http_client.close()
+        return True
+
+    async def health_check(self) -> bool:
+        if self.failed or self.process is None or not self.process.is_alive():
+            return False
+        try:
+            return bool(await self._call('health_check'))
+        except Exception:
+            return False
+
+    def get_metadata(self) -> PluginMetadata:
+        if self._metadata is not None:
+            return self._metadata
+        return PluginMetadata(name=self.name, version="unknown", description="", author="")
+
+    @staticmethod
+    def _build_metadata(data: Dict[str, Any]) -> PluginMetadata:
+        return PluginMetadata(
+            name=data['name'],
+            version=data['version'],
+            description=data['description'],
+            author=data['author'],
+            dependencies=[PluginDependency(*dep) for dep in data['dependencies']],
+            priority=PluginPriority(data['priority']),
+            enabled=data['enabled'],
+            config_schema=data['config_schema']
+        )
+
+    async def handle_message(self, message: Any) -> Optional[Any]:
+        """Forward a routed message to the plugin's message handler"""
+        try:
+            return await self._call('handle_message', message)
+        except Exception as e:
+            self.logger.error(f"Isolated plugin {self.name} failed to handle message: {e}")
+            return None
+
+    # Supervision
+
+    async def _monitor_loop(self):
+        """Sample resource use, ping the worker and restart it when needed"""
+        try:
+            while not self._stopping:
+                channel = self.channel
+                if channel is not None:
+                    try:
+                        await asyncio.wait_for(channel.closed.wait(), self.monitor_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(self.monitor_interval)
+                if self._stopping:
+                    return
+
+                reason = await self._check_worker()
+                if reason:
+                    await self.restart_worker(reason)
+        except asyncio.CancelledError:
+            pass
+
+    async def _check_worker(self) -> Optional[str]:
+        """Update resource stats; return why the worker needs a restart, if it does"""
+        if self.failed:
+            return None
+        if self.process is None or not self.process.is_alive() or self.channel is None \
+                or self.channel.closed.is_set():
+            return 'exited'
+
+        self.sample_resources()
+        if self.max_memory_mb and self.stats.rss_bytes > self.max_memory_mb * 1024 * 1024:
+            self.logger.warning(
+                f"Isolated plugin {self.name} uses {self.stats.rss_bytes / 1048576:.0f} MB, "
+                f"over its {self.max_memory_mb} MB limit"
+            )
+            return 'memory'
+
+        try:
+            await self.channel.call('ping', timeout=self.call_timeout)
+        except IsolatedPluginError:
+            if self.channel is None or self.channel.closed.is_set():
+                return 'exited'
+            self.logger.warning(f"Isolated plugin {self.name} did not answer for {self.call_timeout}s")
+            return 'unresponsive'
+        return None
+
+    def sample_resources(self):
+        """Read the worker's memory and CPU use"""
+        if self._psutil_process is None:
+            return
+        try:
+            with self._psutil_process.oneshot():
+                memory = self._psutil_process.memory_info()
+                cpu_times = self._psutil_process.cpu_times()
+                self.stats.cpu_percent = self._psutil_process.cpu_percent(interval=None)
+                self.stats.threads = self._psutil_process.num_threads()
+        except psutil.Error:
+            return
+        self.stats.rss_bytes = memory.rss
+        self.stats.peak_rss_bytes = max(self.stats.peak_rss_bytes, memory.rss)
+        self.stats.cpu_seconds = cpu_times.user + cpu_times.system
+        self._memory_metric.set(memory.rss)
+        self._cpu_metric.set(self.stats.cpu_seconds_total + self.stats.cpu_seconds)
+
+    async def restart_worker(self, reason: str) -> bool:
+        """
+        Replace the worker process, re-initializing the plugin in a new one.
+
+        Restarts back off exponentially. After ``max_restarts`` within
+        ``restart_window`` seconds the plugin is marked failed and left down.
+        """
+        async with self._restart_lock:
+            if self._stopping or self.failed:
+                return False
+            now = time.monotonic()
+            while self._restart_times and now - self._restart_times[0] > self.restart_window:
+                self._restart_times.popleft()
+            if len(self._restart_times) >= self.max_restarts:
+                self.logger.error(
+                    f"Isolated plugin {self.name} restarted {len(self._restart_times)} times "
+                    f"in {self.restart_window}s; giving up"
+                )
+                self.failed = True
+                self.is_running = False
+                self._unregister_entry_points()
+                await self._terminate()
+                return False
+
+            delay = min(2 ** len(self._restart_times) - 1, 60)
+            self._restart_times.append(now)
+            self.stats.restarts += 1
+            self.stats.last_restart_reason = reason
+            self._restart_metric.labels(self.name, reason).inc()
+            self.logger.warning(f"Restarting worker for isolated plugin {self.name} ({reason})")
+
+            was_running, self.is_running = self.is_running, False
+            self._unregister_entry_points()
+            await self._terminate()
+            if delay:
+                await asyncio.sleep(delay)
+
+            try:
+                await self._spawn()
+                metadata = await self._call('initialize', timeout=self.start_timeout)
+                if metadata is None:
+                    raise IsolatedPluginError("initialize() returned False")
+                if was_running:
+                    self.is_running = bool(await self._call('start', timeout=self.start_timeout))
+                return True
+            except Exception as e:
+                self.logger.error(f"Failed to restart isolated plugin {self.name}: {e}")
+                self.is_running = False
+                await self._terminate()
+                return False
+
+    def get_process_stats(self) -> Dict[str, Any]:
+        """Worker resource use and IPC statistics"""
+        stats = self.stats
+        uptime = time.monotonic() - stats.started_at if stats.started_at and self.process else 0.0
+        return {
+            'pid': stats.pid if self.process else None,
+            'alive': bool(self.process and self.process.is_alive()),
+            'failed': self.failed,
+            'uptime_seconds': round(uptime, 1),
+            'rss_bytes': stats.rss_bytes,
+            'peak_rss_bytes': stats.peak_rss_bytes,
+            'cpu_percent': stats.cpu_percent,
+            'cpu_seconds': round(stats.cpu_seconds_total + stats.cpu_seconds, 3),
+            'threads': stats.threads,
+            'restarts': stats.restarts,
+            'last_restart_reason': stats.last_restart_reason,
+            'calls': stats.calls,
+            'call_errors': stats.call_errors,
+            'call_timeouts': stats.call_timeouts,
+            'rejected': stats.rejected,
+            'pending': self.channel.pending if self.channel else 0,
+            'bytes_sent': self.channel.bytes_sent if self.channel else 0,
+            'bytes_received': self.channel.bytes_received if self.channel else 0,
+            'latency': self.latency.get_stats()
+        }
+
+    # Requests from the worker
+
+    async def _serve(self, op: str, args: tuple) -> Any:
+        handler = getattr(self, f'_op_{op}', None)
+        if handler is None:
+            raise IsolatedPluginError(f"Unknown operation: {op}")
+        result = handler(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _serve_sync(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer the worker's blocking calls, one at a time"""
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                kind, call_id, op, args = _decode_data(await reader.readexactly(_frame_size(header)))
+                if kind != CALL:
+                    raise ValueError(f"Unexpected '{kind}' frame on the sync channel")
+                try:
+                    frame = (REPLY, call_id, None, await self._serve(op, args))
+                    data = _encode(frame)
+                except Exception as e:
+                    data = _encode((ERROR, call_id, None, _error_payload(e)))
+                writer.write(data)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        except BAD_FRAME_ERRORS as e:
+            self.logger.error(f"Closing sync channel of isolated plugin {self.name} after a bad frame: {e}")
+        finally:
+            writer.close()
+
+    def _router(self):
+        return getattr(self.plugin_manager, 'message_router', None)
+
+    def _op_register_command(self, command: str, help_text: str, priority: int):
+        router = self._router()
+        if router is not None:
+            router.register_plugin_command(self.name, command, self._command_forwarder(command),
+                                           help_text, priority)
+
+    def _op_unregister_commands(self):
+        router = self._router()
+        if router is not None:
+            router.unregister_plugin_commands(self.name)
+
+    def _op_register_menu_item(self, menu: str, label: str, command: str, description: str,
+                               admin_only: bool, order: int):
+        self.plugin_manager.plugin_menu_registry.register_menu_item(
+            plugin_name=self.name, menu=menu, label=label, command=command,
+            handler=self._menu_forwarder(command), description=description,
+            admin_only=admin_only, order=order
+        )
+
+    def _op_unregister_menu_items(self):
+        registry = getattr(self.plugin_manager, 'plugin_menu_registry', None)
+        if registry is not None:
+            registry.unregister_plugin_menu_items(self.name)
+
+    def _op_register_inter_plugin_handler(self):
+        async def forward(message):
+            return await self._call('inter_plugin_message', message)
+        self.plugin_manager.core_service_access.inter_plugin.register_message_handler(self.name, forward)
+
+    def _op_register_config_callback(self):
+        def forward(changed_keys: Dict[str, Any], new_config: Dict[str, Any]):
+            if self.channel is not None and not self.channel.closed.is_set():
+                self.channel.notify('config_changed', changed_keys, new_config)
+        self.plugin_manager.config_manager.register_config_change_callback(self.name, forward)
+
+    async def _op_event(self, event_type: str, data: Any):
+        await self.plugin_manager.handle_plugin_event(self.name, event_type, data)
+
+    async def _op_helper(self, helper: str, method: str, args: tuple, kwargs: Dict[str, Any]):
+        """Call the host's storage or HTTP helper for the worker"""
+        target = {'storage': self._storage, 'http': self._http_client}.get(helper)
+        function = None if method.startswith('_') else getattr(target, method, None)
+        if function is None or not inspect.iscoroutinefunction(function) or method == 'close':
+            raise IsolatedPluginError(f"{helper}.{method} is not available to isolated plugins")
+        return await function(*args, **kwargs)
+
+    async def _op_service(self, service: str, method: str, args: tuple, kwargs: Dict[str, Any]):
+        """Call a core service on the worker's behalf, as this plugin"""
+        if method not in SCOPED_METHODS.get(service, ()):
+            raise IsolatedPluginError(f"{service}.{method} is not available to isolated plugins")
+        if service == 'config_manager':
+            target = self.plugin_manager.config_manager
+        else:
+            target = getattr(self.plugin_manager.core_service_access, service)
+        result = getattr(target, method)(self.name, *args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    # Forwarding handlers registered in the main process
+
+    def _command_forwarder(self, command: str) -> Callable:
+        async def forward(args: List[str], context: Dict[str, Any]) -> Any:
+            return await self._call('command', command, args, _picklable(context))
+        return forward
+
+    def _menu_forwarder(self, command: str) -> Callable:
+        async def forward(context: Dict[str, Any]) -> Any:
+            return await self._call('menu', command, _picklable(context))
+        return forward
+
+    def _unregister_entry_points(self):
+        self._op_unregister_commands()
+        self._op_unregister_menu_items()
+
+
+# Worker process side
+
+
+class _SyncClient:
+    """Blocking calls to the host, for plugin APIs that are not coroutines"""
+
+    def __init__(self, sock: socket.socket, error_types: Dict[str, type]):
+        self.sock = sock
+        self.error_types = error_types
+        self._ids = itertools.count(1)
+
+    def _recv_exactly(self, size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = self.sock.recv(size)
+            if not chunk:
+                raise IsolatedPluginError("Host closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def call(self, op: str, *args: Any) -> Any:
+        self.sock.sendall(_encode_data((CALL, next(self._ids), op, args)))
+        header = self._recv_exactly(HEADER.size)
+        kind, _, _, payload = pickle.loads(self._recv_exactly(HEADER.unpack(header)[0]))
+        if kind == ERROR:
+            name, message = payload
+            error_type = self.error_types.get(name) or getattr(builtins, name, None)
+            if isinstance(error_type, type) and issubclass(error_type, Exception):
+                raise error_type(message)
+            raise IsolatedPluginError(f"{name}: {message}")
+        return payload
+
+
+class _RemoteHelper:
+    """Worker replacement for PluginStorage / PluginHTTPClient that calls the host's"""
+
+    helper = ''
+
+    def __init__(self, plugin_name: str, *args: Any, **kwargs: Any):
+        self.plugin_name = plugin_name
+        self.runtime: Optional['_WorkerRuntime'] = _WorkerRuntime.current
+
+    def __getattr__(self, method: str):
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.runtime.channel.call('helper', self.helper, method, args, kwargs)
+        return call
+
+
+class _RemoteStorage(_RemoteHelper):
+    helper = 'storage'
+
+
+class _RemoteHTTPClient(_RemoteHelper):
+    helper = 'http'
+
+    async def close(self):
+        """The host owns the HTTP session"""
+        pass
+
+
+class _RemoteService:
+    """Worker view of a core service; the host fills in the plugin name"""
+
+    def __init__(self, runtime: '_WorkerRuntime', service: str, blocking: bool,
+                 available: Optional[List[str]] = None):
+        self._runtime = runtime
+        self._service = service
+        self._blocking = blocking
+        self._available = set(SCOPED_METHODS[service] if available is None else available)
+
+    def __getattr__(self, method: str):
+        if method.startswith('_') or method not in self._available:
+            raise AttributeError(method)
+        runtime, service = self._runtime, self._service
+
+        if self._blocking:
+            def call(plugin_name: str, *args: Any, **kwargs: Any) -> Any:
+                return runtime.sync.call('service', service, method, args, kwargs)
+        else:
+            async def call(plugin_name: str, *args: Any, **kwargs: Any) -> Any:
+                return await runtime.channel.call('service', service, method, args, kwargs)
+        return call
+
+
+class _RemoteInterPlugin(_RemoteService):
+
+    def register_message_handler(self, plugin_name: str, handler: Callable):
+        self._runtime.inter_plugin_handler = handler
+        self._runtime.channel.notify('register_inter_plugin_handler')
+
+
+class _RemoteCoreServices:
+
+    def __init__(self, runtime: '_WorkerRuntime'):
+        self.message_routing = _RemoteService(runtime, 'message_routing', blocking=False)
+        self.system_state = _RemoteService(runtime, 'system_state', blocking=True)
+        self.inter_plugin = _RemoteInterPlugin(runtime, 'inter_plugin', blocking=False)
+
+
+class _RemoteConfigManager(_RemoteService):
+    """Worker view of the host's config manager, offering only the methods it has"""
+
+    def __init__(self, runtime: '_WorkerRuntime', available: List[str]):
+        super().__init__(runtime, 'config_manager', blocking=True,
+                         available=[m for m in available if m in SCOPED_METHODS['config_manager']])
+
+    def register_config_change_callback(self, plugin_name: str, callback: Callable):
+        self._runtime.config_callback = callback
+        self._runtime.channel.notify('register_config_callback')
+
+
+class _WorkerRouter:
+    """Records the plugin's command handlers and registers forwarders on the host"""
+
+    def __init__(self, runtime: '_WorkerRuntime'):
+        self._runtime = runtime
+
+    def register_plugin_command(self, plugin_name: str, command: str, handler: Callable,
+                                help_text: str = "", priority: int = 100,
+                                handler_instance: Optional[Any] = None) -> bool:
+        self._runtime.commands[command.lower()] = handler
+        self._runtime.channel.notify('register_command', command, help_text, priority)
+        return True
+
+    def unregister_plugin_commands(self, plugin_name: str) -> int:
+        count = len(self._runtime.commands)
+        self._runtime.commands.clear()
+        self._runtime.channel.notify('unregister_commands')
+        return count
+
+
+class _WorkerMenuRegistry:
+
+    def __init__(self, runtime: '_WorkerRuntime'):
+        self._runtime = runtime
+
+    def register_menu_item(self, plugin_name: str, menu: str, label: str, command: str,
+                           handler: Callable, description: str = "", admin_only: bool = False,
+                           order: int = 100) -> bool:
+        self._runtime.menu_handlers[command] = handler
+        self._runtime.channel.notify('register_menu_item', menu, label, command, description,
+                                     admin_only, order)
+        return True
+
+    def unregister_plugin_menu_items(self, plugin_name: str) -> int:
+        count = len(self._runtime.menu_handlers)
+        self._runtime.menu_handlers.clear()
+        self._runtime.channel.notify('unregister_menu_items')
+        return count
+
+
+class _WorkerPluginManager:
+    """The plugin manager as seen by a plugin running in a worker process"""
+
+    def __init__(self, runtime: '_WorkerRuntime', features: Dict[str, Any]):
+        self.runtime = runtime
+        self.message_router = _WorkerRouter(runtime)
+        if features['menu']:
+            self.plugin_menu_registry = _WorkerMenuRegistry(runtime)
+        if features['core_services']:
+            self.core_service_access = _RemoteCoreServices(runtime)
+        if features['config_manager']:
+            methods = features['config_methods']
+            if 'register_config_change_callback' in methods:
+                self.config_manager = _RemoteConfigManager(runtime, methods)
+            else:
+                self.config_manager = _RemoteService(runtime, 'config_manager', blocking=True,
+                                                     available=methods)
+
+    async def handle_plugin_event(self, plugin_name: str, event_type: str, data: Any = None):
+        self.runtime.channel.notify('event', event_type, data)
+
+
+class _WorkerRuntime:
+    """Hosts one plugin inside a worker process"""
+
+    current: Optional['_WorkerRuntime'] = None
+
+    def __init__(self, plugin_name: str, plugin_paths: List[str], config: Dict[str, Any],
+                 features: Dict[str, Any], sync_sock: socket.socket):
+        self.plugin_name = plugin_name
+        self.plugin_paths = plugin_paths
+        self.config = config
+        self.features = features
+        self.plugin = None
+        self.channel: Optional[_Channel] = None
+        self.error_types: Dict[str, type] = {'IsolatedPluginError': IsolatedPluginError}
+        self.sync = _SyncClient(sync_sock, self.error_types)
+        self.commands: Dict[str, Callable] = {}
+        self.menu_handlers: Dict[str, Callable] = {}
+        self.inter_plugin_handler: Optional[Callable] = None
+        self.config_callback: Optional[Callable] = None
+        _WorkerRuntime.current = self
+
+    async def run(self, main_sock: socket.socket):
+        reader, writer = await asyncio.open_unix_connection(sock=main_sock)
+        self.channel = _Channel(reader, writer, self._serve, self.error_types,
+                                encode=_encode_data, decode=pickle.loads)
+        await self.channel.closed.wait()
+
+    async def _serve(self, op: str, args: tuple) -> Any:
+        handler = getattr(self, f'_op_{op}', None)
+        if handler is None:
+            raise IsolatedPluginError(f"Unknown operation: {op}")
+        result = handler(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _import_plugin_class(self):
+        src_path = Path(__file__).parent.parent
+        for path in [str(src_path)] + self.plugin_paths:
+            if path not in sys.path:
+                sys.path.insert(0, path)
+        for plugin_path in self.plugin_paths:
+            module_path = Path(plugin_path) / self.plugin_name
+            if (module_path / "__init__.py").exists() and str(module_path) not in sys.path:
+                sys.path.insert(0, str(module_path))
+
+        module = importlib.import_module(self.plugin_name)
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            # Plugins import EnhancedPlugin as core.* or src.core.*, so match by name
+            bases = [base for base in obj.__mro__[1:] if base.__name__ == 'EnhancedPlugin']
+            if bases and obj.__name__ != 'EnhancedPlugin':
+                return obj, sys.modules[bases[0].__module__]
+        raise TypeError(f"No EnhancedPlugin subclass found in {self.plugin_name}")
+
+    async def _op_initialize(self) -> Optional[Dict[str, Any]]:
+        plugin_class, enhanced = self._import_plugin_class()
+
+        # This process only runs this plugin, so its storage and HTTP client
+        # can be swapped for ones that call the host's
+        enhanced.PluginStorage = _RemoteStorage
+        enhanced.PluginHTTPClient = _RemoteHTTPClient
+        for name in ('RateLimitExceeded', 'HTTPRequestError', 'PermissionDeniedError'):
+            if hasattr(enhanced, name):
+                self.error_types[name] = getattr(enhanced, name)
+
+        self.plugin = plugin_class(self.plugin_name, self.config, _WorkerPluginManager(self, self.features))
+        if not await self.plugin.initialize():
+            return None
+
+        metadata = self.plugin.get_metadata()
+        return {
+            'name': metadata.name,
+            'version': metadata.version,
+            'description': metadata.description,
+            'author': metadata.author,
+            'dependencies': [(dep.name, dep.version, dep.optional) for dep in metadata.dependencies],
+            'priority': metadata.priority.value,
+            'enabled': metadata.enabled,
+            'config_schema': metadata.config_schema
+        }
+
+    async def _op_start(self) -> bool:
+        return await self.plugin.start()
+
+    async def _op_stop(self) -> bool:
+        return await self.plugin.stop()
+
+    async def _op_cleanup(self) -> bool:
+        return await self.plugin.cleanup()
+
+    async def _op_health_check(self) -> bool:
+        return await self.plugin.health_check()
+
+    def _op_ping(self) -> bool:
+        return True
+
+    async def _op_command(self, command: str, args: List[str], context: Dict[str, Any]) -> Any:
+        handler = self.commands.get(command.lower())
+        if handler is None:
+            raise IsolatedPluginError(f"Command '{command}' is not registered")
+        return await handler(args, context)
+
+    async def _op_menu(self, command: str, context: Dict[str, Any]) -> Any:
+        handler = self.menu_handlers.get(command)
+        if handler is None:
+            raise IsolatedPluginError(f"Menu command '{command}' is not registered")
+        return await handler(context)
+
+    async def _op_handle_message(self, message: Any) -> Any:
+        return await self.plugin.handle_message(message)
+
+    async def _op_inter_plugin_message(self, message: Any) -> Any:
+        if self.inter_plugin_handler is None:
+            return None
+        return await self.inter_plugin_handler(message)
+
+    def _op_config_changed(self, changed_keys: Dict[str, Any], new_config: Dict[str, Any]):
+        if self.config_callback is not None:
+            self.config_callback(changed_keys, new_config)
+
+
+def run_worker(main_sock: socket.socket, sync_sock: socket.socket, plugin_name: str,
+               plugin_paths: List[str], config: Dict[str, Any], features: Dict[str, Any]):
+    """Worker process entry point"""
+    # The host decides when the worker stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    runtime = _WorkerRuntime(plugin_name, plugin_paths, config, features, sync_sock)
+    try:
+        asyncio.run(runtime.run(main_sock))
+    except Exception:
+        traceback.print_exc()
+        sys.exit(1)
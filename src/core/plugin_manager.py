@@ -23,6 +23,8 @@ import uuid
 
 from .config import ConfigurationManager
 from .logging import get_logger
+from .http_pool import get_http_pool
+from .storage_cache import get_storage_cache_stats
 from .plugin_manifest import PluginManifest, ManifestLoader
 
 
@@ -37,6 +39,7 @@ class PluginStatus(Enum):
     STOPPED = "stopped"
     FAILED = "failed"
     DISABLED = "disabled"
+    DORMANT = "dormant"  # lazy plugin: commands registered from its manifest, module not imported
 
 
 class PluginPriority(Enum):
@@ -181,6 +184,9 @@ class PluginInfo:
     config: Dict[str, Any] = field(default_factory=dict)
     manifest: Optional[PluginManifest] = None  # Plugin manifest if available
     plugin_path: Optional[Path] = None  # Path to plugin directory
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per phase (import, initialize, start)
+    lazy: bool = False  # activated on first use and unloaded when idle
+    activations: int = 0
     
     def get_uptime(self) -> Optional[timedelta]:
         """Get plugin uptime"""
@@ -196,8 +202,13 @@ class PluginInfo:
             'uptime_seconds': uptime.total_seconds() if uptime else 0,
             'load_time': self.load_time.isoformat() if self.load_time else None,
             'start_time': self.start_time.isoformat() if self.start_time else None,
+            'timings_ms': {phase: round(seconds * 1000, 1) for phase, seconds in self.timings.items()},
+            'lazy': self.lazy,
+            'activations': self.activations,
             'health': {
-                'is_healthy': self.health.is_healthy(),
+                # A dormant plugin has nothing running to heartbeat, so it
+                # is not unhealthy and must not be restarted
+                'is_healthy': self.status == PluginStatus.DORMANT or self.health.is_healthy(),
                 'failure_count': self.health.failure_count,
                 'restart_count': self.health.restart_count,
                 'consecutive_successes': self.health.consecutive_successes,
@@ -357,6 +368,38 @@ class PluginManager:
         # Dependency management
         self.dependency_graph: Dict[str, Set[str]] = {}
         self.startup_order: List[str] = []
+        self.startup_levels: List[List[str]] = []
+        
+        # Concurrent discovery, import and startup
+        self.parallel_startup = config_manager.get('plugins.parallel_startup', True)
+        self._discovered_manifests: Dict[str, PluginManifest] = {}
+        self.startup_report: Dict[str, Any] = {}
+        
+        # Lazy activation: plugins imported on their first command, unloaded when idle
+        lazy_config = config_manager.get('plugins.lazy', {})
+        if not isinstance(lazy_config, dict):
+            lazy_config = {}
+        self.lazy_enabled = lazy_config.get('enabled', False)
+        self.lazy_plugins: Set[str] = set(lazy_config.get('plugins', []))
+        self.lazy_idle_ttl = lazy_config.get('idle_ttl', 1800)
+        self.lazy_check_interval = lazy_config.get('check_interval', 60)
+        self._lazy_configs: Dict[str, Dict[str, Any]] = {}
+        self._activation_locks: Dict[str, asyncio.Lock] = {}
+        self._lazy_stubs: Dict[str, Dict[str, Callable]] = {}
+        self._activated_at: Dict[str, float] = {}
+        self.idle_unload_task: Optional[asyncio.Task] = None
+        
+        # Process isolation: plugins that run in their own worker process
+        isolation_config = config_manager.get('plugins.isolation', {})
+        if not isinstance(isolation_config, dict):
+            isolation_config = {}
+        self.isolated_plugins: Set[str] = set(isolation_config.get('plugins', []))
+        self.isolation_options = {
+            key: isolation_config[key]
+            for key in ('call_timeout', 'start_timeout', 'max_pending', 'max_memory_mb',
+                        'max_restarts', 'restart_window', 'monitor_interval')
+            if key in isolation_config
+        }
         
         # Health monitoring
         self.health_monitor_task: Optional[asyncio.Task] = None
@@ -440,8 +483,8 @@ class PluginManager:
         Returns:
             List[str]: List of discovered plugin names
         """
-        discovered = []
-        discovered_names = set()  # Track names to avoid duplicates
+        start = time.perf_counter()
+        candidates: Dict[str, Path] = {}  # first directory found for each name
         
         for plugin_path in self.plugin_paths:
             if not plugin_path.exists():
@@ -459,36 +502,44 @@ class PluginManager:
                 if not (item / "__init__.py").exists():
                     continue
                 
-                plugin_name = item.name
-                
-                # Skip if already discovered in this run
-                if plugin_name in discovered_names:
-                    continue
-                
-                # Skip if already loaded
-                if plugin_name in self.plugins:
+                # Skip if already discovered in this run or already loaded
+                if item.name in candidates or item.name in self.plugins:
                     continue
                 
-                # Check for manifest.yaml (third-party plugins)
-                manifest_path = item / "manifest.yaml"
-                if manifest_path.exists():
-                    # Try to load and validate manifest
-                    manifest = ManifestLoader.load_from_directory(item)
-                    if manifest:
-                        discovered.append(plugin_name)
-                        discovered_names.add(plugin_name)
-                        self.logger.debug(f"Discovered third-party plugin: {plugin_name} (with manifest)")
-                    else:
-                        self.logger.warning(f"Plugin {plugin_name} has invalid manifest, skipping")
-                else:
-                    # Internal plugin without manifest
-                    discovered.append(plugin_name)
-                    discovered_names.add(plugin_name)
-                    self.logger.debug(f"Discovered internal plugin: {plugin_name} (no manifest)")
+                candidates[item.name] = item
         
+        # Parse manifests (third-party plugins) concurrently in worker threads
+        with_manifest = [name for name, item in candidates.items() if (item / "manifest.yaml").exists()]
+        manifests = await self._run_concurrently(
+            [(ManifestLoader.load_from_directory, candidates[name]) for name in with_manifest]
+        )
+        parsed = dict(zip(with_manifest, manifests))
+        
+        discovered = []
+        for plugin_name in candidates:
+            if plugin_name not in parsed:
+                # Internal plugin without manifest
+                discovered.append(plugin_name)
+                self.logger.debug(f"Discovered internal plugin: {plugin_name} (no manifest)")
+            elif parsed[plugin_name]:
+                discovered.append(plugin_name)
+                self._discovered_manifests[plugin_name] = parsed[plugin_name]
+                self.logger.debug(f"Discovered third-party plugin: {plugin_name} (with manifest)")
+            else:
+                self.logger.warning(f"Plugin {plugin_name} has invalid manifest, skipping")
+        
+        self.startup_report['discovery_ms'] = round((time.perf_counter() - start) * 1000, 1)
         self.logger.info(f"Discovered {len(discovered)} plugins: {discovered}")
         return discovered
     
+    async def _run_concurrently(self, calls: List[tuple]) -> List[Any]:
+        """Run blocking ``(function, *args)`` calls in worker threads, or inline if parallel startup is off"""
+        if not self.parallel_startup:
+            return [function(*args) for function, *args in calls]
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(*(loop.run_in_executor(None, function, *args)
+                                           for function, *args in calls)))
+    
     async def load_plugin(self, plugin_name: str, config: Optional[Dict[str, Any]] = None) -> bool:
         """
         Load a plugin by name.
@@ -533,10 +584,12 @@ class PluginManager:
             
             plugin_info.plugin_path = plugin_dir
             
-            # Load manifest if it exists
+            # Load manifest if it exists (parsed already if the plugin was just discovered)
             manifest_path = plugin_dir / "manifest.yaml"
             if manifest_path.exists():
-                manifest = ManifestLoader.load_from_directory(plugin_dir)
+                manifest = self._discovered_manifests.pop(plugin_name, None)
+                if manifest is None:
+                    manifest = ManifestLoader.load_from_directory(plugin_dir)
                 if not manifest:
                     raise ValueError(f"Invalid manifest for plugin: {plugin_name}")
                 
@@ -558,29 +611,45 @@ class PluginManager:
                 
                 self.logger.info(f"Loaded manifest for plugin {plugin_name} v{manifest.version}")
             
-            # Find and import the plugin module
-            module = await self._import_plugin_module(plugin_name)
-            if not module:
-                raise ImportError(f"Could not import plugin module: {plugin_name}")
-            
-            plugin_info.module = module
-            
-            # Find the plugin class
-            plugin_class = self._find_plugin_class(module)
-            if not plugin_class:
-                raise ValueError(f"No valid plugin class found in {plugin_name}")
-            
-            # Create plugin instance
-            plugin_instance = plugin_class(plugin_name, plugin_info.config, self)
+            isolated = plugin_name in self.isolated_plugins
+            if isolated:
+                # The worker process imports the module; this process never does
+                from .plugin_isolation import IsolatedPlugin
+                plugin_instance = IsolatedPlugin(plugin_name, plugin_info.config, self,
+                                                 **self.isolation_options)
+            else:
+                # Find and import the plugin module
+                phase_start = time.perf_counter()
+                module = await self._import_plugin_module(plugin_name)
+                plugin_info.timings['import'] = time.perf_counter() - phase_start
+                if not module:
+                    raise ImportError(f"Could not import plugin module: {plugin_name}")
+                
+                plugin_info.module = module
+                
+                # Find the plugin class
+                plugin_class = self._find_plugin_class(module)
+                if not plugin_class:
+                    raise ValueError(f"No valid plugin class found in {plugin_name}")
+                
+                # Create plugin instance
+                plugin_instance = plugin_class(plugin_name, plugin_info.config, self)
             plugin_info.instance = plugin_instance
             
             # Get metadata from instance
             plugin_info.metadata = plugin_instance.get_metadata()
             
             # Initialize the plugin
-            if not await plugin_instance.initialize():
+            phase_start = time.perf_counter()
+            initialized = await plugin_instance.initialize()
+            plugin_info.timings['initialize'] = time.perf_counter() - phase_start
+            if not initialized:
                 raise RuntimeError(f"Plugin {plugin_name} initialization failed")
             
+            if isolated:
+                # Reported by the worker once the plugin is initialized
+                plugin_info.metadata = plugin_instance.get_metadata()
+            
             plugin_info.status = PluginStatus.LOADED
             plugin_info.load_time = datetime.utcnow()
             
@@ -596,6 +665,41 @@ class PluginManager:
             
             return False
     
+    async def load_plugins(self, plugin_configs: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        """
+        Load several plugins concurrently.
+        
+        Module imports run in worker threads and ``initialize()`` calls
+        overlap, so loading takes about as long as the slowest plugin rather
+        than the sum. With ``plugins.parallel_startup`` off, plugins are
+        loaded one at a time in the given order.
+        
+        Args:
+            plugin_configs: Plugin name to plugin configuration
+            
+        Returns:
+            Dict mapping each plugin name to whether it loaded
+        """
+        start = time.perf_counter()
+        names = list(plugin_configs)
+        
+        lazy = self._select_lazy_plugins(names)
+        for name in lazy:
+            self.register_lazy_plugin(name, plugin_configs[name])
+        names = [name for name in names if name not in lazy]
+        
+        if self.parallel_startup:
+            results = await asyncio.gather(*(self.load_plugin(name, plugin_configs[name]) for name in names))
+        else:
+            results = [await self.load_plugin(name, plugin_configs[name]) for name in names]
+        
+        loaded = [self.plugins[name] for name in names if name in self.plugins]
+        self.startup_report['load_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        self.startup_report['load_sum_ms'] = round(
+            sum(info.timings.get('import', 0.0) + info.timings.get('initialize', 0.0) for info in loaded) * 1000, 1
+        )
+        return {**{name: True for name in lazy}, **dict(zip(names, results))}
+    
     def _find_plugin_directory(self, plugin_name: str) -> Optional[Path]:
         """Find the directory containing a plugin"""
         for plugin_path in self.plugin_paths:
@@ -713,8 +817,13 @@ class PluginManager:
                     self.logger.debug(f"Attempting to import {plugin_name} from {plugin_path}")
                     self.logger.debug(f"Current sys.path: {sys.path[:5]}")
                     
-                    # Import the module
-                    module = importlib.import_module(plugin_name)
+                    # Import the module (in a worker thread, so other plugins load meanwhile)
+                    if self.parallel_startup:
+                        module = await asyncio.get_running_loop().run_in_executor(
+                            None, importlib.import_module, plugin_name
+                        )
+                    else:
+                        module = importlib.import_module(plugin_name)
                     self.logger.debug(f"Successfully imported {plugin_name}")
                     return module
                     
@@ -760,6 +869,10 @@ class PluginManager:
             if plugin_info.instance:
                 await plugin_info.instance.cleanup()
             
+            # A dormant lazy plugin only has stand-in handlers registered
+            if plugin_info.status == PluginStatus.DORMANT:
+                self._unregister_lazy_entry_points(plugin_name)
+            
             # Remove from plugins
             del self.plugins[plugin_name]
             
@@ -810,7 +923,10 @@ class PluginManager:
                 raise RuntimeError(f"Dependencies not satisfied for {plugin_name}")
             
             # Start the plugin
-            if not await plugin_info.instance.start():
+            phase_start = time.perf_counter()
+            started = await plugin_info.instance.start()
+            plugin_info.timings['start'] = time.perf_counter() - phase_start
+            if not started:
                 raise RuntimeError(f"Plugin {plugin_name} start method returned False")
             
             plugin_info.status = PluginStatus.RUNNING
@@ -925,6 +1041,8 @@ class PluginManager:
                 return await self.start_plugin(plugin_name)
             elif plugin_info.status == PluginStatus.STOPPED:
                 return await self.start_plugin(plugin_name)
+            elif plugin_info.status == PluginStatus.DORMANT:
+                return await self.activate_plugin(plugin_name)
             else:
                 self.logger.warning(f"Plugin {plugin_name} is in state {plugin_info.status}, attempting to reload")
                 await self.unload_plugin(plugin_name)
@@ -967,6 +1085,258 @@ class PluginManager:
         # Unload the plugin
         return await self.unload_plugin(plugin_name)
     
+    def _manifest_for(self, plugin_name: str) -> Optional[PluginManifest]:
+        """The plugin's manifest, from discovery if already parsed"""
+        manifest = self._discovered_manifests.get(plugin_name)
+        if manifest is None:
+            plugin_dir = self._find_plugin_directory(plugin_name)
+            if plugin_dir and (plugin_dir / "manifest.yaml").exists():
+                manifest = ManifestLoader.load_from_directory(plugin_dir)
+                if manifest:
+                    self._discovered_manifests[plugin_name] = manifest
+        return manifest
+    
+    def _select_lazy_plugins(self, plugin_names: List[str]) -> Set[str]:
+        """
+        Plugins to register for lazy activation instead of loading.
+        
+        A plugin qualifies when lazy activation is enabled (for it, or for
+        all plugins if no list is configured), its manifest declares commands
+        or menu items to trigger activation, and no other plugin being loaded
+        requires it. Plugins that declare scheduled tasks or message handlers
+        do work without being sent a command (escalation checks, polling,
+        keyword-routed messages), so they are always loaded eagerly.
+        """
+        if not self.lazy_enabled:
+            return set()
+        
+        manifests = {name: self._manifest_for(name) for name in plugin_names}
+        required = {
+            dep.name
+            for manifest in manifests.values() if manifest
+            for dep in manifest.plugin_dependencies if not dep.optional
+        }
+        return {
+            name for name, manifest in manifests.items()
+            if manifest and (manifest.commands or manifest.menu_items)
+            and not manifest.scheduled_tasks and not manifest.message_handlers
+            and (not self.lazy_plugins or name in self.lazy_plugins)
+            and name not in required and name not in self._disabled_plugins
+        }
+    
+    def register_lazy_plugin(self, plugin_name: str, config: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Register a plugin's commands and menu items from its manifest without importing it.
+        
+        The plugin is loaded and started by the first matching command.
+        
+        Returns:
+            bool: True if registered, False if the plugin has no usable manifest
+        """
+        manifest = self._manifest_for(plugin_name)
+        if manifest is None:
+            self.logger.error(f"Cannot register {plugin_name} lazily: no valid manifest")
+            return False
+        
+        self._lazy_configs[plugin_name] = config or {}
+        self.plugins[plugin_name] = PluginInfo(
+            metadata=PluginMetadata(
+                name=plugin_name,
+                version=manifest.version,
+                description=manifest.description,
+                author=manifest.author
+            ),
+            status=PluginStatus.DORMANT,
+            config=config or {},
+            manifest=manifest,
+            plugin_path=self._find_plugin_directory(plugin_name),
+            lazy=True
+        )
+        self._register_lazy_entry_points(plugin_name, manifest)
+        
+        self.logger.info(
+            f"Registered lazy plugin {plugin_name}: commands {[c.name for c in manifest.commands]}"
+        )
+        return True
+    
+    def _register_lazy_entry_points(self, plugin_name: str, manifest: PluginManifest):
+        """Register stand-in command and menu handlers that activate the plugin"""
+        router = getattr(self, 'message_router', None)
+        if router is not None:
+            stubs = self._lazy_stubs.setdefault(plugin_name, {})
+            for command in manifest.commands:
+                stubs[command.name] = self._lazy_command_handler(plugin_name, command.name)
+                router.register_plugin_command(plugin_name, command.name, stubs[command.name],
+                                               command.description)
+        
+        menu_registry = getattr(self, 'plugin_menu_registry', None)
+        if menu_registry is not None:
+            for item in manifest.menu_items:
+                menu_registry.register_menu_item(
+                    plugin_name=plugin_name, menu=item.menu, label=item.label, command=item.command,
+                    handler=self._lazy_menu_handler(plugin_name, item.command),
+                    description=item.description
+                )
+    
+    def _unregister_lazy_entry_points(self, plugin_name: str):
+        self._lazy_stubs.pop(plugin_name, None)
+        router = getattr(self, 'message_router', None)
+        if router is not None:
+            router.unregister_plugin_commands(plugin_name)
+        self._unregister_lazy_menu_items(plugin_name)
+    
+    def _unregister_lazy_menu_items(self, plugin_name: str):
+        menu_registry = getattr(self, 'plugin_menu_registry', None)
+        if menu_registry is not None:
+            menu_registry.unregister_plugin_menu_items(plugin_name)
+    
+    def _remove_command_stubs(self, plugin_name: str):
+        """Remove stand-in command handlers, keeping those the plugin registered itself"""
+        stubs = self._lazy_stubs.pop(plugin_name, {})
+        router = getattr(self, 'message_router', None)
+        if router is not None:
+            for command, stub in stubs.items():
+                router.command_handler.unregister_command(plugin_name, command, stub)
+    
+    def _lazy_command_handler(self, plugin_name: str, command: str) -> Callable:
+        async def activate_and_run(args: List[str], context: Dict[str, Any]) -> Optional[str]:
+            if not await self.activate_plugin(plugin_name):
+                return f"'{command}' is unavailable right now."
+            handler = self.message_router.command_handler.find_handler(plugin_name, command)
+            if handler is None:
+                self.logger.error(f"Plugin {plugin_name} did not register command '{command}' from its manifest")
+                return None
+            return await handler(args, context)
+        return activate_and_run
+    
+    def _lazy_menu_handler(self, plugin_name: str, command: str) -> Callable:
+        async def activate_and_run(context: Dict[str, Any]) -> Optional[str]:
+            if not await self.activate_plugin(plugin_name):
+                return "This menu item is unavailable right now."
+            item = self.plugin_menu_registry.get_menu_item_by_command(command)
+            if item is None or item.plugin != plugin_name:
+                return None
+            return await item.handler(context)
+        return activate_and_run
+    
+    async def activate_plugin(self, plugin_name: str) -> bool:
+        """
+        Load and start a dormant lazy plugin.
+        
+        Concurrent calls for the same plugin share one activation. If loading
+        or starting fails the plugin returns to dormant, so a later command
+        retries.
+        
+        Returns:
+            bool: True if the plugin is running
+        """
+        lock = self._activation_locks.setdefault(plugin_name, asyncio.Lock())
+        async with lock:
+            plugin_info = self.plugins.get(plugin_name)
+            if plugin_info is None:
+                return False
+            if plugin_info.status == PluginStatus.RUNNING:
+                return True
+            if plugin_info.status != PluginStatus.DORMANT:
+                return False
+            
+            self.logger.info(f"Activating lazy plugin {plugin_name}")
+            start = time.perf_counter()
+            manifest = plugin_info.manifest
+            activations = plugin_info.activations
+            
+            # The plugin registers its real handlers while it loads and starts.
+            # Command stubs stay registered until then so that commands
+            # arriving meanwhile wait on this activation instead of finding
+            # no handler at all.
+            self._unregister_lazy_menu_items(plugin_name)
+            del self.plugins[plugin_name]
+            self._discovered_manifests[plugin_name] = manifest
+            
+            loaded = await self.load_plugin(plugin_name, self._lazy_configs.get(plugin_name, {}))
+            started = loaded and await self.start_plugin(plugin_name)
+            self._remove_command_stubs(plugin_name)
+            
+            plugin_info = self.plugins[plugin_name]
+            plugin_info.lazy = True
+            plugin_info.activations = activations + 1
+            if not started:
+                self.logger.error(f"Failed to activate lazy plugin {plugin_name}")
+                await self._return_to_dormant(plugin_name)
+                return False
+            
+            plugin_info.timings['activate'] = time.perf_counter() - start
+            self._activated_at[plugin_name] = time.monotonic()
+            self._start_idle_unload()
+            await self.handle_plugin_event(plugin_name, 'plugin_activated', plugin_info.instance)
+            return True
+    
+    async def deactivate_plugin(self, plugin_name: str) -> bool:
+        """
+        Stop and unload an active lazy plugin, leaving it dormant.
+        
+        The plugin's modules are removed from ``sys.modules`` so their memory
+        can be reclaimed; the next matching command imports them again.
+        """
+        lock = self._activation_locks.setdefault(plugin_name, asyncio.Lock())
+        async with lock:
+            plugin_info = self.plugins.get(plugin_name)
+            if plugin_info is None or not plugin_info.lazy or plugin_info.status == PluginStatus.DORMANT:
+                return False
+            
+            self.logger.info(f"Unloading idle lazy plugin {plugin_name}")
+            await self.handle_plugin_event(plugin_name, 'plugin_deactivated', plugin_info.instance)
+            await self._return_to_dormant(plugin_name)
+            return True
+    
+    async def _return_to_dormant(self, plugin_name: str):
+        plugin_info = self.plugins[plugin_name]
+        manifest, activations = plugin_info.manifest, plugin_info.activations
+        
+        if plugin_info.status == PluginStatus.RUNNING:
+            await self.stop_plugin(plugin_name)
+        if plugin_name in self.plugins:
+            await self.unload_plugin(plugin_name)
+        self.plugins.pop(plugin_name, None)
+        self._activated_at.pop(plugin_name, None)
+        
+        for module_name in [name for name in sys.modules
+                            if name == plugin_name or name.startswith(f"{plugin_name}.")]:
+            del sys.modules[module_name]
+        
+        # Handlers the plugin registered itself and did not remove on stop
+        self._unregister_lazy_entry_points(plugin_name)
+        self._discovered_manifests[plugin_name] = manifest
+        self.register_lazy_plugin(plugin_name, self._lazy_configs.get(plugin_name))
+        self.plugins[plugin_name].activations = activations
+    
+    def _start_idle_unload(self):
+        if self.lazy_idle_ttl and (self.idle_unload_task is None or self.idle_unload_task.done()):
+            self.idle_unload_task = asyncio.create_task(self._idle_unload_loop())
+    
+    async def _idle_unload_loop(self):
+        """Unload lazy plugins with no command for ``lazy_idle_ttl`` seconds"""
+        try:
+            while self._activated_at:
+                await asyncio.sleep(self.lazy_check_interval)
+                await self.unload_idle_plugins()
+        except asyncio.CancelledError:
+            pass
+    
+    async def unload_idle_plugins(self) -> List[str]:
+        """Deactivate lazy plugins idle for longer than the TTL; returns their names"""
+        router = getattr(self, 'message_router', None)
+        last_used = router.command_handler.last_used if router is not None else {}
+        now = time.monotonic()
+        
+        idle = [
+            name for name, activated in list(self._activated_at.items())
+            if now - max(activated, last_used.get(name, 0.0)) >= self.lazy_idle_ttl
+        ]
+        for name in idle:
+            await self.deactivate_plugin(name)
+        return idle
+    
     async def _check_dependencies(self, plugin_name: str) -> bool:
         """
         Check if plugin dependencies are satisfied at runtime.
@@ -1024,8 +1394,11 @@ class PluginManager:
         self.dependency_graph.clear()
         
         for plugin_name, plugin_info in self.plugins.items():
+            dependencies = list(plugin_info.metadata.dependencies)
+            if plugin_info.manifest:
+                dependencies.extend(plugin_info.manifest.plugin_dependencies)
             deps = set()
-            for dependency in plugin_info.metadata.dependencies:
+            for dependency in dependencies:
                 if not dependency.optional and dependency.name in self.plugins:
                     deps.add(dependency.name)
             self.dependency_graph[plugin_name] = deps
@@ -1076,6 +1449,30 @@ class PluginManager:
         
         return startup_order
     
+    def _calculate_startup_levels(self) -> List[List[str]]:
+        """
+        Group plugins into dependency levels.
+        
+        Every plugin's dependencies are in earlier levels, so the plugins of
+        one level can start concurrently. Each level is ordered by priority.
+        """
+        self._build_dependency_graph()
+        
+        levels = []
+        placed: Set[str] = set()
+        remaining = set(self.plugins.keys())
+        while remaining:
+            level = [name for name in remaining if self.dependency_graph.get(name, set()) <= placed]
+            if not level:
+                self.logger.error(f"Circular dependencies detected in plugins: {remaining}")
+                level = list(remaining)  # start them anyway, as a final level
+            level.sort(key=lambda name: (self.plugins[name].metadata.priority.value, name))
+            levels.append(level)
+            placed.update(level)
+            remaining.difference_update(level)
+        
+        return levels
+    
     def should_auto_start_plugin(self, plugin_name: str) -> bool:
         """
         Check if a plugin should be auto-started based on persisted state.
@@ -1104,23 +1501,40 @@ class PluginManager:
         """
         Start all loaded plugins in dependency order.
         
+        Plugins in the same dependency level start concurrently; a level
+        starts once the previous one has finished.
+        
         Returns:
             bool: True if all plugins started successfully, False otherwise
         """
-        self.startup_order = self._calculate_startup_order()
+        start = time.perf_counter()
+        if self.parallel_startup:
+            self.startup_levels = self._calculate_startup_levels()
+            self.startup_order = [name for level in self.startup_levels for name in level]
+        else:
+            self.startup_order = self._calculate_startup_order()
+            self.startup_levels = [[name] for name in self.startup_order]
         
-        self.logger.info(f"Starting plugins in order: {self.startup_order}")
+        self.logger.info(f"Starting plugins in levels: {self.startup_levels}")
         
         success = True
-        for plugin_name in self.startup_order:
-            if plugin_name in self.plugins:
+        for level in self.startup_levels:
+            to_start = []
+            for plugin_name in level:
+                if self.plugins[plugin_name].status == PluginStatus.DORMANT:
+                    continue  # started on first use
                 # Check if plugin should be auto-started based on persisted state
                 if self.should_auto_start_plugin(plugin_name):
-                    if not await self.start_plugin(plugin_name):
-                        success = False
-                        # Continue starting other plugins even if one fails
+                    to_start.append(plugin_name)
                 else:
                     self.logger.debug(f"Skipping plugin {plugin_name} (disabled in persisted state)")
+            
+            # Continue starting other plugins even if one fails
+            results = await asyncio.gather(*(self.start_plugin(name) for name in to_start))
+            if not all(results):
+                success = False
+        
+        self._record_startup_report(time.perf_counter() - start)
         
         # Start health monitoring
         if not self.health_monitor_task or self.health_monitor_task.done():
@@ -1128,6 +1542,35 @@ class PluginManager:
         
         return success
     
+    def _record_startup_report(self, start_seconds: float):
+        """Summarize per-plugin timings and the startup critical path"""
+        starts = {name: self.plugins[name].timings.get('start', 0.0) for name in self.startup_order}
+        finish: Dict[str, float] = {}  # when each start() would finish if no plugin waited on another level
+        for name in self.startup_order:
+            ready = max((finish.get(dep, 0.0) for dep in self.dependency_graph.get(name, ())), default=0.0)
+            finish[name] = ready + starts[name]
+        
+        total = {name: sum(self.plugins[name].timings.values()) for name in self.startup_order}
+        self.startup_report.update({
+            'start_ms': round(start_seconds * 1000, 1),
+            'start_sum_ms': round(sum(starts.values()) * 1000, 1),
+            'critical_path_ms': round(max(finish.values(), default=0.0) * 1000, 1),
+            'levels': self.startup_levels,
+            'slowest': sorted(total, key=total.get, reverse=True)[:5],
+            'plugins': {
+                name: {phase: round(seconds * 1000, 1) for phase, seconds in self.plugins[name].timings.items()}
+                for name in self.startup_order
+            }
+        })
+        self.logger.info(
+            f"Started {len(self.startup_order)} plugins in {self.startup_report['start_ms']}ms "
+            f"({len(self.startup_levels)} levels; slowest: {self.startup_report['slowest']})"
+        )
+    
+    def get_startup_report(self) -> Dict[str, Any]:
+        """Discovery, load and start timings from the last startup"""
+        return dict(self.startup_report)
+    
     async def stop_all_plugins(self) -> bool:
         """
         Stop all running plugins in reverse dependency order.
@@ -1138,6 +1581,8 @@ class PluginManager:
         # Stop health monitoring
         if self.health_monitor_task and not self.health_monitor_task.done():
             self.health_monitor_task.cancel()
+        if self.idle_unload_task and not self.idle_unload_task.done():
+            self.idle_unload_task.cancel()
         
         # Stop plugins in reverse order
         reverse_order = list(reversed(self.startup_order))
@@ -1291,13 +1736,20 @@ class PluginManager:
             'running_plugins': len(self.get_running_plugins()),
             'failed_plugins': len([p for p in self.plugins.values() if p.status == PluginStatus.FAILED]),
             'disabled_plugins_count': len([p for p in self.plugins.values() if p.status == PluginStatus.DISABLED]),
+            'dormant_plugins': [name for name, p in self.plugins.items() if p.status == PluginStatus.DORMANT],
             'enabled_plugins': list(self._enabled_plugins),
             'disabled_plugins': list(self._disabled_plugins),
+            'startup': self.get_startup_report(),
+            'isolated': {},
+            'http': get_http_pool().get_stats(),
+            'storage': get_storage_cache_stats(),
             'plugins': {}
         }
         
         for name, info in self.plugins.items():
             stats['plugins'][name] = info.get_metrics()
+            if name in self.isolated_plugins and info.instance is not None:
+                stats['isolated'][name] = info.instance.get_process_stats()
         
         return stats
     
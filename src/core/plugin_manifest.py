@@ -91,6 +91,21 @@ class TaskCapability:
         return result
 
 
+@dataclass
+class MessageHandlerCapability:
+    """Message handler capability declaration (the plugin handles routed messages)"""
+    description: str = ""
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MessageHandlerCapability':
+        """Create from dictionary"""
+        return cls(description=data.get('description', ''))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        return {'description': self.description}
+
+
 @dataclass
 class MenuCapability:
     """Menu item capability declaration"""
@@ -142,6 +157,7 @@ class PluginManifest:
     commands: List[CommandCapability] = field(default_factory=list)
     scheduled_tasks: List[TaskCapability] = field(default_factory=list)
     menu_items: List[MenuCapability] = field(default_factory=list)
+    message_handlers: List[MessageHandlerCapability] = field(default_factory=list)
     
     # Configuration
     config_schema_file: Optional[str] = None
@@ -220,6 +236,11 @@ class PluginManifest:
             for menu_data in capabilities_config['menu_items']:
                 menu_items.append(MenuCapability.from_dict(menu_data))
         
+        message_handlers = []
+        if 'message_handlers' in capabilities_config:
+            for handler_data in capabilities_config['message_handlers'] or []:
+                message_handlers.append(MessageHandlerCapability.from_dict(handler_data))
+        
         # Extract configuration
         config_section = data.get('config', {})
         
@@ -238,6 +259,7 @@ class PluginManifest:
             commands=commands,
             scheduled_tasks=scheduled_tasks,
             menu_items=menu_items,
+            message_handlers=message_handlers,
             config_schema_file=config_section.get('schema_file'),
             default_config=config_section.get('defaults', {}),
             permissions=data.get('permissions', [])
@@ -283,7 +305,7 @@ class PluginManifest:
                 result['dependencies']['python_packages'] = self.python_dependencies
         
         # Capabilities
-        if self.commands or self.scheduled_tasks or self.menu_items:
+        if self.commands or self.scheduled_tasks or self.menu_items or self.message_handlers:
             result['capabilities'] = {}
             if self.commands:
                 result['capabilities']['commands'] = [
@@ -297,6 +319,10 @@ class PluginManifest:
                 result['capabilities']['menu_items'] = [
                     menu.to_dict() for menu in self.menu_items
                 ]
+            if self.message_handlers:
+                result['capabilities']['message_handlers'] = [
+                    handler.to_dict() for handler in self.message_handlers
+                ]
         
         # Configuration
         if self.config_schema_file or self.default_config:
@@ -1,15 +1,20 @@
 """
 Plugin Scheduler System
 
-Provides interval-based and cron-style scheduling for plugin tasks.
+Provides interval-based and cron-style scheduling for plugin tasks. Tasks run
+as jobs on the shared job scheduler, so idle tasks cost no event loop work.
 """
 
 import asyncio
+import functools
 import logging
+import time
 from typing import Any, Callable, Dict, List, Optional, Set
-from datetime import datetime, timedelta
+from datetime import datetime
 from dataclasses import dataclass, field
-import re
+
+from .cron import CronExpression
+from .job_scheduler import Job, MisfirePolicy, get_job_scheduler
 
 
 @dataclass
@@ -26,23 +31,27 @@ class ScheduledTask:
     run_count: int = 0
     error_count: int = 0
     last_error: Optional[str] = None
-    _task: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+    jitter: float = 0.0  # seconds of random delay added to each run
+    misfire: MisfirePolicy = MisfirePolicy.RUN_ONCE
+    _job: Optional[Job] = field(default=None, init=False, repr=False)
 
 
 class CronParser:
-    """Simple cron expression parser"""
+    """Cron expression parser (see core.cron for the supported syntax)"""
     
     @staticmethod
     def parse(cron_expr: str) -> Dict[str, Any]:
         """
         Parse cron expression.
         
-        Supports simplified cron format: minute hour day month weekday
+        Supports standard cron format: minute hour day month weekday, with an
+        optional sixth seconds field
         Examples:
             "0 * * * *" - Every hour at minute 0
             "*/5 * * * *" - Every 5 minutes
             "0 0 * * *" - Daily at midnight
             "0 12 * * 1" - Every Monday at noon
+            "30 8 * * 1#1" - First Monday of the month at 8:30
         
         Args:
             cron_expr: Cron expression string
@@ -53,18 +62,7 @@ class CronParser:
         Raises:
             ValueError: If cron expression is invalid
         """
-        parts = cron_expr.strip().split()
-        
-        if len(parts) != 5:
-            raise ValueError(f"Invalid cron expression: {cron_expr}. Expected 5 fields.")
-        
-        return {
-            'minute': parts[0],
-            'hour': parts[1],
-            'day': parts[2],
-            'month': parts[3],
-            'weekday': parts[4]
-        }
+        return CronExpression(cron_expr).fields
     
     @staticmethod
     def next_run_time(cron_expr: str, from_time: Optional[datetime] = None) -> datetime:
@@ -73,7 +71,7 @@ class CronParser:
         
         Args:
             cron_expr: Cron expression
-            from_time: Calculate from this time (defaults to now)
+            from_time: Calculate from this time (defaults to now, UTC)
             
         Returns:
             Next scheduled run time
@@ -81,57 +79,7 @@ class CronParser:
         if from_time is None:
             from_time = datetime.utcnow()
         
-        parsed = CronParser.parse(cron_expr)
-        
-        # For simplicity, handle common patterns
-        # Full cron implementation would be more complex
-        
-        minute = parsed['minute']
-        hour = parsed['hour']
-        
-        # Start from next minute
-        next_time = from_time.replace(second=0, microsecond=0) + timedelta(minutes=1)
-        
-        # Handle */N patterns for minutes
-        if minute.startswith('*/'):
-            interval = int(minute[2:])
-            # Round up to next interval
-            minutes_since_hour = next_time.minute
-            next_interval = ((minutes_since_hour // interval) + 1) * interval
-            if next_interval >= 60:
-                next_time = next_time.replace(minute=0) + timedelta(hours=1)
-            else:
-                next_time = next_time.replace(minute=next_interval)
-        elif minute == '*':
-            # Every minute - already set
-            pass
-        else:
-            # Specific minute
-            target_minute = int(minute)
-            if next_time.minute > target_minute:
-                # Move to next hour
-                next_time = next_time.replace(minute=target_minute) + timedelta(hours=1)
-            else:
-                next_time = next_time.replace(minute=target_minute)
-        
-        # Handle hour
-        if hour.startswith('*/'):
-            interval = int(hour[2:])
-            hours_since_day = next_time.hour
-            next_interval = ((hours_since_day // interval) + 1) * interval
-            if next_interval >= 24:
-                next_time = next_time.replace(hour=0) + timedelta(days=1)
-            else:
-                next_time = next_time.replace(hour=next_interval)
-        elif hour != '*':
-            target_hour = int(hour)
-            if next_time.hour > target_hour:
-                # Move to next day
-                next_time = next_time.replace(hour=target_hour) + timedelta(days=1)
-            elif next_time.hour < target_hour:
-                next_time = next_time.replace(hour=target_hour)
-        
-        return next_time
+        return CronExpression(cron_expr).next_after(from_time)
     
     @staticmethod
     def seconds_until_next_run(cron_expr: str, from_time: Optional[datetime] = None) -> int:
@@ -177,15 +125,22 @@ class PluginScheduler:
     
     def register_task(self, name: str, handler: Callable,
                      interval: Optional[int] = None,
-                     cron: Optional[str] = None) -> ScheduledTask:
+                     cron: Optional[str] = None,
+                     jitter: float = 0.0,
+                     misfire: MisfirePolicy = MisfirePolicy.RUN_ONCE) -> ScheduledTask:
         """
         Register a scheduled task.
         
+        Interval tasks run as soon as they are started and then every
+        interval; cron tasks run at the times their expression matches (UTC).
+        
         Args:
             name: Task name (unique within plugin)
             handler: Async function to execute
             interval: Interval in seconds (for interval-based scheduling)
             cron: Cron expression (for cron-style scheduling)
+            jitter: Delay each run by up to this many seconds, chosen at random
+            misfire: What to do with runs missed while the process was busy or suspended
             
         Returns:
             Created ScheduledTask
@@ -232,7 +187,9 @@ class PluginScheduler:
             interval=interval,
             cron=cron,
             handler=handler,
-            enabled=True
+            enabled=True,
+            jitter=jitter,
+            misfire=misfire
         )
         
         self.tasks[name] = task
@@ -263,76 +220,80 @@ class PluginScheduler:
         task = self.tasks[name]
         
         # Don't start if already running
-        if task._task and not task._task.done():
+        if task._job is not None and not task._job.cancelled:
             self.logger.warning(f"Task '{name}' is already running")
             return
         
-        # Create and start the task
-        task._task = asyncio.create_task(self._run_task(task))
-        self.running_tasks.add(task._task)
-        
-        # Clean up when done
-        task._task.add_done_callback(self.running_tasks.discard)
+        task.enabled = True
+        task._job = get_job_scheduler().add_job(
+            functools.partial(self._run_task, task),
+            interval=task.interval,
+            cron=task.cron,
+            start_at=time.time() if task.interval else None,
+            name=f"{self.plugin_name}.{task.name}",
+            owner=self.plugin_name,
+            jitter=task.jitter,
+            misfire=task.misfire
+        )
+        self._update_next_run(task)
         
         self.logger.info(f"Started task '{name}'")
     
+    @staticmethod
+    def _update_next_run(task: ScheduledTask):
+        next_fire = task._job.next_fire if task._job is not None else None
+        task.next_run = next_fire.replace(tzinfo=None) if next_fire else None
+    
     async def _run_task(self, task: ScheduledTask):
         """
-        Run a scheduled task loop.
+        Run a scheduled task once; called by the job scheduler.
         
         Args:
             task: Task to run
         """
-        self.logger.debug(f"Task loop started for '{task.name}'")
+        if not task.enabled or self._shutdown:
+            return
         
-        while task.enabled and not self._shutdown:
-            try:
-                # Execute the handler
-                self.logger.debug(f"Executing task '{task.name}'")
-                task.last_run = datetime.utcnow()
-                
-                try:
-                    # Call the handler
-                    result = task.handler()
-                    if asyncio.iscoroutine(result):
-                        await result
-                    
-                    task.run_count += 1
-                    task.last_error = None
-                    self.logger.debug(f"Task '{task.name}' completed successfully " +
-                                    f"(run #{task.run_count})")
-                    
-                except Exception as e:
-                    # Log error but continue running
-                    task.error_count += 1
-                    task.last_error = str(e)
-                    self.logger.error(f"Error in task '{task.name}': {e}", exc_info=True)
-                
-                # Calculate wait time for next execution
-                if task.interval:
-                    # Interval-based scheduling
-                    wait_time = task.interval
-                    task.next_run = datetime.utcnow() + timedelta(seconds=wait_time)
-                else:
-                    # Cron-based scheduling
-                    wait_time = CronParser.seconds_until_next_run(task.cron)
-                    task.next_run = datetime.utcnow() + timedelta(seconds=wait_time)
-                
-                # Wait until next execution
-                self.logger.debug(f"Task '{task.name}' waiting {wait_time}s until next run")
-                await asyncio.sleep(wait_time)
-                
-            except asyncio.CancelledError:
-                self.logger.info(f"Task '{task.name}' cancelled")
-                break
-            except Exception as e:
-                # Unexpected error in task loop
-                self.logger.error(f"Unexpected error in task loop for '{task.name}': {e}",
-                                exc_info=True)
-                # Wait a bit before retrying
-                await asyncio.sleep(60)
-        
-        self.logger.debug(f"Task loop ended for '{task.name}'")
+        current = asyncio.current_task()
+        self.running_tasks.add(current)
+        self.logger.debug(f"Executing task '{task.name}'")
+        task.last_run = datetime.utcnow()
+        
+        try:
+            # Call the handler
+            result = task.handler()
+            if asyncio.iscoroutine(result):
+                await result
+            
+            task.run_count += 1
+            task.last_error = None
+            self.logger.debug(f"Task '{task.name}' completed successfully " +
+                            f"(run #{task.run_count})")
+            
+        except Exception as e:
+            # Log error but keep the task scheduled
+            task.error_count += 1
+            task.last_error = str(e)
+            self.logger.error(f"Error in task '{task.name}': {e}", exc_info=True)
+        
+        finally:
+            self.running_tasks.discard(current)
+            self._update_next_run(task)
+    
+    def _cancel_task(self, task: ScheduledTask) -> Optional[asyncio.Task]:
+        """Unschedule a task; returns its run in progress, if any, after cancelling it"""
+        task.enabled = False
+        job, task._job = task._job, None
+        if job is None:
+            return None
+        
+        job.cancel()
+        task.next_run = None
+        running = job.running
+        if running is not None and not running.done() and running is not asyncio.current_task():
+            running.cancel()
+            return running
+        return None
     
     async def stop_task(self, name: str):
         """
@@ -347,13 +308,10 @@ class PluginScheduler:
         if name not in self.tasks:
             raise KeyError(f"Task '{name}' not found")
         
-        task = self.tasks[name]
-        task.enabled = False
-        
-        if task._task and not task._task.done():
-            task._task.cancel()
+        running = self._cancel_task(self.tasks[name])
+        if running is not None:
             try:
-                await task._task
+                await running
             except asyncio.CancelledError:
                 pass
         
@@ -381,7 +339,8 @@ class PluginScheduler:
             name: Task name
             
         Returns:
-            Dictionary with task status information
+            Dictionary with task status information, including run timing
+            statistics once the task has been started
             
         Raises:
             KeyError: If task not found
@@ -390,6 +349,7 @@ class PluginScheduler:
             raise KeyError(f"Task '{name}' not found")
         
         task = self.tasks[name]
+        job = task._job
         
         return {
             'name': task.name,
@@ -402,7 +362,8 @@ class PluginScheduler:
             'run_count': task.run_count,
             'error_count': task.error_count,
             'last_error': task.last_error,
-            'is_running': task._task is not None and not task._task.done()
+            'is_running': job is not None and not job.cancelled,
+            'timing': job.stats.to_dict() if job is not None else None
         }
     
     def get_all_task_status(self) -> List[Dict[str, Any]]:
@@ -428,7 +389,7 @@ class PluginScheduler:
             raise KeyError(f"Task '{name}' not found")
         
         # Stop the task first
-        asyncio.create_task(self.stop_task(name))
+        self._cancel_task(self.tasks[name])
         
         # Remove from registry
         del self.tasks[name]
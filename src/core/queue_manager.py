@@ -11,7 +11,7 @@ import time
 import uuid
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
 import json
@@ -20,7 +20,13 @@ try:
     from ..models.message import Message, MessagePriority, QueuedMessage
 except ImportError:
     from models.message import Message, MessagePriority, QueuedMessage
+from .airtime import AirtimeScheduler
+from .chunk_framing import ChunkFramer, FrameCorrupted, ReassemblyBuffer, decode_base64, parse_frame
+from .durable_queue import DurableQueueStore, QueueRecord
 from .logging import get_logger
+from .metrics import get_metrics_registry
+from .rate_limiter import HierarchicalRateLimiter, create_rate_limiter
+from .tracing import get_tracer
 
 
 class QueueType(Enum):
@@ -51,67 +57,6 @@ class QueueStats:
             self.average_wait_time = (self.average_wait_time * 0.9) + (wait_time * 0.1)
 
 
-@dataclass
-class RateLimitRule:
-    """Rate limiting rule"""
-    key_pattern: str
-    max_tokens: float
-    refill_rate: float  # tokens per second
-    burst_size: float
-    window_seconds: int = 60
-    
-    def matches_key(self, key: str) -> bool:
-        """Check if key matches this rule"""
-        import re
-        return bool(re.match(self.key_pattern, key))
-
-
-@dataclass
-class TokenBucket:
-    """Token bucket for rate limiting"""
-    max_tokens: float
-    tokens: float
-    refill_rate: float
-    last_refill: datetime
-    burst_size: float = 0
-    
-    def __post_init__(self):
-        if self.burst_size == 0:
-            self.burst_size = self.max_tokens
-    
-    def can_consume(self, tokens: float = 1.0) -> bool:
-        """Check if tokens can be consumed"""
-        self._refill()
-        return self.tokens >= tokens
-    
-    def consume(self, tokens: float = 1.0) -> bool:
-        """Consume tokens if available"""
-        self._refill()
-        if self.tokens >= tokens:
-            self.tokens -= tokens
-            return True
-        return False
-    
-    def _refill(self):
-        """Refill tokens based on elapsed time"""
-        now = datetime.utcnow()
-        elapsed = (now - self.last_refill).total_seconds()
-        
-        # Add tokens based on refill rate
-        tokens_to_add = elapsed * self.refill_rate
-        self.tokens = min(self.max_tokens, self.tokens + tokens_to_add)
-        self.last_refill = now
-    
-    def get_wait_time(self, tokens: float = 1.0) -> float:
-        """Get time to wait before tokens are available"""
-        self._refill()
-        if self.tokens >= tokens:
-            return 0.0
-        
-        tokens_needed = tokens - self.tokens
-        return tokens_needed / self.refill_rate
-
-
 @dataclass
 class PriorityQueueItem:
     """Priority queue item wrapper"""
@@ -119,6 +64,8 @@ class PriorityQueueItem:
     timestamp: datetime
     message: QueuedMessage
     queue_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    chunk_id: Optional[str] = None  # chunk sequence tag, fixed once a chunked send starts
+    chunks_sent: int = 0
     
     def __lt__(self, other):
         # Higher priority first, then older messages first
@@ -128,320 +75,101 @@ class PriorityQueueItem:
 
 
 class MessageChunker:
-    """Handles message chunking for large messages"""
+    """Frames large messages into chunks and reassembles incoming chunks"""
     
-    def __init__(self, max_message_size: int = 228, chunk_overhead: int = 20):
+    def __init__(self, max_message_size: int = 228, reassembly_timeout: float = 300.0,
+                 max_pending: int = 64, max_pending_bytes: int = 65536):
         self.max_message_size = max_message_size
-        self.chunk_overhead = chunk_overhead
-        self.max_chunk_size = max_message_size - chunk_overhead
         self.logger = get_logger('message_chunker')
         
-        # Track chunk reassembly
-        self.chunk_buffers: Dict[str, Dict[int, str]] = {}
-        self.chunk_metadata: Dict[str, Dict[str, Any]] = {}
-        self.chunk_timeouts: Dict[str, datetime] = {}
+        self.framer = ChunkFramer(max_size=max_message_size)
+        self.reassembly = ReassemblyBuffer(
+            timeout=reassembly_timeout,
+            max_messages=max_pending,
+            max_bytes=max_pending_bytes
+        )
     
     def needs_chunking(self, message: Message) -> bool:
         """Check if message needs to be chunked"""
-        content_size = len(message.content.encode('utf-8'))
-        return content_size > self.max_chunk_size
-    
-    def chunk_message(self, message: Message) -> List[Message]:
-        """Split message into chunks"""
-        if not self.needs_chunking(message):
-            return [message]
-        
-        content = message.content
-        content_bytes = content.encode('utf-8')
-        
-        # Calculate number of chunks needed
-        total_chunks = (len(content_bytes) + self.max_chunk_size - 1) // self.max_chunk_size
-        chunk_id = str(uuid.uuid4())[:8]
-        
-        chunks = []
-        
-        for i in range(total_chunks):
-            start_byte = i * self.max_chunk_size
-            end_byte = min(start_byte + self.max_chunk_size, len(content_bytes))
-            
-            # Extract chunk content (handle UTF-8 boundaries)
-            chunk_bytes = content_bytes[start_byte:end_byte]
-            
-            # Ensure we don't break UTF-8 characters
-            try:
-                chunk_content = chunk_bytes.decode('utf-8')
-            except UnicodeDecodeError:
-                # Find the last complete UTF-8 character
-                for j in range(len(chunk_bytes) - 1, -1, -1):
-                    try:
-                        chunk_content = chunk_bytes[:j].decode('utf-8')
-                        # Adjust end_byte for next chunk
-                        end_byte = start_byte + j
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    # Fallback: use original content with replacement
-                    chunk_content = chunk_bytes.decode('utf-8', errors='replace')
-            
-            # Create chunk header
-            chunk_header = f"[{i+1}/{total_chunks}:{chunk_id}]"
-            full_chunk_content = f"{chunk_header} {chunk_content}"
-            
-            # Create chunk message
-            chunk_msg = Message(
-                id=f"{message.id}_chunk_{i}",
-                sender_id=message.sender_id,
-                recipient_id=message.recipient_id,
-                channel=message.channel,
-                content=full_chunk_content,
-                message_type=message.message_type,
-                priority=message.priority,
-                metadata={
-                    **message.metadata,
-                    'is_chunk': True,
-                    'chunk_id': chunk_id,
-                    'chunk_index': i,
-                    'total_chunks': total_chunks,
-                    'original_message_id': message.id
-                }
-            )
-            
-            chunks.append(chunk_msg)
-        
-        self.logger.info(f"Chunked message {message.id} into {total_chunks} parts")
+        return not self.framer.fits(message.content)
+    
+    def chunk_message(self, message: Message, chunk_id: Optional[str] = None) -> List[Message]:
+        """Split message into framed chunks, reusing ``chunk_id`` when resuming a send"""
+        seq_id = decode_base64(chunk_id) if chunk_id else None
+        chunks = self.framer.frame_message(message, seq_id=seq_id)
+        if len(chunks) > 1:
+            self.logger.info(f"Chunked message {message.id} into {len(chunks)} parts")
         return chunks
     
     def process_chunk(self, message: Message) -> Optional[Message]:
         """Process incoming chunk and reassemble if complete"""
-        if not message.metadata.get('is_chunk'):
-            return message
+        try:
+            frame = parse_frame(message.content)
+        except FrameCorrupted as e:
+            self.reassembly.record_corrupted()
+            self.logger.warning(f"Dropped chunk from {message.sender_id}: {e}")
+            return None
         
-        chunk_id = message.metadata.get('chunk_id')
-        chunk_index = message.metadata.get('chunk_index')
-        total_chunks = message.metadata.get('total_chunks')
+        if frame is None:
+            return message
         
-        if not all([chunk_id, chunk_index is not None, total_chunks]):
-            self.logger.warning("Invalid chunk metadata")
+        content = self.reassembly.add(message.sender_id, frame, message.interface_id, message.channel)
+        if content is None:
             return None
         
-        # Extract chunk content (remove header)
-        content = message.content
-        header_end = content.find('] ')
-        if header_end != -1:
-            chunk_content = content[header_end + 2:]
-        else:
-            chunk_content = content
-        
-        # Initialize chunk buffer if needed
-        if chunk_id not in self.chunk_buffers:
-            self.chunk_buffers[chunk_id] = {}
-            self.chunk_metadata[chunk_id] = {
-                'total_chunks': total_chunks,
-                'original_message_id': message.metadata.get('original_message_id'),
-                'sender_id': message.sender_id,
-                'recipient_id': message.recipient_id,
-                'channel': message.channel,
-                'message_type': message.message_type,
-                'priority': message.priority,
-                'first_chunk_time': datetime.utcnow()
-            }
-            self.chunk_timeouts[chunk_id] = datetime.utcnow() + timedelta(minutes=5)
-        
-        # Store chunk
-        self.chunk_buffers[chunk_id][chunk_index] = chunk_content
-        
-        # Check if all chunks received
-        if len(self.chunk_buffers[chunk_id]) == total_chunks:
-            # Reassemble message
-            full_content = ''
-            for i in range(total_chunks):
-                if i in self.chunk_buffers[chunk_id]:
-                    full_content += self.chunk_buffers[chunk_id][i]
-                else:
-                    self.logger.error(f"Missing chunk {i} for message {chunk_id}")
-                    return None
-            
-            # Create reassembled message
-            metadata = self.chunk_metadata[chunk_id]
-            reassembled_message = Message(
-                id=metadata.get('original_message_id', str(uuid.uuid4())),
-                sender_id=metadata['sender_id'],
-                recipient_id=metadata['recipient_id'],
-                channel=metadata['channel'],
-                content=full_content,
-                message_type=metadata['message_type'],
-                priority=metadata['priority'],
-                metadata={'reassembled_from_chunks': True}
-            )
-            
-            # Clean up
-            del self.chunk_buffers[chunk_id]
-            del self.chunk_metadata[chunk_id]
-            del self.chunk_timeouts[chunk_id]
-            
-            self.logger.info(f"Reassembled message {chunk_id} from {total_chunks} chunks")
-            return reassembled_message
+        reassembled_message = Message(
+            id=message.metadata.get('original_message_id') or str(uuid.uuid4()),
+            sender_id=message.sender_id,
+            recipient_id=message.recipient_id,
+            channel=message.channel,
+            content=content,
+            message_type=message.message_type,
+            priority=message.priority,
+            interface_id=message.interface_id,
+            metadata={'reassembled_from_chunks': True, 'total_chunks': frame.total}
+        )
         
-        # Not all chunks received yet
-        return None
+        self.logger.info(f"Reassembled message from {message.sender_id} from {frame.total} chunks")
+        return reassembled_message
     
-    def cleanup_expired_chunks(self):
+    def cleanup_expired_chunks(self) -> int:
         """Clean up expired chunk buffers"""
-        now = datetime.utcnow()
-        expired_chunks = [
-            chunk_id for chunk_id, timeout in self.chunk_timeouts.items()
-            if now > timeout
-        ]
-        
-        for chunk_id in expired_chunks:
-            self.logger.warning(f"Cleaning up expired chunk buffer: {chunk_id}")
-            self.chunk_buffers.pop(chunk_id, None)
-            self.chunk_metadata.pop(chunk_id, None)
-            self.chunk_timeouts.pop(chunk_id, None)
+        expired = self.reassembly.expire()
+        if expired:
+            self.logger.warning(f"Dropped {expired} incomplete chunked messages")
+        return expired
 
 
-class RateLimiter:
-    """Rate limiting system with multiple rules and token buckets"""
-    
-    def __init__(self):
-        self.logger = get_logger('rate_limiter')
-        self.buckets: Dict[str, TokenBucket] = {}
-        self.rules: List[RateLimitRule] = []
-        self.global_bucket: Optional[TokenBucket] = None
-        
-        # Default rules
-        self._setup_default_rules()
-    
-    def _setup_default_rules(self):
-        """Set up default rate limiting rules"""
-        # Global rate limit
-        self.global_bucket = TokenBucket(
-            max_tokens=10.0,
-            tokens=10.0,
-            refill_rate=1.0,  # 1 message per second
-            last_refill=datetime.utcnow()
-        )
-        
-        # Per-sender rate limits
-        self.rules.extend([
-            RateLimitRule(
-                key_pattern=r'sender_.*',
-                max_tokens=5.0,
-                refill_rate=0.2,  # 1 message per 5 seconds per sender
-                burst_size=3.0
-            ),
-            RateLimitRule(
-                key_pattern=r'emergency_.*',
-                max_tokens=10.0,
-                refill_rate=2.0,  # Emergency messages get higher rate
-                burst_size=5.0
-            ),
-            RateLimitRule(
-                key_pattern=r'channel_.*',
-                max_tokens=20.0,
-                refill_rate=1.0,  # 1 message per second per channel
-                burst_size=10.0
-            )
-        ])
-    
-    def add_rule(self, rule: RateLimitRule):
-        """Add a rate limiting rule"""
-        self.rules.append(rule)
-        self.logger.info(f"Added rate limit rule: {rule.key_pattern}")
-    
-    def can_send(self, key: str, tokens: float = 1.0) -> bool:
-        """Check if message can be sent"""
-        # Check global rate limit
-        if self.global_bucket and not self.global_bucket.can_consume(tokens):
-            return False
-        
-        # Check specific bucket
-        bucket = self._get_bucket(key)
-        if bucket and not bucket.can_consume(tokens):
-            return False
-        
-        return True
-    
-    def consume(self, key: str, tokens: float = 1.0) -> bool:
-        """Consume tokens for sending"""
-        # Consume from global bucket
-        if self.global_bucket and not self.global_bucket.consume(tokens):
-            return False
-        
-        # Consume from specific bucket
-        bucket = self._get_bucket(key)
-        if bucket and not bucket.consume(tokens):
-            # Refund global tokens
-            if self.global_bucket:
-                self.global_bucket.tokens = min(
-                    self.global_bucket.max_tokens,
-                    self.global_bucket.tokens + tokens
-                )
-            return False
-        
-        return True
-    
-    def get_wait_time(self, key: str, tokens: float = 1.0) -> float:
-        """Get time to wait before tokens are available"""
-        wait_times = []
-        
-        # Check global bucket
-        if self.global_bucket:
-            wait_times.append(self.global_bucket.get_wait_time(tokens))
-        
-        # Check specific bucket
-        bucket = self._get_bucket(key)
-        if bucket:
-            wait_times.append(bucket.get_wait_time(tokens))
-        
-        return max(wait_times) if wait_times else 0.0
-    
-    def _get_bucket(self, key: str) -> Optional[TokenBucket]:
-        """Get or create token bucket for key"""
-        if key in self.buckets:
-            return self.buckets[key]
-        
-        # Find matching rule
-        for rule in self.rules:
-            if rule.matches_key(key):
-                bucket = TokenBucket(
-                    max_tokens=rule.max_tokens,
-                    tokens=rule.max_tokens,
-                    refill_rate=rule.refill_rate,
-                    last_refill=datetime.utcnow(),
-                    burst_size=rule.burst_size
-                )
-                self.buckets[key] = bucket
-                return bucket
-        
-        return None
-    
-    def cleanup_old_buckets(self, max_age_hours: int = 24):
-        """Clean up old unused buckets"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
-        expired_keys = [
-            key for key, bucket in self.buckets.items()
-            if bucket.last_refill < cutoff_time
-        ]
-        
-        for key in expired_keys:
-            del self.buckets[key]
-        
-        if expired_keys:
-            self.logger.debug(f"Cleaned up {len(expired_keys)} expired rate limit buckets")
+def _to_epoch(value: datetime) -> float:
+    """Naive UTC datetime to epoch seconds"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_epoch(value: float) -> datetime:
+    """Epoch seconds to naive UTC datetime"""
+    return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
 
 
 class QueueManager:
     """Manages message queues with priority handling and rate limiting"""
     
-    def __init__(self, max_queue_size: int = 1000):
+    def __init__(self, max_queue_size: int = 1000, retry_delay: float = 1.0,
+                 rate_limit_config: Optional[Dict[str, Any]] = None,
+                 airtime_scheduler: Optional[AirtimeScheduler] = None,
+                 persistence_path: Optional[str] = None):
         self.logger = get_logger('queue_manager')
         self.max_queue_size = max_queue_size
+        self.retry_delay = retry_delay  # first retry delay, doubled per attempt
         
         # Queue components
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter: HierarchicalRateLimiter = create_rate_limiter(rate_limit_config)
         self.chunker = MessageChunker()
+        self.airtime_scheduler = airtime_scheduler  # optional per-interface airtime pacing
+        
+        # Optional crash-safe storage of outbound and retry queues
+        self.store: Optional[DurableQueueStore] = (
+            DurableQueueStore(persistence_path) if persistence_path else None
+        )
         
         # Priority queues
         self.outbound_queue: List[PriorityQueueItem] = []
@@ -452,6 +180,11 @@ class QueueManager:
         self.processing_tasks: Set[asyncio.Task] = set()
         self.running = False
         
+        # Wakeup signals: processors sleep until work arrives or a timer is due
+        self._outbound_ready = asyncio.Event()
+        self._retry_ready = asyncio.Event()
+        self.wakeups = {'outbound': 0, 'inbound': 0, 'retry': 0}
+        
         # Statistics
         self.stats = {
             'outbound': QueueStats(),
@@ -462,6 +195,14 @@ class QueueManager:
         # Message tracking
         self.pending_messages: Dict[str, datetime] = {}
         
+        # Exported metrics
+        metrics = get_metrics_registry()
+        depth = metrics.gauge('queue_depth', 'Messages waiting in each queue', ['queue'])
+        self._depth_gauges = {name: depth.labels(queue=name) for name in ('outbound', 'inbound', 'retry')}
+        self._outbound_wait = metrics.histogram(
+            'queue_wait_seconds', 'Time messages wait in a queue before processing', ['queue']
+        ).labels(queue='outbound')
+        
         self.logger.info("Queue manager initialized")
     
     async def start(self):
@@ -472,6 +213,9 @@ class QueueManager:
         self.running = True
         self.logger.info("Starting queue manager")
         
+        if self.store is not None:
+            self._restore(await self.store.start())
+        
         # Start processing tasks
         tasks = [
             asyncio.create_task(self._process_outbound_queue()),
@@ -502,8 +246,57 @@ class QueueManager:
         if self.processing_tasks:
             await asyncio.gather(*self.processing_tasks, return_exceptions=True)
         
+        if self.store is not None:
+            await self.store.stop()
+        
         self.logger.info("Queue manager stopped")
     
+    def _update_depth_metrics(self):
+        self._depth_gauges['outbound'].set(len(self.outbound_queue))
+        self._depth_gauges['inbound'].set(self.inbound_queue.qsize())
+        self._depth_gauges['retry'].set(len(self.retry_queue))
+    
+    def _restore(self, records: List[QueueRecord]):
+        """Rebuild the outbound and retry queues from stored records"""
+        for record in records:
+            try:
+                message = Message.from_dict(json.loads(record.message))
+            except (ValueError, TypeError) as e:
+                self.logger.error(f"Skipping unreadable stored message {record.queue_id}: {e}")
+                self.store.delete(record.queue_id)
+                continue
+            
+            queued_msg = QueuedMessage(
+                message=message,
+                retry_count=record.retry_count,
+                max_retries=record.max_retries,
+                next_retry=_from_epoch(record.due_at) if record.due_at is not None else None
+            )
+            item = PriorityQueueItem(
+                priority=record.priority,
+                timestamp=_from_epoch(record.enqueued_at),
+                message=queued_msg,
+                queue_id=record.queue_id,
+                chunk_id=record.chunk_id,
+                chunks_sent=record.chunks_sent
+            )
+            if record.due_at is not None:
+                self.retry_queue.append(item)
+            else:
+                self.outbound_queue.append(item)
+            self.pending_messages[message.id] = item.timestamp
+        
+        heapq.heapify(self.outbound_queue)
+        heapq.heapify(self.retry_queue)
+        self._update_depth_metrics()
+        if self.outbound_queue:
+            self._outbound_ready.set()
+        if self.retry_queue:
+            self._retry_ready.set()
+        if records:
+            self.logger.info(f"Restored {len(self.outbound_queue)} queued and "
+                             f"{len(self.retry_queue)} retrying messages")
+    
     async def queue_outbound_message(self, message: Message, priority: Optional[MessagePriority] = None) -> bool:
         """Queue message for outbound processing"""
         if len(self.outbound_queue) >= self.max_queue_size:
@@ -514,6 +307,12 @@ class QueueManager:
         # Use message priority or default
         msg_priority = priority or message.priority
         
+        # Replies keep the trace of the message being handled; other messages start their own
+        tracer = get_tracer()
+        tracer.attach(message)
+        if tracer.current() is None:
+            tracer.start_trace(message, direction='outbound')
+        
         # Create queued message
         queued_msg = QueuedMessage(message=message)
         
@@ -524,8 +323,25 @@ class QueueManager:
             message=queued_msg
         )
         
+        # Persist before the message becomes visible to the sender
+        if self.store is not None:
+            try:
+                await self.store.put(QueueRecord(
+                    queue_id=queue_item.queue_id,
+                    priority=queue_item.priority,
+                    enqueued_at=_to_epoch(queue_item.timestamp),
+                    message=json.dumps(message.to_dict(), default=str),
+                    max_retries=queued_msg.max_retries
+                ))
+            except Exception as e:
+                self.stats['outbound'].messages_dropped += 1
+                self.logger.error(f"Failed to persist outbound message {message.id}: {e}")
+                return False
+        
         # Add to priority queue
         heapq.heappush(self.outbound_queue, queue_item)
+        self._outbound_ready.set()
+        self._update_depth_metrics()
         
         # Update stats
         self.stats['outbound'].messages_queued += 1
@@ -547,6 +363,7 @@ class QueueManager:
             await self.inbound_queue.put(message)
             self.stats['inbound'].messages_queued += 1
             self.stats['inbound'].queue_size = self.inbound_queue.qsize()
+            self._depth_gauges['inbound'].set(self.inbound_queue.qsize())
             self.stats['inbound'].max_queue_size = max(
                 self.stats['inbound'].max_queue_size,
                 self.stats['inbound'].queue_size
@@ -568,87 +385,140 @@ class QueueManager:
         """Set callback for processing inbound messages"""
         self.inbound_processor = processor
     
+    async def _wait_for(self, event: asyncio.Event, timeout: Optional[float] = None):
+        """Wait until an event is set or the timeout expires, then clear it"""
+        try:
+            if timeout is None:
+                await event.wait()
+            elif timeout > 0:
+                await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+    
+    def _rate_limit_args(self, message: Message) -> Dict[str, Any]:
+        """Rate limiter arguments for a message"""
+        return {
+            'sender': message.sender_id,
+            'channel': message.channel,
+            'tier': 'emergency' if message.priority == MessagePriority.EMERGENCY else None
+        }
+    
     async def _process_outbound_queue(self):
         """Process outbound message queue"""
         while self.running:
             try:
                 if not self.outbound_queue:
-                    await asyncio.sleep(0.1)
+                    # Idle: sleep until a message is queued
+                    self._outbound_ready.clear()
+                    await self._wait_for(self._outbound_ready)
+                    self.wakeups['outbound'] += 1
                     continue
                 
-                # Get highest priority message
-                queue_item = heapq.heappop(self.outbound_queue)
+                # Check rate limiting for the highest priority message
+                queue_item = self.outbound_queue[0]
                 message = queue_item.message.message
-                
-                # Calculate wait time
-                queue_time = datetime.utcnow() - queue_item.timestamp
-                self.stats['outbound'].update_wait_time(queue_time.total_seconds())
-                
-                # Check rate limiting
-                rate_key = f"sender_{message.sender_id}"
-                if not self.rate_limiter.can_send(rate_key):
-                    wait_time = self.rate_limiter.get_wait_time(rate_key)
+                rate_args = self._rate_limit_args(message)
+                if not self.rate_limiter.can_send(**rate_args):
+                    wait_time = self.rate_limiter.get_wait_time(**rate_args)
                     
                     if wait_time > 0:
-                        # Re-queue with delay
-                        await asyncio.sleep(min(wait_time, 1.0))
-                        heapq.heappush(self.outbound_queue, queue_item)
+                        # Sleep until tokens are released, or a new message is queued
+                        self._outbound_ready.clear()
+                        await self._wait_for(self._outbound_ready, wait_time)
+                        self.wakeups['outbound'] += 1
                         continue
                 
-                # Chunk message if needed
-                chunks = self.chunker.chunk_message(message)
+                heapq.heappop(self.outbound_queue)
                 
-                # Process each chunk
-                success = True
-                for chunk in chunks:
-                    # Consume rate limit tokens
-                    if not self.rate_limiter.consume(rate_key):
-                        success = False
-                        break
-                    
-                    # Send message (via callback)
-                    if hasattr(self, 'outbound_processor'):
-                        try:
-                            await self.outbound_processor(chunk)
-                        except Exception as e:
-                            self.logger.error(f"Outbound processor failed: {e}")
-                            success = False
-                            break
+                # Calculate wait time
+                queue_time = datetime.utcnow() - queue_item.timestamp
+                self.stats['outbound'].update_wait_time(queue_time.total_seconds())
+                self._outbound_wait.observe(queue_time.total_seconds())
+                
+                success = await self._send_outbound(queue_item, message, rate_args, queue_time.total_seconds())
                 
                 # Update stats
                 if success:
                     self.stats['outbound'].messages_processed += 1
                     self.pending_messages.pop(message.id, None)
+                    if self.store is not None:
+                        self.store.delete(queue_item.queue_id)
                 else:
-                    # Handle retry
-                    if queue_item.message.should_retry():
-                        queue_item.message.schedule_retry()
+                    # Handle retry; chunks already sent are not sent again
+                    if queue_item.message.retry_count < queue_item.message.max_retries:
+                        delay = self.retry_delay * (2 ** queue_item.message.retry_count)
+                        queue_item.message.schedule_retry(delay)
                         heapq.heappush(self.retry_queue, queue_item)
-                        self.logger.info(f"Scheduled retry for message {message.id}")
+                        self._retry_ready.set()
+                        if self.store is not None:
+                            self.store.update_retry(
+                                queue_item.queue_id, queue_item.message.retry_count,
+                                _to_epoch(queue_item.message.next_retry), queue_item.chunks_sent
+                            )
+                        self.logger.info(f"Scheduled retry for message {message.id} in {delay:.1f}s")
                     else:
                         self.stats['outbound'].messages_failed += 1
                         self.pending_messages.pop(message.id, None)
+                        if self.store is not None:
+                            self.store.delete(queue_item.queue_id)
                         self.logger.error(f"Message {message.id} failed after max retries")
                 
                 # Update queue size
                 self.stats['outbound'].queue_size = len(self.outbound_queue)
+                self._update_depth_metrics()
                 
             except Exception as e:
                 self.logger.error(f"Error processing outbound queue: {e}")
                 await asyncio.sleep(1)
     
+    async def _send_outbound(self, queue_item: PriorityQueueItem, message: Message,
+                             rate_args: Dict[str, Any], queue_time: float) -> bool:
+        """Send the chunks of a message not yet sent; returns False if a chunk failed"""
+        tracer = get_tracer()
+        with tracer.activate(tracer.trace_of(message)):
+            tracer.record_span('outbound_queue_wait', queue_time, attempt=queue_item.message.retry_count)
+            
+            # Chunk message if needed, keeping the same chunk ID when resuming
+            chunks = self.chunker.chunk_message(message, queue_item.chunk_id)
+            if len(chunks) > 1:
+                queue_item.chunk_id = chunks[0].metadata['chunk_id']
+            
+            # Process each chunk not yet sent
+            for chunk in chunks[queue_item.chunks_sent:]:
+                # Consume rate limit tokens, waiting for later chunks if needed
+                with tracer.span('rate_limit'):
+                    allowed = await self.rate_limiter.acquire(**rate_args)
+                if not allowed:
+                    return False
+                
+                if self.airtime_scheduler is not None:
+                    with tracer.span('airtime_wait'):
+                        await self.airtime_scheduler.acquire(
+                            chunk.interface_id or 'default', len(chunk.content.encode('utf-8'))
+                        )
+                
+                # Send message (via callback)
+                if hasattr(self, 'outbound_processor'):
+                    try:
+                        with tracer.span('transmit'):
+                            await self.outbound_processor(chunk)
+                    except Exception as e:
+                        self.logger.error(f"Outbound processor failed: {e}")
+                        return False
+                
+                queue_item.chunks_sent += 1
+                if self.store is not None and len(chunks) > 1:
+                    self.store.update_progress(queue_item.queue_id, queue_item.chunk_id, queue_item.chunks_sent)
+        
+        return True
+    
     async def _process_inbound_queue(self):
         """Process inbound message queue"""
         while self.running:
             try:
-                # Get message with timeout
-                try:
-                    message = await asyncio.wait_for(
-                        self.inbound_queue.get(),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    continue
+                message = await self.inbound_queue.get()
+                self.wakeups['inbound'] += 1
                 
                 # Process chunks
                 processed_message = self.chunker.process_chunk(message)
@@ -667,6 +537,7 @@ class QueueManager:
                 
                 # Update queue size
                 self.stats['inbound'].queue_size = self.inbound_queue.qsize()
+                self._depth_gauges['inbound'].set(self.inbound_queue.qsize())
                 
             except Exception as e:
                 self.logger.error(f"Error processing inbound queue: {e}")
@@ -677,27 +548,39 @@ class QueueManager:
         while self.running:
             try:
                 if not self.retry_queue:
-                    await asyncio.sleep(1)
+                    # Idle: sleep until a retry is scheduled
+                    self._retry_ready.clear()
+                    await self._wait_for(self._retry_ready)
+                    self.wakeups['retry'] += 1
                     continue
                 
-                # Check for messages ready to retry
+                # Move every message that is due back to the outbound queue
                 now = datetime.utcnow()
                 ready_items = []
-                
-                while self.retry_queue:
-                    item = self.retry_queue[0]
-                    if (item.message.next_retry is None or 
-                        now >= item.message.next_retry):
-                        ready_items.append(heapq.heappop(self.retry_queue))
+                waiting_items = []
+                for item in self.retry_queue:
+                    if item.message.next_retry is None or now >= item.message.next_retry:
+                        ready_items.append(item)
                     else:
-                        break
+                        waiting_items.append(item)
                 
-                # Move ready items back to outbound queue
-                for item in ready_items:
-                    heapq.heappush(self.outbound_queue, item)
-                    self.logger.debug(f"Moved message {item.message.message.id} from retry to outbound queue")
+                if ready_items:
+                    heapq.heapify(waiting_items)
+                    self.retry_queue = waiting_items
+                    for item in ready_items:
+                        heapq.heappush(self.outbound_queue, item)
+                        self.logger.debug(f"Moved message {item.message.message.id} from retry to outbound queue")
+                    self._outbound_ready.set()
+                    self._update_depth_metrics()
                 
-                await asyncio.sleep(1)
+                if not self.retry_queue:
+                    continue
+                
+                # Sleep until the earliest retry is due, or a new retry is scheduled
+                next_due = min(item.message.next_retry for item in self.retry_queue)
+                self._retry_ready.clear()
+                await self._wait_for(self._retry_ready, (next_due - datetime.utcnow()).total_seconds())
+                self.wakeups['retry'] += 1
                 
             except Exception as e:
                 self.logger.error(f"Error processing retry queue: {e}")
@@ -709,8 +592,8 @@ class QueueManager:
             try:
                 await asyncio.sleep(300)  # Run every 5 minutes
                 
-                # Clean up rate limiter
-                self.rate_limiter.cleanup_old_buckets()
+                # Clean up idle rate limiter state
+                self.rate_limiter.sweep()
                 
                 # Clean up expired chunks
                 self.chunker.cleanup_expired_chunks()
@@ -755,12 +638,12 @@ class QueueManager:
             'retry': {
                 'queue_size': len(self.retry_queue)
             },
-            'rate_limiter': {
-                'active_buckets': len(self.rate_limiter.buckets),
-                'rules_count': len(self.rate_limiter.rules)
-            },
+            'rate_limiter': self.rate_limiter.get_stats(),
             'chunker': {
-                'active_chunk_buffers': len(self.chunker.chunk_buffers)
+                'active_chunk_buffers': len(self.chunker.reassembly.pending),
+                **self.chunker.reassembly.get_stats()
             },
-            'pending_messages': len(self.pending_messages)
+            'pending_messages': len(self.pending_messages),
+            'wakeups': dict(self.wakeups),
+            'persistence': self.store.get_stats() if self.store else None
         }
\ No newline at end of file
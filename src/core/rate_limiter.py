@@ -0,0 +1,386 @@
+"""
+Rate Limiting for ZephyrGate
+
+Shared token bucket rate limiting used by the message router and queue
+manager. Buckets run on the monotonic clock and are arranged in a hierarchy
+(global -> channel -> sender); a message is allowed only when every level
+has tokens, and tokens are taken from all levels at once. Per-sender state
+lives in a bounded LRU map with idle expiry, so memory stays flat no matter
+how many distinct nodes are heard.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .logging import get_logger
+
+
+Clock = Callable[[], float]
+
+
+class TokenBucket:
+    """Token bucket on a monotonic clock"""
+
+    __slots__ = ('capacity', 'refill_rate', 'tokens', 'updated', 'clock')
+
+    def __init__(self, capacity: float, refill_rate: float, tokens: Optional[float] = None,
+                 clock: Clock = time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)  # tokens per second
+        self.tokens = self.capacity if tokens is None else float(tokens)
+        self.clock = clock
+        self.updated = clock()
+
+    def refill(self, now: Optional[float] = None):
+        """Add tokens for the time elapsed since the last update"""
+        now = self.clock() if now is None else now
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated = now
+
+    def can_consume(self, tokens: float = 1.0, now: Optional[float] = None) -> bool:
+        """Check if tokens are available without taking them"""
+        self.refill(now)
+        return self.tokens >= tokens
+
+    def consume(self, tokens: float = 1.0, now: Optional[float] = None) -> bool:
+        """Take tokens if available"""
+        self.refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def get_wait_time(self, tokens: float = 1.0, now: Optional[float] = None) -> float:
+        """Seconds until ``tokens`` will be available"""
+        self.refill(now)
+        if self.tokens >= tokens:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float('inf')
+        return (tokens - self.tokens) / self.refill_rate
+
+    def time_to_full(self) -> float:
+        """Seconds for an empty bucket to refill completely"""
+        if self.refill_rate <= 0:
+            return float('inf')
+        return self.capacity / self.refill_rate
+
+
+@dataclass
+class RateLimitTier:
+    """Bucket parameters for one level (or sender class) of the hierarchy"""
+    capacity: float
+    refill_rate: float  # tokens per second
+
+    def create_bucket(self, clock: Clock = time.monotonic) -> TokenBucket:
+        return TokenBucket(self.capacity, self.refill_rate, clock=clock)
+
+
+class BoundedBucketMap:
+    """
+    LRU map of token buckets with idle expiry.
+
+    Entries are kept in last-use order, so expired entries are always at the
+    front and are dropped lazily on access. A bucket idle for at least its
+    time-to-full has refilled completely and is indistinguishable from a new
+    one, so the default TTL makes expiry lossless.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = None, clock: Clock = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Any, Tuple[TokenBucket, float]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._entries)
+
+    def get(self, key: Any, factory: Callable[[], TokenBucket], now: Optional[float] = None) -> TokenBucket:
+        """Get the bucket for ``key``, creating it with ``factory`` if missing"""
+        now = self.clock() if now is None else now
+        self.expire(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            bucket = entry[0]
+            self._entries.move_to_end(key)
+        else:
+            bucket = factory()
+            if len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        self._entries[key] = (bucket, now)
+        return bucket
+
+    def peek(self, key: Any) -> Optional[TokenBucket]:
+        """Get the bucket for ``key`` without creating it or updating recency"""
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop entries idle for longer than the TTL"""
+        if self.ttl is None or not self._entries:
+            return 0
+        now = self.clock() if now is None else now
+        cutoff = now - self.ttl
+        expired = 0
+        while self._entries:
+            key, (_, last_used) = next(iter(self._entries.items()))
+            if last_used > cutoff:
+                break
+            self._entries.popitem(last=False)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def clear(self):
+        self._entries.clear()
+
+
+@dataclass
+class RateLimiterStats:
+    """Rate limiter statistics"""
+    allowed: int = 0
+    limited_global: int = 0
+    limited_channel: int = 0
+    limited_sender: int = 0
+    delayed: int = 0
+    delay_timeouts: int = 0
+    total_delay: float = 0.0
+
+
+class HierarchicalRateLimiter:
+    """
+    Global -> channel -> sender token bucket rate limiter.
+
+    ``try_acquire`` checks every applicable level before taking tokens from
+    any of them, so a message blocked at the sender level does not use up
+    global capacity. ``acquire`` is the "delay until allowed" mode: it waits
+    for the earliest time every level has tokens (up to ``max_wait``) instead
+    of dropping. Senders can be assigned named tiers (e.g. ``emergency``)
+    with their own bucket parameters.
+    """
+
+    def __init__(self, global_tier: Optional[RateLimitTier] = None,
+                 channel_tier: Optional[RateLimitTier] = None,
+                 sender_tier: Optional[RateLimitTier] = None,
+                 sender_tiers: Optional[Dict[str, RateLimitTier]] = None,
+                 max_senders: int = 10000, sender_ttl: Optional[float] = None,
+                 max_channels: int = 256, clock: Clock = time.monotonic):
+        self.logger = get_logger('rate_limiter')
+        self.clock = clock
+        self.global_tier = global_tier
+        self.channel_tier = channel_tier
+        self.sender_tier = sender_tier
+        self.sender_tiers: Dict[str, RateLimitTier] = dict(sender_tiers or {})
+
+        self.global_bucket = global_tier.create_bucket(clock) if global_tier else None
+
+        self.channels = BoundedBucketMap(
+            max_size=max_channels,
+            ttl=self._lossless_ttl([channel_tier]),
+            clock=clock
+        )
+        if sender_ttl is None:
+            sender_ttl = self._lossless_ttl([sender_tier, *self.sender_tiers.values()])
+        self.senders = BoundedBucketMap(max_size=max_senders, ttl=sender_ttl, clock=clock)
+
+        self.stats = RateLimiterStats()
+
+    def _lossless_ttl(self, tiers: List[Optional[RateLimitTier]]) -> Optional[float]:
+        """Idle time after which any bucket of these tiers is back to full"""
+        times = [t.capacity / t.refill_rate for t in tiers if t and t.refill_rate > 0]
+        return max(times) if times else None
+
+    def _buckets(self, sender: Optional[str], channel: Optional[Any], tier: Optional[str],
+                 now: float, create: bool = True) -> List[Tuple[str, TokenBucket]]:
+        """
+        Buckets that apply to a message, outermost first.
+
+        With ``create=False`` (read-only checks) channel and sender state is
+        neither allocated nor moved up the LRU order; a missing entry is
+        stood in for by a full, unstored bucket.
+        """
+        def lookup(buckets: BoundedBucketMap, key: Any, tier_config: RateLimitTier) -> TokenBucket:
+            factory = lambda: tier_config.create_bucket(self.clock)
+            if create:
+                return buckets.get(key, factory, now)
+            return buckets.peek(key) or factory()
+
+        buckets = []
+        if self.global_bucket is not None:
+            buckets.append(('global', self.global_bucket))
+        if channel is not None and self.channel_tier is not None:
+            buckets.append(('channel', lookup(self.channels, channel, self.channel_tier)))
+        if sender is not None:
+            sender_tier = self.sender_tiers.get(tier, self.sender_tier) if tier else self.sender_tier
+            if sender_tier is not None:
+                key = (tier, sender) if tier in self.sender_tiers else sender
+                buckets.append(('sender', lookup(self.senders, key, sender_tier)))
+        return buckets
+
+    def try_acquire(self, sender: Optional[str] = None, channel: Optional[Any] = None,
+                    tokens: float = 1.0, tier: Optional[str] = None) -> bool:
+        """Take tokens from every level if all of them allow it"""
+        now = self.clock()
+        buckets = self._buckets(sender, channel, tier, now)
+
+        for level, bucket in buckets:
+            if not bucket.can_consume(tokens, now):
+                self._record_limited(level)
+                return False
+
+        for _, bucket in buckets:
+            bucket.tokens -= tokens
+        self.stats.allowed += 1
+        return True
+
+    def can_send(self, sender: Optional[str] = None, channel: Optional[Any] = None,
+                 tokens: float = 1.0, tier: Optional[str] = None) -> bool:
+        """Check whether a message would be allowed, without taking tokens"""
+        now = self.clock()
+        return all(b.can_consume(tokens, now) for _, b in self._buckets(sender, channel, tier, now, create=False))
+
+    def get_wait_time(self, sender: Optional[str] = None, channel: Optional[Any] = None,
+                      tokens: float = 1.0, tier: Optional[str] = None) -> float:
+        """Seconds until every level has ``tokens`` available"""
+        now = self.clock()
+        return max((b.get_wait_time(tokens, now) for _, b in self._buckets(sender, channel, tier, now, create=False)),
+                   default=0.0)
+
+    async def acquire(self, sender: Optional[str] = None, channel: Optional[Any] = None,
+                      tokens: float = 1.0, tier: Optional[str] = None,
+                      max_wait: Optional[float] = None) -> bool:
+        """
+        Wait until the message is allowed, then take tokens.
+
+        Returns False if it would not be allowed within ``max_wait`` seconds,
+        or at all (``tokens`` exceeds the capacity of an applicable bucket).
+        """
+        if self.try_acquire(sender, channel, tokens, tier):
+            return True
+
+        now = self.clock()
+        buckets = self._buckets(sender, channel, tier, now, create=False)
+        if any(tokens > bucket.capacity for _, bucket in buckets):
+            self.stats.delay_timeouts += 1
+            return False
+
+        start = now
+        self.stats.delayed += 1
+        while True:
+            wait = self.get_wait_time(sender, channel, tokens, tier)
+            waited = self.clock() - start
+            if max_wait is not None and waited + wait > max_wait:
+                self.stats.delay_timeouts += 1
+                return False
+
+            await asyncio.sleep(wait)
+            if self.try_acquire(sender, channel, tokens, tier):
+                self.stats.total_delay += self.clock() - start
+                return True
+
+    def _record_limited(self, level: str):
+        if level == 'global':
+            self.stats.limited_global += 1
+        elif level == 'channel':
+            self.stats.limited_channel += 1
+        else:
+            self.stats.limited_sender += 1
+
+    def sweep(self) -> int:
+        """Drop expired channel and sender state"""
+        return self.channels.expire() + self.senders.expire()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        return {
+            'allowed': self.stats.allowed,
+            'limited_global': self.stats.limited_global,
+            'limited_channel': self.stats.limited_channel,
+            'limited_sender': self.stats.limited_sender,
+            'delayed': self.stats.delayed,
+            'delay_timeouts': self.stats.delay_timeouts,
+            'average_delay': (self.stats.total_delay / self.stats.delayed) if self.stats.delayed else 0.0,
+            'global_tokens': self.global_bucket.tokens if self.global_bucket else None,
+            'active_channels': len(self.channels),
+            'active_senders': len(self.senders),
+            'max_senders': self.senders.max_size,
+            'sender_ttl': self.senders.ttl,
+            'sender_evictions': self.senders.evictions,
+            'sender_expirations': self.senders.expirations
+        }
+
+
+# Defaults shared by the router and queue manager
+DEFAULT_LIMITS = {
+    'global': {'capacity': 10.0, 'refill_rate': 1.0},     # 1 message per second overall
+    'channel': {'capacity': 20.0, 'refill_rate': 1.0},    # 1 message per second per channel
+    'sender': {'capacity': 5.0, 'refill_rate': 0.2},      # 1 message per 5 seconds per sender
+    'tiers': {
+        'emergency': {'capacity': 10.0, 'refill_rate': 2.0}
+    },
+    'max_senders': 10000
+}
+
+
+def _tier_from_config(config: Any, default: Optional[Dict[str, float]]) -> Optional[RateLimitTier]:
+    if config is None:
+        config = default
+    if not isinstance(config, dict):
+        return None
+    merged = {**(default or {}), **config}
+    if 'capacity' not in merged or 'refill_rate' not in merged:
+        return None
+    return RateLimitTier(capacity=float(merged['capacity']), refill_rate=float(merged['refill_rate']))
+
+
+def create_rate_limiter(config: Optional[Dict[str, Any]] = None,
+                        clock: Clock = time.monotonic) -> HierarchicalRateLimiter:
+    """
+    Build a hierarchical rate limiter from a configuration section.
+
+    Missing levels use ``DEFAULT_LIMITS``; a level set to ``false`` is disabled.
+    """
+    if not isinstance(config, dict):
+        config = {}
+
+    def level(name):
+        value = config.get(name)
+        if value is False:
+            return None
+        return _tier_from_config(value, DEFAULT_LIMITS[name])
+
+    tiers_config = config.get('tiers', DEFAULT_LIMITS['tiers'])
+    if not isinstance(tiers_config, dict):
+        tiers_config = {}
+    tiers = {}
+    for name, tier_config in {**DEFAULT_LIMITS['tiers'], **tiers_config}.items():
+        tier = _tier_from_config(tier_config, DEFAULT_LIMITS['tiers'].get(name))
+        if tier:
+            tiers[name] = tier
+
+    max_senders = config.get('max_senders', DEFAULT_LIMITS['max_senders'])
+    sender_ttl = config.get('sender_ttl')
+    return HierarchicalRateLimiter(
+        global_tier=level('global'),
+        channel_tier=level('channel'),
+        sender_tier=level('sender'),
+        sender_tiers=tiers,
+        max_senders=int(max_senders) if isinstance(max_senders, (int, float)) else DEFAULT_LIMITS['max_senders'],
+        sender_ttl=float(sender_ttl) if isinstance(sender_ttl, (int, float)) else None,
+        clock=clock
+    )
@@ -0,0 +1,369 @@
+"""
+Concurrent Service Dispatcher for ZephyrGate
+
+Fans routed messages out to service modules concurrently. Handler call
+signatures are resolved once when a service is registered, and every service
+gets its own timeout, concurrency limit (bulkhead) and retry state, so a slow
+or failing service cannot delay or duplicate delivery to the others.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .logging import get_logger
+from .metrics import LogHistogram, get_metrics_registry
+from .tracing import get_tracer
+
+
+# Handler call styles
+CALL_CONTEXT = 'context'            # handle_message_with_context(message, routing_context)
+CALL_MESSAGE = 'message'            # handle_message(message)
+CALL_MESSAGE_USER = 'message_user'  # handle_message(message, user)
+CALL_MESSAGE_CONTEXT = 'message_context'  # handle_message(message, context)
+CALL_NONE = 'none'                  # no usable handler
+
+
+def resolve_call_style(service: Any) -> str:
+    """Determine how a service's message handler should be called"""
+    # Only an explicitly defined context handler opts in (not dynamic attributes)
+    try:
+        inspect.getattr_static(service, 'handle_message_with_context')
+        return CALL_CONTEXT
+    except AttributeError:
+        pass
+
+    handler = getattr(service, 'handle_message', None)
+    if handler is None or not callable(handler):
+        return CALL_NONE
+
+    try:
+        signature = inspect.signature(handler)
+    except (TypeError, ValueError):
+        return CALL_MESSAGE
+
+    positional = [
+        p for p in signature.parameters.values()
+        if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    required = [p for p in positional if p.default is inspect.Parameter.empty]
+
+    if len(required) >= 2:
+        return CALL_MESSAGE_CONTEXT if required[1].name == 'context' else CALL_MESSAGE_USER
+    return CALL_MESSAGE
+
+
+@dataclass
+class ServiceHandler:
+    """A registered service with its resolved call style"""
+    name: str
+    service: Any
+    call_style: str
+
+    async def invoke(self, message: Any, user: Any, context: Dict[str, Any]) -> Any:
+        """Call the service's handler using the resolved signature"""
+        if self.call_style == CALL_CONTEXT:
+            result = self.service.handle_message_with_context(message, context)
+        elif self.call_style == CALL_MESSAGE_USER:
+            result = self.service.handle_message(message, user)
+        elif self.call_style == CALL_MESSAGE_CONTEXT:
+            result = self.service.handle_message(message, context)
+        else:
+            result = self.service.handle_message(message)
+
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+@dataclass
+class ServiceState:
+    """Per-service bulkhead, timeout and retry state"""
+    name: str
+    timeout: float
+    max_concurrency: int
+    semaphore: asyncio.Semaphore
+    in_flight: int = 0
+    waiting: int = 0
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    rejected: int = 0
+    consecutive_failures: int = 0
+    retries_scheduled: int = 0
+    retries_pending: int = 0
+    retries_exhausted: int = 0
+    last_error: Optional[str] = None
+    last_failure: Optional[datetime] = None
+    latency: LogHistogram = field(default_factory=LogHistogram)
+    exported_latency: Any = None  # registry series for this service
+
+
+@dataclass
+class DispatchOutcome:
+    """Result of delivering a message to one service"""
+    service: str
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+    duration: float = 0.0
+    timed_out: bool = False
+    skipped: bool = False
+
+
+ResultCallback = Callable[[str, Any, Any], Awaitable[None]]
+
+
+class ServiceDispatcher:
+    """
+    Concurrent fan-out of messages to services.
+
+    Each service call runs under its own ``asyncio.Semaphore`` (bulkhead) and
+    timeout. Results are handed to ``on_result`` as soon as each service
+    finishes. A failed call is retried for that service only, up to
+    ``max_retries`` times with exponential backoff, instead of re-queueing the
+    whole message for every service.
+    """
+
+    def __init__(self, default_timeout: float = 30.0, max_concurrency: int = 4,
+                 max_pending: int = 100, max_retries: int = 3, retry_delay: float = 30.0,
+                 service_overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.default_timeout = default_timeout
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.service_overrides = service_overrides or {}
+        self.logger = get_logger('service_dispatcher')
+
+        self.handlers: Dict[str, ServiceHandler] = {}
+        self.states: Dict[str, ServiceState] = {}
+        self.dispatch_latency = LogHistogram()
+        self.dispatches = 0
+        self._retry_tasks: Set[asyncio.Task] = set()
+
+        metrics = get_metrics_registry()
+        self._handler_latency = metrics.histogram(
+            'service_handler_seconds', 'Service and plugin message handler latency', ['service']
+        )
+        self._handler_calls = metrics.counter(
+            'service_calls_total', 'Service handler calls by outcome', ['service', 'outcome']
+        )
+
+    def register(self, name: str, service: Any) -> ServiceHandler:
+        """Register a service and resolve its handler signature"""
+        handler = ServiceHandler(name=name, service=service, call_style=resolve_call_style(service))
+        self.handlers[name] = handler
+        self._get_state(name)
+        self.logger.debug(f"Service {name} registered with call style '{handler.call_style}'")
+        return handler
+
+    def unregister(self, name: str):
+        """Forget a service's handler (its statistics are kept)"""
+        self.handlers.pop(name, None)
+
+    def _get_handler(self, name: str, service: Any) -> ServiceHandler:
+        handler = self.handlers.get(name)
+        if handler is None or handler.service is not service:
+            handler = self.register(name, service)
+        return handler
+
+    def _get_state(self, name: str) -> ServiceState:
+        state = self.states.get(name)
+        if state is None:
+            overrides = self.service_overrides.get(name, {})
+            if not isinstance(overrides, dict):
+                overrides = {}
+            max_concurrency = overrides.get('max_concurrency', self.max_concurrency)
+            state = ServiceState(
+                name=name,
+                timeout=overrides.get('timeout', self.default_timeout),
+                max_concurrency=max_concurrency,
+                semaphore=asyncio.Semaphore(max_concurrency),
+                exported_latency=self._handler_latency.labels(service=name)
+            )
+            self.states[name] = state
+        return state
+
+    async def dispatch(self, message: Any, user: Any, context: Dict[str, Any],
+                       targets: List[Tuple[str, Any]],
+                       on_result: Optional[ResultCallback] = None) -> List[DispatchOutcome]:
+        """
+        Deliver a message to all target services concurrently.
+
+        Args:
+            message: Message to deliver
+            user: Sender's user profile, if known
+            context: Routing context passed to context-aware handlers
+            targets: ``(service_name, service_instance)`` pairs
+            on_result: Coroutine called with ``(service_name, result, message)``
+                after each successful call
+
+        Returns:
+            One outcome per target, in target order
+        """
+        start = time.monotonic()
+        handlers = [self._get_handler(name, service) for name, service in targets]
+        outcomes = await asyncio.gather(*(
+            self._run(handler, message, user, context, on_result, 0) for handler in handlers
+        ))
+
+        self.dispatches += 1
+        self.dispatch_latency.record(time.monotonic() - start)
+        return list(outcomes)
+
+    async def _run(self, handler: ServiceHandler, message: Any, user: Any, context: Dict[str, Any],
+                   on_result: Optional[ResultCallback], attempt: int) -> DispatchOutcome:
+        """Call one service, hand off its result and schedule a retry on failure"""
+        outcome = await self._invoke(handler, message, user, context)
+
+        if outcome.success:
+            if on_result:
+                try:
+                    await on_result(handler.name, outcome.result, message)
+                except Exception as e:
+                    self.logger.error(f"Error handling result from {handler.name}: {e}")
+        elif not outcome.skipped:
+            self._schedule_retry(handler, message, user, context, on_result, attempt + 1)
+
+        return outcome
+
+    async def _invoke(self, handler: ServiceHandler, message: Any, user: Any,
+                      context: Dict[str, Any]) -> DispatchOutcome:
+        """Call a service inside its bulkhead and timeout"""
+        state = self._get_state(handler.name)
+
+        if handler.call_style == CALL_NONE:
+            self.logger.warning(f"Service {handler.name} lacks proper message handling interface")
+            return DispatchOutcome(service=handler.name, success=False, skipped=True)
+
+        if state.waiting >= self.max_pending:
+            state.rejected += 1
+            return self._failed(state, "Bulkhead full", 0.0, outcome='rejected')
+
+        start = time.monotonic()
+        state.waiting += 1
+        try:
+            await asyncio.wait_for(state.semaphore.acquire(), timeout=state.timeout)
+        except asyncio.TimeoutError:
+            state.rejected += 1
+            return self._failed(state, "Timed out waiting for a free slot", time.monotonic() - start,
+                                outcome='rejected')
+        finally:
+            state.waiting -= 1
+
+        state.in_flight += 1
+        state.calls += 1
+        try:
+            remaining = max(0.0, state.timeout - (time.monotonic() - start))
+            result = await asyncio.wait_for(handler.invoke(message, user, context), timeout=remaining)
+        except asyncio.TimeoutError:
+            state.timeouts += 1
+            self.logger.error(f"Service {handler.name} timed out after {state.timeout}s")
+            return self._failed(state, f"Timed out after {state.timeout}s", time.monotonic() - start,
+                                timed_out=True, outcome='timeout')
+        except Exception as e:
+            self.logger.error(f"Service {handler.name} failed to handle message: {e}")
+            return self._failed(state, str(e), time.monotonic() - start)
+        finally:
+            state.in_flight -= 1
+            state.semaphore.release()
+
+        duration = time.monotonic() - start
+        state.successes += 1
+        state.consecutive_failures = 0
+        self._record_latency(state, duration, 'success')
+        return DispatchOutcome(service=handler.name, success=True, result=result, duration=duration)
+
+    def _record_latency(self, state: ServiceState, duration: Optional[float], outcome: str):
+        if duration:
+            state.latency.record(duration)
+            state.exported_latency.observe(duration)
+        self._handler_calls.labels(state.name, outcome).inc()
+        get_tracer().record_span(f"service:{state.name}", duration or 0.0,
+                                 error=None if outcome == 'success' else outcome)
+
+    def _failed(self, state: ServiceState, error: str, duration: float,
+                timed_out: bool = False, outcome: str = 'failure') -> DispatchOutcome:
+        state.failures += 1
+        state.consecutive_failures += 1
+        state.last_error = error
+        state.last_failure = datetime.utcnow()
+        self._record_latency(state, duration, outcome)
+        return DispatchOutcome(service=state.name, success=False, error=error,
+                               duration=duration, timed_out=timed_out)
+
+    def _schedule_retry(self, handler: ServiceHandler, message: Any, user: Any, context: Dict[str, Any],
+                        on_result: Optional[ResultCallback], attempt: int):
+        """Retry a failed delivery to a single service after a backoff delay"""
+        state = self._get_state(handler.name)
+        if attempt > self.max_retries or state.retries_pending >= self.max_pending:
+            state.retries_exhausted += 1
+            return
+
+        delay = self.retry_delay * (2 ** (attempt - 1))
+        retry_context = {**context, 'is_retry': True, 'retry_count': attempt}
+
+        async def retry():
+            try:
+                await asyncio.sleep(delay)
+                # Use the current registration in case the service was replaced
+                current = self.handlers.get(handler.name)
+                if current is None:
+                    return
+                await self._run(current, message, user, retry_context, on_result, attempt)
+            finally:
+                state.retries_pending -= 1
+
+        state.retries_scheduled += 1
+        state.retries_pending += 1
+        task = asyncio.create_task(retry())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+        self.logger.info(f"Scheduled retry {attempt}/{self.max_retries} for {handler.name} in {delay:.0f}s")
+
+    async def stop(self):
+        """Cancel pending retries"""
+        for task in list(self._retry_tasks):
+            task.cancel()
+        if self._retry_tasks:
+            await asyncio.gather(*self._retry_tasks, return_exceptions=True)
+        self._retry_tasks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-service dispatch statistics"""
+        services = {}
+        for name, state in self.states.items():
+            services[name] = {
+                'call_style': self.handlers[name].call_style if name in self.handlers else None,
+                'timeout': state.timeout,
+                'max_concurrency': state.max_concurrency,
+                'in_flight': state.in_flight,
+                'waiting': state.waiting,
+                'calls': state.calls,
+                'successes': state.successes,
+                'failures': state.failures,
+                'timeouts': state.timeouts,
+                'rejected': state.rejected,
+                'consecutive_failures': state.consecutive_failures,
+                'retries_scheduled': state.retries_scheduled,
+                'retries_pending': state.retries_pending,
+                'retries_exhausted': state.retries_exhausted,
+                'last_error': state.last_error,
+                'last_failure': state.last_failure.isoformat() if state.last_failure else None,
+                'latency_p50_ms': state.latency.percentile(50) * 1000,
+                'latency_p95_ms': state.latency.percentile(95) * 1000,
+                'latency_p99_ms': state.latency.percentile(99) * 1000
+            }
+
+        return {
+            'dispatches': self.dispatches,
+            'retries_pending': sum(s.retries_pending for s in self.states.values()),
+            'dispatch_latency_p50_ms': self.dispatch_latency.percentile(50) * 1000,
+            'dispatch_latency_p99_ms': self.dispatch_latency.percentile(99) * 1000,
+            'services': services
+        }
@@ -0,0 +1,474 @@
+"""
+Statistics Rollups for ZephyrGate
+
+Keeps network statistics (packets, messages, active nodes, SNR, RSSI and
+battery) in minute, hour and day buckets so stats commands and
+leaderboards read a few dozen bucket rows instead of scanning message
+history and the node table on every request.
+
+Packets are counted in memory as they arrive and added to the rollup
+tables in one transaction every few seconds, the same way the node
+registry writes back node updates. Per-node rows are the source of truth;
+the network totals for each bucket follow them through triggers. Minute
+and hour buckets are pruned after their retention period, day buckets are
+kept. ``backfill_rollups`` rebuilds all of them from stored history.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import DatabaseManager, get_database
+from .logging import get_logger
+
+
+PERIODS = ('minute', 'hour', 'day')
+
+# Bucket keys are the bucket's start time; SQLite's strftime builds the
+# same keys from stored timestamps
+BUCKET_FORMATS = {
+    'minute': '%Y-%m-%dT%H:%M:00',
+    'hour': '%Y-%m-%dT%H:00:00',
+    'day': '%Y-%m-%dT00:00:00',
+}
+
+# Longest window read from each period before moving to a coarser one
+PERIOD_SPANS = {
+    'minute': timedelta(hours=3),
+    'hour': timedelta(days=14),
+}
+
+LEADERBOARD_METRICS = ('messages', 'packets', 'snr', 'battery')
+
+# Seconds between deletions of expired minute and hour buckets
+PRUNE_INTERVAL = 300
+
+_COUNT_COLUMNS = ('packets', 'messages', 'snr_sum', 'snr_count', 'rssi_sum', 'rssi_count',
+                  'battery_sum', 'battery_count')
+
+NODE_UPSERT = f"""
+    INSERT INTO node_stats_rollup
+    (period, bucket, node_id, {', '.join(_COUNT_COLUMNS)}, battery_last)
+    VALUES (?, ?, ?, {', '.join('?' for _ in _COUNT_COLUMNS)}, ?)
+    ON CONFLICT (period, bucket, node_id) DO UPDATE SET
+        {', '.join(f'{column} = {column} + excluded.{column}' for column in _COUNT_COLUMNS)},
+        battery_last = COALESCE(excluded.battery_last, battery_last)
+"""
+
+
+def _utc(moment: datetime) -> datetime:
+    """A datetime as stored: naive UTC"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def bucket_start(moment: datetime, period: str) -> str:
+    """Key of the ``period`` bucket containing ``moment``"""
+    return _utc(moment).strftime(BUCKET_FORMATS[period])
+
+
+def window_period(duration: Optional[timedelta]) -> str:
+    """Finest period whose buckets cover ``duration`` in a bounded number of rows"""
+    for period, span in PERIOD_SPANS.items():
+        if duration is not None and duration <= span:
+            return period
+    return 'day'
+
+
+@dataclass
+class _Counts:
+    """Pending additions to one node's bucket"""
+    packets: int = 0
+    messages: int = 0
+    snr_sum: float = 0.0
+    snr_count: int = 0
+    rssi_sum: float = 0.0
+    rssi_count: int = 0
+    battery_sum: float = 0.0
+    battery_count: int = 0
+    battery_last: Optional[int] = None
+
+    def add(self, other: '_Counts'):
+        for column in _COUNT_COLUMNS:
+            setattr(self, column, getattr(self, column) + getattr(other, column))
+        if other.battery_last is not None:
+            self.battery_last = other.battery_last
+
+
+@dataclass
+class RollupSummary:
+    """Network totals over a window of buckets"""
+    period: str
+    since: Optional[str]
+    packets: int = 0
+    messages: int = 0
+    active_nodes: int = 0  # distinct nodes heard in the window
+    average_snr: Optional[float] = None
+    average_rssi: Optional[float] = None
+    average_battery: Optional[float] = None  # mean of battery reports in the window
+
+
+class StatsRollup:
+    """
+    In-memory packet counters flushed into the rollup tables.
+
+    ``record_packet`` and ``record_message`` may be called from any thread.
+    Counters are written by a background thread every ``flush_interval``
+    seconds, so reads lag arrivals by at most that long. ``stop`` performs a
+    final flush.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, flush_interval: float = 10.0,
+                 minute_retention_hours: float = 48, hour_retention_days: float = 90):
+        self.db = db_manager
+        self.flush_interval = flush_interval
+        self.retention = {
+            'minute': timedelta(hours=minute_retention_hours),
+            'hour': timedelta(days=hour_retention_days),
+        }
+        self.logger = get_logger('stats_rollup')
+
+        self.pending: Dict[Tuple[str, str, str], _Counts] = {}
+        self.stats = {'packets': 0, 'messages': 0, 'flushes': 0, 'flush_failures': 0,
+                      'rows_written': 0, 'rows_pruned': 0}
+        self._last_prune = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            name='zephyrgate-stats-rollup',
+            daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"Statistics rollups started (flush every {self.flush_interval}s)")
+
+    def stop(self, timeout: float = 30.0):
+        """Stop the flush thread and write out all pending counts"""
+        self._stopping = True
+        self._wakeup.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+        self.flush()
+        self.logger.info("Statistics rollups stopped")
+
+    def record_packet(self, node_id: str, snr: Optional[float] = None, rssi: Optional[float] = None,
+                      battery_level: Optional[int] = None, timestamp: Optional[datetime] = None):
+        """Count a packet heard from a node, with its signal and any battery report"""
+        counts = _Counts(packets=1)
+        if snr is not None:
+            counts.snr_sum, counts.snr_count = snr, 1
+        if rssi is not None:
+            counts.rssi_sum, counts.rssi_count = rssi, 1
+        if battery_level is not None:
+            counts.battery_sum, counts.battery_count = battery_level, 1
+            counts.battery_last = battery_level
+        self._record(node_id, counts, timestamp)
+
+    def record_message(self, node_id: str, timestamp: Optional[datetime] = None):
+        """Count a text message sent by a node"""
+        self._record(node_id, _Counts(messages=1), timestamp)
+
+    def _record(self, node_id: str, counts: _Counts, timestamp: Optional[datetime]):
+        if not node_id:
+            return
+        moment = _utc(timestamp) if timestamp else datetime.utcnow()
+        with self._lock:
+            for period in PERIODS:
+                key = (period, bucket_start(moment, period), node_id)
+                pending = self.pending.get(key)
+                if pending is None:
+                    self.pending[key] = pending = _Counts()
+                pending.add(counts)
+            self.stats['packets'] += counts.packets
+            self.stats['messages'] += counts.messages
+
+    def flush(self) -> int:
+        """Add pending counts to the rollup tables; returns the number of node rows written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self.pending = self.pending, {}
+
+            if batch:
+                rows = [
+                    (*key, *(getattr(counts, column) for column in _COUNT_COLUMNS), counts.battery_last)
+                    for key, counts in batch.items()
+                ]
+                try:
+                    with self.db.transaction() as conn:
+                        conn.executemany(NODE_UPSERT, rows)
+                except Exception as e:
+                    self.logger.error(f"Statistics rollup flush failed, will retry: {e}")
+                    self._requeue(batch)
+                    self.stats['flush_failures'] += 1
+                    return 0
+                self.stats['flushes'] += 1
+                self.stats['rows_written'] += len(rows)
+
+            if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                self._last_prune = time.monotonic()
+                try:
+                    self.stats['rows_pruned'] += self.prune()
+                except Exception as e:
+                    self.logger.error(f"Statistics rollup pruning failed: {e}")
+
+            return len(batch)
+
+    def _requeue(self, batch: Dict[Tuple[str, str, str], _Counts]):
+        """Put a failed batch back, merging counts recorded since"""
+        with self._lock:
+            for key, counts in batch.items():
+                newer = self.pending.get(key)
+                if newer is not None:
+                    counts.add(newer)
+                self.pending[key] = counts
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Delete minute and hour buckets older than their retention; returns node rows deleted"""
+        now = _utc(now) if now else datetime.utcnow()
+        deleted = 0
+        with self.db.transaction() as conn:
+            for period, retention in self.retention.items():
+                cutoff = bucket_start(now - retention, period)
+                deleted += conn.execute(
+                    "DELETE FROM node_stats_rollup WHERE period = ? AND bucket < ?", (period, cutoff)
+                ).rowcount
+                conn.execute(
+                    "DELETE FROM network_stats_rollup WHERE period = ? AND bucket < ?", (period, cutoff)
+                )
+        return deleted
+
+    def _window(self, duration: Optional[timedelta], now: Optional[datetime]) -> Tuple[str, str]:
+        """Period and first bucket key of the window ending now; all of history when duration is None"""
+        period = window_period(duration)
+        if duration is None:
+            return period, ''
+        return period, bucket_start((_utc(now) if now else datetime.utcnow()) - duration, period)
+
+    def summary(self, duration: Optional[timedelta] = None, now: Optional[datetime] = None) -> RollupSummary:
+        """
+        Network totals over the last ``duration`` (all of history when None).
+
+        The window is rounded out to whole buckets: minutes for up to three
+        hours, hours for up to two weeks, days beyond that.
+        """
+        period, since = self._window(duration, now)
+        totals = self.db.execute_query(
+            """
+            SELECT SUM(packets), SUM(messages),
+                   SUM(snr_sum) / SUM(snr_count), SUM(rssi_sum) / SUM(rssi_count),
+                   SUM(battery_sum) / SUM(battery_count)
+            FROM network_stats_rollup WHERE period = ? AND bucket >= ?
+            """,
+            (period, since)
+        )[0]
+        return RollupSummary(
+            period=period,
+            since=since or None,
+            packets=totals[0] or 0,
+            messages=totals[1] or 0,
+            active_nodes=self.active_nodes(duration, now),
+            average_snr=totals[2],
+            average_rssi=totals[3],
+            average_battery=totals[4]
+        )
+
+    def active_nodes(self, duration: Optional[timedelta] = None, now: Optional[datetime] = None) -> int:
+        """Distinct nodes heard in the last ``duration``"""
+        period, since = self._window(duration, now)
+        rows = self.db.execute_query(
+            "SELECT COUNT(DISTINCT node_id) FROM node_stats_rollup WHERE period = ? AND bucket >= ?",
+            (period, since)
+        )
+        return rows[0][0]
+
+    def series(self, duration: timedelta, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Network totals per bucket over the last ``duration``, oldest first"""
+        period, since = self._window(duration, now)
+        rows = self.db.execute_query(
+            """
+            SELECT bucket, active_nodes, packets, messages,
+                   snr_sum / NULLIF(snr_count, 0) AS average_snr,
+                   battery_sum / NULLIF(battery_count, 0) AS average_battery
+            FROM network_stats_rollup WHERE period = ? AND bucket >= ?
+            ORDER BY bucket
+            """,
+            (period, since)
+        )
+        return [dict(row) for row in rows]
+
+    def top_nodes(self, metric: str, duration: Optional[timedelta] = None, limit: int = 10,
+                  now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Nodes ranked by a metric over the last ``duration``.
+
+        ``messages`` and ``packets`` are totals, ``snr`` is the average SNR of
+        the node's packets (with its average RSSI as ``rssi``) and
+        ``battery`` its latest reported level. Each entry has node_id,
+        short_name and value.
+        """
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Unknown leaderboard metric: {metric}")
+
+        period, since = self._window(duration, now)
+        if metric == 'battery':
+            # With one MAX() aggregate SQLite takes battery_last from the
+            # node's latest bucket with a battery report
+            sql = """
+                SELECT r.node_id, u.short_name, r.battery_last AS value, MAX(r.bucket) AS latest_bucket
+                FROM node_stats_rollup r LEFT JOIN users u ON u.node_id = r.node_id
+                WHERE r.period = ? AND r.bucket >= ? AND r.battery_count > 0
+                GROUP BY r.node_id
+                ORDER BY value DESC
+                LIMIT ?
+            """
+        else:
+            if metric == 'snr':
+                value, having = "SUM(r.snr_sum) / SUM(r.snr_count)", "SUM(r.snr_count) > 0"
+                value += " AS value, SUM(r.rssi_sum) / SUM(r.rssi_count) AS rssi"
+            else:
+                value, having = f"SUM(r.{metric}) AS value", f"SUM(r.{metric}) > 0"
+            sql = f"""
+                SELECT r.node_id, u.short_name, {value}
+                FROM node_stats_rollup r LEFT JOIN users u ON u.node_id = r.node_id
+                WHERE r.period = ? AND r.bucket >= ?
+                GROUP BY r.node_id
+                HAVING {having}
+                ORDER BY value DESC
+                LIMIT ?
+            """
+        rows = self.db.execute_query(sql, (period, since, limit))
+        return [
+            {**dict(row), 'short_name': row['short_name'] or row['node_id'][-4:]}
+            for row in rows
+        ]
+
+    def _flush_loop(self):
+        """Background thread: flush on an interval"""
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Error in statistics rollup flush loop: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rollup counter statistics"""
+        with self._lock:
+            return {**self.stats, 'pending_rows': len(self.pending)}
+
+
+def backfill_rollups(db: DatabaseManager, now: Optional[datetime] = None,
+                     minute_retention_hours: float = 48, hour_retention_days: float = 90) -> int:
+    """
+    Rebuild the rollup tables from message history and the node table.
+
+    Every stored message counts as a packet and a message from its sender,
+    with its SNR and RSSI. Battery history is not stored, so each node's
+    current battery level is added at the bucket it was last seen in.
+    Existing rollup rows are replaced; run this while the gateway is
+    stopped so counts recorded meanwhile are not lost or doubled.
+
+    Returns:
+        Number of node rollup rows written
+    """
+    now = _utc(now) if now else datetime.utcnow()
+    cutoffs = {
+        'minute': bucket_start(now - timedelta(hours=minute_retention_hours), 'minute'),
+        'hour': bucket_start(now - timedelta(days=hour_retention_days), 'hour'),
+        'day': '',
+    }
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM node_stats_rollup")
+        conn.execute("DELETE FROM network_stats_rollup")
+
+        for period, since in cutoffs.items():
+            bucket = f"strftime('{BUCKET_FORMATS[period]}', timestamp)"
+            conn.execute(
+                f"""
+                INSERT INTO node_stats_rollup
+                (period, bucket, node_id, packets, messages, snr_sum, snr_count, rssi_sum, rssi_count)
+                SELECT ?, {bucket} AS rollup_bucket, sender_id, COUNT(*), COUNT(*),
+                       TOTAL(snr), COUNT(snr), TOTAL(rssi), COUNT(rssi)
+                FROM message_history
+                WHERE {bucket} >= ?
+                GROUP BY rollup_bucket, sender_id
+                """,
+                (period, since)
+            )
+
+            bucket = f"strftime('{BUCKET_FORMATS[period]}', last_seen)"
+            conn.execute(
+                f"""
+                INSERT INTO node_stats_rollup
+                (period, bucket, node_id, battery_sum, battery_count, battery_last)
+                SELECT ?, {bucket}, node_id, battery_level, 1, battery_level
+                FROM users
+                WHERE battery_level IS NOT NULL AND {bucket} >= ?
+                ON CONFLICT (period, bucket, node_id) DO UPDATE SET
+                    battery_sum = battery_sum + excluded.battery_sum,
+                    battery_count = battery_count + excluded.battery_count,
+                    battery_last = excluded.battery_last
+                """,
+                (period, since)
+            )
+
+        return conn.execute("SELECT COUNT(*) FROM node_stats_rollup").fetchone()[0]
+
+
+# Global statistics rollup instance (created on first use or by the application)
+stats_rollup: Optional[StatsRollup] = None
+_rollup_lock = threading.Lock()
+
+
+def initialize_stats_rollup(db_manager: DatabaseManager, flush_interval: float = 10.0,
+                            minute_retention_hours: float = 48,
+                            hour_retention_days: float = 90) -> StatsRollup:
+    """Initialize and start the global statistics rollup"""
+    global stats_rollup
+    with _rollup_lock:
+        if stats_rollup is not None:
+            stats_rollup.stop()
+        stats_rollup = StatsRollup(db_manager, flush_interval, minute_retention_hours, hour_retention_days)
+        stats_rollup.start()
+        return stats_rollup
+
+
+def get_stats_rollup() -> StatsRollup:
+    """Get the global statistics rollup, creating it from the global database if needed"""
+    global stats_rollup
+    if stats_rollup is None:
+        with _rollup_lock:
+            if stats_rollup is None:
+                stats_rollup = StatsRollup(get_database())
+                stats_rollup.start()
+    return stats_rollup
+
+
+def shutdown_stats_rollup():
+    """Flush and stop the global statistics rollup"""
+    global stats_rollup
+    with _rollup_lock:
+        if stats_rollup is not None:
+            stats_rollup.stop()
+            stats_rollup = None
@@ -0,0 +1,445 @@
+"""
+Plugin Storage Cache for ZephyrGate
+
+Sits between PluginStorage and the ``plugin_storage`` table. Reads go
+through a process-wide LRU cache, including remembered misses, so plugins
+that read counters or session state on every message stop making a SQLite
+roundtrip per access. Writes update the cache at once and are queued; all
+writes queued within ``write_delay`` seconds are committed together in one
+transaction off the event loop, and repeated writes to a key in that window
+become a single row write. Reads of a key with a queued write are served from
+the queue, so the cache can never return an older value than was written.
+
+Expired rows are deleted by a background sweeper on the shared job scheduler,
+using the ``expires_at`` index, instead of only when they happen to be read.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .database import DatabaseManager, DatabaseError, get_database
+from .job_scheduler import Job, MisfirePolicy, get_job_scheduler
+from .logging import get_logger
+
+
+StorageKey = Tuple[str, str]  # (plugin name, key)
+
+# Keys per IN (...) query, below SQLite's default bound parameter limit
+QUERY_CHUNK = 500
+
+
+@dataclass
+class StoredValue:
+    """A cached row; ``value`` is None when the key is known to be absent"""
+    value: Optional[str]
+    expires_at: Optional[float] = None  # epoch seconds
+
+    @property
+    def size(self) -> int:
+        return len(self.value) if self.value is not None else 0
+
+    def live(self, now: float) -> bool:
+        return self.value is not None and (self.expires_at is None or now < self.expires_at)
+
+
+@dataclass
+class StorageCacheStats:
+    """Plugin storage cache statistics"""
+    hits: int = 0
+    misses: int = 0
+    db_reads: int = 0
+    writes: int = 0
+    coalesced: int = 0
+    flushes: int = 0
+    rows_written: int = 0
+    write_errors: int = 0
+    scans: int = 0
+    swept: int = 0
+    evictions: int = 0
+
+
+def _to_epoch(expires_at: Optional[str]) -> Optional[float]:
+    """Stored expiry times are naive UTC ISO strings"""
+    if not expires_at:
+        return None
+    return (datetime.fromisoformat(expires_at) - datetime(1970, 1, 1)).total_seconds()
+
+
+def _to_iso(expires_at: Optional[float]) -> Optional[str]:
+    if expires_at is None:
+        return None
+    return datetime.utcfromtimestamp(expires_at).isoformat()
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with ``prefix``"""
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code <= 0xDFFF:
+            code = 0xE000  # surrogates cannot be stored
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+
+class PluginStorageCache:
+    """Read-through, write-behind cache over the plugin_storage table"""
+
+    def __init__(self, db: DatabaseManager, max_entries: int = 4096, max_bytes: int = 4 * 1024 * 1024,
+                 write_delay: float = 0.5, max_pending: int = 500, sweep_interval: float = 60.0,
+                 sweep_batch: int = 500):
+        """
+        Initialize the cache.
+
+        Args:
+            db: Database holding the plugin_storage table
+            max_entries: Cached keys kept, including remembered misses
+            max_bytes: Total size of cached JSON values
+            write_delay: Seconds writes are held to be committed together;
+                0 commits each write before it returns
+            max_pending: Queued writes that trigger a commit straight away
+            sweep_interval: Seconds between expired row sweeps; 0 disables
+            sweep_batch: Rows deleted per sweep transaction
+        """
+        self.db = db
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.write_delay = write_delay
+        self.max_pending = max_pending
+        self.sweep_interval = sweep_interval
+        self.sweep_batch = sweep_batch
+        self.logger = get_logger('plugin_storage')
+        self.stats = StorageCacheStats()
+
+        self.entries: 'OrderedDict[StorageKey, StoredValue]' = OrderedDict()
+        self.bytes = 0
+        # Writes not yet committed; value None is a delete
+        self._pending: Dict[StorageKey, StoredValue] = {}
+        self._inflight: Dict[StorageKey, StoredValue] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sweep_job: Optional[Job] = None
+
+        if sweep_interval > 0:
+            self._sweep_job = get_job_scheduler().add_job(
+                self.sweep, interval=sweep_interval, name="plugin_storage.sweep",
+                owner="plugin_storage", misfire=MisfirePolicy.SKIP, misfire_grace=sweep_interval
+            )
+
+    # Cache
+
+    def _cache_get(self, key: StorageKey) -> Optional[StoredValue]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def _cache_put(self, key: StorageKey, entry: StoredValue):
+        self._cache_remove(key)
+        self.entries[key] = entry
+        self.bytes += entry.size
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._cache_remove(next(iter(self.entries)))
+            self.stats.evictions += 1
+
+    def _cache_remove(self, key: StorageKey):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def _unflushed(self, key: StorageKey) -> Optional[StoredValue]:
+        entry = self._pending.get(key)
+        return entry if entry is not None else self._inflight.get(key)
+
+    # Reads
+
+    def get(self, plugin_name: str, key: str) -> Optional[str]:
+        """JSON text stored under a key, or None if it is absent or expired"""
+        return self.get_many(plugin_name, [key]).get(key)
+
+    def get_many(self, plugin_name: str, keys: Iterable[str]) -> Dict[str, str]:
+        """JSON text of the keys that are present and unexpired"""
+        now = time.time()
+        found: Dict[str, str] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            storage_key = (plugin_name, key)
+            entry = self._unflushed(storage_key) or self._cache_get(storage_key)
+            if entry is None:
+                missing.append(key)
+                continue
+            self.stats.hits += 1
+            if entry.live(now):
+                found[key] = entry.value
+
+        self.stats.misses += len(missing)
+        for start in range(0, len(missing), QUERY_CHUNK):
+            chunk = missing[start:start + QUERY_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = self.db.execute_query(
+                f"SELECT key, value, expires_at FROM plugin_storage "
+                f"WHERE plugin_name = ? AND key IN ({placeholders})",
+                (plugin_name, *chunk)
+            )
+            self.stats.db_reads += 1
+            loaded = {row['key']: StoredValue(row['value'], _to_epoch(row['expires_at'])) for row in rows}
+            for key in chunk:
+                entry = loaded.get(key)
+                if entry is not None and not entry.live(now):
+                    entry = None  # left for the sweeper
+                self._cache_put((plugin_name, key), entry or StoredValue(None))
+                if entry is not None:
+                    found[key] = entry.value
+        return found
+
+    def scan(self, plugin_name: str, prefix: str = "", values: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Unexpired keys starting with ``prefix``, in key order.
+
+        Uses a range on the primary key, so ``%`` and ``_`` in the prefix are
+        literal. With ``values=False`` the mapped values are None.
+        """
+        self.stats.scans += 1
+        now = time.time()
+        upper = _prefix_upper_bound(prefix)
+        columns = "key, value, expires_at" if values else "key, expires_at"
+        query = f"SELECT {columns} FROM plugin_storage WHERE plugin_name = ? AND key >= ?"
+        params: Tuple = (plugin_name, prefix)
+        if upper is not None:
+            query += " AND key < ?"
+            params += (upper,)
+        rows = self.db.execute_query(query + " ORDER BY key", params)
+        self.stats.db_reads += 1
+
+        results: Dict[str, Optional[str]] = {}
+        for row in rows:
+            expires_at = _to_epoch(row['expires_at'])
+            if expires_at is None or now < expires_at:
+                results[row['key']] = row['value'] if values else None
+
+        # Overlay writes the database has not seen yet
+        for unflushed in (self._inflight, self._pending):
+            for (owner, key), entry in unflushed.items():
+                if owner != plugin_name or not key.startswith(prefix):
+                    continue
+                if entry.live(now):
+                    results[key] = entry.value if values else None
+                else:
+                    results.pop(key, None)
+        return dict(sorted(results.items()))
+
+    # Writes
+
+    async def set_many(self, plugin_name: str, items: Dict[str, str], ttl: Optional[float] = None):
+        """Store JSON text under each key, with an optional time to live"""
+        expires_at = time.time() + ttl if ttl else None
+        for key, value in items.items():
+            self._write((plugin_name, key), StoredValue(value, expires_at))
+        await self._after_write()
+
+    async def delete_many(self, plugin_name: str, keys: Iterable[str]) -> int:
+        """Delete keys; returns how many were present"""
+        keys = list(dict.fromkeys(keys))
+        present = self.get_many(plugin_name, keys)
+        for key in keys:
+            self._write((plugin_name, key), StoredValue(None))
+        await self._after_write()
+        return len(present)
+
+    def _write(self, key: StorageKey, entry: StoredValue):
+        self.stats.writes += 1
+        if key in self._pending:
+            self.stats.coalesced += 1
+        self._pending[key] = entry
+        self._cache_put(key, entry)
+
+    async def _after_write(self):
+        if self.write_delay <= 0 or len(self._pending) >= self.max_pending:
+            await self.flush()
+        else:
+            self._arm_flush(self.write_delay)
+
+    def _arm_flush(self, delay: float):
+        loop = asyncio.get_running_loop()
+        if self._flush_timer is not None and self._flush_loop is loop:
+            return
+        self._flush_loop = loop
+        self._flush_timer = loop.call_later(delay, self._flush_soon)
+
+    def _flush_soon(self):
+        self._flush_timer = None
+        asyncio.ensure_future(self._flush_logged())
+
+    async def _flush_logged(self):
+        try:
+            await self.flush()
+        except Exception:
+            pass  # logged by _commit; the writes are retried
+
+    async def flush(self):
+        """Commit queued writes; raises DatabaseError if the commit fails"""
+        while self._flush_task is not None and not self._flush_task.done():
+            try:
+                await asyncio.shield(self._flush_task)
+            except DatabaseError:
+                pass  # its writes are queued again and go out with ours
+        if not self._pending:
+            return
+        self._flush_task = asyncio.ensure_future(self._commit())
+        await asyncio.shield(self._flush_task)
+
+    async def _commit(self):
+        batch, self._pending = self._pending, {}
+        self._inflight = batch
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+            self.stats.flushes += 1
+            self.stats.rows_written += len(batch)
+        except Exception as e:
+            self.stats.write_errors += 1
+            self.logger.error(f"Error writing {len(batch)} plugin storage key(s): {e}")
+            # Retry later, keeping any newer writes to the same keys
+            for key, entry in batch.items():
+                self._pending.setdefault(key, entry)
+            self._arm_flush(max(self.write_delay, 1.0))
+            raise DatabaseError(f"Plugin storage write failed: {e}") from e
+        finally:
+            self._inflight = {}
+
+    def _write_batch(self, batch: Dict[StorageKey, StoredValue]):
+        upserts = [(plugin_name, key, entry.value, _to_iso(entry.expires_at))
+                   for (plugin_name, key), entry in batch.items() if entry.value is not None]
+        deletes = [key for key, entry in batch.items() if entry.value is None]
+        with self.db.transaction() as conn:
+            if upserts:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO plugin_storage
+                    (plugin_name, key, value, expires_at, updated_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """, upserts)
+            if deletes:
+                conn.executemany(
+                    "DELETE FROM plugin_storage WHERE plugin_name = ? AND key = ?", deletes
+                )
+
+    # Expiry
+
+    async def sweep(self) -> int:
+        """Delete expired rows and cache entries; returns the rows deleted"""
+        now = time.time()
+        for key in [key for key, entry in self.entries.items()
+                    if entry.expires_at is not None and entry.expires_at <= now]:
+            self._cache_remove(key)
+
+        swept = await asyncio.to_thread(self._delete_expired, _to_iso(now))
+        self.stats.swept += swept
+        if swept:
+            self.logger.debug(f"Swept {swept} expired plugin storage key(s)")
+        return swept
+
+    def _delete_expired(self, now: str) -> int:
+        total = 0
+        while True:
+            # Short transactions so the sweep never holds the write lock for long
+            deleted = self.db.execute_update("""
+                DELETE FROM plugin_storage WHERE rowid IN (
+                    SELECT rowid FROM plugin_storage WHERE expires_at <= ? LIMIT ?
+                )
+            """, (now, self.sweep_batch))
+            total += deleted
+            if deleted < self.sweep_batch:
+                return total
+
+    async def close(self):
+        """Commit queued writes and stop the sweeper"""
+        if self._sweep_job is not None:
+            self._sweep_job.cancel()
+            self._sweep_job = None
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            **asdict(self.stats),
+            'hit_rate': round(self.stats.hits / lookups, 4) if lookups else 0.0,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'pending_writes': len(self._pending) + len(self._inflight)
+        }
+
+
+def create_storage_cache(config: Optional[Dict[str, Any]] = None,
+                         db: Optional[DatabaseManager] = None) -> PluginStorageCache:
+    """Build a storage cache from the ``plugins.storage`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    return PluginStorageCache(
+        db if db is not None else get_database(),
+        max_entries=int(config.get('cache_max_entries', 4096)),
+        max_bytes=int(config.get('cache_max_bytes', 4 * 1024 * 1024)),
+        write_delay=float(config.get('write_delay', 0.5)),
+        max_pending=int(config.get('max_pending', 500)),
+        sweep_interval=float(config.get('sweep_interval', 60.0))
+    )
+
+
+# Global plugin storage cache
+storage_cache: Optional[PluginStorageCache] = None
+storage_config: Dict[str, Any] = {}
+
+
+def initialize_storage_cache(config: Optional[Dict[str, Any]] = None,
+                             db: Optional[DatabaseManager] = None) -> PluginStorageCache:
+    """Initialize the global plugin storage cache"""
+    global storage_cache, storage_config
+    storage_config = config if isinstance(config, dict) else {}
+    if storage_cache is not None and storage_cache._sweep_job is not None:
+        storage_cache._sweep_job.cancel()
+    storage_cache = create_storage_cache(storage_config, db)
+    return storage_cache
+
+
+def get_storage_cache(db: Optional[DatabaseManager] = None) -> PluginStorageCache:
+    """
+    Get the global storage cache for ``db`` (default: the global database).
+
+    A cache holds rows of one database; asking for another database
+    replaces it.
+
+    Raises:
+        DatabaseError: If no database is given and none is initialized
+    """
+    if db is None:
+        db = get_database()
+    if storage_cache is None or storage_cache.db is not db:
+        if storage_cache is not None and storage_cache._pending:
+            try:
+                storage_cache._write_batch(storage_cache._pending)
+            except Exception as e:
+                storage_cache.logger.error(f"Plugin storage writes lost replacing cache: {e}")
+        return initialize_storage_cache(storage_config, db)
+    return storage_cache
+
+
+def get_storage_cache_stats() -> Optional[Dict[str, Any]]:
+    """Statistics of the global storage cache, if one is in use"""
+    return storage_cache.get_stats() if storage_cache is not None else None
+
+
+async def shutdown_storage_cache():
+    """Commit queued plugin storage writes and stop the sweeper"""
+    if storage_cache is not None:
+        try:
+            await storage_cache.close()
+        except DatabaseError as e:
+            storage_cache.logger.error(f"Plugin storage writes lost at shutdown: {e}")
@@ -0,0 +1,337 @@
+"""
+Per-Message Pipeline Tracing for ZephyrGate
+
+Records where the time goes for each message: receive, reassembly,
+classification, plugin and service handlers, queueing, rate limiting,
+airtime waits and transmission. A trace is keyed by the ID of the message
+that started it and holds a flat list of timed spans.
+
+The trace being worked on is carried in a context variable, so code called
+while handling a message (including tasks it creates) adds spans to it.
+Where work crosses a queue, the message carries ``metadata['trace_id']``
+and the consumer re-activates the trace with ``tracer.activate(...)``.
+
+Sampling is decided from a hash of the message ID, so every component
+makes the same choice for a message. Traces are kept in memory in a ring
+buffer; traces slower than ``slow_threshold`` are also kept in a second,
+smaller ring so busy traffic does not push them out.
+
+    tracer = get_tracer()
+    with tracer.activate(tracer.start_trace(message, interface='serial0')):
+        with tracer.span('classify'):
+            ...
+"""
+
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .logging import get_logger
+from .metrics import LogHistogram
+
+
+_current_trace: ContextVar[Optional['Trace']] = ContextVar('zephyrgate_trace', default=None)
+
+
+@dataclass
+class Span:
+    """A timed pipeline stage within a trace"""
+    name: str
+    offset: float  # seconds from the start of the trace
+    duration: float
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'name': self.name, 'offset': self.offset, 'duration': self.duration}
+        if self.error:
+            data['error'] = self.error
+        if self.attributes:
+            data['attributes'] = self.attributes
+        return data
+
+
+class Trace:
+    """Spans recorded for one message"""
+
+    def __init__(self, trace_id: str, attributes: Optional[Dict[str, Any]] = None, max_spans: int = 100):
+        self.trace_id = trace_id
+        self.attributes = attributes or {}
+        self.max_spans = max_spans
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.first = 0.0  # offset of the earliest span start (spans may predate the trace)
+        self.end = 0.0  # offset of the latest span end
+        self.slow = False
+
+    def add_span(self, name: str, start: float, duration: float, error: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        """Add a span that started at ``start`` (a ``time.perf_counter()`` value)"""
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return
+        offset = start - self.start
+        self.spans.append(Span(name, offset, duration, error, attributes or {}))
+        self.first = min(self.first, offset)
+        self.end = max(self.end, offset + duration)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.first
+
+    def breakdown(self) -> Dict[str, float]:
+        """Total time per span name"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'started_at': self.started_at.isoformat(),
+            'duration': self.duration,
+            'spans': len(self.spans),
+            'errors': sum(1 for span in self.spans if span.error),
+            'attributes': self.attributes,
+            'breakdown': self.breakdown()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.summary(),
+            'dropped_spans': self.dropped_spans,
+            'spans': [span.to_dict() for span in sorted(self.spans, key=lambda span: span.offset)]
+        }
+
+
+class _Activation:
+    """Context manager making a trace current"""
+    __slots__ = ('trace', 'token')
+
+    def __init__(self, trace: Optional[Trace]):
+        self.trace = trace
+        self.token = None
+
+    def __enter__(self) -> Optional[Trace]:
+        self.token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self.token)
+        return False
+
+
+class _SpanTimer:
+    """Context manager timing one span; also feeds an optional metric series"""
+    __slots__ = ('tracer', 'name', 'metric', 'attributes', 'trace', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, metric: Any, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.metric = metric
+        self.attributes = attributes
+
+    def __enter__(self) -> '_SpanTimer':
+        self.trace = _current_trace.get()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if self.metric is not None:
+            self.metric.observe(duration)
+        if self.trace is not None:
+            error = exc_type.__name__ if exc_type is not None else None
+            self.tracer._add_span(self.trace, self.name, self.start, duration, error, self.attributes)
+        return False
+
+
+class Tracer:
+    """
+    Sampled in-memory message tracing.
+
+    ``span`` costs two clock reads when the current message is not
+    sampled, so stages can be wrapped unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True, sample_rate: float = 1.0, max_traces: int = 500,
+                 max_slow_traces: int = 50, slow_threshold: float = 5.0, max_spans: int = 100,
+                 max_stages: int = 200):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_traces = max_traces
+        self.max_slow_traces = max_slow_traces
+        self.slow_threshold = slow_threshold
+        self.max_spans = max_spans
+        self.max_stages = max_stages
+        self.logger = get_logger('tracing')
+
+        self.traces: 'OrderedDict[str, Trace]' = OrderedDict()
+        self.slow_traces: 'OrderedDict[str, Trace]' = OrderedDict()
+        self.stage_latency: Dict[str, LogHistogram] = {}
+        self.traces_started = 0
+        self.spans_recorded = 0
+        self._lock = threading.Lock()  # interfaces may start traces from their reader threads
+
+    # Trace lifecycle
+
+    def sampled(self, message_id: str) -> bool:
+        """Whether a message is traced; the same for every caller"""
+        if not self.enabled or self.sample_rate <= 0:
+            return False
+        if self.sample_rate >= 1:
+            return True
+        return zlib.crc32(message_id.encode('utf-8')) < self.sample_rate * 0x100000000
+
+    def start_trace(self, message: Any, **attributes) -> Optional[Trace]:
+        """Start (or return the existing) trace for a message, if it is sampled"""
+        trace_id = message.metadata.get('trace_id') or message.id
+        with self._lock:
+            trace = self.traces.get(trace_id)
+            if trace is not None or not self.sampled(trace_id):
+                return trace
+            trace = Trace(trace_id, {
+                'sender_id': message.sender_id,
+                'channel': message.channel,
+                **attributes
+            }, self.max_spans)
+            self.traces[trace_id] = trace
+            while len(self.traces) > self.max_traces:
+                self.traces.popitem(last=False)
+            self.traces_started += 1
+        message.metadata['trace_id'] = trace_id
+        return trace
+
+    def trace_of(self, message: Any) -> Optional[Trace]:
+        """Get the trace a message belongs to"""
+        return self.traces.get(message.metadata.get('trace_id') or message.id)
+
+    def current(self) -> Optional[Trace]:
+        """Get the trace being worked on in this context"""
+        return _current_trace.get()
+
+    def activate(self, trace: Optional[Trace]) -> _Activation:
+        """Make a trace current for the duration of a ``with`` block"""
+        return _Activation(trace)
+
+    def attach(self, message: Any):
+        """Mark a message created while handling a traced one as part of its trace"""
+        trace = _current_trace.get()
+        if trace is not None:
+            message.metadata.setdefault('trace_id', trace.trace_id)
+
+    # Spans
+
+    def span(self, name: str, metric: Any = None, **attributes) -> _SpanTimer:
+        """Time a stage of the current trace; ``metric`` also gets the duration"""
+        return _SpanTimer(self, name, metric, attributes)
+
+    def record_span(self, name: str, duration: float, error: Optional[str] = None,
+                    trace: Optional[Trace] = None, **attributes):
+        """Add a span that ended just now to the current (or given) trace"""
+        trace = trace or _current_trace.get()
+        if trace is not None:
+            self._add_span(trace, name, time.perf_counter() - duration, duration, error, attributes)
+
+    def _add_span(self, trace: Trace, name: str, start: float, duration: float,
+                  error: Optional[str], attributes: Dict[str, Any]):
+        trace.add_span(name, start, duration, error, attributes)
+        self.spans_recorded += 1
+
+        histogram = self.stage_latency.get(name)
+        if histogram is None and len(self.stage_latency) < self.max_stages:
+            histogram = self.stage_latency[name] = LogHistogram()
+        if histogram is not None:
+            histogram.record(duration)
+
+        if not trace.slow and trace.duration >= self.slow_threshold:
+            trace.slow = True
+            with self._lock:
+                self.slow_traces[trace.trace_id] = trace
+                while len(self.slow_traces) > self.max_slow_traces:
+                    self.slow_traces.popitem(last=False)
+            self.logger.info(f"Slow message {trace.trace_id}: {trace.duration:.2f}s so far, "
+                             f"last stage {name} took {duration:.2f}s")
+
+    # Reporting
+
+    def get_trace(self, trace_id: str) -> Optional[Trace]:
+        return self.traces.get(trace_id) or self.slow_traces.get(trace_id)
+
+    def recent(self, limit: int = 50) -> List[Trace]:
+        """Most recent traces, newest first"""
+        with self._lock:
+            traces = list(self.traces.values())
+        return traces[::-1][:limit]
+
+    def slowest(self, limit: int = 20) -> List[Trace]:
+        """Slowest retained traces, slowest first"""
+        with self._lock:
+            candidates = {**self.traces, **self.slow_traces}
+        return sorted(candidates.values(), key=lambda trace: trace.duration, reverse=True)[:limit]
+
+    def stage_breakdown(self) -> Dict[str, Dict[str, Any]]:
+        """Latency statistics per stage across sampled traffic"""
+        return {name: histogram.get_stats() for name, histogram in sorted(self.stage_latency.items())}
+
+    def export(self, trace_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Full traces as JSON-serializable dicts (all retained traces by default)"""
+        if trace_ids is None:
+            with self._lock:
+                traces = list({**self.slow_traces, **self.traces}.values())
+        else:
+            traces = [trace for trace in map(self.get_trace, trace_ids) if trace is not None]
+        return [trace.to_dict() for trace in traces]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracer statistics"""
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'slow_threshold': self.slow_threshold,
+            'traces_started': self.traces_started,
+            'spans_recorded': self.spans_recorded,
+            'retained_traces': len(self.traces),
+            'retained_slow_traces': len(self.slow_traces)
+        }
+
+
+def create_tracer(config: Optional[Dict[str, Any]] = None) -> Tracer:
+    """Build a tracer from the ``tracing`` configuration section"""
+    if not isinstance(config, dict):
+        config = {}
+    return Tracer(
+        enabled=bool(config.get('enabled', True)),
+        sample_rate=float(config.get('sample_rate', 1.0)),
+        max_traces=int(config.get('max_traces', 500)),
+        max_slow_traces=int(config.get('max_slow_traces', 50)),
+        slow_threshold=float(config.get('slow_threshold', 5.0)),
+        max_spans=int(config.get('max_spans', 100))
+    )
+
+
+# Global tracer
+tracer: Optional[Tracer] = None
+
+
+def initialize_tracer(config: Optional[Dict[str, Any]] = None) -> Tracer:
+    """Initialize the global tracer"""
+    global tracer
+    tracer = create_tracer(config)
+    return tracer
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer, creating one with defaults if needed"""
+    global tracer
+    if tracer is None:
+        tracer = create_tracer()
+    return tracer
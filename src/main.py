@@ -23,6 +23,14 @@ from core.message_router import CoreMessageRouter
 from core.health_monitor import HealthMonitor, HealthAlert, AlertSeverity
 from core.service_manager import ServiceManager, ServiceOperation
 from core.interfaces import InterfaceManager, InterfaceConfig
+from core.node_registry import initialize_node_registry
+from core.airtime import initialize_airtime_scheduler
+from core.metrics import initialize_metrics_registry
+from core.tracing import initialize_tracer
+from core.http_pool import initialize_http_pool, shutdown_http_pool
+from core.job_scheduler import initialize_job_scheduler, shutdown_job_scheduler
+from core.storage_cache import initialize_storage_cache, shutdown_storage_cache
+from core.stats_rollup import initialize_stats_rollup, shutdown_stats_rollup
 from services.scheduled_broadcasts import ScheduledBroadcastsService
 
 
@@ -69,6 +77,12 @@ class ZephyrGateApplication:
             self.logger.info(f"Version: {self.config_manager.get('app.version', '1.1.0')}")
             self.logger.info(f"Debug mode: {self.config_manager.get('app.debug', False)}")
             
+            # Initialize metrics before the components that register them
+            initialize_metrics_registry(self.config_manager.get('metrics', {}))
+            initialize_tracer(self.config_manager.get('tracing', {}))
+            initialize_http_pool(self.config_manager.get('plugins.http', {}))
+            initialize_job_scheduler(self.config_manager.get('scheduler', {}))
+            
             # Initialize database
             await self._initialize_database()
             
@@ -110,10 +124,19 @@ class ZephyrGateApplication:
         max_connections = self.config_manager.get('database.max_connections', 10)
         
         self.db_manager = initialize_database(db_path, max_connections)
+        initialize_storage_cache(self.config_manager.get('plugins.storage', {}), self.db_manager)
         
         # Ensure database schema is up to date
         await self._ensure_database_schema()
         
+        # Minute/hour/day statistics, counted as packets arrive
+        initialize_stats_rollup(
+            self.db_manager,
+            flush_interval=self.config_manager.get('database.stats_rollup.flush_interval', 10),
+            minute_retention_hours=self.config_manager.get('database.stats_rollup.minute_retention_hours', 48),
+            hour_retention_days=self.config_manager.get('database.stats_rollup.hour_retention_days', 90)
+        )
+        
         self.logger.info("Database initialized successfully")
     
     async def _ensure_database_schema(self):
@@ -179,8 +202,23 @@ class ZephyrGateApplication:
         """Initialize Meshtastic interface manager"""
         self.logger.info("Initializing interface manager...")
         
+        # Write-behind cache for node updates received from interfaces
+        initialize_node_registry(
+            self.db_manager,
+            flush_interval=self.config_manager.get('meshtastic.node_cache.flush_interval', 30),
+            flush_threshold=self.config_manager.get('meshtastic.node_cache.flush_threshold', 200),
+            max_nodes=self.config_manager.get('meshtastic.node_cache.max_nodes', 10000)
+        )
+        
+        # Outbound pacing by estimated LoRa time-on-air and duty cycle
+        initialize_airtime_scheduler(self.config_manager.get('meshtastic.airtime', {}))
+        
         # Create interface manager with message callback
-        self.interface_manager = InterfaceManager(self._handle_incoming_message)
+        # (sharing the router's outbound policy so both send paths balance alike)
+        self.interface_manager = InterfaceManager(
+            self._handle_incoming_message,
+            outbound=self.message_router.outbound if self.message_router else None
+        )
         
         # Load interface configurations
         interface_configs = self.config_manager.get('meshtastic.interfaces', [])
@@ -210,6 +248,14 @@ class ZephyrGateApplication:
                         connection_string = f"{host}:{port}"
                     elif iface_type == 'ble':
                         connection_string = config_dict.get('ble_address', '')
+                    elif iface_type == 'replay':
+                        connection_string = config_dict.get('file', '')
+                        metadata['speed'] = config_dict.get('speed', 1.0)
+                        metadata['loop'] = config_dict.get('loop', False)
+                    
+                    # Record received packets for offline replay
+                    if config_dict.get('capture'):
+                        metadata['capture'] = config_dict['capture']
                     
                     self.logger.debug(f"Connection string: {connection_string}")
                     
@@ -329,30 +375,10 @@ class ZephyrGateApplication:
         else:
             self.logger.info(f"Loading enabled plugins: {enabled_plugins}")
         
-        # Load enabled plugins
+        # Load enabled plugins (imports and initialization run concurrently)
+        plugin_configs = {}
         for plugin_name in enabled_plugins:
-            # Get plugin-specific config if available
-            # Try multiple config paths:
-            # 1. plugins.{plugin_name} - new plugin config location
-            # 2. services.{plugin_name} - legacy service config location (exact match)
-            # 3. services.{short_name} - legacy service config with short name (weather_service -> weather)
-            # 4. {plugin_name} - root level config
-            plugin_config = self.config_manager.get(f'plugins.{plugin_name}', {})
-            
-            if not plugin_config:
-                plugin_config = self.config_manager.get(f'services.{plugin_name}', {})
-            
-            # Try short name (remove _service suffix if present)
-            if not plugin_config and plugin_name.endswith('_service'):
-                short_name = plugin_name.replace('_service', '')
-                plugin_config = self.config_manager.get(f'services.{short_name}', {})
-            
-            if not plugin_config:
-                plugin_config = self.config_manager.get(plugin_name, {})
-            
-            # If still no config, pass empty dict
-            if not plugin_config:
-                plugin_config = {}
+            plugin_config = self._get_plugin_config(plugin_name)
             
             # Debug logging
             self.logger.info(f"Loading plugin {plugin_name} with config keys: {list(plugin_config.keys())}")
@@ -360,20 +386,31 @@ class ZephyrGateApplication:
                 self.logger.info(f"Weather service config: {plugin_config}")
                 self.logger.info(f"Weather default_location: {plugin_config.get('default_location')}")
             
-            try:
-                success = await self.plugin_manager.load_plugin(plugin_name, plugin_config)
+            plugin_configs[plugin_name] = plugin_config
+        
+        try:
+            results = await self.plugin_manager.load_plugins(plugin_configs)
+            for plugin_name, success in results.items():
                 if success:
                     self.logger.info(f"Loaded plugin: {plugin_name}")
                 else:
                     self.logger.error(f"Failed to load plugin: {plugin_name}")
-            except Exception as e:
-                self.logger.error(f"Error loading plugin {plugin_name}: {e}")
+        except Exception as e:
+            self.logger.error(f"Error loading plugins: {e}")
         
         # Start all loaded plugins
         success = await self.plugin_manager.start_all_plugins()
         if not success:
             self.logger.warning("Some plugins failed to start")
         
+        report = self.plugin_manager.get_startup_report()
+        self.logger.info(
+            f"Plugin startup: discovery {report.get('discovery_ms', 0)}ms, "
+            f"load {report.get('load_ms', 0)}ms (sum {report.get('load_sum_ms', 0)}ms), "
+            f"start {report.get('start_ms', 0)}ms (critical path {report.get('critical_path_ms', 0)}ms, "
+            f"sum {report.get('start_sum_ms', 0)}ms)"
+        )
+        
         # Register plugins with message router
         await self._register_services_with_router()
         
@@ -391,20 +428,49 @@ class ZephyrGateApplication:
         
         self.logger.info("Services started successfully")
     
+    def _get_plugin_config(self, plugin_name: str) -> Dict[str, Any]:
+        """
+        Get plugin-specific config, trying in order:
+        1. plugins.{plugin_name} - new plugin config location
+        2. services.{plugin_name} - legacy service config location (exact match)
+        3. services.{short_name} - legacy service config with short name (weather_service -> weather)
+        4. {plugin_name} - root level config
+        """
+        plugin_config = self.config_manager.get(f'plugins.{plugin_name}', {})
+        
+        if not plugin_config:
+            plugin_config = self.config_manager.get(f'services.{plugin_name}', {})
+        
+        # Try short name (remove _service suffix if present)
+        if not plugin_config and plugin_name.endswith('_service'):
+            short_name = plugin_name.replace('_service', '')
+            plugin_config = self.config_manager.get(f'services.{short_name}', {})
+        
+        if not plugin_config:
+            plugin_config = self.config_manager.get(plugin_name, {})
+        
+        # If still no config, pass empty dict
+        return plugin_config or {}
+    
+    # Mapping of plugin names to classifier service names
+    SERVICE_NAME_MAPPING = {
+        'bot_service': 'bot',
+        'emergency_service': 'emergency',
+        'bbs_service': 'bbs',
+        'weather_service': 'weather',
+        'email_service': 'email',
+        'asset_service': 'asset',
+        'web_service': 'web'
+    }
+    
     async def _register_services_with_router(self):
         """Register all running services with the message router"""
         running_plugins = self.plugin_manager.get_running_plugins()
+        service_name_mapping = self.SERVICE_NAME_MAPPING
         
-        # Mapping of plugin names to classifier service names
-        service_name_mapping = {
-            'bot_service': 'bot',
-            'emergency_service': 'emergency',
-            'bbs_service': 'bbs',
-            'weather_service': 'weather',
-            'email_service': 'email',
-            'asset_service': 'asset',
-            'web_service': 'web'
-        }
+        # Lazy plugins are registered when their first command activates them
+        self.plugin_manager.register_event_handler('plugin_activated', self._handle_plugin_activated)
+        self.plugin_manager.register_event_handler('plugin_deactivated', self._handle_plugin_deactivated)
         
         for plugin_name in running_plugins:
             plugin_info = self.plugin_manager.get_plugin_info(plugin_name)
@@ -419,6 +485,18 @@ class ZephyrGateApplication:
                     self.message_router.register_service(short_name, plugin_info.instance)
                     self.logger.debug(f"Registered service {short_name} (alias for {plugin_name}) with message router")
     
+    async def _handle_plugin_activated(self, plugin_name: str, instance: Any):
+        """Register a lazily activated plugin with the message router"""
+        self.message_router.register_service(plugin_name, instance)
+        if plugin_name in self.SERVICE_NAME_MAPPING:
+            self.message_router.register_service(self.SERVICE_NAME_MAPPING[plugin_name], instance)
+    
+    async def _handle_plugin_deactivated(self, plugin_name: str, instance: Any):
+        """Unregister an idle lazy plugin from the message router"""
+        self.message_router.unregister_service(plugin_name)
+        if plugin_name in self.SERVICE_NAME_MAPPING:
+            self.message_router.unregister_service(self.SERVICE_NAME_MAPPING[plugin_name])
+    
     async def _setup_bot_command_filtering(self):
         """Set up bot service to filter commands based on active plugins"""
         try:
@@ -652,6 +730,18 @@ class ZephyrGateApplication:
                 self.logger.info("Stopping Meshtastic interfaces...")
                 await self.interface_manager.stop_all()
             
+            # Close shared plugin HTTP connections
+            await shutdown_http_pool()
+            
+            # Stop timed jobs still scheduled
+            await shutdown_job_scheduler()
+            
+            # Commit batched plugin storage writes
+            await shutdown_storage_cache()
+            
+            # Write out packet counts not yet added to the statistics rollups
+            await asyncio.get_event_loop().run_in_executor(None, shutdown_stats_rollup)
+            
             # Close database connections
             if self.db_manager:
                 self.db_manager.close()
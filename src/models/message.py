@@ -5,7 +5,7 @@ Defines the core message structures used throughout the system.
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Union
 import uuid
@@ -176,9 +176,7 @@ class QueuedMessage:
     def schedule_retry(self, delay_seconds: int = 30):
         """Schedule next retry attempt"""
         self.retry_count += 1
-        self.next_retry = datetime.utcnow().replace(
-            second=datetime.utcnow().second + delay_seconds
-        )
+        self.next_retry = datetime.utcnow() + timedelta(seconds=delay_seconds)
 
 
 @dataclass
@@ -272,7 +270,7 @@ class BBSMessage:
 class InterfaceConfig:
     """Meshtastic interface configuration"""
     id: str
-    type: str  # 'serial', 'tcp', 'ble'
+    type: str  # 'serial', 'tcp', 'ble', 'replay'
     enabled: bool = True
     connection_string: str = ""
     retry_interval: int = 30
@@ -301,5 +299,7 @@ class InterfaceConfig:
                 params['port'] = 4403  # Default Meshtastic TCP port
         elif self.type == 'ble':
             params['address'] = self.connection_string
+        elif self.type == 'replay':
+            params['path'] = self.connection_string
         
         return params
\ No newline at end of file
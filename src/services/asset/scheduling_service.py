@@ -3,6 +3,8 @@ Scheduling Service
 
 Provides cron-like functionality for automated task scheduling, including
 broadcasts, weather updates, BBS synchronization, and maintenance tasks.
+Each active task is a one-shot job on the shared job scheduler, re-armed at
+its next run time after every execution.
 """
 
 import asyncio
@@ -11,11 +13,13 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Callable, Union
 from dataclasses import dataclass, field
 from enum import Enum
+import functools
 import uuid
 import json
-from croniter import croniter
 
+from core.cron import CronExpression
 from core.database import get_database, DatabaseError
+from core.job_scheduler import Job, MisfirePolicy, get_job_scheduler
 from core.plugin_interfaces import BaseMessageHandler
 
 
@@ -169,12 +173,14 @@ class SchedulingService(BaseMessageHandler):
         self.running_tasks: Dict[str, asyncio.Task] = {}
         
         # Configuration
-        self.check_interval = config.get('check_interval', 30)  # Check every 30 seconds
+        self.check_interval = config.get('check_interval', 30)  # Seconds between execution history cleanups
         self.max_concurrent_tasks = config.get('max_concurrent_tasks', 10)
         self.cleanup_days = config.get('cleanup_days', 30)
+        self._task_slots = asyncio.Semaphore(self.max_concurrent_tasks)
         
-        # Scheduler task
-        self.scheduler_task: Optional[asyncio.Task] = None
+        # Jobs on the shared scheduler, by task ID
+        self.jobs: Dict[str, Job] = {}
+        self.cleanup_job: Optional[Job] = None
         
         # Communication interface for sending broadcasts
         self.communication: Optional[Any] = None
@@ -254,7 +260,7 @@ class SchedulingService(BaseMessageHandler):
                 
                 # Calculate next run time if not set
                 if not task.next_run and task.status == TaskStatus.ACTIVE:
-                    task.next_run = self._calculate_next_run(task)
+                    task.next_run = self._first_run(task)
                     self._save_task(task)
             
             self.logger.info(f"Loaded {len(self.tasks)} scheduled tasks")
@@ -279,7 +285,15 @@ class SchedulingService(BaseMessageHandler):
         # Load scheduled broadcasts from configuration
         await self._load_scheduled_broadcasts_from_config()
         
-        self.scheduler_task = asyncio.create_task(self._scheduler_loop())
+        for task in list(self.tasks.values()):
+            self._arm_task(task)
+        self.cleanup_job = get_job_scheduler().add_job(
+            self._cleanup_old_executions,
+            interval=self.check_interval,
+            name="scheduling.cleanup",
+            owner="scheduling",
+            misfire=MisfirePolicy.SKIP
+        )
         self.logger.info("Scheduling Service started")
     
     async def _load_scheduled_broadcasts_from_config(self):
@@ -372,13 +386,13 @@ class SchedulingService(BaseMessageHandler):
         """Stop the scheduling service"""
         self.running = False
         
-        # Cancel scheduler task
-        if self.scheduler_task:
-            self.scheduler_task.cancel()
-            try:
-                await self.scheduler_task
-            except asyncio.CancelledError:
-                pass
+        # Unschedule jobs
+        for job in self.jobs.values():
+            job.cancel()
+        self.jobs.clear()
+        if self.cleanup_job:
+            self.cleanup_job.cancel()
+            self.cleanup_job = None
         
         # Cancel running tasks
         for task in self.running_tasks.values():
@@ -418,44 +432,44 @@ class SchedulingService(BaseMessageHandler):
         self.communication = communication
         self.logger.info("Communication interface set for scheduling service")
     
-    async def _scheduler_loop(self):
-        """Main scheduler loop"""
-        while self.running:
-            try:
-                await self._check_scheduled_tasks()
-                await self._cleanup_old_executions()
-                await asyncio.sleep(self.check_interval)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Error in scheduler loop: {e}")
-                await asyncio.sleep(self.check_interval)
+    def _arm_task(self, task: ScheduledTask):
+        """Schedule a task's job at its next run time, or unschedule it if it has none"""
+        job = self.jobs.get(task.id)
+        if not self.running or task.status != TaskStatus.ACTIVE or task.next_run is None:
+            if job is not None:
+                job.cancel()
+                del self.jobs[task.id]
+            return
+        
+        if job is None:
+            self.jobs[task.id] = get_job_scheduler().add_job(
+                functools.partial(self._run_scheduled_task, task.id),
+                at=task.next_run,
+                name=f"scheduling.{task.name}",
+                owner="scheduling"
+            )
+        else:
+            get_job_scheduler().reschedule_job(job, task.next_run)
     
-    async def _check_scheduled_tasks(self):
-        """Check for tasks that need to be executed"""
-        now = datetime.now(timezone.utc)
+    async def _run_scheduled_task(self, task_id: str):
+        """Execute a task that has come due; called by the job scheduler"""
+        task = self.tasks.get(task_id)
+        if task is None or task.status != TaskStatus.ACTIVE or task_id in self.running_tasks:
+            return
         
-        # Limit concurrent tasks
-        if len(self.running_tasks) >= self.max_concurrent_tasks:
+        # Check failure threshold
+        if task.failure_count >= task.max_failures:
+            task.status = TaskStatus.FAILED
+            self._save_task(task)
+            self._arm_task(task)
+            self.logger.warning(f"Task {task.name} disabled due to too many failures")
             return
         
-        for task in list(self.tasks.values()):
-            if (task.status == TaskStatus.ACTIVE and 
-                task.next_run and 
-                task.next_run <= now and
-                task.id not in self.running_tasks):
-                
-                # Check failure threshold
-                if task.failure_count >= task.max_failures:
-                    task.status = TaskStatus.FAILED
-                    self._save_task(task)
-                    self.logger.warning(f"Task {task.name} disabled due to too many failures")
-                    continue
-                
-                # Execute task
-                execution_task = asyncio.create_task(self._execute_task(task))
-                self.running_tasks[task.id] = execution_task
+        # Limit concurrent tasks; later ones wait for a free slot
+        async with self._task_slots:
+            self.running_tasks[task_id] = asyncio.current_task()
+            await self._execute_task(task)
+        self._arm_task(task)
     
     async def _execute_task(self, task: ScheduledTask):
         """Execute a scheduled task"""
@@ -541,6 +555,12 @@ class SchedulingService(BaseMessageHandler):
             if task.id in self.running_tasks:
                 del self.running_tasks[task.id]
     
+    def _first_run(self, task: ScheduledTask) -> Optional[datetime]:
+        """Calculate the first run time of a task that has not run yet"""
+        if task.schedule_type == ScheduleType.ONE_TIME:
+            return task.scheduled_time if task.run_count == 0 else None
+        return self._calculate_next_run(task)
+    
     def _calculate_next_run(self, task: ScheduledTask) -> Optional[datetime]:
         """Calculate next run time for a task"""
         now = datetime.now(timezone.utc)
@@ -556,9 +576,8 @@ class SchedulingService(BaseMessageHandler):
         elif task.schedule_type == ScheduleType.CRON:
             if task.cron_expression:
                 try:
-                    cron = croniter(task.cron_expression, now)
-                    return cron.get_next(datetime)
-                except Exception as e:
+                    return CronExpression(task.cron_expression).next_after(now)
+                except ValueError as e:
                     self.logger.error(f"Invalid cron expression for task {task.name}: {e}")
         
         return None
@@ -895,11 +914,12 @@ class SchedulingService(BaseMessageHandler):
             )
             
             # Calculate next run time
-            task.next_run = self._calculate_next_run(task)
+            task.next_run = self._first_run(task)
             
             # Save task
             self.tasks[task_id] = task
             self._save_task(task)
+            self._arm_task(task)
             
             self.logger.info(f"Created scheduled task: {name}")
             return task_id
@@ -937,9 +957,10 @@ class SchedulingService(BaseMessageHandler):
             
             # Recalculate next run if schedule changed
             if any(field in kwargs for field in ['cron_expression', 'interval_seconds', 'scheduled_time']):
-                task.next_run = self._calculate_next_run(task)
+                task.next_run = self._first_run(task)
             
             self._save_task(task)
+            self._arm_task(task)
             self.logger.info(f"Updated task {task_id}")
             return True
             
@@ -955,6 +976,7 @@ class SchedulingService(BaseMessageHandler):
                 task.status = TaskStatus.CANCELLED
                 self._save_task(task)
                 del self.tasks[task_id]
+                self._arm_task(task)
                 
                 # Cancel if currently running
                 if task_id in self.running_tasks:
@@ -1040,6 +1062,7 @@ class SchedulingService(BaseMessageHandler):
                 'active_tasks': active_tasks,
                 'running_tasks': running_tasks,
                 'max_concurrent_tasks': self.max_concurrent_tasks,
+                'scheduled_jobs': len(self.jobs),
                 'check_interval': self.check_interval
             }
         except Exception as e:
@@ -175,14 +175,18 @@ class BulletinService:
             if not search_term.strip():
                 return False, "Search term cannot be empty."
             
-            results = self.bbs_db.search_bulletins(search_term.strip(), board)
+            hits = self.bbs_db.search_bulletin_hits(search_term.strip(), board, limit=20)
             
-            if not results:
+            if not hits:
                 board_text = f" on '{board}' board" if board else ""
                 return True, f"No bulletins found matching '{search_term}'{board_text}."
             
+            total = len(hits)
+            if total == 20:
+                total = self.bbs_db.count_bulletin_matches(search_term.strip(), board)
+            
             # Format search results
-            formatted = self._format_search_results(results, search_term, board)
+            formatted = self._format_search_results(hits, total, search_term, board)
             
             return True, formatted
             
@@ -359,9 +363,9 @@ class BulletinService:
         
         return "\n".join(lines)
     
-    def _format_search_results(self, results: List[BBSBulletin], search_term: str, 
-                              board: Optional[str]) -> str:
-        """Format search results for display"""
+    def _format_search_results(self, hits: List[Tuple[BBSBulletin, str]], total: int,
+                              search_term: str, board: Optional[str]) -> str:
+        """Format ranked search results, each with a snippet of the matching text"""
         lines = []
         board_text = f" on '{board}' board" if board else ""
         lines.append(f"Search results for '{search_term}'{board_text}:")
@@ -369,7 +373,7 @@ class BulletinService:
         lines.append(f"{'ID':<4} | {'Board':<8} | {'From':<12} | {'Subject':<25} | {'Age':<8}")
         lines.append("-" * 70)
         
-        for bulletin in results[:20]:  # Limit to 20 results
+        for bulletin, snippet in hits:
             # Calculate age
             age = self._calculate_age(bulletin.timestamp)
             
@@ -379,12 +383,14 @@ class BulletinService:
             subject = bulletin.subject[:24] + "…" if len(bulletin.subject) > 25 else bulletin.subject
             
             lines.append(f"{bulletin.id:<4} | {board_name:<8} | {sender:<12} | {subject:<25} | {age:<8}")
+            if snippet:
+                lines.append(f"       {snippet}")
         
-        if len(results) > 20:
-            lines.append(f"... and {len(results) - 20} more results")
+        if total > len(hits):
+            lines.append(f"... and {total - len(hits)} more results")
         
         lines.append("-" * 70)
-        lines.append(f"Found: {len(results)} bulletins")
+        lines.append(f"Found: {total} bulletins")
         lines.append("")
         lines.append("Use 'read <ID>' to read a bulletin")
         
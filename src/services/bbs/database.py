@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 from contextlib import contextmanager
 
-from core.database import get_database, DatabaseError
+from core.database import get_database, DatabaseError, fts_match_query
 from services.bbs.models import (
     BBSBulletin, BBSMail, BBSChannel, JS8CallMessage, BBSSession,
     MailStatus, ChannelType, JS8CallPriority,
@@ -20,6 +20,10 @@ from services.bbs.models import (
 )
 
 
+# Full-text searches rank at most this many of the newest matches
+SEARCH_RANK_WINDOW = 500
+
+
 class BBSDatabase:
     """BBS database operations manager"""
     
@@ -185,31 +189,80 @@ class BBSDatabase:
             self.logger.error(f"Failed to get bulletin boards: {e}")
             return []
     
-    def search_bulletins(self, search_term: str, board: Optional[str] = None) -> List[BBSBulletin]:
-        """Search bulletins by subject or content"""
+    def search_bulletins(self, search_term: str, board: Optional[str] = None,
+                         limit: int = 100) -> List[BBSBulletin]:
+        """Search bulletins by subject, content or sender, best matches first"""
+        return [bulletin for bulletin, _ in self.search_bulletin_hits(search_term, board, limit)]
+    
+    def search_bulletin_hits(self, search_term: str, board: Optional[str] = None,
+                             limit: int = 20) -> List[Tuple[BBSBulletin, str]]:
+        """
+        Full-text search of bulletins.
+        
+        Each word of the search term must appear in the subject, content or
+        sender name, as a whole word or a word prefix. The newest
+        SEARCH_RANK_WINDOW matches are ranked by relevance (subject matches
+        weigh most), newest first among equals.
+        
+        Returns:
+            List of (bulletin, snippet of its content around the matched
+            words, which are in [brackets])
+        """
+        try:
+            match = fts_match_query(search_term)
+            if match is None:
+                return []
+            
+            # Rank only the newest matches so a common word does not score
+            # (and snippet) the whole archive; rowids follow posting order.
+            # CROSS JOIN keeps the index as the outer loop of the join.
+            board_filter = "AND b.board = ?" if board else ""
+            query = f"""
+                SELECT b.*, hits.snippet FROM (
+                    SELECT b.id, bm25(bulletins_fts, 4.0, 1.0, 2.0) AS score,
+                           snippet(bulletins_fts, 1, '[', ']', '...', 10) AS snippet
+                    FROM bulletins_fts
+                    CROSS JOIN bulletins b ON b.id = bulletins_fts.rowid
+                    WHERE bulletins_fts MATCH ? {board_filter}
+                    ORDER BY bulletins_fts.rowid DESC
+                    LIMIT ?
+                ) hits
+                JOIN bulletins b ON b.id = hits.id
+                ORDER BY hits.score, b.timestamp DESC
+                LIMIT ?
+            """
+            params = (match, board) if board else (match,)
+            rows = self.db.execute_query(query, params + (SEARCH_RANK_WINDOW, limit))
+            
+            return [(self._row_to_bulletin(row), row['snippet']) for row in rows]
+            
+        except Exception as e:
+            self.logger.error(f"Failed to search bulletins: {e}")
+            return []
+    
+    def count_bulletin_matches(self, search_term: str, board: Optional[str] = None) -> int:
+        """Count bulletins matching a full-text search"""
         try:
-            search_term = f"%{search_term}%"
+            match = fts_match_query(search_term)
+            if match is None:
+                return 0
             
             if board:
                 query = """
-                    SELECT * FROM bulletins 
-                    WHERE board = ? AND (subject LIKE ? OR content LIKE ?)
-                    ORDER BY timestamp DESC
+                    SELECT COUNT(*) FROM bulletins_fts
+                    CROSS JOIN bulletins b ON b.id = bulletins_fts.rowid
+                    WHERE bulletins_fts MATCH ? AND b.board = ?
                 """
-                rows = self.db.execute_query(query, (board, search_term, search_term))
+                rows = self.db.execute_query(query, (match, board))
             else:
-                query = """
-                    SELECT * FROM bulletins 
-                    WHERE subject LIKE ? OR content LIKE ?
-                    ORDER BY timestamp DESC
-                """
-                rows = self.db.execute_query(query, (search_term, search_term))
+                query = "SELECT COUNT(*) FROM bulletins_fts WHERE bulletins_fts MATCH ?"
+                rows = self.db.execute_query(query, (match,))
             
-            return [self._row_to_bulletin(row) for row in rows]
+            return rows[0][0] if rows else 0
             
         except Exception as e:
-            self.logger.error(f"Failed to search bulletins: {e}")
-            return []
+            self.logger.error(f"Failed to count bulletin matches: {e}")
+            return 0
     
     # Mail Operations
     
@@ -306,6 +359,63 @@ class BBSDatabase:
             self.logger.error(f"Failed to get unread mail count for {user_id}: {e}")
             return 0
     
+    def search_mail(self, user_id: str, search_term: str,
+                    limit: int = 20) -> List[Tuple[BBSMail, str]]:
+        """
+        Full-text search of a user's mail by subject, content or sender.
+        
+        Matching and ranking are as for search_bulletin_hits.
+        
+        Returns:
+            List of (mail, snippet of its content around the matched words)
+        """
+        try:
+            match = fts_match_query(search_term)
+            if match is None:
+                return []
+            
+            query = """
+                SELECT m.*, hits.snippet FROM (
+                    SELECT m.id, bm25(mail_fts, 4.0, 1.0, 2.0) AS score,
+                           snippet(mail_fts, 1, '[', ']', '...', 10) AS snippet
+                    FROM mail_fts
+                    CROSS JOIN mail m ON m.id = mail_fts.rowid
+                    WHERE mail_fts MATCH ? AND m.recipient_id = ?
+                    ORDER BY mail_fts.rowid DESC
+                    LIMIT ?
+                ) hits
+                JOIN mail m ON m.id = hits.id
+                ORDER BY hits.score, m.timestamp DESC
+                LIMIT ?
+            """
+            rows = self.db.execute_query(query, (match, user_id, SEARCH_RANK_WINDOW, limit))
+            
+            return [(self._row_to_mail(row), row['snippet']) for row in rows]
+            
+        except Exception as e:
+            self.logger.error(f"Failed to search mail for {user_id}: {e}")
+            return []
+    
+    def count_mail_matches(self, user_id: str, search_term: str) -> int:
+        """Count a user's mail matching a full-text search"""
+        try:
+            match = fts_match_query(search_term)
+            if match is None:
+                return 0
+            
+            query = """
+                SELECT COUNT(*) FROM mail_fts
+                CROSS JOIN mail m ON m.id = mail_fts.rowid
+                WHERE mail_fts MATCH ? AND m.recipient_id = ?
+            """
+            rows = self.db.execute_query(query, (match, user_id))
+            
+            return rows[0][0] if rows else 0
+            
+        except Exception as e:
+            self.logger.error(f"Failed to count mail matches for {user_id}: {e}")
+            return 0
+    
     def mark_mail_read(self, mail_id: int, user_id: str) -> bool:
         """Mark mail as read"""
         try:
@@ -265,24 +265,17 @@ class MailService:
             if not search_term.strip():
                 return False, "Search term cannot be empty."
             
-            # Get all user's mail
-            all_mail = self.bbs_db.get_user_mail(user_id, include_read=True)
-            
-            # Filter by search term
-            search_term_lower = search_term.strip().lower()
-            results = []
+            hits = self.bbs_db.search_mail(user_id, search_term.strip(), limit=20)
             
-            for mail in all_mail:
-                if (search_term_lower in mail.subject.lower() or 
-                    search_term_lower in mail.content.lower() or
-                    search_term_lower in mail.sender_name.lower()):
-                    results.append(mail)
-            
-            if not results:
+            if not hits:
                 return True, f"No mail found matching '{search_term}'."
             
+            total = len(hits)
+            if total == 20:
+                total = self.bbs_db.count_mail_matches(user_id, search_term.strip())
+            
             # Format search results
-            formatted = self._format_search_results(results, search_term)
+            formatted = self._format_search_results(hits, total, search_term)
             
             return True, formatted
             
@@ -393,15 +386,16 @@ class MailService:
         
         return "\n".join(lines)
     
-    def _format_search_results(self, results: List[BBSMail], search_term: str) -> str:
-        """Format search results for display"""
+    def _format_search_results(self, hits: List[Tuple[BBSMail, str]], total: int,
+                              search_term: str) -> str:
+        """Format ranked search results, each with a snippet of the matching text"""
         lines = []
         lines.append(f"Mail search results for '{search_term}':")
         lines.append("=" * 70)
         lines.append(f"{'ID':<4} | {'From':<12} | {'Subject':<25} | {'Age':<8} | {'Status':<6}")
         lines.append("-" * 70)
         
-        for mail in results[:20]:  # Limit to 20 results
+        for mail, snippet in hits:
             # Calculate age
             age = self._calculate_age(mail.timestamp)
             
@@ -413,12 +407,14 @@ class MailService:
             status = "READ" if mail.is_read() else "NEW"
             
             lines.append(f"{mail.id:<4} | {sender:<12} | {subject:<25} | {age:<8} | {status:<6}")
+            if snippet:
+                lines.append(f"       {snippet}")
         
-        if len(results) > 20:
-            lines.append(f"... and {len(results) - 20} more results")
+        if total > len(hits):
+            lines.append(f"... and {total - len(hits)} more results")
         
         lines.append("-" * 70)
-        lines.append(f"Found: {len(results)} messages")
+        lines.append(f"Found: {total} messages")
         lines.append("")
         lines.append("Use 'read <ID>' to read a message")
         
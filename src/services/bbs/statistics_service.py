@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from core.database import get_database, DatabaseError
+from core.stats_rollup import get_stats_rollup
 from services.bbs.database import get_bbs_database
 
 
@@ -61,6 +62,7 @@ class SystemStatistics:
     """System statistics data"""
     total_nodes: int = 0
     active_nodes: int = 0  # Seen in last 24 hours
+    messages_last_day: int = 0
     nodes_by_role: Dict[str, int] = None
     nodes_by_hardware: Dict[str, int] = None
     low_battery_nodes: int = 0
@@ -200,12 +202,10 @@ class StatisticsService:
             total_rows = self.db.execute_query("SELECT COUNT(*) FROM users")
             stats.total_nodes = total_rows[0][0] if total_rows else 0
             
-            # Active nodes (seen in last 24 hours)
-            yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
-            active_rows = self.db.execute_query(
-                "SELECT COUNT(*) FROM users WHERE last_seen > ?", (yesterday,)
-            )
-            stats.active_nodes = active_rows[0][0] if active_rows else 0
+            # Activity in the last 24 hours, from the hourly rollups
+            last_day = get_stats_rollup().summary(timedelta(days=1))
+            stats.active_nodes = last_day.active_nodes
+            stats.messages_last_day = last_day.messages
             
         except Exception as e:
             self.logger.error(f"Failed to get node statistics: {e}")
@@ -423,6 +423,7 @@ class StatisticsService:
         lines.append("📡 Node Information:")
         lines.append(f"  Total Nodes: {stats.total_nodes}")
         lines.append(f"  Active (24h): {stats.active_nodes}")
+        lines.append(f"  Messages (24h): {stats.messages_last_day}")
         
         if stats.nodes_by_role:
             lines.append("  Roles:")
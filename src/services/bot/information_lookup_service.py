@@ -18,6 +18,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 
 from core.database import get_database
+from core.stats_rollup import get_stats_rollup
 from core.plugin_interfaces import PluginCommunicationInterface
 
 
@@ -798,35 +799,27 @@ class InformationLookupService:
         
         try:
             db = get_database()
-            cursor = db.cursor()
+            rollup = get_stats_rollup()
             
             # Total nodes
-            cursor.execute("SELECT COUNT(*) FROM users")
-            total_nodes = cursor.fetchone()[0]
-            
-            # Active nodes (last 24 hours)
-            cursor.execute("SELECT COUNT(*) FROM users WHERE last_seen > datetime('now', '-24 hours')")
-            nodes_last_day = cursor.fetchone()[0]
+            total_nodes = db.execute_query("SELECT COUNT(*) FROM users")[0][0]
             
-            # Active nodes (last hour)
-            cursor.execute("SELECT COUNT(*) FROM users WHERE last_seen > datetime('now', '-1 hour')")
-            nodes_last_hour = cursor.fetchone()[0]
+            # Activity from the minute, hour and day rollups
+            last_hour = rollup.summary(timedelta(hours=1))
+            last_day = rollup.summary(timedelta(hours=24))
+            total_messages = rollup.summary().messages
             
-            # Message statistics would need message logging
-            # For now, use placeholder values
-            total_messages = 0
-            messages_last_hour = 0
-            messages_last_day = 0
+            nodes_last_day = last_day.active_nodes
+            nodes_last_hour = last_hour.active_nodes
+            messages_last_hour = last_hour.messages
+            messages_last_day = last_day.messages
             
-            # Signal quality averages
-            cursor.execute("SELECT AVG(snr), AVG(rssi) FROM users WHERE snr IS NOT NULL AND last_seen > datetime('now', '-24 hours')")
-            avg_row = cursor.fetchone()
-            average_snr = avg_row[0] if avg_row[0] is not None else None
-            average_rssi = avg_row[1] if avg_row[1] is not None else None
+            # Signal quality averages over the last day's packets
+            average_snr = last_day.average_snr
+            average_rssi = last_day.average_rssi
             
             # Network diameter (max hop count)
-            cursor.execute("SELECT MAX(hop_count) FROM users WHERE hop_count IS NOT NULL")
-            diameter_row = cursor.fetchone()
+            diameter_row = db.execute_query("SELECT MAX(hop_count) FROM users WHERE hop_count IS NOT NULL")[0]
             network_diameter = diameter_row[0] if diameter_row[0] is not None else None
             
             stats = NetworkStats(
@@ -884,36 +877,37 @@ class InformationLookupService:
     
     async def _get_message_leaderboard(self) -> str:
         """Get message count leaderboard"""
-        # This would require message logging implementation
-        response = f"🏆 **Message Leaderboard**\n\n"
-        response += f"⚠️ Message tracking not fully implemented\n"
-        response += f"This feature requires message logging to be enabled"
-        return response
+        try:
+            rows = get_stats_rollup().top_nodes('messages', timedelta(hours=24))
+            
+            if not rows:
+                return f"🏆 **Message Leaderboard**\n\n❌ No messages in the last 24 hours"
+            
+            response = f"🏆 **Message Leaderboard** (Last 24h)\n\n"
+            
+            for i, row in enumerate(rows, 1):
+                response += f"{i}. **{row['short_name']}**: {row['value']} msgs\n"
+            
+            return response
+            
+        except Exception as e:
+            self.logger.error(f"Error getting message leaderboard: {e}")
+            return f"❌ Error generating message leaderboard: {str(e)}"
     
     async def _get_battery_leaderboard(self) -> str:
         """Get battery level leaderboard"""
         try:
-            db = get_database()
-            cursor = db.cursor()
-            
-            cursor.execute("""
-                SELECT short_name, node_id, battery_level
-                FROM users 
-                WHERE battery_level IS NOT NULL AND last_seen > datetime('now', '-24 hours')
-                ORDER BY battery_level DESC
-                LIMIT 10
-            """)
-            
-            rows = cursor.fetchall()
+            rows = get_stats_rollup().top_nodes('battery', timedelta(hours=24))
             
             if not rows:
                 return f"🔋 **Battery Leaderboard**\n\n❌ No battery data available"
             
             response = f"🔋 **Battery Leaderboard** (Top 10)\n\n"
             
-            for i, (short_name, node_id, battery_level) in enumerate(rows, 1):
+            for i, row in enumerate(rows, 1):
+                battery_level = row['value']
                 battery_emoji = "🔋" if battery_level > 50 else "🪫" if battery_level > 20 else "🔴"
-                response += f"{i}. {battery_emoji} **{short_name}**: {battery_level}%\n"
+                response += f"{i}. {battery_emoji} **{row['short_name']}**: {battery_level}%\n"
             
             return response
             
@@ -922,31 +916,19 @@ class InformationLookupService:
             return f"❌ Error generating battery leaderboard: {str(e)}"
     
     async def _get_signal_leaderboard(self) -> str:
-        """Get signal quality leaderboard"""
+        """Get signal quality leaderboard (average SNR over the last day)"""
         try:
-            db = get_database()
-            cursor = db.cursor()
-            
-            cursor.execute("""
-                SELECT short_name, node_id, snr, rssi
-                FROM users 
-                WHERE snr IS NOT NULL AND last_seen > datetime('now', '-24 hours')
-                ORDER BY snr DESC
-                LIMIT 10
-            """)
-            
-            rows = cursor.fetchall()
+            rows = get_stats_rollup().top_nodes('snr', timedelta(hours=24))
             
             if not rows:
                 return f"📶 **Signal Quality Leaderboard**\n\n❌ No signal data available"
             
             response = f"📶 **Signal Quality Leaderboard** (Top 10)\n\n"
             
-            for i, (short_name, node_id, snr, rssi) in enumerate(rows, 1):
-                signal_emoji = "📶" if snr > 10 else "📶" if snr > 0 else "📶"
-                response += f"{i}. {signal_emoji} **{short_name}**: SNR {snr:.1f}dB"
-                if rssi is not None:
-                    response += f", RSSI {rssi:.0f}dBm"
+            for i, row in enumerate(rows, 1):
+                response += f"{i}. 📶 **{row['short_name']}**: SNR {row['value']:.1f}dB"
+                if row['rssi'] is not None:
+                    response += f", RSSI {row['rssi']:.0f}dBm"
                 response += "\n"
             
             return response
@@ -16,6 +16,7 @@ import json
 
 from models.message import Message, MessageType, MessagePriority
 from core.database import get_database
+from core.history_search import HistoryQuery, search_message_history
 from core.plugin_interfaces import BaseMessageHandler, PluginCommunicationInterface
 
 
@@ -34,6 +35,7 @@ class MessageFilter:
     max_hop_count: Optional[int] = None
     limit: int = 50
     offset: int = 0
+    before_id: Optional[int] = None  # page cursor: only messages older than this history id
 
 
 @dataclass
@@ -245,11 +247,13 @@ class MessageHistoryService(BaseMessageHandler):
         parts = message.content.strip().split()
         
         # Parse command arguments
-        filter_criteria = MessageFilter()
+        filter_criteria = MessageFilter(limit=10)
+        search_words = []
         
         if len(parts) > 1:
-            # Parse arguments
-            for i, part in enumerate(parts[1:], 1):
+            # Parse arguments; a number is a count, a !node a sender and
+            # any other word is searched for
+            for part in parts[1:]:
                 if part.startswith('sender:'):
                     filter_criteria.sender_id = part[7:]
                 elif part.startswith('channel:'):
@@ -268,8 +272,22 @@ class MessageHistoryService(BaseMessageHandler):
                         filter_criteria.limit = min(int(part[6:]), self.config['max_history_results'])
                     except ValueError:
                         pass
+                elif part.startswith('before:'):
+                    try:
+                        filter_criteria.before_id = int(part[7:])
+                    except ValueError:
+                        pass
                 elif part.startswith('search:'):
-                    filter_criteria.content_pattern = part[7:]
+                    search_words.append(part[7:])
+                elif part.isdigit():
+                    filter_criteria.limit = min(int(part), self.config['max_history_results'])
+                elif part.startswith('!'):
+                    filter_criteria.sender_id = part
+                else:
+                    search_words.append(part)
+        
+        if search_words:
+            filter_criteria.content_pattern = ' '.join(search_words)
         
         # Default to last 24 hours if no time filter specified
         if not filter_criteria.start_time:
@@ -283,7 +301,7 @@ class MessageHistoryService(BaseMessageHandler):
         else:
             response = f"📜 Message History ({len(messages)} messages):\n\n"
             
-            for msg in messages[-10:]:  # Show last 10 messages
+            for msg in messages:
                 timestamp = msg['timestamp'][:16]  # YYYY-MM-DD HH:MM
                 sender = msg['sender_id'][-4:]  # Last 4 chars of node ID
                 content = msg['content'][:50]  # First 50 chars
@@ -292,8 +310,9 @@ class MessageHistoryService(BaseMessageHandler):
                 
                 response += f"{timestamp} {sender}: {content}\n"
             
-            if len(messages) > 10:
-                response += f"\n... and {len(messages) - 10} more messages"
+            # A full page may have older messages after it
+            if len(messages) == filter_criteria.limit and msg.get('id') is not None:
+                response += f"\n... more with before:{msg['id']}"
         
         return self._create_response_message(response, message)
     
@@ -608,59 +627,23 @@ class MessageHistoryService(BaseMessageHandler):
             self.logger.info(f"Delivered {delivered_count} offline messages to {user_id}")
     
     async def _get_message_history(self, filter_criteria: MessageFilter) -> List[Dict[str, Any]]:
-        """Retrieve message history based on filter criteria"""
+        """Retrieve message history based on filter criteria, newest first"""
         try:
-            db = get_database()
-            
-            # Build query
-            query_parts = ["SELECT * FROM message_history WHERE 1=1"]
-            params = []
-            
-            if filter_criteria.sender_id:
-                query_parts.append("AND sender_id = ?")
-                params.append(filter_criteria.sender_id)
-            
-            if filter_criteria.recipient_id:
-                query_parts.append("AND recipient_id = ?")
-                params.append(filter_criteria.recipient_id)
-            
-            if filter_criteria.channel is not None:
-                query_parts.append("AND channel = ?")
-                params.append(filter_criteria.channel)
-            
-            if filter_criteria.content_pattern:
-                query_parts.append("AND content LIKE ?")
-                params.append(f"%{filter_criteria.content_pattern}%")
-            
-            if filter_criteria.start_time:
-                query_parts.append("AND timestamp >= ?")
-                params.append(filter_criteria.start_time.isoformat())
-            
-            if filter_criteria.end_time:
-                query_parts.append("AND timestamp <= ?")
-                params.append(filter_criteria.end_time.isoformat())
-            
-            if filter_criteria.interface_id:
-                query_parts.append("AND interface_id = ?")
-                params.append(filter_criteria.interface_id)
-            
-            if filter_criteria.min_snr is not None:
-                query_parts.append("AND snr >= ?")
-                params.append(filter_criteria.min_snr)
-            
-            if filter_criteria.max_hop_count is not None:
-                query_parts.append("AND hop_count <= ?")
-                params.append(filter_criteria.max_hop_count)
-            
-            # Add ordering and limits
-            query_parts.append("ORDER BY timestamp DESC")
-            query_parts.append("LIMIT ? OFFSET ?")
-            params.extend([filter_criteria.limit, filter_criteria.offset])
-            
-            query = " ".join(query_parts)
-            
-            rows = db.execute_query(query, tuple(params))
-            return [dict(row) for row in rows]
+            page = search_message_history(get_database(), HistoryQuery(
+                text=filter_criteria.content_pattern,
+                sender_id=filter_criteria.sender_id,
+                recipient_id=filter_criteria.recipient_id,
+                channel=filter_criteria.channel,
+                interface_id=filter_criteria.interface_id,
+                start_time=filter_criteria.start_time,
+                end_time=filter_criteria.end_time,
+                min_snr=filter_criteria.min_snr,
+                max_hop_count=filter_criteria.max_hop_count,
+                before_id=filter_criteria.before_id,
+                limit=filter_criteria.limit,
+                offset=filter_criteria.offset
+            ))
+            return page.messages
             
         except Exception as e:
             self.logger.error(f"Failed to retrieve message history: {e}")
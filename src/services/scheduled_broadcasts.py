@@ -2,16 +2,19 @@
 Scheduled Broadcasts Service
 
 Standalone service for sending scheduled broadcasts independent of asset tracking.
-Supports cron expressions, intervals, and one-time broadcasts.
+Supports cron expressions, intervals, and one-time broadcasts. Each enabled
+broadcast is a job on the shared job scheduler.
 """
 
 import asyncio
+import functools
 import logging
-from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
-from croniter import croniter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List
 
 from core.config_loader import load_scheduled_broadcasts
+from core.cron import CronExpression
+from core.job_scheduler import Job, MisfirePolicy, get_job_scheduler
 from models.message import Message, MessageType
 
 
@@ -34,7 +37,9 @@ class ScheduledBroadcastsService:
         
         self.broadcasts: List[Dict[str, Any]] = []
         self.running = False
-        self.scheduler_task: Optional[asyncio.Task] = None
+        
+        # Jobs on the shared scheduler, by broadcast name
+        self.jobs: Dict[str, Job] = {}
         
         # Track last execution times
         self.last_execution: Dict[str, datetime] = {}
@@ -54,7 +59,9 @@ class ScheduledBroadcastsService:
             self.logger.info(f"Loaded {len(self.broadcasts)} scheduled broadcast(s)")
             
             self.running = True
-            self.scheduler_task = asyncio.create_task(self._scheduler_loop())
+            for broadcast in self.broadcasts:
+                if broadcast.get('enabled', True):
+                    self._schedule_broadcast(broadcast)
             
             self.logger.info("Scheduled Broadcasts Service started")
             
@@ -65,144 +72,71 @@ class ScheduledBroadcastsService:
         """Stop the scheduled broadcasts service"""
         self.running = False
         
-        if self.scheduler_task:
-            self.scheduler_task.cancel()
-            try:
-                await self.scheduler_task
-            except asyncio.CancelledError:
-                pass
+        for job in self.jobs.values():
+            job.cancel()
+        self.jobs.clear()
         
         self.logger.info("Scheduled Broadcasts Service stopped")
     
-    async def _scheduler_loop(self):
-        """Main scheduler loop that checks for broadcasts to send"""
-        while self.running:
-            try:
-                await self._check_and_send_broadcasts()
-                await asyncio.sleep(30)  # Check every 30 seconds
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Error in scheduler loop: {e}", exc_info=True)
-                await asyncio.sleep(60)
-    
-    async def _check_and_send_broadcasts(self):
-        """Check all broadcasts and send any that are due"""
-        now = datetime.now(timezone.utc)
-        
-        for broadcast in self.broadcasts:
-            if not broadcast.get('enabled', True):
-                continue
-            
-            broadcast_name = broadcast['name']
-            schedule_type = broadcast['schedule_type']
-            
-            try:
-                should_send = False
-                
-                if schedule_type == 'cron':
-                    should_send = self._should_send_cron(broadcast, now)
-                elif schedule_type == 'interval':
-                    should_send = self._should_send_interval(broadcast, now)
-                elif schedule_type == 'one_time':
-                    should_send = self._should_send_one_time(broadcast, now)
-                
-                if should_send:
-                    await self._send_broadcast(broadcast)
-                    self.last_execution[broadcast_name] = now
-                    
-            except Exception as e:
-                self.logger.error(f"Error checking broadcast '{broadcast_name}': {e}", exc_info=True)
-    
-    def _should_send_cron(self, broadcast: Dict[str, Any], now: datetime) -> bool:
-        """Check if a cron-based broadcast should be sent"""
-        cron_expression = broadcast.get('cron_expression')
-        if not cron_expression:
-            return False
-        
+    def _schedule_broadcast(self, broadcast: Dict[str, Any]):
+        """Add the job that sends a broadcast on its schedule"""
         broadcast_name = broadcast['name']
-        last_exec = self.last_execution.get(broadcast_name)
+        schedule_type = broadcast['schedule_type']
+        scheduler = get_job_scheduler()
+        callback = functools.partial(self._run_broadcast, broadcast)
+        now = datetime.now(timezone.utc)
         
         try:
-            # Create croniter instance
-            cron = croniter(cron_expression, now)
-            
-            # Get the previous scheduled time
-            prev_time = cron.get_prev(datetime)
-            
-            # If we've never executed, or the previous scheduled time is after our last execution
-            if last_exec is None:
-                # Check if prev_time is within the last minute (to avoid sending on startup for past schedules)
-                time_diff = (now - prev_time).total_seconds()
-                if 0 <= time_diff <= 60:
-                    return True
-            elif prev_time > last_exec:
-                return True
+            if schedule_type == 'cron':
+                cron_expression = broadcast.get('cron_expression')
+                if not cron_expression:
+                    return
+                # A time that matched within the last minute is still sent on startup
+                first = CronExpression(cron_expression).next_after(now - timedelta(seconds=60))
+                job = scheduler.add_job(
+                    callback, cron=cron_expression, start_at=first, tz=timezone.utc,
+                    name=f"broadcast.{broadcast_name}", owner="scheduled_broadcasts",
+                    misfire=MisfirePolicy.SKIP, misfire_grace=60
+                )
+            
+            elif schedule_type == 'interval':
+                interval_seconds = broadcast.get('interval_seconds')
+                if not interval_seconds:
+                    return
+                job = scheduler.add_job(
+                    callback, interval=interval_seconds, start_at=now,
+                    name=f"broadcast.{broadcast_name}", owner="scheduled_broadcasts"
+                )
+            
+            elif schedule_type == 'one_time':
+                scheduled_time_str = broadcast.get('scheduled_time')
+                if not scheduled_time_str:
+                    return
+                # Parse scheduled time (ISO format); naive times are UTC
+                scheduled_time = datetime.fromisoformat(scheduled_time_str.replace('Z', '+00:00'))
+                # Sent if the service starts within a minute of it, otherwise missed
+                job = scheduler.add_job(
+                    callback, at=scheduled_time,
+                    name=f"broadcast.{broadcast_name}", owner="scheduled_broadcasts",
+                    misfire=MisfirePolicy.SKIP, misfire_grace=60
+                )
             
-            return False
+            else:
+                return
             
-        except Exception as e:
-            self.logger.error(f"Error parsing cron expression '{cron_expression}': {e}")
-            return False
-    
-    def _should_send_interval(self, broadcast: Dict[str, Any], now: datetime) -> bool:
-        """Check if an interval-based broadcast should be sent"""
-        interval_seconds = broadcast.get('interval_seconds')
-        if not interval_seconds:
-            return False
+        except ValueError as e:
+            self.logger.error(f"Invalid schedule for broadcast '{broadcast_name}': {e}")
+            return
         
-        broadcast_name = broadcast['name']
-        last_exec = self.last_execution.get(broadcast_name)
-        
-        if last_exec is None:
-            # First execution
-            return True
-        
-        # Check if enough time has passed
-        elapsed = (now - last_exec).total_seconds()
-        if elapsed >= interval_seconds:
-            return True
-        
-        return False
+        self.jobs[broadcast_name] = job
     
-    def _should_send_one_time(self, broadcast: Dict[str, Any], now: datetime) -> bool:
-        """Check if a one-time broadcast should be sent"""
-        scheduled_time_str = broadcast.get('scheduled_time')
-        if not scheduled_time_str:
-            return False
-        
-        broadcast_name = broadcast['name']
-        
-        # Check if already sent
-        if broadcast_name in self.last_execution:
-            return False
+    async def _run_broadcast(self, broadcast: Dict[str, Any]):
+        """Send a broadcast that has come due; called by the job scheduler"""
+        if not self.running:
+            return
         
-        try:
-            # Parse scheduled time (ISO format)
-            scheduled_time = datetime.fromisoformat(scheduled_time_str.replace('Z', '+00:00'))
-            
-            # Make sure scheduled_time is timezone-aware
-            if scheduled_time.tzinfo is None:
-                scheduled_time = scheduled_time.replace(tzinfo=timezone.utc)
-            
-            # Check if it's time to send (within the last minute)
-            time_diff = (now - scheduled_time).total_seconds()
-            
-            if time_diff < 0:
-                # Scheduled time is in the future
-                return False
-            elif time_diff > 60:
-                # Scheduled time was more than 60 seconds ago - missed window
-                self.logger.warning(f"One-time broadcast '{broadcast_name}' missed send window. Scheduled: {scheduled_time}, Now: {now}, Diff: {time_diff:.0f}s")
-                return False
-            else:
-                # Within the send window
-                return True
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing scheduled time '{scheduled_time_str}': {e}")
-            return False
+        await self._send_broadcast(broadcast)
+        self.last_execution[broadcast['name']] = datetime.now(timezone.utc)
     
     async def _send_broadcast(self, broadcast: Dict[str, Any]):
         """Send a broadcast message"""
@@ -307,6 +241,7 @@ class ScheduledBroadcastsService:
             'running': self.running,
             'broadcasts_configured': len(self.broadcasts),
             'broadcasts_enabled': len([b for b in self.broadcasts if b.get('enabled', True)]),
+            'broadcasts_scheduled': len(self.jobs),
             'last_executions': {
                 name: time.isoformat() 
                 for name, time in self.last_execution.items()
@@ -2,21 +2,25 @@
 Broadcast Scheduling Module for Web Administration
 
 Provides message scheduling, broadcast history, and template management.
+Each active broadcast is a one-shot job on the shared job scheduler, re-armed
+at its next send time after every send.
 """
 
-import asyncio
 import json
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, field
 from enum import Enum
+import functools
 import uuid
 
 try:
     from ...models.message import Message, MessageType
+    from ...core.job_scheduler import Job, get_job_scheduler
 except ImportError:
     from models.message import Message, MessageType
+    from core.job_scheduler import Job, get_job_scheduler
 
 
 logger = logging.getLogger(__name__)
@@ -119,10 +123,9 @@ class BroadcastScheduler:
         
         # Configuration
         self.history_limit = 1000
-        self.check_interval = 60  # Check every minute
         
-        # Scheduler task
-        self.scheduler_task: Optional[asyncio.Task] = None
+        # Jobs on the shared scheduler, by broadcast ID
+        self.jobs: Dict[str, Job] = {}
         self.is_running = False
         
         # Default templates
@@ -186,7 +189,8 @@ class BroadcastScheduler:
         """Start the scheduler"""
         try:
             self.is_running = True
-            self.scheduler_task = asyncio.create_task(self._scheduler_loop())
+            for broadcast in list(self.scheduled_broadcasts.values()):
+                self._arm_broadcast(broadcast)
             self.logger.info("Broadcast scheduler started")
             
         except Exception as e:
@@ -198,70 +202,67 @@ class BroadcastScheduler:
         try:
             self.is_running = False
             
-            if self.scheduler_task:
-                self.scheduler_task.cancel()
-                try:
-                    await self.scheduler_task
-                except asyncio.CancelledError:
-                    pass
+            for job in self.jobs.values():
+                job.cancel()
+            self.jobs.clear()
             
             self.logger.info("Broadcast scheduler stopped")
             
         except Exception as e:
             self.logger.error(f"Error stopping broadcast scheduler: {e}")
     
-    async def _scheduler_loop(self):
-        """Main scheduler loop"""
-        while self.is_running:
-            try:
-                await self._check_scheduled_broadcasts()
-                await asyncio.sleep(self.check_interval)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Error in scheduler loop: {e}")
-                await asyncio.sleep(self.check_interval)
+    def _next_send_time(self, broadcast: ScheduledBroadcast) -> Optional[datetime]:
+        """When a broadcast is next due, or None if it has nothing left to send"""
+        if broadcast.schedule_type == ScheduleType.ONE_TIME:
+            return broadcast.scheduled_time if broadcast.send_count == 0 else None
+        
+        if broadcast.schedule_type == ScheduleType.RECURRING:
+            return broadcast.next_send
+        
+        if broadcast.schedule_type == ScheduleType.INTERVAL:
+            if broadcast.last_sent:
+                return broadcast.last_sent + timedelta(minutes=broadcast.interval_minutes or 60)
+            return broadcast.scheduled_time
+        
+        return None
     
-    async def _check_scheduled_broadcasts(self):
-        """Check for broadcasts that need to be sent"""
+    def _arm_broadcast(self, broadcast: ScheduledBroadcast):
+        """Schedule a broadcast's job at its next send time, or unschedule it"""
+        job = self.jobs.get(broadcast.id)
+        due = self._next_send_time(broadcast) if broadcast.is_active else None
+        if not self.is_running or due is None:
+            if job is not None:
+                job.cancel()
+                del self.jobs[broadcast.id]
+            return
+        
+        if job is None:
+            self.jobs[broadcast.id] = get_job_scheduler().add_job(
+                functools.partial(self._run_scheduled_broadcast, broadcast.id),
+                at=due,
+                name=f"broadcast.{broadcast.name}",
+                owner="web_scheduler"
+            )
+        else:
+            get_job_scheduler().reschedule_job(job, due)
+    
+    async def _run_scheduled_broadcast(self, broadcast_id: str):
+        """Send a broadcast that has come due; called by the job scheduler"""
+        broadcast = self.scheduled_broadcasts.get(broadcast_id)
+        if broadcast is None or not broadcast.is_active:
+            return
+        
+        # Check limits
         now = datetime.now(timezone.utc)
+        if broadcast.end_date and now > broadcast.end_date:
+            broadcast.is_active = False
+        elif broadcast.max_occurrences and broadcast.send_count >= broadcast.max_occurrences:
+            broadcast.is_active = False
+        else:
+            # Send the broadcast
+            await self._send_scheduled_broadcast(broadcast)
         
-        for broadcast in list(self.scheduled_broadcasts.values()):
-            if not broadcast.is_active:
-                continue
-            
-            should_send = False
-            
-            # Check if it's time to send
-            if broadcast.schedule_type == ScheduleType.ONE_TIME:
-                if broadcast.scheduled_time and broadcast.scheduled_time <= now and broadcast.send_count == 0:
-                    should_send = True
-            
-            elif broadcast.schedule_type == ScheduleType.RECURRING:
-                if broadcast.next_send and broadcast.next_send <= now:
-                    should_send = True
-            
-            elif broadcast.schedule_type == ScheduleType.INTERVAL:
-                if broadcast.last_sent:
-                    next_time = broadcast.last_sent + timedelta(minutes=broadcast.interval_minutes or 60)
-                    if next_time <= now:
-                        should_send = True
-                elif broadcast.scheduled_time and broadcast.scheduled_time <= now:
-                    should_send = True
-            
-            # Check limits
-            if should_send:
-                if broadcast.end_date and now > broadcast.end_date:
-                    broadcast.is_active = False
-                    continue
-                
-                if broadcast.max_occurrences and broadcast.send_count >= broadcast.max_occurrences:
-                    broadcast.is_active = False
-                    continue
-                
-                # Send the broadcast
-                await self._send_scheduled_broadcast(broadcast)
+        self._arm_broadcast(broadcast)
     
     async def _send_scheduled_broadcast(self, broadcast: ScheduledBroadcast):
         """Send a scheduled broadcast"""
@@ -490,6 +491,7 @@ class BroadcastScheduler:
                 broadcast.next_send = scheduled_time
             
             self.scheduled_broadcasts[broadcast_id] = broadcast
+            self._arm_broadcast(broadcast)
             self.logger.info(f"Scheduled broadcast: {name} at {scheduled_time}")
             
             return broadcast_id
@@ -522,6 +524,7 @@ class BroadcastScheduler:
                 elif broadcast.schedule_type == ScheduleType.INTERVAL:
                     broadcast.next_send = broadcast.scheduled_time
             
+            self._arm_broadcast(broadcast)
             self.logger.info(f"Updated broadcast {broadcast_id}")
             return True
             
@@ -538,6 +541,7 @@ class BroadcastScheduler:
             
             broadcast.is_active = False
             broadcast.status = BroadcastStatus.CANCELLED
+            self._arm_broadcast(broadcast)
             
             self.logger.info(f"Cancelled broadcast {broadcast_id}")
             return True
@@ -552,6 +556,8 @@ class BroadcastScheduler:
             if broadcast_id in self.scheduled_broadcasts:
                 broadcast = self.scheduled_broadcasts[broadcast_id]
                 del self.scheduled_broadcasts[broadcast_id]
+                broadcast.is_active = False
+                self._arm_broadcast(broadcast)
                 self.logger.info(f"Deleted broadcast: {broadcast.name}")
                 return True
             return False
@@ -68,6 +68,11 @@ class ZephyrGateDashboard {
             this.searchMessages();
         });
         
+        // Trace export
+        document.getElementById('export-traces-btn')?.addEventListener('click', () => {
+            this.exportTraces();
+        });
+        
         // Close user menu when clicking outside
         document.addEventListener('click', (e) => {
             const menu = document.getElementById('user-menu');
@@ -436,6 +441,125 @@ class ZephyrGateDashboard {
                     console.error('Failed to load messages:', error);
                 }
                 break;
+            case 'system':
+                // Load event loop lag and blocked callbacks
+                try {
+                    const response = await this.apiRequest('/api/system/loop');
+                    if (response.ok) {
+                        const loop = await response.json();
+                        this.updateLoopHealth(loop);
+                    }
+                } catch (error) {
+                    console.error('Failed to load event loop health:', error);
+                }
+                
+                // Load slowest message traces and per-stage latency
+                try {
+                    const response = await this.apiRequest('/api/traces?slow=true&limit=10');
+                    if (response.ok) {
+                        const traces = await response.json();
+                        this.updateTraces(traces);
+                    }
+                } catch (error) {
+                    console.error('Failed to load message traces:', error);
+                }
+                break;
+        }
+    }
+    
+    updateLoopHealth(loop) {
+        const container = document.getElementById('loop-health');
+        if (!container) return;
+        
+        if (!loop.running) {
+            container.innerHTML = '<p class="text-gray-500 text-center py-4">Event loop monitor is not running</p>';
+            return;
+        }
+        
+        const ms = value => `${((value || 0) * 1000).toFixed(1)} ms`;
+        const lag = loop.lag || {};
+        const events = (loop.recent_events || []).slice().reverse();
+        
+        container.innerHTML = `
+            <div class="grid grid-cols-2 md:grid-cols-5 gap-4 text-sm">
+                <div><p class="text-gray-500">Current lag</p><p class="font-semibold">${ms(loop.current_lag)}</p></div>
+                <div><p class="text-gray-500">p50</p><p class="font-semibold">${ms(lag.p50)}</p></div>
+                <div><p class="text-gray-500">p99</p><p class="font-semibold">${ms(lag.p99)}</p></div>
+                <div><p class="text-gray-500">Max</p><p class="font-semibold">${ms(lag.max)}</p></div>
+                <div><p class="text-gray-500">Blocked</p><p class="font-semibold">${loop.blocked}</p></div>
+            </div>
+            ${events.length === 0 ? '<p class="text-gray-500 text-center py-4">No blocked callbacks recorded</p>' : events.map(event => `
+                <div class="border-l-4 border-yellow-500 pl-4 py-2">
+                    <div class="flex justify-between items-start">
+                        <p class="font-semibold">${event.source} blocked ${ms(event.lag)}</p>
+                        <span class="text-xs text-gray-500">${this.formatTimestamp(event.started)}</span>
+                    </div>
+                    <p class="text-gray-600 text-sm">${event.coroutine || 'callback'}${event.task ? ` (${event.task})` : ''}</p>
+                    <p class="text-xs text-gray-500 font-mono">${event.stack.length ? event.stack[event.stack.length - 1] : ''}</p>
+                </div>
+            `).join('')}
+        `;
+    }
+    
+    updateTraces(data) {
+        const container = document.getElementById('message-traces');
+        if (!container) return;
+        
+        const ms = value => `${((value || 0) * 1000).toFixed(1)} ms`;
+        const stages = Object.entries(data.stages || {});
+        
+        if (stages.length === 0) {
+            container.innerHTML = '<p class="text-gray-500 text-center py-4">No traced messages yet</p>';
+            return;
+        }
+        
+        container.innerHTML = `
+            <table class="min-w-full table-auto text-sm">
+                <thead>
+                    <tr class="border-b text-left text-gray-500">
+                        <th class="px-2 py-1">Stage</th><th class="px-2 py-1">Count</th>
+                        <th class="px-2 py-1">p50</th><th class="px-2 py-1">p95</th><th class="px-2 py-1">p99</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    ${stages.map(([name, stats]) => `
+                        <tr class="border-b">
+                            <td class="px-2 py-1 font-mono">${name}</td><td class="px-2 py-1">${stats.count}</td>
+                            <td class="px-2 py-1">${ms(stats.p50)}</td><td class="px-2 py-1">${ms(stats.p95)}</td>
+                            <td class="px-2 py-1">${ms(stats.p99)}</td>
+                        </tr>
+                    `).join('')}
+                </tbody>
+            </table>
+            <h4 class="font-semibold mt-4">Slowest messages</h4>
+            ${data.traces.map(trace => `
+                <div class="border-l-4 border-blue-500 pl-4 py-2">
+                    <div class="flex justify-between items-start">
+                        <p class="font-semibold font-mono text-sm">${trace.trace_id}</p>
+                        <span class="text-xs text-gray-500">${this.formatTimestamp(trace.started_at)}</span>
+                    </div>
+                    <p class="text-gray-600 text-sm">${ms(trace.duration)} from ${trace.attributes.sender_id || 'unknown'}</p>
+                    <p class="text-xs text-gray-500">
+                        ${Object.entries(trace.breakdown).sort((a, b) => b[1] - a[1]).slice(0, 4)
+                            .map(([name, duration]) => `${name} ${ms(duration)}`).join(' · ')}
+                    </p>
+                </div>
+            `).join('')}
+        `;
+    }
+    
+    async exportTraces() {
+        try {
+            const response = await this.apiRequest('/api/traces/export');
+            if (!response.ok) return;
+            const blob = await response.blob();
+            const link = document.createElement('a');
+            link.href = URL.createObjectURL(blob);
+            link.download = 'zephyrgate-traces.json';
+            link.click();
+            URL.revokeObjectURL(link.href);
+        } catch (error) {
+            console.error('Failed to export traces:', error);
         }
     }
     
@@ -120,6 +120,7 @@ class SystemMonitor:
                 'bytes_sent': net_io.bytes_sent,
                 'bytes_recv': net_io.bytes_recv
             }
+            psutil.cpu_percent(interval=None)  # prime the non-blocking CPU measurement
             
             # Start monitoring tasks
             self.monitoring_task = asyncio.create_task(self._monitoring_loop())
@@ -195,8 +196,8 @@ class SystemMonitor:
     async def _collect_system_metrics(self) -> SystemMetrics:
         """Collect current system metrics"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous collection (interval=None does not block the loop)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory usage
             memory = psutil.virtual_memory()
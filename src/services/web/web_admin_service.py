@@ -6,6 +6,7 @@ Implements authentication, session management, and administrative functions.
 """
 
 import asyncio
+import hmac
 import json
 import logging
 from datetime import datetime, timedelta, timezone
@@ -17,7 +18,7 @@ from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconn
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
@@ -25,7 +26,12 @@ import bcrypt
 from jose import JWTError, jwt
 from pydantic import BaseModel, Field
 
+from core.database import get_database
+from core.history_search import HistoryQuery, search_message_history
+from core.loop_monitor import get_loop_monitor
+from core.metrics import CONTENT_TYPE_OPENMETRICS, CONTENT_TYPE_PROMETHEUS, get_metrics_registry
 from core.plugin_manager import BasePlugin, PluginMetadata
+from core.tracing import get_tracer
 from core.plugin_interfaces import (
     PluginCommunicationInterface, MessageHandler, CommandHandler,
     PluginMessage, PluginEvent, PluginEventType, PluginMessageType
@@ -95,6 +101,7 @@ class MessageInfo(BaseModel):
     timestamp: datetime
     message_type: str
     interface_id: str
+    history_id: Optional[int] = None  # pass as before_id to get the next, older page
 
 
 class BroadcastMessage(BaseModel):
@@ -758,6 +765,8 @@ class WebAdminService(BasePlugin):
         self.port = config.get("port", 8080)
         self.secret_key = config.get("secret_key", "your-secret-key-change-in-production")
         self.debug = config.get("debug", False)
+        self.metrics_endpoint = config.get("metrics_endpoint", True)
+        self.metrics_token = config.get("metrics_token")  # optional bearer token for scrapers
         
         # Initialize components
         security_policy = SecurityPolicy(
@@ -1019,9 +1028,33 @@ class WebAdminService(BasePlugin):
         async def get_messages(
             limit: int = 100,
             offset: int = 0,
+            before_id: Optional[int] = None,
+            query: Optional[str] = None,
+            sender_id: Optional[str] = None,
+            channel: Optional[int] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
             username: str = Depends(require_permission(Permission.MESSAGE_READ))
         ):
-            return await self._get_messages(limit, offset)
+            return await self._get_messages(
+                limit, offset, before_id=before_id, query=query, sender_id=sender_id,
+                channel=channel, start_date=start_date, end_date=end_date
+            )
+        
+        # Prometheus/OpenMetrics scrape endpoint
+        if self.metrics_endpoint:
+            @self.app.get("/metrics", include_in_schema=False)
+            async def get_prometheus_metrics(req: Request):
+                if self.metrics_token:
+                    if not hmac.compare_digest(req.headers.get("authorization", "").encode(),
+                                               f"Bearer {self.metrics_token}".encode()):
+                        raise HTTPException(status_code=401, detail="Invalid metrics token")
+                
+                openmetrics = "application/openmetrics-text" in req.headers.get("accept", "")
+                return Response(
+                    content=get_metrics_registry().render(openmetrics=openmetrics),
+                    media_type=CONTENT_TYPE_OPENMETRICS if openmetrics else CONTENT_TYPE_PROMETHEUS
+                )
         
         # System monitoring routes
         @self.app.get("/api/system/metrics")
@@ -1047,6 +1080,50 @@ class WebAdminService(BasePlugin):
                 for m in metrics
             ]
         
+        @self.app.get("/api/system/loop")
+        async def get_event_loop_health(
+            events: int = 20,
+            username: str = Depends(require_permission(Permission.SYSTEM_MONITOR))
+        ):
+            monitor = get_loop_monitor()
+            if monitor is None:
+                return {"running": False}
+            stats = monitor.get_stats()
+            stats["recent_events"] = [event.to_dict() for event in monitor.recent_events(events)]
+            return stats
+        
+        # Message pipeline traces
+        @self.app.get("/api/traces")
+        async def get_traces(
+            limit: int = 50,
+            slow: bool = False,
+            username: str = Depends(require_permission(Permission.SYSTEM_MONITOR))
+        ):
+            tracer = get_tracer()
+            traces = tracer.slowest(limit) if slow else tracer.recent(limit)
+            return {
+                "stats": tracer.get_stats(),
+                "stages": tracer.stage_breakdown(),
+                "traces": [trace.summary() for trace in traces]
+            }
+        
+        @self.app.get("/api/traces/export")
+        async def export_traces(username: str = Depends(require_permission(Permission.SYSTEM_MONITOR))):
+            return JSONResponse(
+                content={"exported_at": datetime.utcnow().isoformat(), "traces": get_tracer().export()},
+                headers={"Content-Disposition": "attachment; filename=zephyrgate-traces.json"}
+            )
+        
+        @self.app.get("/api/traces/{trace_id}")
+        async def get_trace(
+            trace_id: str,
+            username: str = Depends(require_permission(Permission.SYSTEM_MONITOR))
+        ):
+            trace = get_tracer().get_trace(trace_id)
+            if trace is None:
+                raise HTTPException(status_code=404, detail="Trace not found")
+            return trace.to_dict()
+        
         @self.app.get("/api/system/alerts")
         async def get_alerts(
             active_only: bool = True,
@@ -2562,10 +2639,43 @@ class WebAdminService(BasePlugin):
             for node in nodes
         ]
     
-    async def _get_messages(self, limit: int, offset: int) -> List[MessageInfo]:
-        """Get recent messages"""
-        # This would integrate with actual message history
-        return []  # Mock data for now
+    async def _get_messages(self, limit: int, offset: int, before_id: Optional[int] = None,
+                            query: Optional[str] = None, sender_id: Optional[str] = None,
+                            channel: Optional[int] = None, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None) -> List[MessageInfo]:
+        """Get message history, newest first, from the indexed history search"""
+        history_query = HistoryQuery(
+            text=query or None,
+            sender_id=sender_id,
+            channel=channel,
+            start_time=start_date,
+            end_time=end_date,
+            before_id=before_id,
+            limit=max(0, min(limit, 500)),
+            offset=max(0, offset)
+        )
+        try:
+            page = search_message_history(get_database(), history_query)
+        except Exception as e:
+            self.logger.error(f"Error getting message history: {e}")
+            return []
+
+        messages = []
+        for row in page.messages:
+            user = self.user_manager.get_user(row['sender_id'])
+            messages.append(MessageInfo(
+                id=row['message_id'] or str(row['id']),
+                sender_id=row['sender_id'],
+                sender_name=user.short_name if user else row['sender_id'],
+                recipient_id=row['recipient_id'],
+                channel=row['channel'] or 0,
+                content=row['content'],
+                timestamp=datetime.fromisoformat(row['timestamp']),
+                message_type="text",
+                interface_id=row['interface_id'] or "",
+                history_id=row['id']
+            ))
+        return messages
     
     async def _send_broadcast(self, message: BroadcastMessage, username: str) -> Dict[str, Any]:
         """Send broadcast message"""
@@ -0,0 +1,6 @@
+"""
+Benchmarks for ZephyrGate
+
+Reproducible throughput and latency benchmarks driven by a synthetic mesh
+load generator. See ``mesh_load.py``.
+"""
@@ -0,0 +1,198 @@
+"""
+BBS Search Benchmark for ZephyrGate
+
+Fills a fresh database with a seeded synthetic bulletin archive at several
+sizes and times ``BBSDatabase`` full-text searches against it, next to the
+``LIKE '%term%'`` scan they replaced. Words are drawn from a Zipf-distributed
+vocabulary, so common words appear in most bulletins and rare ones in a
+handful, as in a real archive. For each archive size it reports p50/p99/max
+latency per query plus the time taken to load the archive (which includes
+keeping the search index up to date through its triggers).
+
+    python -m tests.benchmarks.bbs_search
+    python -m tests.benchmarks.bbs_search --sizes 1000 100000 --output search.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add src to path for imports
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.database import DatabaseManager, initialize_database
+from services.bbs.database import BBSDatabase
+
+
+# Most frequent words first; the rest of the vocabulary is synthetic
+TOPIC_WORDS = ("mesh", "node", "repeater", "battery", "solar", "antenna", "ridge", "relay",
+               "signal", "channel", "firmware", "weather", "trail", "summit", "frequency",
+               "storm", "meetup", "swap", "club")
+RARE_WORD = "hamfest"  # placed deep in the vocabulary
+SYLLABLES = ("ka", "ro", "mi", "te", "lu", "sa", "no", "vi", "da", "pe", "zo", "ri", "ba", "fu")
+VOCABULARY_SIZE = 5000
+
+BOARDS = ("general", "tech", "events", "trading")
+
+# (label, search text, board)
+QUERIES = (
+    ("common", "mesh", None),
+    ("mid", "summit", None),
+    ("rare", RARE_WORD, None),
+    ("prefix", "rep", None),
+    ("two_words", "solar battery", None),
+    ("board", "antenna", "tech"),
+    ("no_match", "zeppelin", None),
+)
+
+# The search this benchmark replaced: a substring scan returning every match
+LIKE_QUERY = """
+    SELECT * FROM bulletins
+    WHERE subject LIKE ? OR content LIKE ?
+    ORDER BY timestamp DESC
+"""
+LIKE_BOARD_QUERY = """
+    SELECT * FROM bulletins
+    WHERE board = ? AND (subject LIKE ? OR content LIKE ?)
+    ORDER BY timestamp DESC
+"""
+
+
+def vocabulary() -> List[str]:
+    words = list(TOPIC_WORDS)
+    for length in itertools.count(2):
+        for parts in itertools.product(SYLLABLES, repeat=length):
+            if len(words) == VOCABULARY_SIZE:
+                words.insert(VOCABULARY_SIZE // 2, RARE_WORD)
+                return words
+            words.append("".join(parts))
+
+
+def load_archive(db: DatabaseManager, size: int, seed: int) -> float:
+    """Insert ``size`` synthetic bulletins; returns seconds taken"""
+    rng = random.Random(seed)
+    words = vocabulary()
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+    def text(count: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=weights, k=count))
+
+    senders = [f"!{i:08x}" for i in range(50)]
+    for sender in senders:
+        db.upsert_user({'node_id': sender, 'short_name': sender[-4:]})
+
+    start_time = datetime(2024, 1, 1)
+    rows = []
+    for i in range(size):
+        sender = rng.choice(senders)
+        rows.append((
+            rng.choice(BOARDS), sender, f"Node {sender[-4:]}",
+            text(rng.randint(2, 6)), text(rng.randint(20, 120)),
+            (start_time + timedelta(minutes=i)).isoformat(), f"bench-{i}"
+        ))
+
+    started = time.perf_counter()
+    for offset in range(0, size, 1000):
+        db.execute_many(
+            """
+            INSERT INTO bulletins (board, sender_id, sender_name, subject, content, timestamp, unique_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows[offset:offset + 1000]
+        )
+    return time.perf_counter() - started
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def time_call(call: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Run ``call`` ``repeat`` times; latencies in milliseconds"""
+    samples = []
+    result = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'rows': result if isinstance(result, int) else len(result),
+        'p50_ms': round(_percentile(samples, 0.5), 3),
+        'p99_ms': round(_percentile(samples, 0.99), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def run_size(size: int, seed: int, repeat: int, like: bool) -> Dict[str, Any]:
+    """Benchmark one archive size in its own temporary database"""
+    with tempfile.TemporaryDirectory() as directory:
+        db = initialize_database(str(Path(directory) / "bbs_search.db"))
+        try:
+            bbs = BBSDatabase()
+            result: Dict[str, Any] = {
+                'size': size,
+                'load_seconds': round(load_archive(db, size, seed), 3),
+                'queries': {},
+            }
+            for label, text, board in QUERIES:
+                timings = {
+                    'fts': time_call(lambda: bbs.search_bulletin_hits(text, board), repeat),
+                    'count': time_call(lambda: bbs.count_bulletin_matches(text, board), repeat),
+                }
+                if like:
+                    pattern = f"%{text}%"
+                    if board:
+                        scan = lambda: db.execute_query(LIKE_BOARD_QUERY, (board, pattern, pattern))
+                    else:
+                        scan = lambda: db.execute_query(LIKE_QUERY, (pattern, pattern))
+                    timings['like'] = time_call(scan, repeat)
+                result['queries'][label] = timings
+            return result
+        finally:
+            db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark BBS bulletin search")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Archive sizes (bulletins) to test")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs of each query per size")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for the synthetic archive")
+    parser.add_argument('--no-like', action='store_true', help="Skip the LIKE scan baseline")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = []
+    for size in args.sizes:
+        result = run_size(size, args.seed, args.repeat, not args.no_like)
+        results.append(result)
+        print(f"{size:>8} bulletins (loaded in {result['load_seconds']:.2f}s)")
+        for label, timings in result['queries'].items():
+            fts, count = timings['fts'], timings['count']
+            line = (f"  {label:<10} {count['rows']:>7} hits  fts p50 {fts['p50_ms']:>8.3f}ms "
+                    f"p99 {fts['p99_ms']:>8.3f}ms  count p50 {count['p50_ms']:>8.3f}ms")
+            if 'like' in timings:
+                line += f" | like p50 {timings['like']['p50_ms']:>8.3f}ms p99 {timings['like']['p99_ms']:>8.3f}ms"
+            print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'seed': args.seed, 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Message History Search Benchmark for ZephyrGate
+
+Fills a fresh database with seeded synthetic message history at several
+sizes and times ``core.history_search`` queries against it: recent pages,
+old time ranges, sender and channel filters, full-text searches on common
+and rare words (alone and combined with filters) and deep keyset paging.
+Each query is also run the way message history was queried before (LIKE
+on content, ORDER BY timestamp with LIMIT/OFFSET) as a baseline.
+
+Senders, channels and words are Zipf-distributed, so there are a few
+chatty nodes and common words next to many quiet nodes and rare words.
+Messages arrive every three seconds.
+
+    python -m tests.benchmarks.history_search
+    python -m tests.benchmarks.history_search --sizes 2000000 --no-baseline --output history.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add src to path for imports
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.database import DatabaseManager
+from core.history_search import HistoryQuery, search_message_history
+
+
+COMMON_WORDS = ("mesh", "hello", "node", "ping", "battery", "solar", "net", "check", "ridge", "relay")
+RARE_WORD = "hamfest"  # placed deep in the vocabulary
+SYLLABLES = ("ka", "ro", "mi", "te", "lu", "sa", "no", "vi", "da", "pe", "zo", "ri", "ba", "fu")
+VOCABULARY_SIZE = 3000
+SENDERS = 2000
+START = datetime(2024, 1, 1)
+INTERVAL = timedelta(seconds=3)
+
+# The query this module replaced
+BASELINE_QUERY = "SELECT * FROM message_history WHERE 1=1 {conditions} ORDER BY timestamp DESC LIMIT ? OFFSET ?"
+
+
+def vocabulary() -> List[str]:
+    words = list(COMMON_WORDS)
+    for parts in itertools.product(SYLLABLES, repeat=3):
+        if len(words) == VOCABULARY_SIZE:
+            break
+        words.append("".join(parts))
+    words.insert(VOCABULARY_SIZE // 2, RARE_WORD)
+    return words
+
+
+def sender_id(rank: int) -> str:
+    return f"!{rank:08x}"
+
+
+def load_history(db: DatabaseManager, size: int, seed: int) -> float:
+    """Insert ``size`` synthetic messages; returns seconds taken"""
+    rng = random.Random(seed)
+    words = vocabulary()
+    word_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    senders = [sender_id(rank) for rank in range(SENDERS)]
+    sender_weights = list(itertools.accumulate(1 / rank for rank in range(1, SENDERS + 1)))
+
+    db.execute_many(
+        "INSERT INTO users (node_id, short_name) VALUES (?, ?)",
+        [(sender, sender[-4:]) for sender in senders]
+    )
+
+    def batch(first: int, count: int):
+        for i in range(first, first + count):
+            yield (
+                f"msg-{i}", rng.choices(senders, cum_weights=sender_weights)[0], "^all",
+                rng.choices((0, 1, 2, 3), (80, 10, 7, 3))[0],
+                " ".join(rng.choices(words, cum_weights=word_weights, k=rng.randint(2, 15))),
+                (START + INTERVAL * i).isoformat(), "radio1", rng.randint(0, 3),
+                round(rng.uniform(-20, 10), 1), round(rng.uniform(-120, -50), 1)
+            )
+
+    started = time.perf_counter()
+    for first in range(0, size, 10000):
+        db.execute_many(
+            """
+            INSERT INTO message_history
+            (message_id, sender_id, recipient_id, channel, content, timestamp,
+             interface_id, hop_count, snr, rssi)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            list(batch(first, min(10000, size - first)))
+        )
+    return time.perf_counter() - started
+
+
+def queries(size: int) -> Dict[str, HistoryQuery]:
+    """Named queries scaled to the history size"""
+    end = START + INTERVAL * size
+    day = timedelta(days=1)
+    quiet_sender = sender_id(SENDERS - 1)
+    busy_sender = sender_id(0)
+    return {
+        'recent': HistoryQuery(limit=20),
+        'last_24h': HistoryQuery(start_time=end - day, limit=20),
+        'old_day': HistoryQuery(start_time=START + day, end_time=START + 2 * day, limit=20),
+        'busy_sender': HistoryQuery(sender_id=busy_sender, limit=20),
+        'quiet_sender': HistoryQuery(sender_id=quiet_sender, limit=20),
+        'channel': HistoryQuery(channel=3, limit=20),
+        'text_common': HistoryQuery(text="mesh", limit=20),
+        'text_rare': HistoryQuery(text=RARE_WORD, limit=20),
+        'text_two_words': HistoryQuery(text="solar relay", limit=20),
+        'text_prefix': HistoryQuery(text="rid*", limit=20),
+        'text_quiet_sender': HistoryQuery(text="mesh", sender_id=quiet_sender, limit=20),
+        'text_busy_sender': HistoryQuery(text="ridge", sender_id=busy_sender, limit=20),
+        'text_old_day': HistoryQuery(text="relay", start_time=START + day, end_time=START + 2 * day, limit=20),
+        'text_no_match': HistoryQuery(text="zeppelin", limit=20),
+    }
+
+
+def baseline(db: DatabaseManager, query: HistoryQuery) -> List[Any]:
+    """Run a query the way MessageHistoryService did before"""
+    conditions, params = [], []
+    if query.sender_id:
+        conditions.append("AND sender_id = ?")
+        params.append(query.sender_id)
+    if query.channel is not None:
+        conditions.append("AND channel = ?")
+        params.append(query.channel)
+    if query.text:
+        conditions.append("AND content LIKE ?")
+        params.append(f"%{query.text.rstrip('*')}%")
+    if query.start_time:
+        conditions.append("AND timestamp >= ?")
+        params.append(query.start_time.isoformat())
+    if query.end_time:
+        conditions.append("AND timestamp <= ?")
+        params.append(query.end_time.isoformat())
+    sql = BASELINE_QUERY.format(conditions=" ".join(conditions))
+    return db.execute_query(sql, (*params, query.limit, query.offset))
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def time_call(call: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Run ``call`` ``repeat`` times; latencies in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'p50_ms': round(_percentile(samples, 0.5), 3),
+        'p99_ms': round(_percentile(samples, 0.99), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def page_through(db: DatabaseManager, query: HistoryQuery, pages: int) -> List[float]:
+    """Follow the keyset cursor for ``pages`` pages; per-page milliseconds"""
+    timings = []
+    before_id: Optional[int] = None
+    for _ in range(pages):
+        query.before_id = before_id
+        started = time.perf_counter()
+        page = search_message_history(db, query)
+        timings.append(round((time.perf_counter() - started) * 1000, 3))
+        before_id = page.next_before_id
+        if before_id is None:
+            break
+    return timings
+
+
+def run_size(size: int, seed: int, repeat: int, with_baseline: bool, pages: int) -> Dict[str, Any]:
+    """Benchmark one history size in its own temporary database"""
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(str(Path(directory) / "history_search.db"))
+        try:
+            result: Dict[str, Any] = {
+                'size': size,
+                'load_seconds': round(load_history(db, size, seed), 3),
+                'queries': {},
+            }
+            for label, query in queries(size).items():
+                page = search_message_history(db, query)
+                timings = {
+                    'plan': page.plan,
+                    'rows': len(page.messages),
+                    'search': time_call(lambda: search_message_history(db, query), repeat),
+                }
+                if with_baseline:
+                    timings['baseline'] = time_call(lambda: baseline(db, query), repeat)
+                result['queries'][label] = timings
+
+            deep = page_through(db, HistoryQuery(limit=50), pages)
+            result['paging'] = {'pages': len(deep), 'first_ms': deep[0], 'last_ms': deep[-1]}
+            if with_baseline:
+                offset = HistoryQuery(limit=50, offset=50 * (len(deep) - 1))
+                result['paging']['baseline_last_ms'] = time_call(lambda: baseline(db, offset), repeat)['p50_ms']
+            return result
+        finally:
+            db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark message history queries")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000],
+                        help="History sizes (messages) to test")
+    parser.add_argument('--repeat', type=int, default=10, help="Runs of each query per size")
+    parser.add_argument('--pages', type=int, default=200, help="Pages to follow in the paging test")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for the synthetic history")
+    parser.add_argument('--no-baseline', action='store_true', help="Skip the LIKE/OFFSET baseline")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = []
+    for size in args.sizes:
+        result = run_size(size, args.seed, args.repeat, not args.no_baseline, args.pages)
+        results.append(result)
+        print(f"{size:>9} messages (loaded in {result['load_seconds']:.1f}s)")
+        for label, timings in result['queries'].items():
+            search = timings['search']
+            line = (f"  {label:<18} {timings['plan']:<6} {timings['rows']:>3} rows  "
+                    f"p50 {search['p50_ms']:>8.3f}ms p99 {search['p99_ms']:>8.3f}ms")
+            if 'baseline' in timings:
+                line += f" | baseline p50 {timings['baseline']['p50_ms']:>9.3f}ms"
+            print(line)
+        paging = result['paging']
+        line = (f"  paging {paging['pages']} pages: first {paging['first_ms']:.3f}ms "
+                f"last {paging['last_ms']:.3f}ms")
+        if 'baseline_last_ms' in paging:
+            line += f" | baseline (OFFSET) last {paging['baseline_last_ms']:.3f}ms"
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'seed': args.seed, 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
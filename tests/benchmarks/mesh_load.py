@@ -0,0 +1,829 @@
+"""
+Synthetic Mesh Load Benchmark for ZephyrGate
+
+Replays traffic profiles through a real CoreMessageRouter (SQLite database,
+async writer, plugin commands, service dispatch, chunking and tracing) using
+a simulated Meshtastic interface, and reports for each profile:
+
+- throughput (delivered messages per second)
+- delivery latency (arrival -> first handler) and reply latency
+  (arrival -> last reply packet handed to the radio): p50/p90/p99/max
+- memory growth (RSS, plus Python heap with --tracemalloc)
+- database statements per message and write amplification (bytes written
+  to storage per byte of message payload)
+
+Arrivals come from a seeded generator and latency is measured from the
+scheduled arrival time rather than from when the message was injected, so
+a stalled pipeline shows up as latency instead of quietly slowing the load.
+
+Results are JSON so runs can be compared between commits:
+
+    python -m tests.benchmarks.mesh_load --output baseline.json
+    python -m tests.benchmarks.mesh_load --compare baseline.json
+
+Recorded production traffic (see ``core.packet_capture``) can be replayed
+through the same pipeline with ``--capture FILE [--speed N]``.
+
+The radio is ideal by default (airtime is accounted but never waited for)
+and rate limits are disabled, so numbers reflect software cost. Pass
+``--radio SHORT_FAST`` (any modem preset) to include airtime pacing.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+# Add src to path for imports
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core import airtime, node_registry
+from core.airtime import AirtimeScheduler, MODEM_PRESETS, create_airtime_scheduler
+from core.chunk_framing import ChunkFramer
+from core.config import ConfigurationManager
+from core.database import DatabaseManager
+from core.interfaces import InterfaceStatus, ReplayInterface
+from core.message_router import CoreMessageRouter
+from core.metrics import get_metrics_registry
+from core.node_registry import NodeRegistry
+from core.packet_capture import read_capture
+from core.tracing import initialize_tracer
+from models.message import InterfaceConfig, Message, MessagePriority, MessageType
+
+
+SCHEMA_VERSION = 1
+
+NO_RATE_LIMIT = {'global': False, 'channel': False, 'sender': False, 'tiers': {'emergency': False}}
+
+WORDS = ("mesh", "node", "relay", "ridge", "repeater", "battery", "solar", "antenna", "trail",
+         "camp", "net", "check-in", "grid", "signal", "valley", "summit", "frequency", "club")
+
+
+# Message kinds
+
+@dataclass(frozen=True)
+class MessageKind:
+    """A kind of mesh packet the generator can produce"""
+    message_type: MessageType
+    build: Callable[[random.Random, str], str]  # (rng, sender_id) -> content
+    priority: MessagePriority = MessagePriority.NORMAL
+    chunked: bool = False  # sent over the air as framed parts
+
+    @property
+    def expects_reply(self) -> bool:
+        return self.message_type == MessageType.TEXT
+
+
+def _words(rng: random.Random, length: int) -> str:
+    text = ""
+    while len(text) < length:
+        text += rng.choice(WORDS) + " "
+    return text[:length].strip()
+
+
+KINDS: Dict[str, MessageKind] = {
+    'telemetry': MessageKind(MessageType.TELEMETRY, lambda rng, sender: (
+        f"batt={rng.randint(20, 100)} volt={rng.uniform(3.3, 4.2):.2f} "
+        f"chutil={rng.uniform(0, 40):.1f} airutil={rng.uniform(0, 10):.1f}"
+    )),
+    'position': MessageKind(MessageType.POSITION, lambda rng, sender: (
+        f"lat={rng.uniform(-60, 60):.5f} lon={rng.uniform(-180, 180):.5f} alt={rng.randint(0, 3000)}"
+    )),
+    'nodeinfo': MessageKind(MessageType.NODEINFO, lambda rng, sender: f"{sender} Node {sender[-4:]}"),
+    'chatter': MessageKind(MessageType.TEXT, lambda rng, sender: rng.choice(
+        ("hello mesh", "hi from the ridge", "hey anyone on the net?", "new node here")
+    )),
+    'ping': MessageKind(MessageType.TEXT, lambda rng, sender: "ping"),
+    'help': MessageKind(MessageType.TEXT, lambda rng, sender: "help"),
+    'weather': MessageKind(MessageType.TEXT, lambda rng, sender: rng.choice(("wx", "weather"))),
+    'bbs_list': MessageKind(MessageType.TEXT, lambda rng, sender: "bbslist general"),
+    'bbs_post': MessageKind(MessageType.TEXT, lambda rng, sender: (
+        f"bbspost general {_words(rng, 24)}: {_words(rng, 140)}"
+    )),
+    'bbs_bulletin': MessageKind(MessageType.TEXT, lambda rng, sender: (
+        f"bbspost bulletins {_words(rng, 24)}: {_words(rng, 640)}"
+    ), chunked=True),
+    'sos': MessageKind(MessageType.TEXT, lambda rng, sender: (
+        f"SOS {rng.choice(('injured hiker', 'vehicle stuck', 'lost', 'medical'))} "
+        f"grid {rng.randint(100, 999)}"
+    ), priority=MessagePriority.EMERGENCY),
+    'sos_ack': MessageKind(MessageType.TEXT, lambda rng, sender: "ACK responding"),
+}
+
+
+# Traffic profiles
+
+@dataclass
+class TrafficProfile:
+    """A reproducible mix of mesh traffic"""
+    name: str
+    description: str
+    mix: Dict[str, float]              # kind -> weight
+    rate: float = 20.0                 # mean arrivals per second; 0 injects back to back
+    duration: float = 10.0             # seconds of traffic
+    count: Optional[int] = None        # cap on arrivals (required when rate is 0)
+    senders: int = 50
+    burst_mix: Dict[str, float] = field(default_factory=dict)
+    burst_size: int = 0                # messages per burst
+    burst_rate: float = 100.0          # arrivals per second within a burst
+    burst_interval: float = 0.0        # seconds between bursts
+
+    def scaled(self, rate_scale: float = 1.0, duration_scale: float = 1.0) -> 'TrafficProfile':
+        """A copy with rates and durations multiplied"""
+        return replace(
+            self,
+            rate=self.rate * rate_scale,
+            duration=self.duration * duration_scale,
+            count=int(self.count * duration_scale) if self.count is not None else None,
+            burst_rate=self.burst_rate * rate_scale,
+            burst_interval=self.burst_interval * duration_scale
+        )
+
+    def schedule(self, rng: random.Random) -> List[Tuple[float, str]]:
+        """Arrival offsets (seconds) and message kinds, sorted by time"""
+        kinds, weights = zip(*self.mix.items())
+        arrivals: List[Tuple[float, str]] = []
+        if self.rate > 0:
+            offset = rng.expovariate(self.rate)  # Poisson arrivals
+            while offset < self.duration and (self.count is None or len(arrivals) < self.count):
+                arrivals.append((offset, rng.choices(kinds, weights)[0]))
+                offset += rng.expovariate(self.rate)
+        else:
+            arrivals = [(0.0, rng.choices(kinds, weights)[0]) for _ in range(self.count or 0)]
+
+        if self.burst_size and self.burst_interval > 0:
+            burst_kinds, burst_weights = zip(*(self.burst_mix or {'sos': 1.0}).items())
+            start = self.burst_interval
+            while start < self.duration:
+                for i in range(self.burst_size):
+                    arrivals.append((start + i / self.burst_rate, rng.choices(burst_kinds, burst_weights)[0]))
+                start += self.burst_interval
+
+        arrivals.sort(key=lambda arrival: arrival[0])
+        return arrivals
+
+
+PROFILES: Dict[str, TrafficProfile] = {
+    profile.name: profile for profile in (
+        TrafficProfile(
+            'telemetry_heavy', "Mostly telemetry and position reports with light chatter",
+            {'telemetry': 0.55, 'position': 0.25, 'nodeinfo': 0.05, 'chatter': 0.1, 'ping': 0.05},
+            rate=50.0, duration=10.0, senders=200
+        ),
+        TrafficProfile(
+            'command_heavy', "Interactive plugin commands, bot help and weather lookups",
+            {'ping': 0.35, 'help': 0.2, 'weather': 0.25, 'chatter': 0.1, 'telemetry': 0.1},
+            rate=25.0, duration=10.0, senders=40
+        ),
+        TrafficProfile(
+            'bbs_sync', "BBS list/post traffic with multi-part bulletins and chunked replies",
+            {'bbs_list': 0.3, 'bbs_post': 0.4, 'bbs_bulletin': 0.2, 'telemetry': 0.1},
+            rate=8.0, duration=10.0, senders=10
+        ),
+        TrafficProfile(
+            'emergency_burst', "Background traffic with periodic bursts of SOS messages and acknowledgements",
+            {'telemetry': 0.5, 'chatter': 0.3, 'ping': 0.2},
+            rate=10.0, duration=12.0, senders=60,
+            burst_mix={'sos': 0.8, 'sos_ack': 0.2}, burst_size=40, burst_rate=200.0, burst_interval=4.0
+        ),
+    )
+}
+
+
+# Simulated mesh
+
+class LoadRecorder:
+    """Tracks each injected request from scheduled arrival to delivery and reply"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.scheduled: Dict[str, float] = {}
+        self.awaiting_reply: set = set()
+        self.delivered: Dict[str, float] = {}
+        self.replied: Dict[str, float] = {}
+        self.reply_packets = 0
+        self.payload_bytes = 0
+
+    def expect(self, request_id: str, scheduled_at: float, payload_bytes: int, expects_reply: bool):
+        self.scheduled[request_id] = scheduled_at
+        self.payload_bytes += payload_bytes
+        if expects_reply:
+            self.awaiting_reply.add(request_id)
+
+    def deliver(self, message: Message):
+        """A handler saw the message (first handler wins)"""
+        if message.id in self.scheduled and message.id not in self.delivered:
+            self.delivered[message.id] = time.perf_counter()
+
+    def transmit(self, message: Message):
+        """A packet was handed to the radio"""
+        request_id = message.metadata.get('reply_to')
+        if request_id is None and message.content:
+            request_id = message.content.rsplit(' ', 1)[-1]  # plugin replies end with the request ID
+        if request_id in self.scheduled:
+            self.replied[request_id] = time.perf_counter()
+            self.reply_packets += 1
+
+    def complete(self) -> bool:
+        return len(self.delivered) == len(self.scheduled) and self.awaiting_reply.issubset(self.replied)
+
+
+class SimulatedMeshInterface:
+    """Stands in for a Meshtastic radio: feeds received packets to the router and records transmissions"""
+
+    def __init__(self, router: CoreMessageRouter, recorder: LoadRecorder, interface_id: str = 'sim0'):
+        self.router = router
+        self.recorder = recorder
+        self.interface_id = interface_id
+        self.packets_received = 0
+        self.packets_sent = 0
+        self.bytes_sent = 0
+
+    async def receive(self, message: Message):
+        """Deliver a packet as if it had arrived over the air"""
+        self.packets_received += 1
+        await self.router.process_message(message, self.interface_id)
+
+    async def send_message(self, message: Message) -> bool:
+        self.packets_sent += 1
+        self.bytes_sent += len(message.content.encode('utf-8'))
+        self.recorder.transmit(message)
+        return True
+
+
+class BenchmarkService:
+    """A service that records delivery and answers text messages"""
+
+    def __init__(self, name: str, recorder: LoadRecorder):
+        self.name = name
+        self.recorder = recorder
+        self.handled = 0
+
+    async def handle_message(self, message: Message) -> Optional[Message]:
+        self.recorder.deliver(message)
+        self.handled += 1
+        if message.message_type != MessageType.TEXT:
+            return None
+
+        priority = MessagePriority.NORMAL
+        if self.name == 'bbs' and message.content.startswith('bbslist'):
+            content = "\n".join(f"#{i} {self.name} bulletin from {message.sender_id} re: mesh net" for i in range(12))
+        elif self.name == 'weather':
+            content = "Forecast: partly cloudy, high 18C low 7C, wind NW 15 km/h, 20% rain overnight. " * 2
+        elif self.name == 'emergency':
+            content = f"SOS from {message.sender_id} received, responders notified"
+            priority = MessagePriority.EMERGENCY
+        else:
+            content = f"{self.name}: ok"
+
+        return Message(
+            sender_id="system",
+            recipient_id=message.sender_id,
+            channel=message.channel,
+            content=content,
+            message_type=MessageType.TEXT,
+            priority=priority,
+            metadata={'reply_to': message.id}
+        )
+
+
+class IdealRadioScheduler(AirtimeScheduler):
+    """Accounts airtime like the real scheduler but never waits for it"""
+
+    async def acquire(self, interface_id: str, payload_bytes: int) -> float:
+        _, airtime_seconds = self.reserve(interface_id, payload_bytes)
+        return airtime_seconds
+
+
+class LoadGenerator:
+    """Injects a profile's arrivals into the simulated interface on schedule"""
+
+    def __init__(self, profile: TrafficProfile, interface: SimulatedMeshInterface,
+                 recorder: LoadRecorder, rng: random.Random):
+        self.profile = profile
+        self.interface = interface
+        self.recorder = recorder
+        self.rng = rng
+        self.senders = [f"!{0xbe000000 + i:08x}" for i in range(max(1, profile.senders))]
+        self.framer = ChunkFramer(sent_cache_size=0)
+
+    def _build(self, kind_name: str) -> List[Message]:
+        """The packets for one arrival (several for chunked kinds)"""
+        kind = KINDS[kind_name]
+        sender = self.rng.choice(self.senders)
+        content = kind.build(self.rng, sender)
+        message = Message(
+            sender_id=sender,
+            channel=0,
+            content=content,
+            message_type=kind.message_type,
+            priority=kind.priority,
+            snr=round(self.rng.uniform(-15, 10), 1),
+            rssi=self.rng.randint(-120, -60),
+            metadata={'packet_id': self.rng.getrandbits(32)}
+        )
+        if not kind.chunked or self.framer.fits(content):
+            return [message]
+        return [
+            Message(id=f"{message.id}_chunk_{frame.index}", sender_id=sender, channel=0,
+                    content=frame.encode(), message_type=kind.message_type, priority=kind.priority,
+                    metadata={'packet_id': self.rng.getrandbits(32)})
+            for frame in self.framer.split(content)
+        ]
+
+    async def run(self) -> float:
+        """Inject every arrival; returns the perf_counter time the schedule started"""
+        arrivals = self.profile.schedule(self.rng)
+        start = time.perf_counter()
+        behind = 0
+        for offset, kind_name in arrivals:
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Running behind schedule; still let the pipeline make progress
+                behind += 1
+                if behind % 16 == 0:
+                    await asyncio.sleep(0)
+
+            packets = self._build(kind_name)
+            # Chunked requests are delivered as the reassembled last part
+            self.recorder.expect(
+                packets[-1].id, due,
+                sum(len(packet.content.encode('utf-8')) for packet in packets),
+                KINDS[kind_name].expects_reply
+            )
+            for packet in packets:
+                await self.interface.receive(packet)
+        return start
+
+
+# Benchmark runner
+
+def _latency_stats(values: List[float]) -> Dict[str, Any]:
+    """Nearest-rank percentiles, in milliseconds"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def percentile(percent: float) -> float:
+        index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'mean': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50': percentile(50),
+        'p90': percentile(90),
+        'p99': percentile(99),
+        'max': round(ordered[-1] * 1000, 3)
+    }
+
+
+class MeshLoadBenchmark:
+    """Runs traffic profiles against a fresh router and database per profile"""
+
+    def __init__(self, radio: str = 'ideal', seed: int = 1, warmup: float = 1.0,
+                 drain_timeout: float = 30.0, trace_memory: bool = False):
+        self.radio = radio
+        self.seed = seed
+        self.warmup = warmup
+        self.drain_timeout = drain_timeout
+        self.trace_memory = trace_memory
+        self.process = psutil.Process()
+        self.db_calls = get_metrics_registry().histogram(
+            'db_call_seconds', 'Database call latency by operation', ['operation']
+        )
+
+    def _build_config(self, config_dir: str) -> ConfigurationManager:
+        config = ConfigurationManager(config_dir)
+        config.load_config()
+        rate_limit = config.get('routing.rate_limit', {})
+        config.set('routing.rate_limit', {**(rate_limit if isinstance(rate_limit, dict) else {}), **NO_RATE_LIMIT})
+        return config
+
+    def _build_database(self, db_path: Path) -> DatabaseManager:
+        db = DatabaseManager(str(db_path))
+        # Created by the application at startup rather than by a migration
+        db.execute_update("""
+            CREATE TABLE IF NOT EXISTS message_routing_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id TEXT NOT NULL,
+                sender_id TEXT NOT NULL,
+                target_services TEXT,
+                successful_routes TEXT,
+                failed_routes TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        return db
+
+    def _build_radio(self, config: ConfigurationManager) -> AirtimeScheduler:
+        if self.radio == 'ideal':
+            return IdealRadioScheduler(modem_preset='SHORT_TURBO', duty_cycle_percent=100.0)
+        airtime_config = config.get('meshtastic.airtime', {})
+        if not isinstance(airtime_config, dict):
+            airtime_config = {}
+        return create_airtime_scheduler({**airtime_config, 'modem_preset': self.radio})
+
+    def _db_counts(self, router: CoreMessageRouter) -> Dict[str, int]:
+        counts = {
+            operation: self.db_calls.labels(operation=operation).histogram.count
+            for operation in ('query', 'update', 'many', 'batch')
+        }
+        writer = router.db_writer.get_stats() if router.db_writer else {}
+        counts['intents'] = writer.get('intents_committed', 0) + writer.get('intents_failed', 0)
+        counts['batches'] = writer.get('batches_committed', 0)
+        return counts
+
+    def _bytes_written(self, db_path: Path) -> Tuple[int, str]:
+        """Bytes written to storage so far, from process I/O counters when available"""
+        try:
+            return self.process.io_counters().write_bytes, 'io_counters'
+        except (AttributeError, psutil.Error):
+            total = 0
+            for suffix in ('', '-wal', '-journal'):
+                path = Path(f"{db_path}{suffix}")
+                if path.exists():
+                    total += path.stat().st_size
+            return total, 'file_size'
+
+    def _snapshot(self, router: CoreMessageRouter, db_path: Path) -> Dict[str, Any]:
+        gc.collect()
+        bytes_written, source = self._bytes_written(db_path)
+        return {
+            'rss': self.process.memory_info().rss,
+            'heap': tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+            'bytes_written': bytes_written,
+            'bytes_source': source,
+            'db': self._db_counts(router)
+        }
+
+    async def _drain(self, router: CoreMessageRouter, recorder: LoadRecorder):
+        """Wait for deliveries, replies and pending database writes"""
+        deadline = time.monotonic() + self.drain_timeout
+        while not recorder.complete() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        while router.db_writer and time.monotonic() < deadline:
+            stats = router.db_writer.get_stats()
+            if stats['intents_committed'] + stats['intents_failed'] >= stats['intents_submitted']:
+                break
+            await asyncio.sleep(0.01)
+
+    async def _start_router(self, tmp: str, recorder: LoadRecorder, interface_id: str = 'sim0'):
+        """A router on a fresh database with benchmark services and a simulated radio"""
+        config = self._build_config(tmp)
+        db_path = Path(tmp) / 'benchmark.db'
+        db = self._build_database(db_path)
+        airtime.airtime_scheduler = self._build_radio(config)
+        initialize_tracer(config.get('tracing', {}))
+
+        router = CoreMessageRouter(config, db)
+        interface = SimulatedMeshInterface(router, recorder, interface_id)
+        router.register_interface(interface.interface_id, interface)
+        for name in ('bot', 'weather', 'bbs', 'emergency'):
+            router.register_service(name, BenchmarkService(name, recorder))
+
+        async def ping(args, context):
+            recorder.deliver(context['message'])
+            return f"pong {context['message'].id}"
+
+        router.register_plugin_command('benchmark', 'ping', ping)
+        await router.start()
+        return config, db, db_path, router, interface
+
+    async def run_profile(self, profile: TrafficProfile) -> Dict[str, Any]:
+        """Run one profile and return its results"""
+        recorder = LoadRecorder()
+        with tempfile.TemporaryDirectory(prefix='zephyrgate-bench-') as tmp:
+            config, db, db_path, router, interface = await self._start_router(tmp, recorder)
+            try:
+                # Same seed per profile, so the traffic is identical between runs
+                rng = random.Random(f"{self.seed}:{profile.name}")
+                if self.warmup > 0:
+                    warmup = replace(profile.scaled(duration_scale=self.warmup / profile.duration),
+                                     count=min(profile.count or 200, 200))
+                    await LoadGenerator(warmup, interface, recorder, rng).run()
+                    await self._drain(router, recorder)
+                    recorder.reset()
+                    router.tracer = initialize_tracer(config.get('tracing', {}))
+
+                before = self._snapshot(router, db_path)
+                start = await LoadGenerator(profile, interface, recorder, rng).run()
+                await self._drain(router, recorder)
+                after = self._snapshot(router, db_path)
+            finally:
+                await router.stop()
+                db.close()
+
+        info = {'description': profile.description, 'offered_rate': profile.rate, 'duration': profile.duration}
+        return self._profile_results(info, recorder, start, before, after, router.tracer.stage_breakdown())
+
+    async def run_capture(self, path: str, speed: float = 1.0) -> Dict[str, Any]:
+        """
+        Replay a packet capture through ReplayInterface and the router.
+
+        Received packets take the same path as in the application: the
+        interface's packet handlers, then a routing task per message.
+        Latency is measured from when the interface hands a message over.
+        """
+        packets = list(read_capture(path))
+        span = packets[-1].offset if packets else 0.0
+        recorder = LoadRecorder()
+        with tempfile.TemporaryDirectory(prefix='zephyrgate-bench-') as tmp:
+            config, db, db_path, router, _ = await self._start_router(tmp, recorder, 'replay0')
+            node_registry.node_registry = NodeRegistry(db)
+            node_registry.node_registry.start()
+            routing = set()
+
+            def on_message(message: Message, interface_id: str):
+                recorder.expect(message.id, time.perf_counter(), len(message.content.encode('utf-8')),
+                                message.message_type == MessageType.TEXT)
+                task = asyncio.create_task(router.process_message(message, interface_id))
+                routing.add(task)
+                task.add_done_callback(routing.discard)
+
+            replay = ReplayInterface(
+                InterfaceConfig(id='replay0', type='replay', connection_string=str(path),
+                                metadata={'speed': speed}),
+                on_message
+            )
+            try:
+                before = self._snapshot(router, db_path)
+                start = time.perf_counter()
+                if not await replay._connect():
+                    raise RuntimeError(f"Cannot replay {path}")
+                replay.status = InterfaceStatus.CONNECTED
+                await replay._receive_messages()
+                await self._drain(router, recorder)
+                after = self._snapshot(router, db_path)
+            finally:
+                await router.stop()
+                node_registry.shutdown_node_registry()
+                db.close()
+
+        info = {
+            'description': f"Replay of {Path(path).name} ({len(packets)} packets) at "
+                           f"{'max' if not speed else f'{speed:g}x'} speed",
+            'offered_rate': round(len(packets) * speed / span, 2) if span and speed else 0.0,
+            'duration': round(span / speed, 3) if speed else 0.0
+        }
+        return self._profile_results(info, recorder, start, before, after, router.tracer.stage_breakdown())
+
+    def _profile_results(self, info: Dict[str, Any], recorder: LoadRecorder, start: float,
+                         before: Dict[str, Any], after: Dict[str, Any],
+                         stages: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        sent = len(recorder.scheduled)
+        delivered = len(recorder.delivered)
+        finished = max([*recorder.delivered.values(), *recorder.replied.values()], default=start)
+        elapsed = max(finished - start, 1e-9)
+        per_message = max(sent, 1)
+
+        db_before, db_after = before['db'], after['db']
+        delta = {key: db_after[key] - db_before[key] for key in db_after}
+        statements = delta['intents'] + delta['update'] + delta['many']
+        bytes_written = after['bytes_written'] - before['bytes_written']
+        rss_growth = after['rss'] - before['rss']
+
+        memory = {
+            'rss_start_mb': round(before['rss'] / 1048576, 2),
+            'rss_end_mb': round(after['rss'] / 1048576, 2),
+            'rss_growth_mb': round(rss_growth / 1048576, 3),
+            'rss_growth_kb_per_1k_messages': round(rss_growth / 1024 / per_message * 1000, 2)
+        }
+        if before['heap'] is not None:
+            heap_growth = after['heap'] - before['heap']
+            memory['heap_growth_kb'] = round(heap_growth / 1024, 2)
+            memory['heap_growth_kb_per_1k_messages'] = round(heap_growth / 1024 / per_message * 1000, 2)
+
+        return {
+            **info,
+            'sent': sent,
+            'delivered': delivered,
+            'lost': sent - delivered,
+            'replies_expected': len(recorder.awaiting_reply),
+            'replies': len(recorder.replied),
+            'reply_packets': recorder.reply_packets,
+            'elapsed_seconds': round(elapsed, 3),
+            'throughput': round(delivered / elapsed, 2),
+            'delivery_latency_ms': _latency_stats([
+                recorder.delivered[key] - recorder.scheduled[key] for key in recorder.delivered
+            ]),
+            'reply_latency_ms': _latency_stats([
+                recorder.replied[key] - recorder.scheduled[key] for key in recorder.replied
+            ]),
+            'memory': memory,
+            'database': {
+                'statements': statements,
+                'commits': delta['batches'] + delta['update'] + delta['many'],
+                'reads': delta['query'],
+                'statements_per_message': round(statements / per_message, 3),
+                'reads_per_message': round(delta['query'] / per_message, 3),
+                'payload_bytes': recorder.payload_bytes,
+                'bytes_written': bytes_written,
+                'bytes_source': after['bytes_source'],
+                'write_amplification': round(bytes_written / max(recorder.payload_bytes, 1), 2)
+            },
+            'stages_ms': {
+                name: {'count': stats['count'],
+                       'p50': round(stats['p50'] * 1000, 3), 'p99': round(stats['p99'] * 1000, 3)}
+                for name, stats in stages.items() if stats.get('count')
+            }
+        }
+
+    async def run(self, profiles: List[TrafficProfile], captures: Optional[List[str]] = None,
+                  speed: float = 1.0) -> Dict[str, Any]:
+        """Run profiles, then capture replays, and return the full results document"""
+        if self.trace_memory:
+            tracemalloc.start()
+        try:
+            results = {}
+            for profile in profiles:
+                results[profile.name] = await self.run_profile(profile)
+            for path in captures or []:
+                results[f"capture:{Path(path).name}"] = await self.run_capture(path, speed)
+        finally:
+            if self.trace_memory:
+                tracemalloc.stop()
+        return {
+            'schema': SCHEMA_VERSION,
+            'timestamp': datetime.utcnow().isoformat(),
+            'git': _git_info(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'settings': {'radio': self.radio, 'seed': self.seed, 'warmup': self.warmup,
+                         'trace_memory': self.trace_memory, 'capture_speed': speed},
+            'profiles': results
+        }
+
+
+def _git_info() -> Dict[str, Any]:
+    """Commit the results were produced from, if run from a git checkout"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+
+    try:
+        return {'commit': git('rev-parse', 'HEAD') or None,
+                'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except (OSError, subprocess.SubprocessError):
+        return {'commit': None, 'dirty': None}
+
+
+# Comparison
+
+# (metric path, higher is better, smallest absolute change worth reporting)
+COMPARED_METRICS = [
+    ('throughput', True, 0.5),
+    ('lost', False, 0),
+    ('delivery_latency_ms.p50', False, 1.0),
+    ('delivery_latency_ms.p99', False, 5.0),
+    ('reply_latency_ms.p50', False, 1.0),
+    ('reply_latency_ms.p99', False, 5.0),
+    ('memory.rss_growth_kb_per_1k_messages', False, 512.0),
+    ('memory.heap_growth_kb_per_1k_messages', False, 64.0),
+    ('database.statements_per_message', False, 0.05),
+    ('database.write_amplification', False, 0.5),
+]
+
+
+def _metric(results: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = results
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents profile by profile.
+
+    A metric regresses when it got worse by more than ``tolerance``
+    (relative) and by more than the metric's noise floor.
+    """
+    rows = []
+    for name, current_profile in current.get('profiles', {}).items():
+        baseline_profile = baseline.get('profiles', {}).get(name)
+        if baseline_profile is None:
+            continue
+        for path, higher_is_better, min_delta in COMPARED_METRICS:
+            old, new = _metric(baseline_profile, path), _metric(current_profile, path)
+            if old is None or new is None:
+                continue
+            delta = new - old
+            worse = delta < 0 if higher_is_better else delta > 0
+            rows.append({
+                'profile': name,
+                'metric': path,
+                'baseline': old,
+                'current': new,
+                'change': (delta / abs(old)) if old else None,
+                'regression': worse and abs(delta) > min_delta and abs(delta) > tolerance * abs(old)
+            })
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'profile':<16} {'metric':<40} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for row in rows:
+        change = f"{row['change'] * 100:+.1f}%" if row['change'] is not None else "n/a"
+        flag = "  REGRESSION" if row['regression'] else ""
+        lines.append(f"{row['profile']:<16} {row['metric']:<40} {row['baseline']:>12} "
+                     f"{row['current']:>12} {change:>8}{flag}")
+    return "\n".join(lines)
+
+
+def format_summary(results: Dict[str, Any]) -> str:
+    lines = []
+    for name, profile in results['profiles'].items():
+        delivery, reply = profile['delivery_latency_ms'], profile['reply_latency_ms']
+        lines.append(
+            f"{name:<16} {profile['delivered']}/{profile['sent']} delivered, "
+            f"{profile['throughput']:.1f} msg/s, "
+            f"delivery p50/p99 {delivery.get('p50', 0):.1f}/{delivery.get('p99', 0):.1f} ms, "
+            f"reply p50/p99 {reply.get('p50', 0):.1f}/{reply.get('p99', 0):.1f} ms, "
+            f"RSS +{profile['memory']['rss_growth_mb']:.1f} MB, "
+            f"{profile['database']['statements_per_message']:.2f} stmts/msg, "
+            f"write amp {profile['database']['write_amplification']:.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ZephyrGate synthetic mesh load benchmark")
+    parser.add_argument('--profile', action='append', choices=sorted(PROFILES),
+                        help="Profile to run (repeatable; default: all)")
+    parser.add_argument('--list', action='store_true', help="List profiles and exit")
+    parser.add_argument('--capture', action='append', help="Replay a packet capture (repeatable)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Capture replay speed: 1 = recorded timing, N = N times faster, 0 = unpaced")
+    parser.add_argument('--output', help="Write results JSON to this file")
+    parser.add_argument('--compare', help="Compare against a previous results JSON; exit 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Relative change allowed (default 0.1)")
+    parser.add_argument('--rate-scale', type=float, default=1.0, help="Multiply profile arrival rates")
+    parser.add_argument('--duration-scale', type=float, default=1.0, help="Multiply profile durations")
+    parser.add_argument('--radio', default='ideal', choices=['ideal', *sorted(MODEM_PRESETS)],
+                        help="Radio model: ideal (no airtime waits) or a modem preset")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--warmup', type=float, default=1.0, help="Seconds of unmeasured warmup traffic")
+    parser.add_argument('--tracemalloc', action='store_true', help="Also measure Python heap growth")
+    parser.add_argument('--verbose', action='store_true', help="Show router logging")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for profile in PROFILES.values():
+            print(f"{profile.name:<16} {profile.rate:>6.1f} msg/s  {profile.duration:>5.1f}s  {profile.description}")
+        return 0
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    # Captures alone replace the synthetic profiles unless profiles are also named
+    names = args.profile or ([] if args.capture else list(PROFILES))
+    profiles = [PROFILES[name].scaled(args.rate_scale, args.duration_scale) for name in names]
+    benchmark = MeshLoadBenchmark(radio=args.radio, seed=args.seed, warmup=args.warmup,
+                                  trace_memory=args.tracemalloc)
+    results = asyncio.run(benchmark.run(profiles, args.capture, args.speed))
+    print(format_summary(results))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        rows = compare_results(baseline, results, args.tolerance)
+        print(format_comparison(rows))
+        if any(row['regression'] for row in rows):
+            print("Performance regressions detected")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Statistics Rollup Benchmark for ZephyrGate
+
+Fills a fresh database with the seeded synthetic message history used by
+the history search benchmark, builds the statistics rollups from it with
+the backfill tool and times stats reads (network summaries over the last
+hour, day and all of history, and 24 hour leaderboards) against the rollups
+and against the equivalent aggregate queries over raw message history. It
+also reports how fast packets are counted in memory and flushed.
+
+    python -m tests.benchmarks.stats_rollup
+    python -m tests.benchmarks.stats_rollup --sizes 2000000 --no-baseline --output rollup.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add src to path for imports
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.database import DatabaseManager
+from core.stats_rollup import StatsRollup, backfill_rollups
+
+from tests.benchmarks.history_search import INTERVAL, START, load_history, sender_id, time_call
+
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# The same statistics computed from raw rows: (label, query, window)
+RAW_QUERIES: Tuple[Tuple[str, str, Any], ...] = (
+    ('last_hour', "SELECT COUNT(*), COUNT(DISTINCT sender_id), AVG(snr) FROM message_history "
+                  "WHERE timestamp >= ?", HOUR),
+    ('last_day', "SELECT COUNT(*), COUNT(DISTINCT sender_id), AVG(snr) FROM message_history "
+                 "WHERE timestamp >= ?", DAY),
+    ('all_time', "SELECT COUNT(*), COUNT(DISTINCT sender_id), AVG(snr) FROM message_history "
+                 "WHERE timestamp >= ?", None),
+    ('top_messages', "SELECT sender_id, COUNT(*) AS value FROM message_history WHERE timestamp >= ? "
+                     "GROUP BY sender_id ORDER BY value DESC LIMIT 10", DAY),
+    ('top_snr', "SELECT sender_id, AVG(snr) AS value FROM message_history WHERE timestamp >= ? "
+                "GROUP BY sender_id ORDER BY value DESC LIMIT 10", DAY),
+)
+
+
+def rollup_reads(rollup: StatsRollup, now) -> Dict[str, Callable[[], Any]]:
+    """Rollup reads matching RAW_QUERIES"""
+    return {
+        'last_hour': lambda: rollup.summary(HOUR, now=now),
+        'last_day': lambda: rollup.summary(DAY, now=now),
+        'all_time': lambda: rollup.summary(now=now),
+        'top_messages': lambda: rollup.top_nodes('messages', DAY, now=now),
+        'top_snr': lambda: rollup.top_nodes('snr', DAY, now=now),
+    }
+
+
+def record_rate(rollup: StatsRollup, packets: int) -> Dict[str, float]:
+    """Count ``packets`` packets from 2000 nodes in memory, then flush them"""
+    started = time.perf_counter()
+    for i in range(packets):
+        rollup.record_packet(sender_id(i % 2000), snr=-5.0, rssi=-100.0, battery_level=80)
+    recorded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows = rollup.flush()
+    return {
+        'packets_per_second': round(packets / recorded),
+        'flush_rows': rows,
+        'flush_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def run_size(size: int, seed: int, repeat: int, with_baseline: bool) -> Dict[str, Any]:
+    """Benchmark one history size in its own temporary database"""
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(str(Path(directory) / "stats_rollup.db"))
+        try:
+            result: Dict[str, Any] = {
+                'size': size,
+                'load_seconds': round(load_history(db, size, seed), 3),
+                'queries': {},
+            }
+
+            now = START + INTERVAL * size
+            started = time.perf_counter()
+            result['backfill_rows'] = backfill_rollups(db, now=now)
+            result['backfill_seconds'] = round(time.perf_counter() - started, 3)
+
+            rollup = StatsRollup(db)
+            for label, call in rollup_reads(rollup, now).items():
+                result['queries'][label] = {'rollup': time_call(call, repeat)}
+
+            if with_baseline:
+                for label, query, window in RAW_QUERIES:
+                    since = (now - window).isoformat() if window else ''
+                    result['queries'][label]['raw'] = time_call(
+                        lambda: db.execute_query(query, (since,)), repeat
+                    )
+
+            result['recording'] = record_rate(rollup, 100000)
+            return result
+        finally:
+            db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark statistics rollup reads")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000],
+                        help="History sizes (messages) to test")
+    parser.add_argument('--repeat', type=int, default=10, help="Runs of each read per size")
+    parser.add_argument('--seed', type=int, default=1, help="Seed for the synthetic history")
+    parser.add_argument('--no-baseline', action='store_true', help="Skip the raw history queries")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        result = run_size(size, args.seed, args.repeat, not args.no_baseline)
+        results.append(result)
+        print(f"{size:>9} messages (loaded in {result['load_seconds']:.1f}s, "
+              f"backfilled {result['backfill_rows']} rows in {result['backfill_seconds']:.1f}s)")
+        for label, timings in result['queries'].items():
+            rollup = timings['rollup']
+            line = f"  {label:<14} rollup p50 {rollup['p50_ms']:>8.3f}ms p99 {rollup['p99_ms']:>8.3f}ms"
+            if 'raw' in timings:
+                line += f" | raw p50 {timings['raw']['p50_ms']:>9.3f}ms"
+            print(line)
+        recording = result['recording']
+        print(f"  recording {recording['packets_per_second']} packets/s, "
+              f"flush of {recording['flush_rows']} rows {recording['flush_ms']:.1f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'seed': args.seed, 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,17 +18,30 @@ from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
 from concurrent.futures import ThreadPoolExecutor
 import threading
+import re
+import heapq
+import random
 
 # Add src to path for imports
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from core.message_router import CoreMessageRouter
+from core.message_router import CoreMessageRouter, RouteRule
+from core.pattern_matcher import PatternMatcher
+from core.queue_manager import QueueManager
+from core.rate_limiter import create_rate_limiter
+from core.airtime import AirtimeScheduler, MODEM_PRESETS, estimate_airtime
+from core import airtime as airtime_module
+from core.loop_monitor import LoopMonitor
+from core.metrics import MetricsRegistry
+from core.tracing import Tracer
 from core.health_monitor import HealthMonitor
 from core.service_manager import ServiceManager
 from core.plugin_manager import PluginManager
 from core.config import ConfigurationManager
+from core.packet_capture import PacketCaptureWriter
 from models.message import Message, MessageType, MessagePriority
+from tests.benchmarks.mesh_load import MeshLoadBenchmark, PROFILES, compare_results
 
 
 class TestMessageProcessingPerformance:
@@ -567,6 +580,544 @@ class TestSystemStabilityUnderLoad:
             await router.stop()
 
 
+class TestPatternMatchingPerformance:
+    """Compare per-message routing cost of per-rule regexes and the compiled matcher"""
+    
+    def _build_rules(self, rule_count):
+        """Generate keyword routing rules similar to plugin command routes"""
+        rules = []
+        for i in range(rule_count):
+            if i % 3 == 0:
+                pattern = rf'^(cmd{i}|alias{i})\b'
+            elif i % 3 == 1:
+                pattern = rf'\b(keyword{i}|kw{i})\b'
+            else:
+                pattern = rf'^plugin{i}/'
+            rules.append(RouteRule(pattern=pattern, service=f'service{i % 10}', priority=i % 100))
+        rules.sort(key=lambda r: r.priority, reverse=True)
+        return rules
+    
+    def _legacy_match(self, rules, message):
+        """Previous behaviour: re.search per rule, then sort matches by priority"""
+        matched = [r for r in rules if not r.pattern or re.search(r.pattern, message.content, re.IGNORECASE)]
+        matched.sort(key=lambda r: r.priority, reverse=True)
+        return [r.service for r in matched]
+    
+    def test_matching_cost_by_rule_count(self):
+        """Compiled matching stays flat as the rule count grows"""
+        messages = [
+            Message(sender_id="!12345678", content=content, message_type=MessageType.TEXT)
+            for content in ["cmd3 status", "hello mesh", "what is keyword4 about", "plugin2/run", "ping"]
+        ]
+        results = {}
+        
+        for rule_count in (10, 100, 1000):
+            iterations = max(5, 2000 // rule_count)
+            rules = self._build_rules(rule_count)
+            matcher = PatternMatcher()
+            for index, rule in enumerate(rules):
+                matcher.add(rule.pattern, index)
+            matcher.compile()
+            
+            for message in messages:
+                compiled = [rules[i].service for i in sorted(matcher.match(message.content))]
+                assert compiled == self._legacy_match(rules, message)
+            
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for message in messages:
+                    self._legacy_match(rules, message)
+            legacy_us = (time.perf_counter() - start) / (iterations * len(messages)) * 1e6
+            
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for message in messages:
+                    sorted(matcher.match(message.content))
+            compiled_us = (time.perf_counter() - start) / (iterations * len(messages)) * 1e6
+            
+            results[rule_count] = (legacy_us, compiled_us)
+            print(f"{rule_count:5d} rules: legacy {legacy_us:8.1f}us/msg, compiled {compiled_us:6.1f}us/msg")
+        
+        legacy_1000, compiled_1000 = results[1000]
+        assert compiled_1000 < legacy_1000 / 5, "Compiled matcher should be much faster at 1000 rules"
+        assert compiled_1000 < results[10][1] * 5, "Compiled matching cost should not grow with rule count"
+
+
+class TestQueueWakeupPerformance:
+    """Measure idle cost and enqueue-to-send latency of the queue manager"""
+    
+    @pytest.mark.asyncio
+    async def test_idle_cpu_usage(self):
+        """An idle queue manager makes no wakeups and uses negligible CPU"""
+        manager = QueueManager()
+        await manager.start()
+        try:
+            await asyncio.sleep(0.1)
+            cpu_start = time.process_time()
+            await asyncio.sleep(2.0)
+            cpu_used = time.process_time() - cpu_start
+            
+            wakeups = manager.get_stats()['wakeups']
+            print(f"Idle for 2s: {sum(wakeups.values())} wakeups, {cpu_used*1000:.2f}ms CPU")
+            
+            assert sum(wakeups.values()) == 0
+            assert cpu_used < 0.05
+        finally:
+            await manager.stop()
+    
+    @pytest.mark.asyncio
+    async def test_enqueue_to_send_latency(self):
+        """Messages are handed to the outbound processor as soon as the rate limiter permits"""
+        manager = QueueManager()
+        latencies = []
+        enqueued_at = {}
+        
+        async def processor(message):
+            latencies.append(time.perf_counter() - enqueued_at[message.id])
+        
+        manager.set_outbound_processor(processor)
+        await manager.start()
+        try:
+            for i in range(10):
+                message = Message(content=f"message {i}", sender_id=f"!{i:08x}")
+                enqueued_at[message.id] = time.perf_counter()
+                await manager.queue_outbound_message(message)
+                await asyncio.sleep(0.02)
+            
+            await asyncio.sleep(0.1)
+            
+            print(f"Enqueue-to-send latency: median {statistics.median(latencies)*1000:.2f}ms, "
+                  f"max {max(latencies)*1000:.2f}ms")
+            
+            assert len(latencies) == 10
+            assert statistics.median(latencies) < 0.01
+        finally:
+            await manager.stop()
+
+
+class TestRateLimiterPerformance:
+    """Rate limiter cost and memory with many distinct senders"""
+    
+    def test_ten_thousand_senders(self):
+        """Per-check cost stays flat and sender state stays bounded at 10k senders"""
+        sender_count = 10000
+        senders = [f"!{i:08x}" for i in range(sender_count)]
+        results = {}
+        
+        for max_senders in (sender_count, 1000):
+            limiter = create_rate_limiter({'global': False, 'max_senders': max_senders})
+            
+            start = time.perf_counter()
+            for _ in range(3):
+                for sender in senders:
+                    limiter.try_acquire(sender=sender, channel=0)
+            elapsed = time.perf_counter() - start
+            
+            per_check_us = elapsed / (3 * sender_count) * 1e6
+            stats = limiter.get_stats()
+            results[max_senders] = per_check_us
+            print(f"max_senders={max_senders}: {per_check_us:.2f}us/check, "
+                  f"{stats['active_senders']} senders held, {stats['sender_evictions']} evicted")
+            
+            assert stats['active_senders'] <= max_senders
+        
+        assert results[sender_count] < 50, "Rate limit check should take microseconds"
+
+
+class TestAirtimeSchedulerPerformance:
+    """Simulated airtime: fixed inter-chunk delays vs airtime-aware pacing"""
+    
+    DURATION = 7200  # seconds of simulated traffic
+    WINDOW = 600  # duty cycle window
+    DUTY_CYCLE = 10  # percent
+    
+    def _workload(self):
+        """Short one-chunk replies and long four-chunk responses at random times"""
+        rng = random.Random(7)
+        messages = []
+        for mean_interval, chunks in ((60, [40]), (600, [200] * 4)):
+            t = rng.expovariate(1 / mean_interval)
+            while t < self.DURATION:
+                messages.append((t, chunks))
+                t += rng.expovariate(1 / mean_interval)
+        return sorted(messages)
+    
+    def _simulate(self, messages, preset, strategy, utilization=0.0):
+        """Discrete-event run; the radio transmits handed-off packets in FIFO order"""
+        modem = MODEM_PRESETS[preset]
+        scheduler = AirtimeScheduler(
+            modem_preset=preset, duty_cycle_percent=self.DUTY_CYCLE, window_seconds=self.WINDOW,
+            utilization_max_age=float('inf'), clock=lambda: 0.0
+        )
+        scheduler.report_channel_utilization('radio', utilization)
+        
+        events = [(t, i, 0) for i, (t, _) in enumerate(messages)]
+        heapq.heapify(events)
+        radio_free = 0.0
+        transmissions = []
+        first_latency, completion = {}, {}
+        
+        while events:
+            t, i, chunk = heapq.heappop(events)
+            size = messages[i][1][chunk]
+            if strategy == 'fixed':
+                handoff, next_chunk = t, t + 2.0  # previous send_message behaviour
+            else:
+                handoff, _ = scheduler.reserve('radio', size, now=t)
+                next_chunk = handoff
+            
+            airtime = estimate_airtime(size, modem)
+            start = max(handoff, radio_free)
+            radio_free = start + airtime
+            transmissions.append((start, airtime))
+            
+            if chunk == 0:
+                first_latency[i] = start - messages[i][0]
+            completion[i] = start + airtime - messages[i][0]
+            if chunk + 1 < len(messages[i][1]):
+                heapq.heappush(events, (next_chunk, i, chunk + 1))
+        
+        transmissions.sort()
+        peak, used, oldest = 0.0, 0.0, 0
+        for start, airtime in transmissions:
+            used += airtime
+            while transmissions[oldest][0] + self.WINDOW <= start:
+                used -= transmissions[oldest][1]
+                oldest += 1
+            peak = max(peak, used / self.WINDOW * 100)
+        
+        # Back-to-back: idle time after a packet shorter than a quarter of its airtime,
+        # too little for neighbours to rebroadcast it
+        pairs = zip(transmissions, transmissions[1:])
+        gaps = [(nxt[0] - sum(prev)) / prev[1] for prev, nxt in pairs]
+        short = sorted(first_latency[i] for i, m in enumerate(messages) if len(m[1]) == 1)
+        long_completion = [completion[i] for i, m in enumerate(messages) if len(m[1]) > 1]
+        return {
+            'short_p95': short[int(len(short) * 0.95)],
+            'long_mean': statistics.mean(long_completion),
+            'peak_duty': peak,
+            'back_to_back': sum(1 for g in gaps if g < 0.25) / len(gaps) * 100
+        }
+    
+    def test_fixed_delay_vs_airtime_pacing(self):
+        """Airtime pacing speeds up fast presets, leaves gaps on slow ones and respects the duty cycle"""
+        messages = self._workload()
+        results = {}
+        
+        for preset in ('SHORT_FAST', 'LONG_FAST', 'LONG_MODERATE'):
+            for strategy, utilization in (('fixed', 0), ('airtime', 0), ('airtime', 60)):
+                r = self._simulate(messages, preset, strategy, utilization)
+                results[(preset, strategy, utilization)] = r
+                print(f"{preset:13} {strategy:7} util={utilization:2}%: "
+                      f"short p95 {r['short_p95']:7.1f}s, long {r['long_mean']:7.1f}s, "
+                      f"peak duty {r['peak_duty']:5.1f}%, back-to-back {r['back_to_back']:4.1f}%")
+        
+        # Fast presets no longer wait 2s between sub-second chunks
+        assert results[('SHORT_FAST', 'airtime', 0)]['long_mean'] < results[('SHORT_FAST', 'fixed', 0)]['long_mean'] / 3
+        
+        # Chunks leave the channel free for rebroadcasts instead of going out back-to-back
+        assert results[('LONG_FAST', 'airtime', 0)]['back_to_back'] < results[('LONG_FAST', 'fixed', 0)]['back_to_back']
+        
+        # A busy channel widens the gaps
+        assert results[('LONG_FAST', 'airtime', 60)]['long_mean'] > results[('LONG_FAST', 'airtime', 0)]['long_mean']
+        
+        # The rolling duty cycle is never exceeded, while fixed delays exceed it on slow presets
+        for (preset, strategy, _), r in results.items():
+            if strategy == 'airtime':
+                assert r['peak_duty'] <= self.DUTY_CYCLE + 1e-6
+        assert results[('LONG_MODERATE', 'fixed', 0)]['peak_duty'] > self.DUTY_CYCLE
+
+
+class TestDurableQueuePerformance:
+    """Enqueue throughput and restore time of the persistent outbound queue"""
+    
+    NO_RATE_LIMIT = {'global': False, 'channel': False, 'sender': False, 'tiers': {'emergency': False}}
+    
+    @pytest.mark.asyncio
+    async def test_enqueue_throughput_and_restore(self, tmp_path):
+        """Group commit sustains hundreds of durable enqueues per second; restore is fast"""
+        path = str(tmp_path / "queue.db")
+        manager = QueueManager(max_queue_size=100000, rate_limit_config=self.NO_RATE_LIMIT, persistence_path=path)
+        
+        async def blocked(message):
+            await asyncio.Event().wait()
+        
+        manager.set_outbound_processor(blocked)
+        await manager.start()
+        
+        start = time.perf_counter()
+        for i in range(200):
+            await manager.queue_outbound_message(Message(content=f"sequential {i}"))
+        sequential_rate = 200 / (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            manager.queue_outbound_message(Message(content=f"concurrent {i}")) for i in range(5000)
+        ))
+        concurrent_rate = 5000 / (time.perf_counter() - start)
+        
+        stats = manager.get_stats()['persistence']
+        await manager.stop()
+        
+        restarted = QueueManager(max_queue_size=100000, rate_limit_config=self.NO_RATE_LIMIT,
+                                 persistence_path=path)
+        restarted.set_outbound_processor(blocked)
+        start = time.perf_counter()
+        await restarted.start()
+        restore_time = time.perf_counter() - start
+        restored = len(restarted.outbound_queue)
+        await restarted.stop()
+        
+        print(f"Durable enqueue: {sequential_rate:.0f}/s sequential, {concurrent_rate:.0f}/s concurrent "
+              f"(average batch {stats['average_batch']:.1f}, commit {stats['average_commit_ms']:.2f}ms)")
+        print(f"Restored {restored} messages in {restore_time*1000:.1f}ms")
+        
+        assert sequential_rate > 200
+        assert concurrent_rate > 1000
+        assert restored >= 5199  # one message may be in flight
+        assert restore_time < 2.0
+
+
+class TestMetricsPerformance:
+    """Recording and percentile cost of log-bucket histograms vs raw sample scans"""
+    
+    def test_histogram_recording_and_percentiles(self):
+        """Recording is O(1) in fixed memory; percentile queries do not depend on sample count"""
+        registry = MetricsRegistry(namespace='bench')
+        series = registry.histogram('stage_seconds', 'Benchmark latency', ['stage']).labels(stage='dispatch')
+        rng = random.Random(11)
+        samples = [rng.lognormvariate(-5, 1.2) for _ in range(200000)]
+        memory = series.histogram.memory_bytes
+        
+        start = time.perf_counter()
+        for value in samples:
+            series.observe(value)
+        record_ns = (time.perf_counter() - start) / len(samples) * 1e9
+        
+        start = time.perf_counter()
+        for _ in range(100):
+            series.percentile(99)
+        histogram_query_us = (time.perf_counter() - start) / 100 * 1e6
+        
+        start = time.perf_counter()
+        for _ in range(5):
+            ordered = sorted(samples)
+            ordered[int(len(ordered) * 0.99)]
+        scan_query_us = (time.perf_counter() - start) / 5 * 1e6
+        
+        exact = sorted(samples)[int(len(samples) * 0.99)]
+        estimate = series.percentile(99)
+        print(f"Histogram: {record_ns:.0f}ns/record, p99 query {histogram_query_us:.0f}us, "
+              f"{memory} bytes for {len(samples)} samples")
+        print(f"Raw samples: p99 query {scan_query_us:.0f}us; estimate error "
+              f"{abs(estimate - exact) / exact * 100:.2f}%")
+        
+        assert series.histogram.memory_bytes == memory
+        assert record_ns < 20000
+        assert histogram_query_us < scan_query_us
+        assert abs(estimate - exact) / exact < 0.02
+    
+    def test_render_many_series(self):
+        """Exposition of a realistic registry stays in the millisecond range"""
+        registry = MetricsRegistry(namespace='bench')
+        latency = registry.histogram('service_handler_seconds', 'Handler latency', ['service'])
+        counter = registry.counter('interface_messages_total', 'Messages', ['interface', 'direction'])
+        for i in range(50):
+            for value in (0.001, 0.01, 0.1):
+                latency.labels(service=f"service{i}").observe(value)
+            counter.labels(f"radio{i % 4}", 'rx').inc()
+        
+        start = time.perf_counter()
+        text = registry.render()
+        elapsed = time.perf_counter() - start
+        
+        print(f"Rendered {len(text.splitlines())} lines in {elapsed*1000:.1f}ms")
+        assert elapsed < 0.5
+
+
+class TestLoopMonitorPerformance:
+    """Overhead of leaving the event loop monitor on"""
+    
+    @pytest.mark.asyncio
+    async def test_monitor_overhead(self):
+        """A callback-heavy workload runs at nearly the same rate with the monitor running"""
+        async def workload():
+            start = time.perf_counter()
+            for _ in range(20):
+                await asyncio.gather(*(asyncio.sleep(0) for _ in range(2000)))
+            return time.perf_counter() - start
+        
+        await workload()  # warm up
+        baseline = min([await workload() for _ in range(3)])
+        
+        monitor = LoopMonitor(interval=0.25, slow_callback_threshold=0.1)
+        await monitor.start()
+        monitored = min([await workload() for _ in range(3)])
+        await monitor.stop()
+        
+        overhead = (monitored - baseline) / baseline * 100
+        print(f"Workload: {baseline * 1000:.1f}ms without monitor, {monitored * 1000:.1f}ms with "
+              f"({overhead:+.1f}%), {monitor.stats.ticks} ticks, "
+              f"{monitor.stats.watchdog_checks} watchdog checks")
+        
+        assert overhead < 10
+        assert monitor.stats.blocked == 0
+
+
+class TestTracingPerformance:
+    """Cost of wrapping pipeline stages in trace spans"""
+    
+    def test_span_overhead(self):
+        """Spans add little over the stage metric alone, traced or not"""
+        metric = MetricsRegistry(namespace='bench').histogram('stage_seconds', 'Stage').labels()
+        tracer = Tracer(max_spans=1000000)
+        iterations = 100000
+        
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with metric.time():
+                pass
+        metric_ns = (time.perf_counter() - start) / iterations * 1e9
+        
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with tracer.span('classify', metric):
+                pass
+        untraced_ns = (time.perf_counter() - start) / iterations * 1e9
+        
+        with tracer.activate(tracer.start_trace(Message(content="bench"))) as trace:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                with tracer.span('classify', metric):
+                    pass
+            traced_ns = (time.perf_counter() - start) / iterations * 1e9
+        
+        print(f"Stage timing: metric only {metric_ns:.0f}ns, with span untraced {untraced_ns:.0f}ns, "
+              f"traced {traced_ns:.0f}ns")
+        
+        assert len(trace.spans) == iterations
+        assert untraced_ns - metric_ns < 2000
+        assert traced_ns < 20000
+
+
+class TestMeshLoadBenchmark:
+    """Smoke test the synthetic mesh load benchmark"""
+    
+    @pytest.mark.asyncio
+    async def test_profiles_run_end_to_end(self):
+        """Every profile delivers and answers its traffic through the real router"""
+        benchmark = MeshLoadBenchmark(warmup=0.2)
+        results = {'profiles': {}}
+        for profile in PROFILES.values():
+            results['profiles'][profile.name] = await benchmark.run_profile(
+                profile.scaled(duration_scale=0.15)
+            )
+        
+        for name, profile in results['profiles'].items():
+            print(f"{name}: {profile['sent']} sent, {profile['throughput']} msg/s, "
+                  f"delivery p99 {profile['delivery_latency_ms']['p99']}ms, "
+                  f"{profile['database']['statements_per_message']} stmts/msg, "
+                  f"write amplification {profile['database']['write_amplification']}x")
+            assert profile['sent'] > 0
+            assert profile['lost'] == 0
+            assert profile['replies'] == profile['replies_expected']
+            assert profile['database']['statements_per_message'] > 0
+        
+        assert results['profiles']['bbs_sync']['reply_packets'] > results['profiles']['bbs_sync']['replies']
+        assert not any(row['regression'] for row in compare_results(results, results))
+    
+    @pytest.mark.asyncio
+    async def test_capture_replay(self, tmp_path):
+        """A recorded capture replays through the interface handlers and router"""
+        path = tmp_path / "capture.jsonl.gz"
+        writer = PacketCaptureWriter(str(path), 'radio1')
+        writer.open()
+        for i in range(120):
+            sender = f"!{i % 12:08x}"
+            writer.record('meshtastic.receive.text', {
+                'id': 0x10000 + i, 'fromId': sender, 'toId': '^all', 'channel': 0,
+                'decoded': {'text': ('ping', 'wx', 'hello mesh')[i % 3]}
+            })
+            writer.record('meshtastic.receive.telemetry', {
+                'fromId': sender, 'decoded': {'telemetry': {'deviceMetrics': {'batteryLevel': 90}}}
+            })
+        writer.close()
+        
+        start = time.time()
+        results = await MeshLoadBenchmark().run_capture(str(path), speed=0)
+        elapsed = time.time() - start
+        
+        print(f"Replayed 240 packets in {elapsed:.2f}s: {results['throughput']} msg/s, "
+              f"delivery p99 {results['delivery_latency_ms']['p99']}ms")
+        assert results['sent'] == 120
+        assert results['lost'] == 0
+        assert results['replies'] == 120
+    
+    def test_regressions_detected(self):
+        """Latency and write amplification increases beyond tolerance are flagged"""
+        baseline = {'profiles': {'command_heavy': {
+            'throughput': 25.0, 'delivery_latency_ms': {'p50': 2.0, 'p99': 5.0},
+            'database': {'write_amplification': 100.0}
+        }}}
+        current = {'profiles': {'command_heavy': {
+            'throughput': 24.9, 'delivery_latency_ms': {'p50': 2.5, 'p99': 20.0},
+            'database': {'write_amplification': 180.0}
+        }}}
+        
+        regressions = {row['metric'] for row in compare_results(baseline, current) if row['regression']}
+        
+        assert regressions == {'delivery_latency_ms.p99', 'database.write_amplification'}
+
+
+class TestOutboundBalancingPerformance:
+    """Outbound throughput with two radios: mirrored on both vs balanced across them"""
+    
+    MESSAGES = 40
+    
+    async def _send_all(self, policy):
+        config = Mock(spec=ConfigurationManager)
+        values = {
+            'routing.outbound': {'policy': policy},
+            'routing.rate_limit': {'global': False, 'channel': False, 'sender': False,
+                                   'tiers': {'emergency': False}},
+            'meshtastic.max_message_size': 228,
+            'database.async_writes': False
+        }
+        config.get.side_effect = lambda key, default=None: values.get(key, default)
+        router = CoreMessageRouter(config, Mock())
+        radios = {}
+        for iface_id in ('radio1', 'radio2'):
+            radios[iface_id] = Mock(spec=['send_message'])
+            radios[iface_id].send_message = AsyncMock(return_value=True)
+            router.register_interface(iface_id, radios[iface_id])
+        
+        # Fresh pacing state per run; 24ms SHORT_TURBO slots keep the test short
+        airtime_module.initialize_airtime_scheduler({'modem_preset': 'SHORT_TURBO', 'duty_cycle_percent': 100})
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            router.send_message(Message(content=f"reply {i}", sender_id="!a1b2c3d4", recipient_id=f"!{i:08x}"))
+            for i in range(self.MESSAGES)
+        ))
+        elapsed = time.perf_counter() - start
+        packets = sum(radio.send_message.await_count for radio in radios.values())
+        return self.MESSAGES / elapsed, packets
+    
+    @pytest.mark.asyncio
+    async def test_balanced_policy_doubles_throughput(self):
+        previous = airtime_module.airtime_scheduler
+        try:
+            mirrored, mirrored_packets = await self._send_all('all')
+            balanced, balanced_packets = await self._send_all('least_loaded')
+        finally:
+            airtime_module.airtime_scheduler = previous
+        
+        print(f"Two radios: mirrored {mirrored:.1f} msg/s ({mirrored_packets} packets), "
+              f"least_loaded {balanced:.1f} msg/s ({balanced_packets} packets)")
+        assert mirrored_packets == 2 * self.MESSAGES
+        assert balanced_packets == self.MESSAGES
+        assert balanced > 1.7 * mirrored, f"Balanced throughput {balanced:.1f} vs mirrored {mirrored:.1f} msg/s"
+
+
 if __name__ == "__main__":
     # Run performance tests
     pytest.main([__file__, "-v", "-s"])  # -s to see print output
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Unit tests for airtime-aware transmission scheduling
+
+Tests the LoRa time-on-air estimate, rolling duty-cycle budget and
+utilization-based pacing of the airtime scheduler.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.airtime import (
+    LoRaModemConfig, MODEM_PRESETS, DutyCycleBudget, AirtimeScheduler,
+    estimate_airtime, modem_from_lora_config, create_airtime_scheduler
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestAirtimeEstimate:
+    """Test time-on-air calculation"""
+
+    @pytest.mark.parametrize("modem,payload,expected", [
+        (LoRaModemConfig(7, 125_000, 5, preamble_symbols=8), 10, 0.041216),
+        (LoRaModemConfig(12, 125_000, 5, preamble_symbols=8), 51, 2.465792),
+    ])
+    def test_matches_reference_values(self, modem, payload, expected):
+        assert estimate_airtime(payload, modem, include_overhead=False) == pytest.approx(expected, abs=1e-6)
+
+    def test_low_data_rate_optimize(self):
+        assert MODEM_PRESETS['LONG_SLOW'].low_data_rate_optimize
+        assert not MODEM_PRESETS['LONG_FAST'].low_data_rate_optimize
+
+    def test_airtime_grows_with_payload_and_range(self):
+        long_fast = MODEM_PRESETS['LONG_FAST']
+
+        assert estimate_airtime(10, long_fast) < estimate_airtime(200, long_fast)
+        assert estimate_airtime(200, MODEM_PRESETS['SHORT_FAST']) < estimate_airtime(200, long_fast)
+        assert 1.5 < estimate_airtime(200, long_fast) < 2.5
+
+    def test_modem_from_radio_config(self):
+        preset = SimpleNamespace(use_preset=True, modem_preset=4)
+        custom = SimpleNamespace(use_preset=False, spread_factor=10, bandwidth=125, coding_rate=6)
+
+        assert modem_from_lora_config(preset) == MODEM_PRESETS['MEDIUM_FAST']
+        assert modem_from_lora_config(custom) == LoRaModemConfig(10, 125_000, 6)
+        assert modem_from_lora_config(None) is None
+
+
+class TestDutyCycleBudget:
+    """Test rolling duty-cycle window"""
+
+    def test_within_budget_starts_immediately(self):
+        budget = DutyCycleBudget(duty_cycle_percent=10, window_seconds=100)
+        budget.record(0, 5)
+
+        assert budget.earliest_start(5, 1) == 1
+
+    def test_waits_for_old_transmissions_to_age_out(self):
+        budget = DutyCycleBudget(duty_cycle_percent=10, window_seconds=100)
+        budget.record(0, 4)
+        budget.record(10, 4)
+
+        assert budget.earliest_start(4, 20) == 100
+        assert budget.utilization(50) == pytest.approx(8.0)
+        assert budget.utilization(105) == pytest.approx(4.0)
+
+
+class TestAirtimeScheduler:
+    """Test per-interface pacing"""
+
+    def test_first_packet_is_immediate(self, clock):
+        scheduler = AirtimeScheduler(clock=clock)
+
+        start, airtime = scheduler.reserve('radio', 20)
+
+        assert start == clock.now
+        assert airtime == pytest.approx(estimate_airtime(20, MODEM_PRESETS['LONG_FAST']))
+
+    def test_chunks_spaced_by_airtime(self, clock):
+        scheduler = AirtimeScheduler(gap_factor=0.5, clock=clock)
+
+        first, airtime = scheduler.reserve('radio', 200)
+        second, _ = scheduler.reserve('radio', 200)
+
+        assert second - first == pytest.approx(airtime * 1.5)
+
+    def test_interfaces_are_independent(self, clock):
+        scheduler = AirtimeScheduler(clock=clock)
+
+        scheduler.reserve('radio1', 200)
+        start, _ = scheduler.reserve('radio2', 200)
+
+        assert start == clock.now
+
+    def test_busy_channel_widens_gap(self, clock):
+        scheduler = AirtimeScheduler(gap_factor=0.5, max_gap_factor=4.0,
+                                     utilization_low=25, utilization_high=50, clock=clock)
+        scheduler.report_channel_utilization('radio', 60)
+
+        first, airtime = scheduler.reserve('radio', 200)
+        second, _ = scheduler.reserve('radio', 200)
+
+        assert second - first == pytest.approx(airtime * 5.0)
+
+        scheduler.report_channel_utilization('radio', 37.5)
+        assert scheduler.get_stats()['radio']['gap_factor'] == pytest.approx(2.25)
+
+    def test_stale_utilization_ignored(self, clock):
+        scheduler = AirtimeScheduler(utilization_max_age=60, clock=clock)
+        scheduler.report_channel_utilization('radio', 80)
+
+        clock.advance(120)
+
+        assert scheduler.get_stats()['radio']['gap_factor'] == scheduler.gap_factor
+
+    def test_duty_cycle_budget_enforced(self, clock):
+        scheduler = AirtimeScheduler(duty_cycle_percent=1, window_seconds=600, gap_factor=0, clock=clock)
+
+        starts = [scheduler.reserve('radio', 200)[0] for _ in range(5)]
+
+        # 6 seconds of budget fits three ~1.9s packets; the rest wait for the window
+        assert starts[3] >= starts[0] + 600
+        stats = scheduler.get_stats()['radio']
+        assert stats['budget_delays'] == 2
+        assert stats['duty_cycle_percent'] <= 1.0
+
+    def test_interface_overrides(self, clock):
+        scheduler = create_airtime_scheduler({
+            'modem_preset': 'LONG_FAST',
+            'interfaces': {'fast': {'modem_preset': 'SHORT_FAST', 'duty_cycle_percent': 100}}
+        })
+
+        assert scheduler.has_override('fast')
+        assert not scheduler.has_override('radio')
+        assert scheduler.estimate('fast', 200) < scheduler.estimate('radio', 200)
+        assert scheduler.get_stats()['fast']['duty_cycle_limit_percent'] == 100
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_slot(self):
+        scheduler = AirtimeScheduler(modem_preset='SHORT_TURBO', gap_factor=1.0)
+        loop = asyncio.get_event_loop()
+
+        start = loop.time()
+        airtime = await scheduler.acquire('radio', 200)
+        await scheduler.acquire('radio', 200)
+
+        assert loop.time() - start >= airtime * 2 * 0.9
@@ -0,0 +1,145 @@
+"""
+Unit tests for BBS full-text search indexes
+"""
+
+import pytest
+
+from src.core.database import DatabaseManager, fts_match_query
+
+
+def open_db(path):
+    db = DatabaseManager(path)
+    for node_id in ("!a", "!b"):
+        db.upsert_user({'node_id': node_id, 'short_name': node_id})
+    return db
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = open_db(str(tmp_path / "bbs.db"))
+    yield db
+    db.close()
+
+
+def insert(db, query, params=()):
+    with db.get_connection() as conn:
+        cursor = conn.execute(query, params)
+        conn.commit()
+        return cursor.lastrowid
+
+
+def add_bulletin(db, subject, content, board="general", sender_name="Alice"):
+    return insert(
+        db,
+        """
+        INSERT INTO bulletins (board, sender_id, sender_name, subject, content, timestamp, unique_id)
+        VALUES (?, '!a', ?, ?, ?, CURRENT_TIMESTAMP, ?)
+        """,
+        (board, sender_name, subject, content, f"{board}-{subject}")
+    )
+
+
+def search(db, table, text):
+    rows = db.execute_query(
+        f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ? ORDER BY rowid",
+        (fts_match_query(text),)
+    )
+    return [row[0] for row in rows]
+
+
+class TestMatchQuery:
+    """Test building MATCH expressions from user input"""
+
+    def test_words_become_quoted_prefixes(self):
+        assert fts_match_query("mesh rep") == '"mesh"* "rep"*'
+
+    def test_operators_and_punctuation_are_literal(self):
+        assert fts_match_query('NOT "antenna" OR (x*)') == '"NOT"* "antenna"* "OR"* "x"*'
+
+    def test_no_words(self):
+        assert fts_match_query("  *?! ") is None
+
+
+class TestBulletinIndex:
+    """Test the trigger-maintained bulletin index"""
+
+    def test_prefix_and_diacritics(self, db):
+        first = add_bulletin(db, "Repeater down", "The ridge repeater is off the air")
+        add_bulletin(db, "Net tonight", "Weekly net at the café")
+
+        assert search(db, "bulletins", "rep ridge") == [first]
+        assert len(search(db, "bulletins", "cafe")) == 1
+        assert search(db, "bulletins", "alice") == [first, first + 1]
+
+    def test_update_and_delete_tracked(self, db):
+        bulletin_id = add_bulletin(db, "Swap meet", "Radios for sale")
+
+        db.execute_update("UPDATE bulletins SET content = 'Antennas for sale' WHERE id = ?", (bulletin_id,))
+        assert search(db, "bulletins", "radios") == []
+        assert search(db, "bulletins", "antennas") == [bulletin_id]
+
+        db.execute_update("DELETE FROM bulletins WHERE id = ?", (bulletin_id,))
+        assert search(db, "bulletins", "antennas") == []
+
+    def test_ranked_by_subject_first(self, db):
+        in_content = add_bulletin(db, "Weekly notes", "Mention of solar panels")
+        in_subject = add_bulletin(db, "Solar panels", "Setup notes")
+
+        rows = db.execute_query(
+            """
+            SELECT rowid FROM bulletins_fts WHERE bulletins_fts MATCH ?
+            ORDER BY bm25(bulletins_fts, 4.0, 1.0, 2.0)
+            """,
+            (fts_match_query("solar"),)
+        )
+
+        assert [row[0] for row in rows] == [in_subject, in_content]
+
+
+class TestMailIndex:
+    """Test the trigger-maintained mail index"""
+
+    def test_mail_indexed(self, db):
+        mail_id = insert(
+            db,
+            """
+            INSERT INTO mail (sender_id, sender_name, recipient_id, subject, content, timestamp, unique_id)
+            VALUES ('!a', 'Alice', '!b', 'Frequencies', 'Try 146.520 simplex', CURRENT_TIMESTAMP, 'm1')
+            """
+        )
+
+        assert search(db, "mail", "simplex") == [mail_id]
+
+        db.execute_update("DELETE FROM mail WHERE id = ?", (mail_id,))
+        assert search(db, "mail", "simplex") == []
+
+
+def test_migration_indexes_existing_rows(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = open_db(path)
+    with db.get_connection() as conn:
+        conn.executescript(
+            """
+            DROP TRIGGER bulletins_fts_insert;
+            DROP TRIGGER bulletins_fts_delete;
+            DROP TRIGGER bulletins_fts_update;
+            DROP TRIGGER mail_fts_insert;
+            DROP TRIGGER mail_fts_delete;
+            DROP TRIGGER mail_fts_update;
+            DROP TABLE bulletins_fts;
+            DROP TABLE mail_fts;
+            DROP TRIGGER message_history_fts_insert;
+            DROP TRIGGER message_history_fts_delete;
+            DROP TRIGGER message_history_fts_update;
+            DROP TABLE message_history_fts;
+            DELETE FROM migrations WHERE version >= 9;
+            """
+        )
+    bulletin_id = add_bulletin(db, "Old post", "Written before search existed")
+    db.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert search(db, "bulletins", "written") == [bulletin_id]
+    finally:
+        db.close()
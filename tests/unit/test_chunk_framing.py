@@ -0,0 +1,248 @@
+"""
+Unit tests for compact chunk framing
+
+Tests frame encoding and CRC checks, UTF-8 safe splitting, bounded
+reassembly with timeouts and selective re-requests of missing parts.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.models.message import Message
+from src.core.chunk_framing import (
+    ChunkFrame, ChunkFramer, FrameCorrupted, ReassemblyBuffer, RerequestFrame,
+    encode_base64, decode_base64, parse_frame, parse_rerequest, split_payload
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestFrameEncoding:
+    """Test frame headers"""
+
+    def test_base64_round_trip(self):
+        for value in (0, 1, 63, 64, 4095):
+            assert decode_base64(encode_base64(value, 2)) == value
+
+    def test_frame_round_trip(self):
+        frame = ChunkFrame(seq_id=1234, index=1, total=5, payload="hello [world]")
+        text = frame.encode()
+
+        assert text.startswith("[2/5:")
+        assert len(text) - len(frame.payload) == 11
+        assert parse_frame(text) == frame
+
+    def test_corruption_detected(self):
+        text = ChunkFrame(seq_id=7, index=0, total=2, payload="weather is sunny").encode()
+
+        with pytest.raises(FrameCorrupted):
+            parse_frame(text.replace("sunny", "rainy"))
+        with pytest.raises(FrameCorrupted):
+            parse_frame(text.replace("[1/2", "[2/2"))
+
+    @pytest.mark.parametrize("text", ["hello", "[1/2] no tag", "[3/2:AAAA] bad index", "[1/2:AAAA]no space"])
+    def test_unframed_text(self, text):
+        assert parse_frame(text) is None
+
+    def test_rerequest_round_trip(self):
+        request = RerequestFrame(seq_id=99, indices=[3, 1])
+
+        assert request.encode() == f"[?{encode_base64(99, 2)}:2,4]"
+        assert parse_rerequest(request.encode()) == RerequestFrame(99, [1, 3])
+        assert parse_rerequest("[?AB:]") is None
+
+
+class TestSplitting:
+    """Test payload splitting"""
+
+    def test_frames_fit_packet_size(self):
+        framer = ChunkFramer(max_size=233)
+        frames = framer.split("x" * 5000)
+
+        assert all(len(f.encode().encode('utf-8')) <= 233 for f in frames)
+        assert ''.join(f.payload for f in frames) == "x" * 5000
+        assert len({f.seq_id for f in frames}) == 1
+
+    def test_multibyte_characters_not_split(self):
+        content = "émoji 📡 " * 100
+        payloads = split_payload(content, 60)
+
+        assert ''.join(payloads) == content
+        assert all(len(ChunkFrame(0, 0, len(payloads), p).encode().encode('utf-8')) <= 60 for p in payloads)
+
+    def test_fewer_packets_than_uuid_headers(self):
+        """The compact header leaves more room per packet than "[X/Y:1234abcd] " """
+        content = "A" * 2160
+        legacy_room = 230 - len("[10/10:1234abcd] ")
+
+        frames = ChunkFramer(max_size=230).split(content)
+
+        assert len(frames) < -(-len(content) // legacy_room)
+
+    def test_short_message_not_framed(self):
+        framer = ChunkFramer(max_size=228)
+        message = Message(content="short reply", sender_id="!12345678")
+
+        assert framer.frame_message(message) == [message]
+
+
+class TestChunkFramer:
+    """Test the sent-frame cache used for re-requests"""
+
+    def test_get_frames_for_rerequest(self, clock):
+        framer = ChunkFramer(max_size=50, clock=clock)
+        chunks = framer.frame_message(Message(content="B" * 200, recipient_id="!aaaa0001"))
+        seq_id = parse_frame(chunks[0].content).seq_id
+
+        frames = framer.get_frames(seq_id, [1, 3], requester_id="!aaaa0001")
+
+        assert [f.encode() for f in frames] == [chunks[1].content, chunks[3].content]
+        # Direct messages are only resent to their recipient
+        assert framer.get_frames(seq_id, [1], requester_id="!bbbb0002") == []
+
+    def test_sent_cache_bounded_and_expires(self, clock):
+        framer = ChunkFramer(max_size=50, sent_cache_size=2, sent_cache_ttl=60, clock=clock)
+        for _ in range(3):
+            framer.frame_message(Message(content="C" * 100))
+        assert len(framer.sent) == 2
+
+        clock.advance(61)
+        framer.frame_message(Message(content="D" * 100))
+        assert len(framer.sent) == 1
+
+
+class TestReassemblyBuffer:
+    """Test bounded reassembly"""
+
+    def frames(self, content, seq_id=1, max_size=40):
+        return ChunkFramer(max_size=max_size).split(content, seq_id=seq_id)
+
+    def test_out_of_order_with_duplicates(self, clock):
+        buffer = ReassemblyBuffer(clock=clock)
+        frames = self.frames("The quick brown fox jumps over the lazy dog " * 3)
+
+        results = [buffer.add("!a", f) for f in [frames[2], frames[0], frames[2]] + frames[1:]]
+
+        assert results[-1] == "The quick brown fox jumps over the lazy dog " * 3
+        assert buffer.get_stats()['duplicates'] == 2
+        assert buffer.get_stats()['pending_messages'] == 0
+
+    def test_senders_kept_apart(self, clock):
+        buffer = ReassemblyBuffer(clock=clock)
+        a = self.frames("message from a " * 5, seq_id=5)
+        b = self.frames("message from b " * 5, seq_id=5)
+
+        for frame in a[:-1]:
+            assert buffer.add("!a", frame) is None
+        for frame in b[:-1]:
+            assert buffer.add("!b", frame) is None
+
+        assert buffer.add("!b", b[-1]) == "message from b " * 5
+        assert buffer.add("!a", a[-1]) == "message from a " * 5
+
+    def test_timeout(self, clock):
+        buffer = ReassemblyBuffer(timeout=60, clock=clock)
+        buffer.add("!a", self.frames("x" * 200)[0])
+
+        clock.advance(61)
+
+        assert buffer.expire() == 1
+        assert buffer.pending_bytes == 0
+
+    def test_memory_caps(self, clock):
+        buffer = ReassemblyBuffer(max_messages=3, max_bytes=10000, clock=clock)
+        for seq_id in range(5):
+            buffer.add("!a", self.frames("y" * 200, seq_id=seq_id)[0])
+
+        assert len(buffer.pending) == 3
+        assert buffer.get_stats()['evicted'] == 2
+
+        buffer = ReassemblyBuffer(max_bytes=50, clock=clock)
+        for seq_id in range(5):
+            buffer.add("!a", self.frames("z" * 200, seq_id=seq_id)[0])
+        assert buffer.pending_bytes <= 50
+
+    def test_rerequests_only_missing_parts(self, clock):
+        buffer = ReassemblyBuffer(rerequest_after=30, max_rerequests=2, clock=clock)
+        frames = self.frames("w" * 200)
+        for frame in frames:
+            if frame.index not in (1, 3):
+                buffer.add("!a", frame, interface_id="radio", channel=2)
+
+        assert buffer.due_rerequests() == []
+        clock.advance(31)
+        due = buffer.due_rerequests()
+
+        assert len(due) == 1
+        partial, request = due[0]
+        assert (partial.sender_id, partial.interface_id, partial.channel) == ("!a", "radio", 2)
+        assert request.indices == [1, 3]
+
+        clock.advance(31)
+        assert len(buffer.due_rerequests()) == 1
+        clock.advance(31)
+        assert buffer.due_rerequests() == []
+
+        assert buffer.add("!a", frames[1]) is None
+        assert buffer.add("!a", frames[3]) == "w" * 200
+
+
+class TestRouterIntegration:
+    """Test chunk handling in the message router"""
+
+    @pytest.fixture
+    def router(self):
+        from src.core.message_router import CoreMessageRouter
+
+        config = Mock()
+        config.get.side_effect = lambda key, default=None: default
+        db = Mock()
+        db.execute_update = Mock()
+        router = CoreMessageRouter(config, db)
+        router._store_message_history = AsyncMock()
+        return router
+
+    @pytest.mark.asyncio
+    async def test_parts_routed_once_complete(self, router):
+        sender = ChunkFramer(max_size=60)
+        chunks = sender.frame_message(Message(content="bbslist " + "q" * 150, sender_id="!abcd0001"))
+
+        for chunk in chunks[:-1]:
+            await router.process_message(chunk, "radio")
+        assert router.message_queue.qsize() == 0
+
+        await router.process_message(chunks[-1], "radio")
+        queued = router.message_queue.get_nowait()
+        assert queued.message.content == "bbslist " + "q" * 150
+        assert queued.message.metadata['reassembled_from_chunks']
+
+    @pytest.mark.asyncio
+    async def test_rerequest_resends_only_missing_parts(self, router):
+        router.send_message = AsyncMock(return_value=True)
+        chunks = router._chunk_message(Message(content="r" * 1000, recipient_id="!abcd0002"))
+        seq_id = parse_frame(chunks[0].content).seq_id
+
+        request = Message(sender_id="!abcd0002", content=RerequestFrame(seq_id, [2]).encode())
+        await router.process_message(request, "radio")
+
+        assert router.send_message.await_count == 1
+        resent = router.send_message.await_args.args[0]
+        assert resent.content == chunks[2].content
+        assert resent.recipient_id == "!abcd0002"
+        assert router.message_queue.qsize() == 0
@@ -0,0 +1,88 @@
+"""
+Unit tests for cron expression parsing and fire time calculation
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core.cron import CronExpression
+
+
+def next_after(expression, after):
+    return CronExpression(expression).next_after(after)
+
+
+class TestCronExpression:
+    """Test next fire time calculation"""
+
+    @pytest.mark.parametrize('expression,after,expected', [
+        ('*/5 * * * *', datetime(2024, 1, 1, 10, 2), datetime(2024, 1, 1, 10, 5)),
+        ('0 * * * *', datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 1, 11, 0)),
+        ('30 8 * * *', datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 2, 8, 30)),
+        ('0 0 1 * *', datetime(2024, 1, 31, 12, 0), datetime(2024, 2, 1, 0, 0)),
+        ('0 0 29 2 *', datetime(2024, 3, 1), datetime(2028, 2, 29)),
+        ('59 23 31 12 *', datetime(2024, 12, 31, 23, 59), datetime(2025, 12, 31, 23, 59)),
+        ('0 9-17/4 * * 1-5', datetime(2024, 1, 5, 17, 0), datetime(2024, 1, 8, 9, 0)),
+        ('0 12 * JAN,JUL MON', datetime(2024, 1, 2), datetime(2024, 1, 8, 12, 0)),
+    ])
+    def test_next_after(self, expression, after, expected):
+        assert next_after(expression, after) == expected
+
+    def test_strictly_after(self):
+        assert next_after('0 0 * * *', datetime(2024, 1, 1)) == datetime(2024, 1, 2)
+
+    def test_seconds_field(self):
+        assert next_after('* * * * * */15', datetime(2024, 1, 1, 0, 0, 20)) == datetime(2024, 1, 1, 0, 0, 30)
+
+    def test_sunday_is_zero_and_seven(self):
+        after = datetime(2024, 1, 1)  # Monday
+        assert next_after('0 0 * * 0', after) == next_after('0 0 * * 7', after) == datetime(2024, 1, 7)
+
+    def test_last_day_of_month(self):
+        assert next_after('0 0 L * *', datetime(2024, 2, 1)) == datetime(2024, 2, 29)
+        assert next_after('0 0 L * *', datetime(2023, 2, 1)) == datetime(2023, 2, 28)
+
+    def test_last_and_nth_weekday(self):
+        # Last Friday and second Tuesday of January 2024
+        assert next_after('0 0 * * 5L', datetime(2024, 1, 1)) == datetime(2024, 1, 26)
+        assert next_after('0 0 * * L5', datetime(2024, 1, 1)) == datetime(2024, 1, 26)
+        assert next_after('0 0 * * 2#2', datetime(2024, 1, 1)) == datetime(2024, 1, 9)
+
+    def test_day_and_weekday_either_matches(self):
+        # The 15th, or any Monday
+        times = CronExpression('0 0 15 * 1').next_times(datetime(2024, 1, 9), 3)
+        assert times == [datetime(2024, 1, 15), datetime(2024, 1, 22), datetime(2024, 1, 29)]
+        assert next_after('0 0 13 * 1', datetime(2024, 1, 9)) == datetime(2024, 1, 13)
+
+    def test_star_step_day_requires_both(self):
+        # Odd days that are also Mondays
+        assert next_after('0 0 */2 * 1', datetime(2024, 1, 2)) == datetime(2024, 1, 15)
+
+    def test_macros(self):
+        after = datetime(2024, 5, 5, 5, 5)
+        assert next_after('@hourly', after) == datetime(2024, 5, 5, 6, 0)
+        assert next_after('@daily', after) == datetime(2024, 5, 6)
+        assert next_after('@monthly', after) == datetime(2024, 6, 1)
+        assert next_after('@yearly', after) == datetime(2025, 1, 1)
+
+    def test_keeps_timezone(self):
+        after = datetime(2024, 1, 1, 10, 2, tzinfo=timezone.utc)
+        assert next_after('*/5 * * * *', after) == datetime(2024, 1, 1, 10, 5, tzinfo=timezone.utc)
+
+    def test_never_fires(self):
+        with pytest.raises(ValueError, match='never fires'):
+            next_after('0 0 30 2 *', datetime(2024, 1, 1))
+
+    @pytest.mark.parametrize('expression', [
+        '* * * *', '60 * * * *', '* 24 * * *', '* * 0 * *', '* * * 13 *', '* * * * 8',
+        '*/0 * * * *', '5-1 * * * *', 'x * * * *', '1,,2 * * * *', '* * * * 1#6'
+    ])
+    def test_invalid(self, expression):
+        with pytest.raises(ValueError):
+            CronExpression(expression)
+
+    def test_fields(self):
+        assert CronExpression('0 12 * * 1').fields == {
+            'minute': '0', 'hour': '12', 'day': '*', 'month': '*', 'weekday': '1'
+        }
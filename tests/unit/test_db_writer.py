@@ -0,0 +1,121 @@
+"""
+Unit tests for the asynchronous database writer
+
+Tests grouped commits, awaitable completion, failure isolation,
+backpressure and flush-on-stop behaviour.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.database import DatabaseManager, DatabaseError
+from src.core.db_writer import AsyncDatabaseWriter
+
+
+@pytest.fixture
+def db_manager():
+    """Create a real database in a temporary directory"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseManager(str(Path(tmpdir) / "test.db"))
+        yield db
+        db.close()
+
+
+INSERT_CONFIG = "INSERT INTO system_config (key, value) VALUES (?, ?)"
+
+
+class TestAsyncDatabaseWriter:
+    """Test off-loop database writer"""
+
+    @pytest.mark.asyncio
+    async def test_execute_commits_write(self, db_manager):
+        """Awaiting execute() returns once the row is committed"""
+        writer = AsyncDatabaseWriter(db_manager)
+        writer.start()
+        try:
+            rowcount = await writer.execute(INSERT_CONFIG, ("a", "1"))
+            assert rowcount == 1
+
+            rows = db_manager.execute_query("SELECT value FROM system_config WHERE key = ?", ("a",))
+            assert rows[0]['value'] == "1"
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_writes_are_grouped_into_batches(self, db_manager):
+        """Many concurrent submits are committed in fewer transactions"""
+        writer = AsyncDatabaseWriter(db_manager, batch_size=50, batch_wait=0.05)
+        writer.start()
+        try:
+            futures = [await writer.submit(INSERT_CONFIG, (f"k{i}", str(i))) for i in range(200)]
+            await asyncio.gather(*futures)
+
+            stats = writer.get_stats()
+            assert stats['intents_committed'] == 200
+            assert stats['batches_committed'] < 200
+            assert stats['average_batch_size'] > 1
+
+            rows = db_manager.execute_query("SELECT COUNT(*) FROM system_config")
+            assert rows[0][0] == 200
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_intent_does_not_discard_batch(self, db_manager):
+        """A failing write is isolated and reported on its own future"""
+        writer = AsyncDatabaseWriter(db_manager, batch_wait=0.05)
+        writer.start()
+        try:
+            good = await writer.submit(INSERT_CONFIG, ("good", "1"))
+            bad = await writer.submit(INSERT_CONFIG, ("good", "2"))  # Duplicate primary key
+            other = await writer.submit(INSERT_CONFIG, ("other", "3"))
+
+            assert await good == 1
+            assert await other == 1
+            with pytest.raises(Exception):
+                await bad
+
+            stats = writer.get_stats()
+            assert stats['intents_failed'] == 1
+            assert stats['batch_rollbacks'] >= 1
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_when_queue_full(self, db_manager):
+        """Submitters wait for free slots once the queue bound is reached"""
+        writer = AsyncDatabaseWriter(db_manager, max_queue_size=2)
+        writer.start()
+        try:
+            futures = [await writer.submit(INSERT_CONFIG, (f"k{i}", "v")) for i in range(10)]
+            await asyncio.gather(*futures)
+
+            stats = writer.get_stats()
+            assert stats['intents_committed'] == 10
+            assert stats['backpressure_waits'] > 0
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_writes(self, db_manager):
+        """Pending writes are committed before the writer stops"""
+        writer = AsyncDatabaseWriter(db_manager)
+        writer.start()
+
+        for i in range(25):
+            await writer.submit(INSERT_CONFIG, (f"k{i}", "v"))
+        await writer.stop()
+
+        rows = db_manager.execute_query("SELECT COUNT(*) FROM system_config")
+        assert rows[0][0] == 25
+
+    @pytest.mark.asyncio
+    async def test_submit_requires_running_writer(self, db_manager):
+        """Submitting before start() is an error"""
+        writer = AsyncDatabaseWriter(db_manager)
+
+        with pytest.raises(DatabaseError):
+            await writer.submit(INSERT_CONFIG, ("a", "1"))
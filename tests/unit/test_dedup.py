@@ -0,0 +1,146 @@
+"""
+Unit tests for duplicate packet suppression
+
+Tests packet ID and payload keying, expiry, the size cap, cross-interface
+accounting and the router integration.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from src.models.message import Message
+from src.core.config import ConfigurationManager
+from src.core.database import DatabaseManager
+from src.core.dedup import DuplicateFilter, SeenSet, create_duplicate_filter
+from src.core.message_router import CoreMessageRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def packet(content="hello", sender="!a1b2c3d4", packet_id=None, interface_id="radio1"):
+    message = Message(content=content, sender_id=sender, interface_id=interface_id)
+    if packet_id is not None:
+        message.metadata['packet_id'] = packet_id
+    return message
+
+
+class TestSeenSet:
+    """Test the bounded seen set"""
+
+    def test_expiry(self):
+        clock = FakeClock()
+        seen = SeenSet(ttl=10, clock=clock)
+
+        assert seen.check_and_add('a', 'radio1') is None
+        clock.now += 5
+        assert seen.check_and_add('a', 'radio2') == (1000.0, 'radio1')
+        clock.now += 6
+        assert seen.check_and_add('a', 'radio2') is None
+        assert seen.expirations == 1
+
+    def test_max_entries(self):
+        seen = SeenSet(ttl=60, max_entries=3, clock=FakeClock())
+
+        for key in 'abcd':
+            seen.check_and_add(key)
+
+        assert len(seen) == 3
+        assert seen.evictions == 1
+        assert seen.check_and_add('a') is None  # oldest was dropped
+
+
+class TestDuplicateFilter:
+    """Test duplicate detection"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.filter = DuplicateFilter(ttl=600, payload_ttl=10, clock=self.clock)
+
+    def test_packet_id_keying(self):
+        assert not self.filter.is_duplicate(packet(packet_id=1))
+        assert self.filter.is_duplicate(packet(packet_id=1))
+        # A user repeating a command sends a new packet
+        assert not self.filter.is_duplicate(packet(packet_id=2))
+        # Packet IDs are only unique per sender
+        assert not self.filter.is_duplicate(packet(packet_id=1, sender="!00000002"))
+
+        stats = self.filter.get_stats()
+        assert stats['suppressed_packet_id'] == 1
+        assert stats['tracked_packet_ids'] == 3
+
+    def test_payload_fallback(self):
+        assert not self.filter.is_duplicate(packet("wx"))
+        assert self.filter.is_duplicate(packet("wx"))
+        assert not self.filter.is_duplicate(packet("wx", sender="!00000002"))
+
+        self.clock.now += 11
+        assert not self.filter.is_duplicate(packet("wx"))
+        assert self.filter.get_stats()['suppressed_payload'] == 1
+
+    def test_payload_fallback_off_by_default(self):
+        dedup = create_duplicate_filter({})
+
+        assert not dedup.is_duplicate(packet("ping"))
+        assert not dedup.is_duplicate(packet("ping"))
+        assert dedup.is_duplicate(packet(packet_id=1)) is False
+        assert dedup.is_duplicate(packet(packet_id=1))
+        assert dedup.get_stats()['tracked_payloads'] == 0
+
+    def test_packet_id_window(self):
+        self.filter.is_duplicate(packet(packet_id=7))
+        self.clock.now += 599
+        assert self.filter.is_duplicate(packet(packet_id=7))
+        self.clock.now += 2
+        assert not self.filter.is_duplicate(packet(packet_id=7))
+
+    def test_cross_interface(self):
+        self.filter.is_duplicate(packet(packet_id=1, interface_id="radio1"))
+        self.filter.is_duplicate(packet(packet_id=1, interface_id="radio1"))  # rebroadcast
+        self.filter.is_duplicate(packet(packet_id=1, interface_id="radio2"))
+
+        stats = self.filter.get_stats()
+        assert stats['suppressed'] == 2
+        assert stats['cross_interface'] == 1
+
+    def test_disabled(self):
+        dedup = create_duplicate_filter({'enabled': False})
+
+        assert not dedup.is_duplicate(packet(packet_id=1))
+        assert not dedup.is_duplicate(packet(packet_id=1))
+        assert dedup.get_stats()['checked'] == 0
+
+    def test_create_from_config(self):
+        dedup = create_duplicate_filter({'ttl': 30, 'payload_ttl': 2, 'max_entries': 50})
+
+        assert dedup.packet_ids.ttl == 30
+        assert dedup.payloads.ttl == 2
+        assert dedup.packet_ids.max_entries == 50
+        assert create_duplicate_filter(None).enabled
+
+
+class TestRouterDedup:
+    """Test duplicate suppression in the message router"""
+
+    @pytest.mark.asyncio
+    async def test_same_packet_on_two_interfaces_routed_once(self):
+        config = Mock(spec=ConfigurationManager)
+        config.get.return_value = 228
+        db = Mock(spec=DatabaseManager)
+        router = CoreMessageRouter(config, db)
+
+        await router.process_message(packet("ping", packet_id=42), "radio1")
+        await router.process_message(packet("ping", packet_id=42), "radio2")
+        await router.process_message(packet("ping", packet_id=43), "radio1")
+
+        stats = router.get_stats()
+        assert router.message_queue.qsize() == 2
+        assert stats['messages_received'] == 3
+        assert stats['messages_duplicate'] == 1
+        assert stats['dedup']['cross_interface'] == 1
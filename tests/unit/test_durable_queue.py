@@ -0,0 +1,243 @@
+"""
+Unit tests for the durable outbound queue
+
+Tests group-committed storage, restoring queued and retrying messages,
+resuming partially sent chunked messages, and surviving a killed process.
+"""
+
+import asyncio
+import signal
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from src.models.message import Message
+from src.core.chunk_framing import parse_frame
+from src.core.durable_queue import DurableQueueStore, QueueRecord
+from src.core.queue_manager import QueueManager
+
+
+NO_RATE_LIMIT = {'global': False, 'channel': False, 'sender': False, 'tiers': {'emergency': False}}
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+async def wait_until(condition, timeout=5.0):
+    """Poll until condition() is true"""
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        await asyncio.sleep(0.01)
+
+
+def make_manager(path, **kwargs):
+    return QueueManager(rate_limit_config=NO_RATE_LIMIT, persistence_path=str(path), **kwargs)
+
+
+class TestDurableQueueStore:
+    """Test the SQLite store"""
+
+    @pytest.mark.asyncio
+    async def test_put_update_delete(self, tmp_path):
+        store = DurableQueueStore(str(tmp_path / "queue.db"))
+        assert await store.start() == []
+
+        await store.put(QueueRecord("a", 2, 100.0, "{}"))
+        await store.put(QueueRecord("b", 4, 101.0, "{}"))
+        await store.put(QueueRecord("c", 2, 102.0, "{}"))
+        store.update_retry("c", retry_count=1, due_at=500.0)
+        store.delete("a")
+        await store.stop()
+
+        store = DurableQueueStore(str(tmp_path / "queue.db"))
+        records = await store.start()
+        await store.stop()
+
+        # Ready records by priority first, then retries by due time
+        assert [(r.queue_id, r.due_at) for r in records] == [("b", None), ("c", 500.0)]
+        assert records[1].retry_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_puts_share_commits(self, tmp_path):
+        store = DurableQueueStore(str(tmp_path / "queue.db"))
+        await store.start()
+
+        await asyncio.gather(*(store.put(QueueRecord(str(i), 2, float(i), "{}")) for i in range(200)))
+
+        stats = store.get_stats()
+        await store.stop()
+        assert stats['statements'] == 200
+        assert stats['commits'] < 20
+        assert stats['pending_statements'] == 0
+
+    @pytest.mark.asyncio
+    async def test_wal_mode(self, tmp_path):
+        import sqlite3
+
+        store = DurableQueueStore(str(tmp_path / "queue.db"))
+        await store.start()
+        await store.stop()
+
+        conn = sqlite3.connect(str(tmp_path / "queue.db"))
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        conn.close()
+
+
+class TestPersistentQueueManager:
+    """Test QueueManager with persistence enabled"""
+
+    @pytest.mark.asyncio
+    async def test_delivered_messages_removed(self, tmp_path):
+        manager = make_manager(tmp_path / "queue.db")
+        sent = []
+
+        async def processor(chunk):
+            sent.append(chunk.content)
+
+        manager.set_outbound_processor(processor)
+        await manager.start()
+        for i in range(5):
+            await manager.queue_outbound_message(Message(content=f"msg {i}"))
+        await wait_until(lambda: len(sent) == 5)
+        await manager.stop()
+
+        restarted = make_manager(tmp_path / "queue.db")
+        await restarted.start()
+        assert restarted.get_stats()['persistence']['restored'] == 0
+        await restarted.stop()
+
+    @pytest.mark.asyncio
+    async def test_retries_restored_with_due_time(self, tmp_path):
+        manager = make_manager(tmp_path / "queue.db", retry_delay=60)
+
+        async def failing(chunk):
+            raise ConnectionError("radio offline")
+
+        manager.set_outbound_processor(failing)
+        await manager.start()
+        await manager.queue_outbound_message(Message(content="retry me"))
+        await wait_until(lambda: len(manager.retry_queue) == 1)
+        due = manager.retry_queue[0].message.next_retry
+        await manager.stop()
+
+        restarted = make_manager(tmp_path / "queue.db")
+        restarted.set_outbound_processor(failing)
+        await restarted.start()
+        item = restarted.retry_queue[0]
+        await restarted.stop()
+
+        assert item.message.message.content == "retry me"
+        assert item.message.retry_count == 1
+        assert abs((item.message.next_retry - due).total_seconds()) < 0.001
+
+    @pytest.mark.asyncio
+    async def test_chunked_send_resumes_after_restart(self, tmp_path):
+        """Chunks already sent are not sent again, and resent parts keep their chunk ID"""
+        manager = make_manager(tmp_path / "queue.db", retry_delay=60)
+        manager.chunker.framer.max_size = 60
+        first_run = []
+
+        async def fail_third(chunk):
+            if len(first_run) == 2:
+                raise ConnectionError("radio offline")
+            first_run.append(chunk.content)
+
+        manager.set_outbound_processor(fail_third)
+        await manager.start()
+        await manager.queue_outbound_message(Message(content="z" * 200))
+        await wait_until(lambda: len(manager.retry_queue) == 1)
+        await manager.stop()
+
+        restarted = make_manager(tmp_path / "queue.db", retry_delay=60)
+        restarted.chunker.framer.max_size = 60
+        second_run = []
+
+        async def record(chunk):
+            second_run.append(chunk.content)
+
+        restarted.set_outbound_processor(record)
+        restarted.retry_delay = 0
+        await restarted.start()
+        for item in restarted.retry_queue:
+            item.message.next_retry = None
+        restarted._retry_ready.set()
+        await wait_until(lambda: restarted.get_stats()['outbound']['messages_processed'] == 1)
+        await restarted.stop()
+
+        first = [parse_frame(content) for content in first_run]
+        second = [parse_frame(content) for content in second_run]
+        assert [f.index for f in first] == [0, 1]
+        assert [f.index for f in second] == list(range(2, first[0].total))
+        assert {f.seq_id for f in first + second} == {first[0].seq_id}
+        assert ''.join(f.payload for f in first + second) == "z" * 200
+
+
+class TestKillAndRestart:
+    """Test recovery after the process is killed"""
+
+    CHILD = textwrap.dedent("""
+        import asyncio, os, signal, sys
+        sys.path.insert(0, {root!r})
+        from src.core.queue_manager import QueueManager
+        from src.models.message import Message, MessagePriority
+
+        async def main():
+            manager = QueueManager(rate_limit_config={limits!r}, persistence_path={path!r})
+            delivered = []
+            never = asyncio.Event()
+
+            async def processor(chunk):
+                if chunk.content.startswith('deliver'):
+                    delivered.append(chunk.content)
+                else:
+                    await never.wait()  # in flight when the process dies
+
+            manager.set_outbound_processor(processor)
+            await manager.start()
+
+            for i in range(50):
+                await manager.queue_outbound_message(Message(content=f'deliver {{i}}'))
+            while len(delivered) < 50:
+                await asyncio.sleep(0.01)
+            await manager.store.flush()
+
+            priorities = list(MessagePriority)
+            await asyncio.gather(*(
+                manager.queue_outbound_message(Message(
+                    content=f'hold {{i}}', priority=priorities[i % len(priorities)]
+                ))
+                for i in range(300)
+            ))
+            os.kill(os.getpid(), signal.SIGKILL)
+
+        asyncio.run(main())
+    """)
+
+    @pytest.mark.asyncio
+    async def test_undelivered_messages_survive_kill(self, tmp_path):
+        path = tmp_path / "queue.db"
+        script = self.CHILD.format(root=str(REPO_ROOT), limits=NO_RATE_LIMIT, path=str(path))
+
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, timeout=60)
+        assert result.returncode == -signal.SIGKILL, result.stderr.decode()
+
+        manager = make_manager(path)
+        received = []
+
+        async def processor(chunk):
+            received.append((chunk.priority.value, chunk.content))
+
+        manager.set_outbound_processor(processor)
+        await manager.start()
+        await wait_until(lambda: len(received) == 300)
+        await manager.stop()
+
+        contents = [content for _, content in received]
+        assert sorted(contents) == sorted(f"hold {i}" for i in range(300))
+        # The message in flight at the kill may go first; the rest follow priority order
+        priorities = [priority for priority, _ in received[1:]]
+        assert priorities == sorted(priorities, reverse=True)
@@ -0,0 +1,177 @@
+"""
+Unit tests for indexed message history search
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core import history_search
+from src.core.database import DatabaseManager, fts_match_query
+from src.core.history_search import HistoryQuery, search_message_history
+
+
+START = datetime(2024, 1, 1)
+SENDERS = ("!a", "!b", "!c")
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "history.db"))
+    for node_id in SENDERS:
+        db.upsert_user({'node_id': node_id, 'short_name': node_id})
+    yield db
+    db.close()
+
+
+def add_messages(db, contents, sender_id="!a", channel=0, first_minute=0):
+    db.execute_many(
+        """
+        INSERT INTO message_history (message_id, sender_id, channel, content, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (f"{sender_id}-{first_minute + i}", sender_id, channel, content,
+             (START + timedelta(minutes=first_minute + i)).isoformat())
+            for i, content in enumerate(contents)
+        ]
+    )
+
+
+def ids(page):
+    return [message['id'] for message in page.messages]
+
+
+class TestMatchQuery:
+    """Test whole-word MATCH expressions"""
+
+    def test_whole_words_unless_starred(self):
+        assert fts_match_query("mesh rep*", prefix=False) == '"mesh" "rep"*'
+        assert fts_match_query("mesh rep*") == '"mesh"* "rep"*'
+
+
+class TestIndex:
+    """Test the trigger-maintained history index"""
+
+    def test_update_and_delete_tracked(self, db):
+        add_messages(db, ["radio check", "net tonight"])
+
+        db.execute_update("UPDATE message_history SET content = 'antenna check' WHERE id = 1")
+        assert ids(search_message_history(db, HistoryQuery(text="radio"))) == []
+        assert ids(search_message_history(db, HistoryQuery(text="antenna"))) == [1]
+
+        db.execute_update("DELETE FROM message_history WHERE id = 1")
+        assert ids(search_message_history(db, HistoryQuery(text="check"))) == []
+
+    def test_migration_indexes_existing_rows(self, tmp_path):
+        path = str(tmp_path / "old.db")
+        db = DatabaseManager(path)
+        db.upsert_user({'node_id': '!a', 'short_name': 'a'})
+        with db.get_connection() as conn:
+            conn.executescript(
+                """
+                DROP TRIGGER message_history_fts_insert;
+                DROP TRIGGER message_history_fts_delete;
+                DROP TRIGGER message_history_fts_update;
+                DROP TABLE message_history_fts;
+                DELETE FROM migrations WHERE version >= 10;
+                """
+            )
+        add_messages(db, ["written before search existed"])
+        db.close()
+
+        db = DatabaseManager(path)
+        try:
+            assert ids(search_message_history(db, HistoryQuery(text="existed"))) == [1]
+        finally:
+            db.close()
+
+
+class TestSearch:
+    """Test filters, plans and matching"""
+
+    def test_whole_word_and_prefix_matching(self, db):
+        add_messages(db, ["repeater down", "rep meeting", "Café on the ridge"])
+
+        assert ids(search_message_history(db, HistoryQuery(text="rep"))) == [2]
+        assert ids(search_message_history(db, HistoryQuery(text="rep*"))) == [2, 1]
+        assert ids(search_message_history(db, HistoryQuery(text="cafe RIDGE"))) == [3]
+        assert search_message_history(db, HistoryQuery(text="?!")).plan == "empty"
+
+    def test_plans_agree(self, db, monkeypatch):
+        add_messages(db, ["mesh check"] * 10, sender_id="!a")
+        add_messages(db, ["mesh relay", "quiet"] * 5, sender_id="!b", first_minute=100)
+        query = HistoryQuery(text="mesh", sender_id="!b")
+
+        sparse = search_message_history(db, query)
+        monkeypatch.setattr(history_search, "SPARSE_FILTER_ROWS", 1)
+        dense = search_message_history(db, query)
+
+        assert (sparse.plan, dense.plan) == ("filter", "fts")
+        assert ids(sparse) == ids(dense) == [19, 17, 15, 13, 11]
+
+    def test_filters_without_text(self, db):
+        add_messages(db, ["one", "two"], sender_id="!a", channel=0)
+        add_messages(db, ["three"], sender_id="!b", channel=2, first_minute=10)
+
+        page = search_message_history(db, HistoryQuery(channel=2))
+        assert page.plan == "index"
+        assert ids(page) == [3]
+        assert ids(search_message_history(db, HistoryQuery(sender_id="!a"))) == [2, 1]
+
+    def test_time_range(self, db):
+        add_messages(db, [f"mesh {i}" for i in range(60)])
+        query = HistoryQuery(
+            start_time=START + timedelta(minutes=10),
+            end_time=START + timedelta(minutes=19)
+        )
+
+        assert ids(search_message_history(db, query)) == list(range(20, 10, -1))
+        query.text = "mesh"
+        assert ids(search_message_history(db, query)) == list(range(20, 10, -1))
+
+    def test_aware_times_compared_as_utc(self, db):
+        add_messages(db, ["a", "b", "c"])
+        start = (START + timedelta(minutes=1)).replace(tzinfo=timezone.utc).astimezone(
+            timezone(timedelta(hours=-5))
+        )
+
+        assert ids(search_message_history(db, HistoryQuery(start_time=start))) == [3, 2]
+
+    def test_empty_time_range(self, db):
+        add_messages(db, ["a"])
+
+        page = search_message_history(db, HistoryQuery(start_time=START + timedelta(days=1)))
+
+        assert page.messages == [] and page.next_before_id is None
+
+
+class TestPaging:
+    """Test keyset pagination"""
+
+    @pytest.mark.parametrize("text", [None, "mesh"])
+    def test_pages_cover_every_row_once(self, db, text):
+        add_messages(db, ["mesh"] * 25)
+        query = HistoryQuery(text=text, limit=10)
+
+        seen, pages = [], 0
+        while True:
+            page = search_message_history(db, query)
+            seen.extend(ids(page))
+            pages += 1
+            if page.next_before_id is None:
+                break
+            query.before_id = page.next_before_id
+
+        assert seen == list(range(25, 0, -1))
+        assert pages == 3
+
+    def test_new_rows_do_not_shift_pages(self, db):
+        add_messages(db, ["old"] * 5)
+        first = search_message_history(db, HistoryQuery(limit=3))
+
+        add_messages(db, ["new"] * 5, first_minute=5)
+        second = search_message_history(db, HistoryQuery(limit=3, before_id=first.next_before_id))
+
+        assert ids(first) == [5, 4, 3]
+        assert ids(second) == [2, 1]
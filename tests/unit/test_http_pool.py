@@ -0,0 +1,279 @@
+"""
+Unit tests for the shared plugin HTTP pool
+"""
+
+import asyncio
+from email.utils import formatdate
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.core.enhanced_plugin import PluginHTTPClient
+from src.core.http_pool import (
+    HTTPResponseCache, CacheEntry, SharedHTTPPool, create_http_pool, freshness, parse_cache_control
+)
+
+
+class Origin:
+    """Local HTTP server whose responses are set per test"""
+
+    def __init__(self):
+        self.hits = {}
+        self.requests = []
+        self.headers = {}
+        self.delay = 0.0
+        self.etag = '"v1"'
+        self.body = {'value': 1}
+
+    async def resource(self, request):
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.etag and request.headers.get('If-None-Match') == self.etag:
+            return web.Response(status=304, headers={'ETag': self.etag, **self.headers})
+        headers = dict(self.headers)
+        if self.etag:
+            headers['ETag'] = self.etag
+        return web.json_response(self.body, headers=headers)
+
+    async def submit(self, request):
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+        return web.json_response({'ok': True})
+
+
+@pytest_asyncio.fixture
+async def origin():
+    origin = Origin()
+    app = web.Application()
+    app.router.add_get('/resource', origin.resource)
+    app.router.add_post('/resource', origin.submit)
+    server = TestServer(app)
+    await server.start_server()
+    origin.url = str(server.make_url('/resource'))
+    yield origin
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = SharedHTTPPool()
+    yield pool
+    await pool.close()
+
+
+def client_for(pool, name='weather'):
+    client = PluginHTTPClient(name)
+    client.pool = pool
+    return client
+
+
+class TestSharedHTTPPool:
+    """Test caching, revalidation and coalescing across plugin clients"""
+
+    @pytest.mark.asyncio
+    async def test_clients_share_one_session(self, pool, origin):
+        first, second = client_for(pool, 'a'), client_for(pool, 'b')
+        origin.headers = {'Cache-Control': 'no-store'}
+
+        await first.get(origin.url)
+        await second.get(origin.url)
+
+        assert first.session is second.session is pool.session
+        assert pool.stats.sessions_created == 1
+
+        await first.close()
+        assert not pool.session.closed
+
+    @pytest.mark.asyncio
+    async def test_fresh_response_served_from_cache(self, pool, origin):
+        origin.headers = {'Cache-Control': 'max-age=60'}
+        first, second = client_for(pool, 'a'), client_for(pool, 'b')
+
+        assert await first.get(origin.url) == {'value': 1}
+        assert await second.get(origin.url) == {'value': 1}
+
+        assert origin.hits['/resource'] == 1
+        assert pool.get_stats()['cache_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_body_not_shared_between_callers(self, pool, origin):
+        origin.headers = {'Cache-Control': 'max-age=60'}
+        client = client_for(pool)
+
+        (await client.get(origin.url))['value'] = 99
+
+        assert await client.get(origin.url) == {'value': 1}
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_do_not_use_rate_limit(self, pool, origin):
+        origin.headers = {'Cache-Control': 'max-age=60'}
+        client = client_for(pool)
+        client.rate_limiter.tokens = 1
+
+        for _ in range(5):
+            await client.get(origin.url)
+
+        assert origin.hits['/resource'] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_response_revalidated(self, pool, origin):
+        origin.headers = {'Cache-Control': 'no-cache'}
+        client = client_for(pool)
+
+        await client.get(origin.url)
+        assert await client.get(origin.url) == {'value': 1}
+
+        assert origin.hits['/resource'] == 2
+        assert origin.requests[-1].headers['If-None-Match'] == '"v1"'
+        assert pool.stats.not_modified == 1
+
+        origin.etag = '"v2"'
+        origin.body = {'value': 2}
+        assert await client.get(origin.url) == {'value': 2}
+
+    @pytest.mark.asyncio
+    async def test_no_store_and_vary_star_not_cached(self, pool, origin):
+        client = client_for(pool)
+        for headers in ({'Cache-Control': 'no-store, max-age=60'}, {'Cache-Control': 'max-age=60', 'Vary': '*'}):
+            origin.headers = headers
+            await client.get(origin.url)
+            assert len(pool.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_request_no_cache_bypasses_cache(self, pool, origin):
+        origin.headers = {'Cache-Control': 'max-age=60'}
+        client = client_for(pool)
+
+        await client.get(origin.url)
+        await client.get(origin.url, headers={'Cache-Control': 'no-cache'})
+
+        assert origin.hits['/resource'] == 2
+
+    @pytest.mark.asyncio
+    async def test_request_headers_are_part_of_key(self, pool, origin):
+        origin.headers = {'Cache-Control': 'max-age=60'}
+        client = client_for(pool)
+
+        await client.get(origin.url, headers={'Authorization': 'a'})
+        await client.get(origin.url, headers={'Authorization': 'b'})
+        await client.get(origin.url, params={'q': 1}, headers={'Authorization': 'a'})
+
+        assert origin.hits['/resource'] == 3
+
+    @pytest.mark.asyncio
+    async def test_post_invalidates_cached_url(self, pool, origin):
+        origin.headers = {'Cache-Control': 'max-age=60'}
+        client = client_for(pool)
+
+        await client.get(origin.url)
+        await client.get(origin.url, params={'page': 2})
+        assert await client.post(origin.url, data={'x': 1}) == {'ok': True}
+        await client.get(origin.url)
+
+        assert origin.hits['/resource'] == 4
+        assert pool.stats.invalidated == 2
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_coalesced(self, pool, origin):
+        origin.headers = {'Cache-Control': 'no-store'}
+        origin.delay = 0.1
+        clients = [client_for(pool, f'p{i}') for i in range(10)]
+
+        results = await asyncio.gather(*(client.get(origin.url) for client in clients))
+
+        assert results == [{'value': 1}] * 10
+        assert origin.hits['/resource'] == 1
+        assert pool.stats.coalesced == 9
+        assert pool.get_stats()['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, pool, origin):
+        origin.headers = {'Cache-Control': 'no-store'}
+        origin.delay = 0.2
+        client = client_for(pool)
+
+        first = asyncio.ensure_future(client.get(origin.url))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(client.get(origin.url))
+        await asyncio.sleep(0.05)
+        first.cancel()
+
+        assert await second == {'value': 1}
+        assert origin.hits['/resource'] == 1
+
+
+class TestFreshness:
+    """Test freshness lifetime and age calculation"""
+
+    def test_parse_cache_control(self):
+        assert parse_cache_control('Max-Age=60, no-cache, private="x"') == {
+            'max-age': '60', 'no-cache': None, 'private': 'x'
+        }
+        assert parse_cache_control(None) == {}
+
+    def test_max_age_beats_expires(self):
+        now = 1_700_000_000.0
+        headers = {'Cache-Control': 'max-age=60', 'Expires': formatdate(now + 600, usegmt=True),
+                   'Date': formatdate(now, usegmt=True)}
+
+        age, lifetime, revalidate = freshness(headers, now, now)
+
+        assert (age, lifetime, revalidate) == (0.0, 60.0, False)
+
+    def test_expires_and_age_header(self):
+        now = 1_700_000_000.0
+        headers = {'Expires': formatdate(now + 600, usegmt=True), 'Date': formatdate(now, usegmt=True), 'Age': '30'}
+
+        age, lifetime, _ = freshness(headers, now, now)
+
+        assert lifetime == 600.0
+        assert age == 30.0
+
+    def test_heuristic_from_last_modified(self):
+        now = 1_700_000_000.0
+        headers = {'Date': formatdate(now, usegmt=True), 'Last-Modified': formatdate(now - 1000, usegmt=True)}
+
+        assert freshness(headers, now, now)[1] == 100.0
+
+    def test_no_cache_requires_revalidation(self):
+        assert freshness({'Cache-Control': 'max-age=60, no-cache'}, 0.0, 0.0)[2]
+
+
+class TestResponseCache:
+    """Test the LRU response cache bounds"""
+
+    @staticmethod
+    def entry(url, size):
+        return CacheEntry(url=url, body=b'x' * size, headers={}, stored_at=0.0)
+
+    def test_evicts_least_recently_used(self):
+        cache = HTTPResponseCache(max_entries=2)
+        cache.put(('a', (), ()), self.entry('a', 1))
+        cache.put(('b', (), ()), self.entry('b', 1))
+        cache.get(('a', (), ()))
+        cache.put(('c', (), ()), self.entry('c', 1))
+
+        assert set(key[0] for key in cache.entries) == {'a', 'c'}
+        assert cache.evictions == 1
+
+    def test_byte_bounds(self):
+        cache = HTTPResponseCache(max_bytes=100, max_entry_bytes=60)
+
+        assert not cache.put(('big', (), ()), self.entry('big', 61))
+        cache.put(('a', (), ()), self.entry('a', 50))
+        cache.put(('b', (), ()), self.entry('b', 50))
+        cache.put(('c', (), ()), self.entry('c', 50))
+
+        assert cache.bytes == 100
+        assert ('a', (), ()) not in cache.entries
+
+
+def test_create_from_config():
+    pool = create_http_pool({'max_connections_per_host': 2, 'cache': {'enabled': False, 'max_entries': 3}})
+
+    assert pool.max_connections_per_host == 2
+    assert not pool.cache_enabled
+    assert pool.cache.max_entries == 3
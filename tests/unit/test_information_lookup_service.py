@@ -323,17 +323,17 @@ class TestInformationLookupService:
     @pytest.mark.asyncio
     async def test_handle_leaderboard_battery(self, service, mock_context):
         """Test battery leaderboard command"""
-        with patch('src.services.bot.information_lookup_service.get_database') as mock_db:
-            mock_cursor = Mock()
-            mock_cursor.fetchall.return_value = [
-                ('NODE1', '!11111111', 95),
-                ('NODE2', '!22222222', 87),
-                ('NODE3', '!33333333', 72)
+        with patch('src.services.bot.information_lookup_service.get_stats_rollup') as mock_rollup:
+            mock_rollup.return_value.top_nodes.return_value = [
+                {'node_id': '!11111111', 'short_name': 'NODE1', 'value': 95},
+                {'node_id': '!22222222', 'short_name': 'NODE2', 'value': 87},
+                {'node_id': '!33333333', 'short_name': 'NODE3', 'value': 72}
             ]
-            mock_db.return_value.cursor.return_value = mock_cursor
             
             result = await service.handle_network_stats_command('leaderboard', ['battery'], mock_context)
             
+            mock_rollup.return_value.top_nodes.assert_called_once_with('battery', timedelta(hours=24))
+            
             assert '🔋 **Battery Leaderboard**' in result
             assert 'NODE1**: 95%' in result
             assert 'NODE2**: 87%' in result
@@ -0,0 +1,245 @@
+"""
+Unit tests for the shared job scheduler
+"""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.core.job_scheduler import JobScheduler, MisfirePolicy, create_job_scheduler
+
+
+class FakeClock:
+    """Wall clock the tests move by hand"""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+async def settle(scheduler, clock=None, advance=0.0):
+    """Move the fake clock, wake the driver and let started jobs finish"""
+    if clock is not None:
+        clock.now += advance
+    scheduler._wake.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def scheduler():
+    scheduler = JobScheduler()
+    yield scheduler
+    await scheduler.stop()
+
+
+@pytest_asyncio.fixture
+async def clocked():
+    clock = FakeClock()
+    scheduler = JobScheduler(clock=clock)
+    yield scheduler, clock
+    await scheduler.stop()
+
+
+class TestJobScheduler:
+    """Test firing, ordering and job management"""
+
+    @pytest.mark.asyncio
+    async def test_jobs_fire_in_due_order(self, scheduler):
+        fired = []
+        now = time.time()
+        for delay in (0.06, 0.02, 0.04):
+            scheduler.add_job(lambda delay=delay: fired.append(delay), at=now + delay)
+
+        await asyncio.sleep(0.15)
+
+        assert fired == [0.02, 0.04, 0.06]
+        assert not any(job.scheduled for job in scheduler.get_jobs())
+
+    @pytest.mark.asyncio
+    async def test_interval_job_repeats(self, scheduler):
+        runs = []
+
+        async def handler():
+            runs.append(time.time())
+
+        job = scheduler.add_job(handler, interval=0.02, start_at=time.time())
+        await asyncio.sleep(0.11)
+        job.cancel()
+
+        assert 4 <= len(runs) <= 7
+        assert job.stats.runs == len(runs)
+
+    @pytest.mark.asyncio
+    async def test_many_idle_jobs_share_one_timer(self, clocked):
+        scheduler, clock = clocked
+        jobs = [scheduler.add_job(lambda: None, interval=60, name=f"job{i}") for i in range(500)]
+        await settle(scheduler)
+        wakeups = scheduler.wakeups
+
+        await asyncio.sleep(0.05)
+
+        assert scheduler.wakeups == wakeups
+        assert scheduler.get_stats()['jobs'] == 500
+        assert all(job.scheduled for job in jobs)
+
+    @pytest.mark.asyncio
+    async def test_max_runs_and_end_at(self, clocked):
+        scheduler, clock = clocked
+        limited = scheduler.add_job(lambda: None, interval=10, start_at=clock.now, max_runs=2)
+        ending = scheduler.add_job(lambda: None, interval=10, start_at=clock.now, end_at=clock.now + 15)
+
+        await settle(scheduler)
+        for _ in range(3):
+            await settle(scheduler, clock, 10)
+
+        assert limited.stats.runs == 2
+        assert ending.stats.runs == 2
+        assert not limited.scheduled and not ending.scheduled
+
+    @pytest.mark.asyncio
+    async def test_jitter_bounds(self, clocked):
+        scheduler, clock = clocked
+        jobs = [scheduler.add_job(lambda: None, at=clock.now + 100, jitter=5) for _ in range(50)]
+
+        offsets = [job.due - (clock.now + 100) for job in jobs]
+
+        assert all(0 <= offset <= 5 for offset in offsets)
+        assert len(set(offsets)) > 1
+
+    @pytest.mark.asyncio
+    async def test_cron_job_next_fire(self, clocked):
+        scheduler, clock = clocked
+        clock.now = 1_704_067_200.0  # 2024-01-01 00:00 UTC
+
+        job = scheduler.add_job(lambda: None, cron='30 6 * * *')
+
+        assert job.next_fire.isoformat() == '2024-01-01T06:30:00+00:00'
+
+    @pytest.mark.asyncio
+    async def test_pause_resume_and_reschedule(self, clocked):
+        scheduler, clock = clocked
+        runs = []
+        job = scheduler.add_job(lambda: runs.append(clock.now), at=clock.now + 10)
+
+        scheduler.pause_job(job)
+        await settle(scheduler, clock, 20)
+        assert runs == []
+
+        scheduler.reschedule_job(job, clock.now + 5)
+        scheduler.resume_job(job)
+        await settle(scheduler, clock, 5)
+        assert len(runs) == 1
+
+        scheduler.reschedule_job(job, clock.now + 5)
+        await settle(scheduler, clock, 5)
+        assert len(runs) == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_recorded(self, clocked):
+        scheduler, clock = clocked
+
+        def broken():
+            raise RuntimeError("boom")
+
+        job = scheduler.add_job(broken, interval=10, start_at=clock.now)
+        await settle(scheduler)
+
+        assert job.stats.failures == 1
+        assert job.stats.last_error == "boom"
+        assert job.scheduled
+
+    @pytest.mark.asyncio
+    async def test_overlapping_fire_dropped(self, clocked):
+        scheduler, clock = clocked
+        release = asyncio.Event()
+        started = []
+
+        async def slow():
+            started.append(clock.now)
+            await release.wait()
+
+        job = scheduler.add_job(slow, interval=10, start_at=clock.now)
+        await settle(scheduler)
+        await settle(scheduler, clock, 10)
+        release.set()
+        await settle(scheduler)
+
+        assert len(started) == 1
+        assert job.stats.overlaps == 1
+
+    @pytest.mark.asyncio
+    async def test_get_jobs_by_owner(self, scheduler):
+        scheduler.add_job(lambda: None, interval=60, owner='weather')
+        scheduler.add_job(lambda: None, interval=60, owner='bbs')
+
+        assert [job.owner for job in scheduler.get_jobs('weather')] == ['weather']
+        assert len(scheduler.get_jobs()) == 2
+
+    def test_trigger_required(self, scheduler):
+        with pytest.raises(ValueError):
+            scheduler.add_job(lambda: None)
+        with pytest.raises(ValueError):
+            scheduler.add_job(lambda: None, interval=1, cron='* * * * *')
+        with pytest.raises(ValueError):
+            scheduler.add_job(lambda: None, interval=0)
+
+
+class TestMisfirePolicy:
+    """Test handling of fires that come due late"""
+
+    @staticmethod
+    async def run_late(clocked, policy):
+        scheduler, clock = clocked
+        runs = []
+        job = scheduler.add_job(lambda: runs.append(clock.now), interval=10,
+                                start_at=clock.now + 10, misfire=policy)
+        # Suspended for three and a half intervals
+        await settle(scheduler, clock, 45)
+        await settle(scheduler)
+        return job, runs, clock
+
+    @pytest.mark.asyncio
+    async def test_skip(self, clocked):
+        job, runs, clock = await self.run_late(clocked, MisfirePolicy.SKIP)
+
+        assert runs == []
+        assert job.stats.misfires == 1
+        assert job.nominal == clock.now + 5
+
+    @pytest.mark.asyncio
+    async def test_run_once(self, clocked):
+        job, runs, clock = await self.run_late(clocked, MisfirePolicy.RUN_ONCE)
+
+        assert len(runs) == 1
+        assert job.nominal == clock.now + 5
+
+    @pytest.mark.asyncio
+    async def test_run_all(self, clocked):
+        job, runs, clock = await self.run_late(clocked, MisfirePolicy.RUN_ALL)
+
+        assert len(runs) == 4
+        assert job.nominal == clock.now + 5
+
+    @pytest.mark.asyncio
+    async def test_within_grace_runs(self, clocked):
+        scheduler, clock = clocked
+        runs = []
+        scheduler.add_job(lambda: runs.append(clock.now), at=clock.now + 10,
+                          misfire=MisfirePolicy.SKIP, misfire_grace=60)
+
+        await settle(scheduler, clock, 40)
+
+        assert len(runs) == 1
+
+
+def test_create_from_config():
+    scheduler = create_job_scheduler({'max_sleep': 30, 'misfire_grace': 5, 'timezone': 'Europe/Berlin'})
+
+    assert scheduler.max_sleep == 30.0
+    assert scheduler.misfire_grace == 5.0
+    assert str(scheduler.tz) == 'Europe/Berlin'
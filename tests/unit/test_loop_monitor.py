@@ -0,0 +1,141 @@
+"""
+Unit tests for the event loop monitor
+
+Tests lag measurement, capture of blocking callbacks with their coroutine,
+owning plugin and stack, and health monitor alerts.
+"""
+
+import asyncio
+import importlib.util
+import textwrap
+import time
+
+import pytest
+
+from src.core.health_monitor import AlertSeverity, HealthMonitor
+from src.core.loop_monitor import LoopMonitor, create_loop_monitor
+
+
+@pytest.fixture
+def slow_plugin(tmp_path):
+    """A module that lives in plugins/slowplug/ and blocks the loop"""
+    plugin_dir = tmp_path / "plugins" / "slowplug"
+    plugin_dir.mkdir(parents=True)
+    path = plugin_dir / "handler.py"
+    path.write_text(textwrap.dedent("""
+        import time
+
+        async def handle_weather(seconds):
+            time.sleep(seconds)
+    """))
+    spec = importlib.util.spec_from_file_location("slowplug_handler", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def wait_until(condition, timeout=2.0):
+    """Poll until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        await asyncio.sleep(0.01)
+
+
+class TestLoopMonitor:
+    """Test lag measurement and slow callback capture"""
+
+    @pytest.mark.asyncio
+    async def test_measures_lag(self):
+        monitor = LoopMonitor(interval=0.01)
+        await monitor.start()
+        await wait_until(lambda: monitor.stats.ticks >= 5)
+        await monitor.stop()
+
+        stats = monitor.get_stats()
+        assert not stats['running']
+        assert stats['lag']['count'] >= 5
+        assert stats['blocked'] == 0
+        assert stats['lag']['p50'] < 0.05
+
+    @pytest.mark.asyncio
+    async def test_captures_blocking_coroutine(self, slow_plugin):
+        monitor = LoopMonitor(interval=0.01, slow_callback_threshold=0.05)
+        await monitor.start()
+        await asyncio.sleep(0.03)
+
+        await asyncio.create_task(slow_plugin.handle_weather(0.3), name="weather-request")
+        await wait_until(lambda: monitor.events and monitor.events[-1].finished)
+        await monitor.stop()
+
+        event = monitor.events[-1]
+        assert monitor.stats.blocked == 1
+        assert event.source == 'plugin:slowplug'
+        assert event.task == 'weather-request'
+        assert event.coroutine == 'handle_weather'
+        assert 'handler.py' in event.stack[-1] and 'handle_weather' in event.stack[-1]
+        assert 0.2 < event.lag < 0.5
+        assert monitor.get_stats()['blocked_by_source'] == {'plugin:slowplug': 1}
+
+    @pytest.mark.asyncio
+    async def test_short_stalls_not_captured(self):
+        monitor = LoopMonitor(interval=0.01, slow_callback_threshold=0.2)
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.05)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert monitor.stats.blocked == 0
+        assert monitor.stats.max_lag >= 0.03
+
+    @pytest.mark.asyncio
+    async def test_window_stats_reset(self):
+        monitor = LoopMonitor(interval=0.01)
+        await monitor.start()
+        await wait_until(lambda: monitor.stats.ticks >= 3)
+        await monitor.stop()
+
+        assert monitor.take_window_stats()['count'] >= 3
+        assert monitor.take_window_stats() == {'count': 0}
+        assert monitor.lag.count >= 3
+
+    def test_create_from_config(self):
+        monitor = create_loop_monitor({'interval': 0.5, 'slow_callback_threshold': 0.2, 'max_events': 5})
+
+        assert (monitor.interval, monitor.slow_callback_threshold) == (0.5, 0.2)
+        assert monitor.events.maxlen == 5
+
+
+class TestHealthMonitorLoopIntegration:
+    """Test loop health reporting through the health monitor"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_raises_alert(self, slow_plugin):
+        health = HealthMonitor({'loop_monitor': {'interval': 0.01, 'slow_callback_threshold': 0.05}})
+        await health.start()
+        await asyncio.sleep(0.03)
+
+        await slow_plugin.handle_weather(0.2)
+        events = health.loop_monitor.events
+        await wait_until(lambda: events and events[-1].finished)
+        await health._check_loop_alerts()
+        status = health.get_system_status()
+        await health.stop()
+
+        alerts = [a for a in health.alerts if a.source == 'event_loop']
+        assert any(a.message == 'Event loop blocked by plugin:slowplug' for a in alerts)
+        assert any(a.severity == AlertSeverity.WARNING and 'lag p99' in a.message for a in alerts)
+        assert status['event_loop']['blocked'] == 1
+        assert 'event_loop_lag_ms' in health.get_performance_metrics()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        health = HealthMonitor({'loop_monitor': {'enabled': False}})
+        await health.start()
+        await health._check_loop_alerts()
+        await health.stop()
+
+        assert health.loop_monitor is None
+        assert health.get_system_status()['event_loop'] == {'running': False}
@@ -6,11 +6,11 @@ Tests message routing logic, classification, and core functionality.
 
 import asyncio
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime
 from unittest.mock import Mock, AsyncMock, patch
 
 from src.models.message import Message, MessageType, MessagePriority, SOSType, UserProfile
-from src.core.message_router import CoreMessageRouter, MessageClassifier, RouteRule, RateLimitBucket
+from src.core.message_router import CoreMessageRouter, MessageClassifier, RouteRule
 from src.core.config import ConfigurationManager
 from src.core.database import DatabaseManager
 
@@ -148,44 +148,6 @@ class TestRouteRule:
         assert not rule.matches(message, None)
 
 
-class TestRateLimitBucket:
-    """Test rate limiting bucket"""
-    
-    def test_token_consumption(self):
-        """Test token consumption"""
-        bucket = RateLimitBucket(
-            tokens=5.0,
-            last_refill=datetime.utcnow(),
-            max_tokens=5.0,
-            refill_rate=1.0
-        )
-        
-        # Should be able to consume tokens
-        assert bucket.can_consume(3.0)
-        assert bucket.consume(3.0)
-        assert bucket.tokens == 2.0
-        
-        # Should not be able to consume more than available
-        assert not bucket.can_consume(3.0)
-        assert not bucket.consume(3.0)
-        assert bucket.tokens == 2.0
-    
-    def test_token_refill(self):
-        """Test token refill over time"""
-        past_time = datetime.utcnow() - timedelta(seconds=2)
-        bucket = RateLimitBucket(
-            tokens=0.0,
-            last_refill=past_time,
-            max_tokens=5.0,
-            refill_rate=1.0  # 1 token per second
-        )
-        
-        # Should refill tokens based on elapsed time
-        bucket._refill()
-        assert bucket.tokens >= 2.0  # At least 2 tokens after 2 seconds
-        assert bucket.tokens <= 5.0  # But not more than max
-
-
 @pytest.fixture
 async def mock_config():
     """Mock configuration manager"""
@@ -293,6 +255,44 @@ class TestCoreMessageRouter:
         # Verify bot service was called
         bot_service.handle_message.assert_called()
     
+    @pytest.mark.asyncio
+    async def test_hung_service_does_not_block_later_messages(self, message_router):
+        """A service that never returns does not hold up routing of other messages"""
+        hung = asyncio.Event()
+        
+        class HungService:
+            async def handle_message(self, message):
+                await hung.wait()
+        
+        bot_service = AsyncMock()
+        message_router.register_service('emergency', HungService())
+        message_router.register_service('bot', bot_service)
+        
+        for _ in range(message_router.routing_workers + 1):
+            await message_router.process_message(Message(content="SOS help needed", sender_id="!1"), 'test')
+        await message_router.process_message(Message(content="help", sender_id="!2"), 'test')
+        await asyncio.sleep(0.2)
+        
+        bot_service.handle_message.assert_called()
+        hung.set()
+    
+    @pytest.mark.asyncio
+    async def test_message_trace(self, message_router):
+        """Test that each routing stage is recorded on the message's trace"""
+        message_router.register_service('emergency', AsyncMock())
+        
+        message = Message(content="SOS help needed", sender_id="!12345678")
+        await message_router.process_message(message, 'test_interface')
+        await asyncio.sleep(0.2)
+        
+        trace = message_router.tracer.get_trace(message.id)
+        names = [span.name for span in trace.spans]
+        assert trace.attributes['interface'] == 'test_interface'
+        for stage in ('reassemble', 'store_history', 'queue_wait', 'user_lookup', 'classify',
+                      'service:emergency', 'dispatch', 'routing_info'):
+            assert stage in names
+        assert names.index('classify') < names.index('service:emergency') < names.index('routing_info')
+    
     @pytest.mark.asyncio
     async def test_rate_limiting(self, message_router):
         """Test rate limiting functionality"""
@@ -306,8 +306,45 @@ class TestCoreMessageRouter:
             # Note: This will fail without actual interfaces, but tests the rate limiting logic
         
         # Verify rate limiting is applied
-        rate_key = f"sender_{sender_id}"
-        assert rate_key in message_router.rate_limiters
+        assert sender_id in message_router.rate_limiter.senders
+        assert message_router.rate_limiter.get_stats()['allowed'] == 3
+    
+    @pytest.mark.asyncio
+    async def test_rate_limited_messages_dropped_by_default(self, message_router):
+        """Limited messages are dropped without waiting for tokens"""
+        message_router._deliver = AsyncMock(return_value=True)
+        sender_id = "!12345678"
+        
+        results = [await message_router.send_message(Message(content="hi", sender_id=sender_id))
+                   for _ in range(6)]
+        
+        assert results == [True] * 5 + [False]
+        assert message_router._deliver.await_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_delay_mode_does_not_block_caller(self, mock_db):
+        """Delay mode sends limited messages from a background task"""
+        config = Mock(spec=ConfigurationManager)
+        config.get.side_effect = lambda key, default=None: (
+            {'mode': 'delay', 'max_delay': 5, 'global': False, 'channel': False,
+             'sender': {'capacity': 1, 'refill_rate': 20.0}}
+            if key == 'routing.rate_limit' else default
+        )
+        router = CoreMessageRouter(config, mock_db)
+        router._deliver = AsyncMock(return_value=True)
+        await router.start()
+        try:
+            loop = asyncio.get_event_loop()
+            start = loop.time()
+            assert await router.send_message(Message(content="one", sender_id="!a"))
+            assert await router.send_message(Message(content="two", sender_id="!a"))
+            assert loop.time() - start < 0.04
+            assert router._deliver.await_count == 1
+            
+            await asyncio.gather(*router._delayed_sends)
+            assert router._deliver.await_count == 2
+        finally:
+            await router.stop()
     
     @pytest.mark.asyncio
     async def test_message_chunking(self, message_router):
@@ -0,0 +1,167 @@
+"""
+Unit tests for the metrics registry
+
+Tests log-bucket histogram accuracy and fixed memory, bounded label
+cardinality and Prometheus/OpenMetrics text exposition.
+"""
+
+import math
+import random
+import threading
+
+import pytest
+
+from src.core.metrics import LogHistogram, MetricsRegistry, create_metrics_registry
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(percent / 100 * len(ordered))) - 1]
+
+
+class TestLogHistogram:
+    """Test the fixed-memory histogram"""
+
+    @pytest.mark.parametrize("percent", [50, 90, 99, 99.9])
+    def test_percentiles_within_precision(self, percent):
+        rng = random.Random(3)
+        values = [rng.lognormvariate(-4, 1.5) for _ in range(20000)]
+        histogram = LogHistogram(precision_bits=6)
+        for value in values:
+            histogram.record(value)
+
+        expected = exact_percentile(values, percent)
+        assert histogram.percentile(percent) == pytest.approx(expected, rel=2 ** -6)
+
+    def test_memory_is_fixed(self):
+        histogram = LogHistogram()
+        size = histogram.memory_bytes
+
+        for i in range(100000):
+            histogram.record(i * 1e-4)
+
+        assert histogram.memory_bytes == size
+        assert histogram.count == 100000
+
+    def test_values_outside_range(self):
+        histogram = LogHistogram(lowest=1e-3, highest=10)
+        histogram.record(0)
+        histogram.record(-1)
+        histogram.record(1e6)
+
+        # Zero and negative values share the first bucket; large values the last
+        assert histogram.percentile(50) < 1e-3
+        assert histogram.percentile(100) == 1e6
+        assert (histogram.min, histogram.max) == (-1, 1e6)
+
+    def test_stats(self):
+        histogram = LogHistogram()
+        assert histogram.get_stats() == {'count': 0}
+        assert histogram.percentile(50) == 0.0
+
+        for value in (0.1, 0.2, 0.3):
+            histogram.record(value)
+        stats = histogram.get_stats()
+
+        assert stats['count'] == 3
+        assert stats['avg'] == pytest.approx(0.2)
+        assert (stats['min'], stats['max']) == (0.1, 0.3)
+        assert stats['p50'] == pytest.approx(0.2, rel=2 ** -6)
+
+
+class TestMetricsRegistry:
+    """Test metric families and exposition"""
+
+    @pytest.fixture
+    def registry(self):
+        return MetricsRegistry(namespace='test', max_series=3)
+
+    def test_get_or_create(self, registry):
+        counter = registry.counter('events_total', 'Events', ['kind'])
+
+        assert registry.counter('events_total', 'Events', ['kind']) is counter
+        with pytest.raises(ValueError):
+            registry.gauge('events_total', 'Events', ['kind'])
+        with pytest.raises(ValueError):
+            registry.counter('events_total', 'Events', ['other'])
+
+    def test_counter_and_gauge(self, registry):
+        counter = registry.counter('events_total', 'Events', ['kind'])
+        gauge = registry.gauge('depth', 'Queue depth')
+
+        counter.labels(kind='a').inc()
+        counter.labels('a').inc(2)
+        gauge.set(5)
+        gauge.dec()
+
+        assert counter.labels(kind='a').value == 3
+        assert gauge.series[()].value == 4
+        with pytest.raises(ValueError):
+            counter.labels(kind='a').inc(-1)
+        with pytest.raises(ValueError):
+            counter.inc()
+
+    def test_label_cardinality_bounded(self, registry):
+        counter = registry.counter('senders_total', 'Per sender', ['sender'])
+
+        for i in range(10):
+            counter.labels(sender=f"!{i:08x}").inc()
+
+        assert len(counter.series) == 4  # three real series plus the overflow series
+        assert counter.labels(sender='other').value == 7
+        assert registry.get_stats()['overflowed_series'] == 7
+
+    def test_prometheus_text(self, registry):
+        registry.counter('events_total', 'Events seen', ['kind']).labels(kind='a "quoted"').inc()
+        registry.gauge('depth', 'Queue depth').set(2.5)
+        latency = registry.histogram('stage_seconds', 'Stage latency', ['stage'])
+        for value in (0.01, 0.02, 0.03):
+            latency.labels(stage='dispatch').observe(value)
+
+        text = registry.render()
+
+        assert '# TYPE test_events_total counter' in text
+        assert 'test_events_total{kind="a \\"quoted\\""} 1' in text
+        assert 'test_depth 2.5' in text
+        assert '# TYPE test_stage_seconds summary' in text
+        assert 'test_stage_seconds{stage="dispatch",quantile="0.5"}' in text
+        assert 'test_stage_seconds_count{stage="dispatch"} 3' in text
+        assert text.endswith('\n') and '# EOF' not in text
+
+    def test_openmetrics_text(self, registry):
+        registry.counter('events_total', 'Events seen').inc()
+
+        text = registry.render(openmetrics=True)
+
+        assert '# TYPE test_events counter' in text
+        assert 'test_events_total 1' in text
+        assert text.endswith('# EOF\n')
+
+    def test_timer(self, registry):
+        latency = registry.histogram('call_seconds', 'Call latency')
+        with latency.time():
+            pass
+
+        assert latency.series[()].histogram.count == 1
+
+    def test_concurrent_increments(self, registry):
+        counter = registry.counter('hits_total', 'Hits')
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.series[()].value == 40000
+
+    def test_create_from_config(self):
+        registry = create_metrics_registry({'namespace': 'zg', 'histogram': {'precision_bits': 4}})
+        histogram = registry.histogram('x_seconds', 'X')
+
+        assert histogram.name == 'zg_x_seconds'
+        assert histogram.series[()].histogram.precision_bits == 4
@@ -0,0 +1,148 @@
+"""
+Unit tests for the write-behind node registry
+
+Tests update coalescing, batched flushing, cache statistics,
+memory bounds and flush-on-stop behaviour.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.database import DatabaseManager
+from src.core.node_registry import NodeRegistry
+
+
+@pytest.fixture
+def db_manager():
+    """Create a real database in a temporary directory"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseManager(str(Path(tmpdir) / "test.db"))
+        yield db
+        db.close()
+
+
+def count_rows(db, table):
+    return db.execute_query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+
+class TestNodeRegistry:
+    """Test node registry caching and flushing"""
+
+    def test_updates_are_coalesced(self, db_manager):
+        """Repeated updates for one node produce a single write"""
+        registry = NodeRegistry(db_manager, flush_interval=3600)
+
+        for i in range(100):
+            registry.update_node("!aabbccdd", {'snr': float(i), 'last_seen': f"2024-01-01T00:00:{i % 60:02d}"})
+
+        assert count_rows(db_manager, 'users') == 0
+
+        rows = registry.flush()
+        assert rows == 1
+
+        user = db_manager.get_user("!aabbccdd")
+        assert user['snr'] == 99.0
+        assert user['short_name'] == "ccdd"
+
+        stats = registry.get_stats()
+        assert stats['updates'] == 100
+        assert stats['updates_coalesced'] == 99
+        assert stats['cache_misses'] == 1
+        assert stats['cache_hits'] == 99
+        assert stats['dirty_nodes'] == 0
+
+    def test_hardware_flushed_with_user(self, db_manager):
+        """Telemetry updates write both the user and node_hardware rows"""
+        registry = NodeRegistry(db_manager, flush_interval=3600)
+
+        registry.update_node("!00000001", {'battery_level': 80}, {'battery_level': 80, 'voltage': 4.1})
+        registry.update_node("!00000001", {'battery_level': 79}, {'battery_level': 79})
+
+        assert registry.flush() == 2
+
+        rows = db_manager.execute_query("SELECT battery_level, voltage FROM node_hardware WHERE node_id = ?",
+                                        ("!00000001",))
+        assert rows[0]['battery_level'] == 79
+        assert rows[0]['voltage'] == 4.1
+
+    def test_known_short_name_not_overwritten(self, db_manager):
+        """Packets without nodeinfo keep the short name from the database"""
+        db_manager.upsert_user({'node_id': '!00000002', 'short_name': 'BOB'})
+        registry = NodeRegistry(db_manager, flush_interval=3600)
+
+        registry.update_node("!00000002", {'snr': 5.0})
+        registry.flush()
+
+        assert db_manager.get_user("!00000002")['short_name'] == 'BOB'
+
+    def test_threshold_triggers_background_flush(self, db_manager):
+        """Reaching the dirty threshold wakes the flush thread early"""
+        registry = NodeRegistry(db_manager, flush_interval=3600, flush_threshold=5)
+        registry.start()
+        try:
+            for i in range(5):
+                registry.update_node(f"!{i:08x}", {'snr': 1.0})
+
+            deadline = time.monotonic() + 5
+            while count_rows(db_manager, 'users') < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert count_rows(db_manager, 'users') == 5
+        finally:
+            registry.stop()
+
+    def test_stop_flushes_pending_updates(self, db_manager):
+        """A clean shutdown writes out all dirty nodes"""
+        registry = NodeRegistry(db_manager, flush_interval=3600)
+        registry.start()
+
+        for i in range(20):
+            registry.update_node(f"!{i:08x}", {'rssi': -90.0})
+        registry.stop()
+
+        assert count_rows(db_manager, 'users') == 20
+
+    def test_failed_flush_keeps_pending_updates(self):
+        """Updates survive a failed flush and newer values win on retry"""
+        db = Mock()
+        db.transaction.side_effect = Exception("database locked")
+        registry = NodeRegistry(db, flush_interval=3600)
+
+        registry.update_node("!00000003", {'snr': 1.0})
+        assert registry.flush() == 0
+        registry.update_node("!00000003", {'snr': 2.0})
+
+        stats = registry.get_stats()
+        assert stats['flush_failures'] == 1
+        assert stats['dirty_nodes'] == 1
+        assert registry.dirty["!00000003"].pending_fields['snr'] == 2.0
+
+    def test_clean_nodes_evicted_beyond_cap(self, db_manager):
+        """Clean nodes are evicted once the memory cap is exceeded"""
+        registry = NodeRegistry(db_manager, flush_interval=3600, max_nodes=10)
+
+        for i in range(10):
+            registry.update_node(f"!{i:08x}", {'snr': 1.0})
+        registry.flush()
+        for i in range(10, 15):
+            registry.update_node(f"!{i:08x}", {'snr': 1.0})
+
+        stats = registry.get_stats()
+        assert stats['cached_nodes'] == 10
+        assert stats['evictions'] == 5
+        assert stats['dirty_nodes'] == 5
+
+    def test_get_node_reads_through_on_miss(self, db_manager):
+        """get_node serves cached state and falls back to the database"""
+        db_manager.upsert_user({'node_id': '!00000004', 'short_name': 'DB'})
+        registry = NodeRegistry(db_manager, flush_interval=3600)
+
+        assert registry.get_node("!00000004")['short_name'] == 'DB'
+
+        registry.update_node("!00000005", {'short_name': 'MEM'})
+        assert registry.get_node("!00000005")['short_name'] == 'MEM'
+        assert registry.get_node("!ffffffff") is None
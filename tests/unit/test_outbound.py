@@ -0,0 +1,295 @@
+"""
+Unit tests for outbound interface selection
+
+Tests send health tracking, the selection policies, failover in the
+message router and rerouting of unsent messages in InterfaceManager.
+"""
+
+import asyncio
+import random
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.models.message import InterfaceConfig, Message
+from src.core import airtime as airtime_module
+from src.core.config import ConfigurationManager
+from src.core.database import DatabaseManager
+from src.core.interfaces import InterfaceManager, InterfaceStatus, MeshtasticInterface
+from src.core.message_router import CoreMessageRouter
+from src.core.outbound import OutboundSelector, SendHealth, create_outbound_selector
+
+
+class FakeInterface:
+    """Minimal interface exposing what the selector looks at"""
+
+    def __init__(self, status=InterfaceStatus.CONNECTED, depth=0):
+        self.status = status
+        self.send_queue = asyncio.Queue()
+        for _ in range(depth):
+            self.send_queue.put_nowait(None)
+        self.send_health = SendHealth()
+        self.send_message = AsyncMock(return_value=True)
+
+
+class FlakyInterface(MeshtasticInterface):
+    """Interface whose sends succeed or fail on demand"""
+
+    def __init__(self, interface_id, callback, fail=False):
+        super().__init__(InterfaceConfig(id=interface_id, type="serial"), callback)
+        self.fail = fail
+        self.sent = []
+
+    async def _connect(self):
+        return True
+
+    async def _disconnect(self):
+        pass
+
+    async def _send_message(self, message):
+        if self.fail:
+            return False
+        self.sent.append(message.content)
+        return True
+
+    async def _receive_messages(self):
+        while self.status == InterfaceStatus.CONNECTED:
+            await asyncio.sleep(0.1)
+
+
+@pytest.fixture(autouse=True)
+def fast_airtime():
+    """Short airtime slots so tests do not wait on LONG_FAST pacing"""
+    previous = airtime_module.airtime_scheduler
+    airtime_module.initialize_airtime_scheduler({'modem_preset': 'SHORT_TURBO', 'duty_cycle_percent': 100})
+    yield airtime_module.airtime_scheduler
+    airtime_module.airtime_scheduler = previous
+
+
+def message(channel=0, content="hello"):
+    return Message(content=content, sender_id="!a1b2c3d4", channel=channel)
+
+
+async def wait_until(condition, timeout=3.0):
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not condition():
+        if asyncio.get_event_loop().time() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        await asyncio.sleep(0.01)
+
+
+class TestSendHealth:
+    """Test send latency and error tracking"""
+
+    def test_latency_and_errors(self):
+        health = SendHealth(window=4, alpha=0.5)
+
+        health.record(True, 0.1)
+        health.record(True, 0.3)
+        health.record(False, 0.1)
+        health.record(False)
+
+        assert health.latency == pytest.approx(0.15)
+        assert health.error_rate == 0.5
+        assert health.consecutive_failures == 2
+
+        health.record(True, 0.15)
+        assert health.consecutive_failures == 0
+        assert health.error_rate == 0.5  # oldest outcome left the window
+
+
+class TestOutboundSelector:
+    """Test the selection policies"""
+
+    def test_round_robin_skips_disconnected(self):
+        selector = OutboundSelector('round_robin')
+        interfaces = {'a': FakeInterface(), 'b': FakeInterface(InterfaceStatus.RECONNECTING), 'c': FakeInterface()}
+
+        first = [selector.candidates(message(), interfaces)[0] for _ in range(4)]
+
+        assert first == ['a', 'c', 'a', 'c']
+        assert selector.candidates(message(), interfaces) == ['a', 'c']
+
+    def test_least_loaded(self, fast_airtime):
+        selector = OutboundSelector('least_loaded')
+        interfaces = {'a': FakeInterface(depth=3), 'b': FakeInterface()}
+        assert selector.candidates(message(), interfaces) == ['b', 'a']
+
+        # Airtime already booked on an interface counts as load
+        fast_airtime.reserve('b', 200)
+        assert selector.candidates(message(), interfaces) == ['a', 'b']
+
+    def test_channel_affinity(self):
+        selector = create_outbound_selector({'policy': 'channel_affinity', 'affinity': {'1': 'a'}})
+        interfaces = {'a': FakeInterface(), 'b': FakeInterface()}
+
+        assert selector.candidates(message(channel=1), interfaces)[0] == 'a'
+        assert selector.candidates(message(channel=2), interfaces)[0] == 'a'  # hashed
+        assert selector.candidates(message(channel=3), interfaces)[0] == 'b'
+
+        interfaces['a'].status = InterfaceStatus.FAILED
+        assert selector.candidates(message(channel=1), interfaces) == ['b']
+
+    def test_health_weighted_prefers_reliable_interface(self):
+        selector = OutboundSelector('health_weighted', rng=random.Random(1))
+        interfaces = {'good': FakeInterface(), 'bad': FakeInterface()}
+        for _ in range(10):
+            interfaces['good'].send_health.record(True, 0.01)
+            interfaces['bad'].send_health.record(False, 0.5)
+            interfaces['bad'].send_health.record(True, 0.5)
+
+        picks = [selector.candidates(message(), interfaces)[0] for _ in range(200)]
+
+        assert picks.count('good') > 150
+
+    def test_failing_interface_tried_last_until_recovered(self):
+        now = [100.0]
+        selector = OutboundSelector('round_robin', failure_threshold=2, recovery_time=30, clock=lambda: now[0])
+        interfaces = {'a': FakeInterface(), 'b': FakeInterface()}
+        interfaces['a'].send_health.clock = lambda: now[0]
+        selector.record_failure(interfaces['a'])
+        selector.record_failure(interfaces['a'])
+
+        assert selector.candidates(message(), interfaces) == ['b', 'a']
+        assert selector.candidates(message(), interfaces) == ['b', 'a']
+
+        now[0] += 31
+        assert selector.candidates(message(), interfaces)[0] == 'a'
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            create_outbound_selector({'policy': 'fastest'})
+
+
+@pytest.fixture
+def router():
+    config = Mock(spec=ConfigurationManager)
+    values = {
+        'routing.outbound': {'policy': 'least_loaded'},
+        'routing.rate_limit': {'global': False, 'channel': False, 'sender': False, 'tiers': {'emergency': False}},
+        'meshtastic.max_message_size': 228,
+        'database.async_writes': False
+    }
+    config.get.side_effect = lambda key, default=None: values.get(key, default)
+    return CoreMessageRouter(config, Mock(spec=DatabaseManager))
+
+
+class TestRouterBalancing:
+    """Test balanced sending in the message router"""
+
+    @pytest.mark.asyncio
+    async def test_messages_spread_across_interfaces(self, router):
+        interfaces = {'a': FakeInterface(), 'b': FakeInterface()}
+        for iface_id, interface in interfaces.items():
+            router.register_interface(iface_id, interface)
+
+        await asyncio.gather(*(router.send_message(message(content=f"msg {i}")) for i in range(10)))
+
+        counts = [interface.send_message.await_count for interface in interfaces.values()]
+        assert sum(counts) == 10
+        assert min(counts) >= 4
+        assert router.get_stats()['outbound']['selections'] == 10
+
+    @pytest.mark.asyncio
+    async def test_failover_sends_remaining_chunks(self, router):
+        broken, working = FakeInterface(), FakeInterface()
+        broken.send_message.side_effect = [True, False]  # fails on the second chunk
+        router.register_interface('broken', broken)
+        router.register_interface('working', working)
+        router.outbound.candidates = Mock(return_value=['broken', 'working'])
+
+        assert await router.send_message(message(content="x" * 500))
+
+        chunks = len(router._chunk_message(message(content="x" * 500)))
+        assert working.send_message.await_count == chunks - 1
+        assert broken.send_health.failures == 1
+        assert router.get_stats()['outbound']['failovers'] == 1
+
+    @pytest.mark.asyncio
+    async def test_fails_when_no_interface_connected(self, router):
+        router.register_interface('a', FakeInterface(InterfaceStatus.DISCONNECTED))
+
+        assert not await router.send_message(message())
+        assert router.stats['messages_failed'] == 1
+
+
+class TestInterfaceManagerRerouting:
+    """Test rerouting of messages an interface could not send"""
+
+    async def manager_with(self, *interfaces):
+        manager = InterfaceManager(Mock(), outbound=OutboundSelector('round_robin'))
+        for interface in interfaces:
+            interface.reroute_callback = manager.reroute_message
+            manager.interfaces[interface.config.id] = interface
+            await interface.start()
+        await wait_until(lambda: all(i.status == InterfaceStatus.CONNECTED for i in interfaces))
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_failed_send_rerouted(self):
+        broken = FlakyInterface('broken', Mock(), fail=True)
+        working = FlakyInterface('working', Mock())
+        manager = await self.manager_with(broken, working)
+        try:
+            await broken.send_message(message(content="wx report"))
+
+            await wait_until(lambda: working.sent == ["wx report"])
+            assert manager.get_stats()['outbound']['reroutes'] == 1
+        finally:
+            await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_rerouted_message_paced_by_target_worker(self, fast_airtime, monkeypatch):
+        """The failing worker only enqueues; the target waits for its own airtime"""
+        released = asyncio.Event()
+        acquire = fast_airtime.acquire
+
+        async def gated_acquire(interface_id, size):
+            if interface_id == 'working':
+                await released.wait()
+            return await acquire(interface_id, size)
+
+        monkeypatch.setattr(fast_airtime, 'acquire', gated_acquire)
+        broken = FlakyInterface('broken', Mock(), fail=True)
+        working = FlakyInterface('working', Mock())
+        manager = await self.manager_with(broken, working)
+        try:
+            await broken.send_message(message(content="first"))
+            await broken.send_message(message(content="second"))
+
+            # Both failures were handed off while the target was still waiting for airtime
+            await wait_until(lambda: manager.outbound.stats.reroutes == 2)
+            assert working.sent == []
+
+            released.set()
+            await wait_until(lambda: working.sent == ["first", "second"])
+        finally:
+            await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_queued_messages_moved_when_interface_stops(self):
+        leaving = FlakyInterface('leaving', Mock())
+        staying = FlakyInterface('staying', Mock())
+        manager = await self.manager_with(leaving, staying)
+        try:
+            leaving.send_task.cancel()
+            for i in range(3):
+                leaving.send_queue.put_nowait(message(content=f"queued {i}"))
+
+            await leaving.stop()
+
+            await wait_until(lambda: len(staying.sent) == 3)
+        finally:
+            await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_reroutes_are_bounded(self):
+        a, b = FlakyInterface('a', Mock(), fail=True), FlakyInterface('b', Mock(), fail=True)
+        manager = await self.manager_with(a, b)
+        try:
+            await a.send_message(message())
+
+            await wait_until(lambda: manager.outbound.stats.reroute_failures == 1)
+            assert a.send_health.failures + b.send_health.failures == 2
+        finally:
+            await manager.stop_all()
@@ -0,0 +1,217 @@
+"""
+Unit tests for packet capture and replay
+
+Tests the capture file format, recording from the serial packet handlers
+and replaying captures through ReplayInterface at recorded, scaled and
+unpaced speed.
+"""
+
+import asyncio
+import gzip
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.models.message import InterfaceConfig, MessageType
+from src.core import interfaces as interfaces_module
+from src.core.interfaces import InterfaceFactory, InterfaceStatus, ReplayInterface, SerialInterface
+from src.core.packet_capture import CaptureError, PacketCaptureWriter, SEND_TOPIC, read_capture
+
+
+def text_packet(sender, text):
+    return {
+        'fromId': sender, 'toId': '^all', 'channel': 0, 'rxSnr': 6.5, 'rxRssi': -80,
+        'hopStart': 3, 'hopLimit': 2,
+        'decoded': {'portnum': 'TEXT_MESSAGE_APP', 'text': text, 'payload': text.encode()}
+    }
+
+
+def telemetry_packet(sender):
+    return {
+        'fromId': sender, 'channel': 0,
+        'decoded': {'telemetry': {'deviceMetrics': {'batteryLevel': 87, 'voltage': 4.01}}}
+    }
+
+
+@pytest.fixture
+def node_registry(monkeypatch):
+    """Keep replayed node updates out of the global database"""
+    registry = Mock()
+    monkeypatch.setattr(interfaces_module, 'get_node_registry', lambda: registry)
+    return registry
+
+
+def write_capture(path, packets, interface_id='radio1'):
+    """Write (delay, topic, packet) entries with real spacing"""
+    writer = PacketCaptureWriter(str(path), interface_id)
+    writer.open()
+    for delay, topic, packet in packets:
+        time.sleep(delay)
+        writer.record(topic, packet)
+    writer.close()
+    return writer
+
+
+def replay_interface(path, callback, **metadata):
+    config = InterfaceConfig(id="replay1", type="replay", connection_string=str(path), metadata=metadata)
+    return InterfaceFactory.create_interface(config, callback)
+
+
+async def wait_until(condition, timeout=3.0):
+    """Poll until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        await asyncio.sleep(0.01)
+
+
+class TestCaptureFile:
+    """Test writing and reading capture files"""
+
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / "capture.jsonl.gz"
+        packet = text_packet('!a1b2c3d4', 'hello mesh')
+        packet['raw'] = object()  # protobuf object, not serializable
+        writer = write_capture(path, [
+            (0, 'meshtastic.receive.text', packet),
+            (0.05, 'meshtastic.receive.telemetry', telemetry_packet('!a1b2c3d4'))
+        ])
+
+        captured = list(read_capture(str(path)))
+
+        assert writer.get_stats()['packets'] == 2
+        assert [c.topic for c in captured] == ['meshtastic.receive.text', 'meshtastic.receive.telemetry']
+        assert captured[0].packet['decoded']['payload'] == b'hello mesh'
+        assert 'raw' not in captured[0].packet
+        assert captured[1].offset - captured[0].offset >= 0.05
+
+    def test_appended_sessions_keep_offsets_increasing(self, tmp_path):
+        path = tmp_path / "capture.jsonl.gz"
+        write_capture(path, [(0, 'meshtastic.receive.text', text_packet('!1', 'a')),
+                             (0.02, 'meshtastic.receive.text', text_packet('!1', 'b'))])
+        write_capture(path, [(0, 'meshtastic.receive.text', text_packet('!1', 'c'))])
+
+        offsets = [c.offset for c in read_capture(str(path))]
+
+        assert len(offsets) == 3
+        assert offsets == sorted(offsets)
+
+    def test_truncated_capture_ends_early(self, tmp_path):
+        path = tmp_path / "capture.jsonl.gz"
+        write_capture(path, [(0, 'meshtastic.receive.text', text_packet('!1', str(i))) for i in range(50)])
+        data = path.read_bytes()
+        path.write_bytes(data[:len(data) // 2])
+
+        assert len(list(read_capture(str(path)))) < 50
+
+    def test_invalid_files(self, tmp_path):
+        with pytest.raises(CaptureError):
+            list(read_capture(str(tmp_path / "missing.jsonl.gz")))
+
+        not_capture = tmp_path / "other.jsonl.gz"
+        with gzip.open(not_capture, 'wt') as f:
+            f.write('{"format": "something-else"}\n')
+        with pytest.raises(CaptureError):
+            list(read_capture(str(not_capture)))
+
+
+class TestInterfaceCapture:
+    """Test recording from a live interface"""
+
+    @pytest.mark.asyncio
+    async def test_serial_handlers_record_packets_and_sends(self, tmp_path, node_registry):
+        path = tmp_path / "radio1-%Y.jsonl.gz"
+        config = InterfaceConfig(id="radio1", type="serial", connection_string="/dev/null",
+                                 metadata={'capture': str(path)})
+        interface = SerialInterface(config, Mock())
+        interface._connection_manager = Mock(return_value=asyncio.sleep(0))  # no radio
+        await interface.start()
+
+        packet = text_packet('!a1b2c3d4', 'wx')
+        interface._capture_packet('meshtastic.receive.text', packet)
+        interface._on_meshtastic_text(packet)
+        interface.status = InterfaceStatus.CONNECTED
+        interface._send_message = Mock(return_value=asyncio.sleep(0, result=True))
+        reply = interface.message_callback.call_args[0][0]
+        reply.content, reply.recipient_id = "Sunny", '!a1b2c3d4'
+        await interface.send_message(reply)
+        await wait_until(lambda: interface.stats.messages_sent == 1)
+        assert interface.get_status()['capture']['packets'] == 2
+        await interface.stop()
+
+        files = list(tmp_path.glob("radio1-*.jsonl.gz"))
+        captured = list(read_capture(str(files[0])))
+        assert [c.topic for c in captured] == ['meshtastic.receive.text', SEND_TOPIC]
+        assert captured[1].packet == {'toId': '!a1b2c3d4', 'channel': 0, 'text': "Sunny"}
+
+
+class TestReplayInterface:
+    """Test replaying captures through the packet handlers"""
+
+    @pytest.mark.asyncio
+    async def test_replays_through_message_path(self, tmp_path, node_registry):
+        path = tmp_path / "capture.jsonl.gz"
+        write_capture(path, [
+            (0, 'meshtastic.receive.text', text_packet('!a1b2c3d4', 'ping')),
+            (0, 'meshtastic.receive.telemetry', telemetry_packet('!a1b2c3d4')),
+            (0, SEND_TOPIC, {'toId': '!a1b2c3d4', 'channel': 0, 'text': 'pong'}),
+            (0, 'meshtastic.receive.text', text_packet('!00000002', 'hello'))
+        ])
+        callback = Mock()
+        interface = replay_interface(path, callback, speed=0)
+
+        assert isinstance(interface, ReplayInterface)
+        assert await interface._connect()
+        interface.status = InterfaceStatus.CONNECTED
+        await interface._receive_messages()
+
+        messages = [c[0][0] for c in callback.call_args_list]
+        assert [m.content for m in messages] == ['ping', 'hello']
+        assert all(m.message_type == MessageType.TEXT and m.interface_id == 'replay1' for m in messages)
+        assert messages[0].hop_count == 1 and messages[0].snr == 6.5
+        assert node_registry.update_node.call_count == 3
+        status = interface.get_status()
+        assert status['stats']['messages_received'] == 2
+        assert status['replay']['packets_replayed'] == 3
+        assert status['replay']['packets_skipped'] == 1
+        assert status['replay']['finished']
+
+    @pytest.mark.asyncio
+    async def test_speed_scales_recorded_timing(self, tmp_path, node_registry):
+        path = tmp_path / "capture.jsonl.gz"
+        write_capture(path, [(0, 'meshtastic.receive.text', text_packet('!1', 'a')),
+                             (0.4, 'meshtastic.receive.text', text_packet('!1', 'b'))])
+
+        timings = {}
+        for speed in (1.0, 4.0, 0):
+            interface = replay_interface(path, Mock(), speed=speed)
+            await interface._connect()
+            interface.status = InterfaceStatus.CONNECTED
+            start = time.monotonic()
+            await interface._receive_messages()
+            timings[speed] = time.monotonic() - start
+
+        assert 0.35 < timings[1.0] < 0.7
+        assert 0.08 < timings[4.0] < 0.25
+        assert timings[0] < 0.05
+
+    @pytest.mark.asyncio
+    async def test_loop_until_stopped(self, tmp_path, node_registry):
+        path = tmp_path / "capture.jsonl.gz"
+        write_capture(path, [(0, 'meshtastic.receive.text', text_packet('!1', 'a'))])
+        callback = Mock()
+        interface = replay_interface(path, callback, speed=0, loop=True)
+        await interface.start()
+
+        await wait_until(lambda: callback.call_count >= 5)
+        await interface.stop()
+
+        assert interface.get_status()['replay']['passes'] >= 5
+
+    @pytest.mark.asyncio
+    async def test_missing_capture_fails_to_connect(self, tmp_path):
+        interface = replay_interface(tmp_path / "missing.jsonl.gz", Mock())
+
+        assert not await interface._connect()
@@ -0,0 +1,103 @@
+"""
+Unit tests for the compiled multi-pattern matcher
+
+Tests keyword decomposition, regex fallback and equivalence with
+per-pattern re.search for classifier and routing patterns.
+"""
+
+import re
+
+import pytest
+
+from src.core.message_router import MessageClassifier
+from src.core.pattern_matcher import PatternMatcher, decompose_pattern
+
+
+SAMPLE_CONTENT = [
+    "", "SOS", "sos need help", "SOSP injured", "SOSX", "help", "help!", "helper",
+    "? ", "?", "?x", "ping", "pinged", "PING me", "wx", "wxyz", "weather today",
+    "email/bob@example.com/hi", "Email/", "sms:+15551234", "tagout", "name/John",
+    "check the BBS", "bbsread 4", "mailbox", "rain and wind", "the storm is near",
+    "hello there", "hi", "nothing special", "MAYDAY MAYDAY", "emergency_exit",
+    "SOS_test", "x SOSF y", "cq cq", "cqd", "test 123", "unsubscribe all",
+]
+
+
+def reference_match(patterns, content):
+    return {tag for pattern, tag in patterns if re.search(pattern, content, re.IGNORECASE)}
+
+
+class TestDecomposePattern:
+    """Test reduction of regexes to literal keywords"""
+
+    def test_start_anchored_alternation(self):
+        anchor, trailing, keywords = decompose_pattern(r'^(help|cmd|\?|ping)\b')
+        assert anchor == 'start'
+        assert trailing is True
+        assert keywords == ['help', 'cmd', '?', 'ping']
+
+    def test_character_class_expansion(self):
+        anchor, trailing, keywords = decompose_pattern(r'\bSOS[PFMH]?\b')
+        assert anchor == 'word'
+        assert sorted(keywords) == ['SOS', 'SOSF', 'SOSH', 'SOSM', 'SOSP']
+
+    @pytest.mark.parametrize("pattern", [r'\d+', r'^help$', r'foo.*bar', r'(a)|(b)', r'\bfoo', r'x{2}'])
+    def test_non_literal_patterns_rejected(self, pattern):
+        with pytest.raises(Exception):
+            decompose_pattern(pattern)
+
+
+class TestPatternMatcher:
+    """Test multi-pattern matching"""
+
+    def test_classifier_patterns_match_reference(self):
+        """The compiled matcher agrees with re.search for every default pattern"""
+        classifier = MessageClassifier()
+        patterns = classifier.matcher.patterns
+
+        for content in SAMPLE_CONTENT:
+            assert classifier.matcher.match(content) == reference_match(patterns, content), content
+
+    def test_fallback_regex_patterns(self):
+        """Patterns that are not keyword lists still match via regex"""
+        patterns = [(r'\d{3}-\d{4}', 'phone'), (r'^grid [a-r]{2}\d{2}$', 'grid'), (r'\bfoo\b', 'foo')]
+        matcher = PatternMatcher()
+        for pattern, tag in patterns:
+            matcher.add(pattern, tag)
+
+        for content in ["call 555-1234", "grid FN31", "foo", "food", "grid fn31 x", "FOO 555-0000"]:
+            assert matcher.match(content) == reference_match(patterns, content), content
+
+    def test_empty_pattern_matches_everything(self):
+        matcher = PatternMatcher()
+        matcher.add('', 'default')
+        matcher.add(r'^ping\b', 'ping')
+
+        assert matcher.match("anything") == {'default'}
+        assert matcher.match("ping") == {'default', 'ping'}
+
+    def test_unanchored_keywords(self):
+        """Unanchored keywords match anywhere, including inside words"""
+        patterns = [('alert', 'alert'), ('tag/', 'tag'), (r'storm\b', 'storm')]
+        matcher = PatternMatcher()
+        for pattern, tag in patterns:
+            matcher.add(pattern, tag)
+
+        for content in ["ALERTS", "no tag", "xtag/y", "storms", "big storm", "stormy storm!"]:
+            assert matcher.match(content) == reference_match(patterns, content), content
+
+    def test_unicode_content(self):
+        """Content whose case folding changes length still matches correctly"""
+        patterns = [(r'\b(help|sos)\b', 'sos')]
+        matcher = PatternMatcher()
+        matcher.add(*patterns[0])
+
+        for content in ["İstanbul SOS", "İ help", "çok yardım", "Ünïcödé sos"]:
+            assert matcher.match(content) == reference_match(patterns, content), content
+
+    def test_invalid_pattern_raises_at_compile(self):
+        matcher = PatternMatcher()
+        matcher.add(r'(unclosed', 'bad')
+
+        with pytest.raises(re.error):
+            matcher.compile()
@@ -0,0 +1,285 @@
+"""
+Unit tests for running plugins in isolated worker processes
+"""
+
+import asyncio
+import os
+import pickle
+import socket
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import pytest_asyncio
+
+from src.core.config import ConfigurationManager
+from src.core.plugin_command_handler import PluginCommandHandler
+from src.core.plugin_isolation import (
+    HEADER, MAX_FRAME_BYTES, IsolatedPluginError, _Channel, _decode_data, _encode, _encode_data, _picklable
+)
+from src.core.plugin_manager import PluginManager, PluginStatus
+from src.models.message import Message
+
+
+ISOLATED_PLUGIN_SOURCE = """
+import os
+import time
+
+from src.core.enhanced_plugin import EnhancedPlugin
+from src.core.plugin_manager import PluginMetadata
+
+
+class WorkerPlugin(EnhancedPlugin):
+    async def initialize(self):
+        self.register_command("pid", self.pid, "Worker process id")
+        self.register_command("crunch", self.crunch, "Burn CPU")
+        self.register_command("count", self.count, "Persistent counter")
+        self.register_command("crash", self.crash, "Exit the worker")
+        self.register_command("hang", self.hang, "Block the worker")
+        return True
+
+    async def pid(self, args, context):
+        return f"{os.getpid()} {context['sender_id']}"
+
+    async def crunch(self, args, context):
+        deadline = time.perf_counter() + float(args[0])
+        while time.perf_counter() < deadline:
+            pass
+        return "done"
+
+    async def count(self, args, context):
+        value = await self.retrieve_data("count", 0) + 1
+        await self.store_data("count", value)
+        return str(value)
+
+    async def crash(self, args, context):
+        os._exit(1)
+
+    async def hang(self, args, context):
+        time.sleep(float(args[0]))
+        return "late"
+
+    def get_metadata(self):
+        return PluginMetadata(name=self.name, version="2.1.0", description="Worker", author="Test")
+"""
+
+
+@pytest.fixture
+def temp_plugin_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def plugin_manager(temp_plugin_dir):
+    config_manager = ConfigurationManager()
+    config_manager.config = {"plugins": {"paths": []}}
+    manager = PluginManager(config_manager)
+    manager.plugin_paths.append(temp_plugin_dir)
+    manager.isolation_options = {'monitor_interval': 0.2, 'call_timeout': 2.0}
+
+    command_handler = PluginCommandHandler()
+    router = Mock()
+    router.command_handler = command_handler
+    router.register_plugin_command.side_effect = command_handler.register_command
+    router.unregister_plugin_commands.side_effect = command_handler.unregister_plugin_commands
+    manager.message_router = router
+    return manager
+
+
+@pytest_asyncio.fixture
+async def isolated(plugin_manager, temp_plugin_dir):
+    name = f"worker_{uuid.uuid4().hex[:8]}"
+    package = temp_plugin_dir / name
+    package.mkdir()
+    (package / "__init__.py").write_text(ISOLATED_PLUGIN_SOURCE)
+    plugin_manager.isolated_plugins.add(name)
+
+    assert await plugin_manager.load_plugin(name)
+    assert await plugin_manager.start_plugin(name)
+    yield plugin_manager.plugins[name].instance
+    await plugin_manager.stop_plugin(name)
+    await plugin_manager.unload_plugin(name)
+
+
+async def send(plugin, text):
+    return await plugin.plugin_manager.message_router.command_handler.route_command(
+        Message(content=text, sender_id="!a1b2c3d4")
+    )
+
+
+async def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.05)
+
+
+class TestIsolatedPlugin:
+    """Test plugins running in worker processes"""
+
+    @pytest.mark.asyncio
+    async def test_commands_run_in_worker(self, isolated, plugin_manager):
+        response = await send(isolated, "pid")
+        pid, sender = response.split()
+
+        assert int(pid) == isolated.process.pid != os.getpid()
+        assert sender == "!a1b2c3d4"
+        info = plugin_manager.plugins[isolated.name]
+        assert info.status == PluginStatus.RUNNING
+        assert info.metadata.version == "2.1.0"
+        assert info.module is None
+
+    @pytest.mark.asyncio
+    async def test_cpu_bound_handler_does_not_block_loop(self, isolated):
+        lags = []
+
+        async def ticker():
+            while True:
+                expected = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - expected)
+
+        task = asyncio.create_task(ticker())
+        assert await send(isolated, "crunch 0.5") == "done"
+        task.cancel()
+
+        assert len(lags) > 10
+        assert max(lags) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_storage_served_by_host(self, isolated):
+        assert await send(isolated, "count") == "1"
+        assert await send(isolated, "count") == "2"
+        assert await isolated._storage.retrieve_data("count") == 2
+
+    @pytest.mark.asyncio
+    async def test_crashed_worker_restarted(self, isolated):
+        first_pid = isolated.process.pid
+
+        assert "unavailable" not in (await send(isolated, "crash") or "")
+        await wait_for(lambda: isolated.stats.restarts == 1 and isolated.is_running)
+
+        response = await send(isolated, "pid")
+        assert int(response.split()[0]) == isolated.process.pid != first_pid
+        assert isolated.stats.last_restart_reason == 'exited'
+
+    @pytest.mark.asyncio
+    async def test_unresponsive_worker_restarted(self, isolated):
+        isolated.call_timeout = 0.3
+        first_pid = isolated.process.pid
+
+        with pytest.raises(IsolatedPluginError):
+            await isolated._call('command', 'hang', ['30'], {})
+        await wait_for(lambda: isolated.stats.restarts == 1 and isolated.is_running)
+
+        assert isolated.process.pid != first_pid
+        assert isolated.stats.last_restart_reason == 'unresponsive'
+        assert isolated.stats.call_timeouts >= 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_restarts(self, isolated):
+        isolated.max_restarts = 1
+
+        assert await isolated.restart_worker('test')
+        assert not await isolated.restart_worker('test')
+
+        assert isolated.failed
+        assert not await isolated.health_check()
+        assert not isolated.plugin_manager.message_router.command_handler.has_command("pid")
+
+    @pytest.mark.asyncio
+    async def test_process_stats(self, isolated, plugin_manager):
+        await send(isolated, "crunch 0.2")
+        isolated.sample_resources()
+
+        stats = plugin_manager.get_plugin_stats()['isolated'][isolated.name]
+        assert stats['alive']
+        assert stats['rss_bytes'] > 0
+        assert stats['cpu_seconds'] >= 0.2
+        assert stats['calls'] >= 3
+        assert stats['bytes_sent'] > 0
+
+
+def test_unpicklable_context_entries_dropped():
+    context = {'sender_id': '!a1b2c3d4', 'lock': asyncio.Lock().__class__, 'callback': lambda: None}
+
+    assert _picklable(context) == {'sender_id': '!a1b2c3d4', 'lock': asyncio.Lock}
+
+
+EXECUTED = []
+
+
+class Exploit:
+    """Pickle payload that runs code when unpickled"""
+
+    def __reduce__(self):
+        return (EXECUTED.append, ("pwned",))
+
+
+async def host_channel():
+    """A host-side channel and the raw worker end of its socket pair"""
+    host_sock, worker_sock = socket.socketpair()
+    reader, writer = await asyncio.open_unix_connection(sock=host_sock)
+
+    async def serve(op, args):
+        return "served"
+
+    return _Channel(reader, writer, serve), worker_sock
+
+
+class TestWorkerFrames:
+    """Test that the host treats worker frames as untrusted data"""
+
+    def test_data_round_trip(self):
+        moment = datetime(2024, 1, 1, 12, 30)
+        message = Message(content="hi", sender_id="!a1b2c3d4")
+        frame = ('reply', 3, None, {'raw': b'\x00\x01', 'at': moment, 'message': message, 'pair': (1, 2)})
+
+        kind, call_id, _, payload = _decode_data(_encode_data(frame)[HEADER.size:])
+
+        assert (kind, call_id) == ('reply', 3)
+        assert payload['raw'] == b'\x00\x01' and payload['at'] == moment and payload['pair'] == [1, 2]
+        assert payload['message'].content == "hi"
+        with pytest.raises(TypeError):
+            _encode_data(('reply', 1, None, object()))
+
+    @pytest.mark.asyncio
+    async def test_pickled_frame_is_not_executed(self):
+        channel, worker = await host_channel()
+
+        worker.sendall(_encode(('notify', 0, 'event', (Exploit(),))))
+
+        await asyncio.wait_for(channel.closed.wait(), 2.0)
+        assert EXECUTED == []
+        worker.close()
+
+    @pytest.mark.asyncio
+    async def test_oversized_frame_closes_channel(self):
+        channel, worker = await host_channel()
+
+        worker.sendall(HEADER.pack(MAX_FRAME_BYTES + 1))
+
+        await asyncio.wait_for(channel.closed.wait(), 2.0)
+        assert channel.bytes_received == 0
+        worker.close()
+
+    @pytest.mark.asyncio
+    async def test_data_frames_served(self):
+        channel, worker = await host_channel()
+
+        worker.sendall(_encode_data(('call', 1, 'anything', ())))
+        worker.setblocking(False)
+        loop = asyncio.get_running_loop()
+        header = await asyncio.wait_for(loop.sock_recv(worker, HEADER.size), 2.0)
+        reply = await asyncio.wait_for(loop.sock_recv(worker, HEADER.unpack(header)[0]), 2.0)
+
+        assert pickle.loads(reply) == ('reply', 1, None, 'served')
+        await channel.close()
+        worker.close()
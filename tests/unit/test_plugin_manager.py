@@ -6,6 +6,9 @@ import asyncio
 import pytest
 import tempfile
 import shutil
+import sys
+import time
+import uuid
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timedelta
@@ -15,6 +18,8 @@ from src.core.plugin_manager import (
     PluginMetadata, PluginDependency, PluginHealth, PluginInfo
 )
 from src.core.config import ConfigurationManager
+from src.core.plugin_command_handler import PluginCommandHandler
+from src.models.message import Message
 
 
 class MockPlugin(BasePlugin):
@@ -668,5 +673,323 @@ class TestPluginManager:
         assert stats["failed_plugins"] == 0
 
 
+SLOW_PLUGIN_SOURCE = """
+import asyncio
+import time
+
+from src.core.plugin_manager import BasePlugin, PluginMetadata
+
+time.sleep({import_delay})  # heavy module-level imports
+
+
+class SlowPlugin(BasePlugin):
+    async def initialize(self):
+        await asyncio.sleep({init_delay})
+        return True
+
+    async def start(self):
+        return True
+
+    async def stop(self):
+        return True
+
+    async def cleanup(self):
+        return True
+
+    def get_metadata(self):
+        return PluginMetadata(name=self.name, version="1.0.0", description="Slow plugin", author="Test")
+"""
+
+
+def write_plugin(plugin_dir, name, import_delay=0.0, init_delay=0.0, manifest=False):
+    """Create an importable plugin package"""
+    package = plugin_dir / name
+    package.mkdir()
+    (package / "__init__.py").write_text(
+        SLOW_PLUGIN_SOURCE.format(import_delay=import_delay, init_delay=init_delay)
+    )
+    if manifest:
+        (package / "manifest.yaml").write_text(
+            f"name: {name}\nversion: 1.0.0\ndescription: Test plugin\nauthor: Test\n"
+        )
+    return name
+
+
+class SlowStartPlugin(MockPlugin):
+    """Plugin whose start takes a while and records when it ran"""
+    
+    delay = 0.2
+    dependencies = []
+    events = []
+    
+    async def start(self) -> bool:
+        self.events.append(('begin', self.name))
+        await asyncio.sleep(self.delay)
+        self.events.append(('end', self.name))
+        return await super().start()
+    
+    def get_metadata(self) -> PluginMetadata:
+        metadata = super().get_metadata()
+        metadata.dependencies = [PluginDependency(name) for name in self.dependencies]
+        return metadata
+
+
+def add_loaded_plugin(plugin_manager, name, dependencies=()):
+    plugin_class = type(f"Plugin_{name}", (SlowStartPlugin,), {'dependencies': list(dependencies)})
+    instance = plugin_class(name, {}, plugin_manager)
+    plugin_manager.plugins[name] = PluginInfo(
+        metadata=instance.get_metadata(), status=PluginStatus.LOADED, instance=instance
+    )
+
+
+class TestParallelStartup:
+    """Test concurrent discovery, loading and dependency-level startup"""
+    
+    @pytest.fixture(autouse=True)
+    def reset_events(self):
+        SlowStartPlugin.events = []
+    
+    @pytest.mark.asyncio
+    async def test_discovery_caches_manifests(self, plugin_manager, temp_plugin_dir):
+        plugin_manager.plugin_paths.append(temp_plugin_dir)
+        name = write_plugin(temp_plugin_dir, f"manifest_{uuid.uuid4().hex[:8]}", manifest=True)
+        (temp_plugin_dir / "broken").mkdir()
+        (temp_plugin_dir / "broken" / "__init__.py").touch()
+        (temp_plugin_dir / "broken" / "manifest.yaml").write_text("name: broken\n")
+        
+        discovered = await plugin_manager.discover_plugins()
+        
+        assert name in discovered
+        assert "broken" not in discovered
+        assert name in plugin_manager._discovered_manifests
+        assert "discovery_ms" in plugin_manager.get_startup_report()
+        
+        assert await plugin_manager.load_plugin(name)
+        assert plugin_manager.plugins[name].manifest.name == name
+        assert name not in plugin_manager._discovered_manifests
+    
+    @pytest.mark.asyncio
+    async def test_plugins_import_and_initialize_concurrently(self, plugin_manager, temp_plugin_dir):
+        plugin_manager.plugin_paths.append(temp_plugin_dir)
+        names = [write_plugin(temp_plugin_dir, f"slow_{uuid.uuid4().hex[:8]}", import_delay=0.2, init_delay=0.2)
+                 for _ in range(4)]
+        
+        start = time.perf_counter()
+        results = await plugin_manager.load_plugins({name: {} for name in names})
+        elapsed = time.perf_counter() - start
+        
+        assert results == {name: True for name in names}
+        assert elapsed < 1.0  # 1.6s if loaded one at a time
+        report = plugin_manager.get_startup_report()
+        assert report['load_sum_ms'] >= 1500
+        for name in names:
+            assert plugin_manager.plugins[name].timings['import'] >= 0.2
+            assert plugin_manager.plugins[name].timings['initialize'] >= 0.2
+    
+    @pytest.mark.asyncio
+    async def test_dependency_levels_start_concurrently(self, plugin_manager):
+        add_loaded_plugin(plugin_manager, "database")
+        add_loaded_plugin(plugin_manager, "radio")
+        add_loaded_plugin(plugin_manager, "bbs", dependencies=["database"])
+        add_loaded_plugin(plugin_manager, "sync", dependencies=["bbs", "radio"])
+        
+        start = time.perf_counter()
+        assert await plugin_manager.start_all_plugins()
+        elapsed = time.perf_counter() - start
+        
+        assert plugin_manager.startup_levels == [["database", "radio"], ["bbs"], ["sync"]]
+        assert 0.55 < elapsed < 0.75  # three levels, not four serial starts
+        events = SlowStartPlugin.events
+        assert events.index(('end', 'database')) < events.index(('begin', 'bbs'))
+        assert events.index(('end', 'bbs')) < events.index(('begin', 'sync'))
+        
+        report = plugin_manager.get_startup_report()
+        assert report['start_sum_ms'] >= 800
+        assert 550 < report['critical_path_ms'] < 750
+        assert set(report['plugins']) == {"database", "radio", "bbs", "sync"}
+        assert 'timings_ms' in plugin_manager.get_plugin_stats()['plugins']['bbs']
+        
+        await plugin_manager.stop_all_plugins()
+    
+    @pytest.mark.asyncio
+    async def test_serial_startup_when_disabled(self, plugin_manager):
+        plugin_manager.parallel_startup = False
+        add_loaded_plugin(plugin_manager, "one")
+        add_loaded_plugin(plugin_manager, "two")
+        
+        start = time.perf_counter()
+        assert await plugin_manager.start_all_plugins()
+        
+        assert time.perf_counter() - start >= 0.4
+        assert plugin_manager.startup_levels == [["one"], ["two"]]
+        
+        await plugin_manager.stop_all_plugins()
+
+
+LAZY_PLUGIN_SOURCE = """
+from src.core.plugin_manager import BasePlugin, PluginMetadata
+
+
+class TriviaPlugin(BasePlugin):
+    async def initialize(self):
+        self.plugin_manager.message_router.register_plugin_command(self.name, "trivia", self.trivia, "Trivia")
+        return True
+
+    async def trivia(self, args, context):
+        return f"Question for {{context['sender_id']}}"
+
+    async def start(self):
+        return True
+
+    async def stop(self):
+        self.plugin_manager.message_router.unregister_plugin_commands(self.name)
+        return True
+
+    async def cleanup(self):
+        return True
+
+    def get_metadata(self):
+        return PluginMetadata(name=self.name, version="1.0.0", description="Trivia", author="Test")
+"""
+
+
+def write_lazy_plugin(plugin_dir, name, depends_on=None, capabilities=""):
+    package = plugin_dir / name
+    package.mkdir()
+    (package / "__init__.py").write_text(LAZY_PLUGIN_SOURCE.format())
+    manifest = (f"name: {name}\nversion: 1.0.0\ndescription: Trivia game\nauthor: Test\n"
+                "capabilities:\n  commands:\n    - name: trivia\n      description: Play trivia\n"
+                + capabilities)
+    if depends_on:
+        manifest += f"dependencies:\n  plugins:\n    - name: {depends_on}\n"
+    (package / "manifest.yaml").write_text(manifest)
+    return name
+
+
+class TestLazyActivation:
+    """Test on-demand plugin activation and idle unloading"""
+    
+    @pytest.fixture
+    def lazy_manager(self, plugin_manager, temp_plugin_dir):
+        plugin_manager.plugin_paths.append(temp_plugin_dir)
+        plugin_manager.lazy_enabled = True
+        command_handler = PluginCommandHandler()
+        router = Mock()
+        router.command_handler = command_handler
+        router.register_plugin_command.side_effect = command_handler.register_command
+        router.unregister_plugin_commands.side_effect = command_handler.unregister_plugin_commands
+        plugin_manager.message_router = router
+        return plugin_manager
+    
+    @staticmethod
+    async def send(manager, text="trivia"):
+        return await manager.message_router.command_handler.route_command(
+            Message(content=text, sender_id="!a1b2c3d4")
+        )
+    
+    @pytest.mark.asyncio
+    async def test_registered_from_manifest_without_import(self, lazy_manager, temp_plugin_dir):
+        name = write_lazy_plugin(temp_plugin_dir, f"trivia_{uuid.uuid4().hex[:8]}")
+        
+        results = await lazy_manager.load_plugins({name: {}})
+        await lazy_manager.start_all_plugins()
+        
+        assert results == {name: True}
+        assert lazy_manager.plugins[name].status == PluginStatus.DORMANT
+        assert name not in sys.modules
+        assert lazy_manager.message_router.command_handler.has_command("trivia")
+        assert name in lazy_manager.get_plugin_stats()['dormant_plugins']
+        await lazy_manager.stop_all_plugins()
+    
+    @pytest.mark.asyncio
+    async def test_first_command_activates_plugin(self, lazy_manager, temp_plugin_dir):
+        name = write_lazy_plugin(temp_plugin_dir, f"trivia_{uuid.uuid4().hex[:8]}")
+        lazy_manager.register_lazy_plugin(name)
+        activated = []
+        
+        async def on_activated(plugin_name, instance):
+            activated.append(plugin_name)
+        lazy_manager.register_event_handler('plugin_activated', on_activated)
+        
+        responses = await asyncio.gather(*(self.send(lazy_manager) for _ in range(3)))
+        
+        assert responses == ["Question for !a1b2c3d4"] * 3
+        info = lazy_manager.plugins[name]
+        assert info.status == PluginStatus.RUNNING
+        assert info.activations == 1
+        assert 'activate' in info.timings
+        assert activated == [name]
+        assert await self.send(lazy_manager) == "Question for !a1b2c3d4"
+        await lazy_manager.stop_all_plugins()
+    
+    @pytest.mark.asyncio
+    async def test_idle_plugin_unloaded_and_reactivated(self, lazy_manager, temp_plugin_dir):
+        name = write_lazy_plugin(temp_plugin_dir, f"trivia_{uuid.uuid4().hex[:8]}")
+        lazy_manager.lazy_idle_ttl = 0.1
+        lazy_manager.register_lazy_plugin(name)
+        await self.send(lazy_manager)
+        
+        assert await lazy_manager.unload_idle_plugins() == []
+        await asyncio.sleep(0.15)
+        assert await lazy_manager.unload_idle_plugins() == [name]
+        
+        assert lazy_manager.plugins[name].status == PluginStatus.DORMANT
+        assert name not in sys.modules
+        assert await self.send(lazy_manager) == "Question for !a1b2c3d4"
+        assert lazy_manager.plugins[name].activations == 2
+        await lazy_manager.stop_all_plugins()
+    
+    @pytest.mark.asyncio
+    async def test_dormant_plugin_not_restarted(self, lazy_manager, temp_plugin_dir):
+        """A dormant plugin never heartbeats, which must not mark it unhealthy"""
+        name = write_lazy_plugin(temp_plugin_dir, f"trivia_{uuid.uuid4().hex[:8]}")
+        lazy_manager.register_lazy_plugin(name)
+        info = lazy_manager.plugins[name]
+        info.health.last_heartbeat = datetime.utcnow() - timedelta(hours=1)
+        
+        stats = lazy_manager.get_plugin_stats()
+        unhealthy = [n for n, p in stats['plugins'].items() if not p['health']['is_healthy']]
+        
+        assert unhealthy == []
+        assert info.status == PluginStatus.DORMANT
+        assert info.health.restart_count == 0
+        assert name not in sys.modules
+        await lazy_manager.stop_all_plugins()
+    
+    @pytest.mark.asyncio
+    async def test_eligibility(self, lazy_manager, temp_plugin_dir):
+        game = write_lazy_plugin(temp_plugin_dir, f"game_{uuid.uuid4().hex[:8]}")
+        base = write_lazy_plugin(temp_plugin_dir, f"base_{uuid.uuid4().hex[:8]}")
+        addon = write_lazy_plugin(temp_plugin_dir, f"addon_{uuid.uuid4().hex[:8]}", depends_on=base)
+        write_plugin(temp_plugin_dir, "no_manifest")
+        
+        assert lazy_manager._select_lazy_plugins([game, base, addon, "no_manifest"]) == {game, addon}
+        
+        lazy_manager.lazy_plugins = {addon}
+        assert lazy_manager._select_lazy_plugins([game, addon]) == {addon}
+        
+        lazy_manager.lazy_enabled = False
+        assert lazy_manager._select_lazy_plugins([game]) == set()
+    
+    @pytest.mark.asyncio
+    async def test_background_plugins_load_eagerly(self, lazy_manager, temp_plugin_dir):
+        """Plugins with scheduled tasks or message handlers must run without a command"""
+        scheduled = write_lazy_plugin(
+            temp_plugin_dir, f"alerts_{uuid.uuid4().hex[:8]}",
+            capabilities="  scheduled_tasks:\n    - name: check_escalation\n      interval: 60\n"
+        )
+        handler = write_lazy_plugin(
+            temp_plugin_dir, f"keywords_{uuid.uuid4().hex[:8]}",
+            capabilities="  message_handlers:\n    - description: Keyword detection\n"
+        )
+        
+        assert lazy_manager._select_lazy_plugins([scheduled, handler]) == set()
+        
+        await lazy_manager.load_plugins({scheduled: {}})
+        assert lazy_manager.plugins[scheduled].status != PluginStatus.DORMANT
+        assert lazy_manager.plugins[scheduled].instance is not None
+        await lazy_manager.stop_all_plugins()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
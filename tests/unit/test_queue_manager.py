@@ -6,186 +6,15 @@ Tests message queuing, rate limiting, and message chunking functionality.
 
 import asyncio
 import pytest
+import time
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock
 
 from src.models.message import Message, MessageType, MessagePriority
 from src.core.queue_manager import (
-    QueueManager, RateLimiter, MessageChunker, TokenBucket,
-    RateLimitRule, QueueType, QueueStats, PriorityQueueItem
+    QueueManager, MessageChunker, QueueType, QueueStats, PriorityQueueItem
 )
-
-
-class TestTokenBucket:
-    """Test token bucket rate limiting"""
-    
-    def test_token_consumption(self):
-        """Test basic token consumption"""
-        bucket = TokenBucket(
-            max_tokens=5.0,
-            tokens=5.0,
-            refill_rate=1.0,
-            last_refill=datetime.utcnow()
-        )
-        
-        # Should be able to consume available tokens
-        assert bucket.can_consume(3.0)
-        assert bucket.consume(3.0)
-        assert bucket.tokens == 2.0
-        
-        # Should not be able to consume more than available
-        assert not bucket.can_consume(3.0)
-        assert not bucket.consume(3.0)
-        assert bucket.tokens == 2.0
-    
-    def test_token_refill(self):
-        """Test token refill over time"""
-        past_time = datetime.utcnow() - timedelta(seconds=2)
-        bucket = TokenBucket(
-            max_tokens=5.0,
-            tokens=0.0,
-            refill_rate=1.0,  # 1 token per second
-            last_refill=past_time
-        )
-        
-        # Should refill tokens based on elapsed time
-        bucket._refill()
-        assert bucket.tokens >= 2.0  # At least 2 tokens after 2 seconds
-        assert bucket.tokens <= 5.0  # But not more than max
-    
-    def test_max_tokens_limit(self):
-        """Test that tokens don't exceed maximum"""
-        past_time = datetime.utcnow() - timedelta(seconds=10)
-        bucket = TokenBucket(
-            max_tokens=5.0,
-            tokens=3.0,
-            refill_rate=1.0,
-            last_refill=past_time
-        )
-        
-        bucket._refill()
-        assert bucket.tokens == 5.0  # Should not exceed max_tokens
-    
-    def test_wait_time_calculation(self):
-        """Test wait time calculation"""
-        bucket = TokenBucket(
-            max_tokens=5.0,
-            tokens=1.0,
-            refill_rate=2.0,  # 2 tokens per second
-            last_refill=datetime.utcnow()
-        )
-        
-        # Should not need to wait for available tokens
-        assert bucket.get_wait_time(1.0) == 0.0
-        
-        # Should calculate wait time for unavailable tokens
-        wait_time = bucket.get_wait_time(3.0)  # Need 2 more tokens
-        assert wait_time == 1.0  # 2 tokens / 2 tokens per second = 1 second
-
-
-class TestRateLimitRule:
-    """Test rate limiting rules"""
-    
-    def test_pattern_matching(self):
-        """Test pattern matching"""
-        rule = RateLimitRule(
-            key_pattern=r'sender_.*',
-            max_tokens=5.0,
-            refill_rate=1.0,
-            burst_size=3.0
-        )
-        
-        assert rule.matches_key('sender_12345')
-        assert rule.matches_key('sender_abcdef')
-        assert not rule.matches_key('channel_1')
-        assert not rule.matches_key('global')
-
-
-class TestRateLimiter:
-    """Test rate limiter functionality"""
-    
-    def test_global_rate_limiting(self):
-        """Test global rate limiting"""
-        limiter = RateLimiter()
-        
-        # Should be able to send initially
-        assert limiter.can_send('test_key')
-        
-        # Consume all global tokens
-        for _ in range(10):
-            limiter.consume('test_key')
-        
-        # Should be rate limited
-        assert not limiter.can_send('test_key')
-    
-    def test_per_sender_rate_limiting(self):
-        """Test per-sender rate limiting"""
-        limiter = RateLimiter()
-        
-        sender_key = 'sender_12345'
-        
-        # Should be able to send initially
-        assert limiter.can_send(sender_key)
-        
-        # Consume sender tokens
-        for _ in range(5):
-            if not limiter.consume(sender_key):
-                break
-        
-        # Should be rate limited for this sender
-        assert not limiter.can_send(sender_key)
-        
-        # But should still work for different sender
-        assert limiter.can_send('sender_67890')
-    
-    def test_emergency_rate_limiting(self):
-        """Test emergency message rate limiting"""
-        limiter = RateLimiter()
-        
-        emergency_key = 'emergency_12345'
-        
-        # Emergency messages should have higher rate limits
-        assert limiter.can_send(emergency_key)
-        
-        # Should be able to send more emergency messages
-        for _ in range(8):  # Emergency has higher limit
-            if not limiter.consume(emergency_key):
-                break
-        
-        # Should eventually be rate limited
-        assert not limiter.can_send(emergency_key)
-    
-    def test_wait_time_calculation(self):
-        """Test wait time calculation"""
-        limiter = RateLimiter()
-        
-        # Exhaust tokens
-        for _ in range(10):
-            limiter.consume('test_key')
-        
-        # Should have wait time
-        wait_time = limiter.get_wait_time('test_key')
-        assert wait_time > 0
-    
-    def test_bucket_cleanup(self):
-        """Test old bucket cleanup"""
-        limiter = RateLimiter()
-        
-        # Create some buckets
-        limiter.consume('sender_1')
-        limiter.consume('sender_2')
-        
-        assert len(limiter.buckets) >= 2
-        
-        # Simulate old buckets
-        for bucket in limiter.buckets.values():
-            bucket.last_refill = datetime.utcnow() - timedelta(hours=25)
-        
-        # Clean up
-        limiter.cleanup_old_buckets(max_age_hours=24)
-        
-        # Buckets should be cleaned up
-        assert len(limiter.buckets) == 0
+from src.core.rate_limiter import HierarchicalRateLimiter
 
 
 class TestMessageChunker:
@@ -193,7 +22,7 @@ class TestMessageChunker:
     
     def test_needs_chunking(self):
         """Test chunking necessity detection"""
-        chunker = MessageChunker(max_message_size=100, chunk_overhead=20)
+        chunker = MessageChunker(max_message_size=100)
         
         # Small message should not need chunking
         small_message = Message(content="short message", sender_id="!12345678")
@@ -206,7 +35,7 @@ class TestMessageChunker:
     
     def test_message_chunking(self):
         """Test message chunking"""
-        chunker = MessageChunker(max_message_size=100, chunk_overhead=20)
+        chunker = MessageChunker(max_message_size=100)
         
         # Create large message
         large_content = "A" * 200
@@ -234,7 +63,7 @@ class TestMessageChunker:
     
     def test_chunk_reassembly(self):
         """Test chunk reassembly"""
-        chunker = MessageChunker(max_message_size=100, chunk_overhead=20)
+        chunker = MessageChunker(max_message_size=100)
         
         # Create and chunk message
         original_content = "This is a test message that will be chunked and reassembled"
@@ -261,24 +90,34 @@ class TestMessageChunker:
     
     def test_chunk_timeout_cleanup(self):
         """Test chunk timeout cleanup"""
-        chunker = MessageChunker()
+        chunker = MessageChunker(max_message_size=100, reassembly_timeout=300)
+        chunks = chunker.chunk_message(Message(content="A" * 300, sender_id="!12345678"))
         
-        # Create partial chunk buffer
-        chunk_id = "test_chunk_123"
-        chunker.chunk_buffers[chunk_id] = {0: "chunk 0 content"}
-        chunker.chunk_metadata[chunk_id] = {
-            'total_chunks': 2,
-            'first_chunk_time': datetime.utcnow()
-        }
-        chunker.chunk_timeouts[chunk_id] = datetime.utcnow() - timedelta(minutes=10)
+        # Receive only the first chunk
+        assert chunker.process_chunk(chunks[0]) is None
+        assert len(chunker.reassembly.pending) == 1
         
         # Clean up expired chunks
-        chunker.cleanup_expired_chunks()
+        chunker.reassembly.clock = lambda: time.monotonic() + 600
+        assert chunker.cleanup_expired_chunks() == 1
         
         # Should be cleaned up
-        assert chunk_id not in chunker.chunk_buffers
-        assert chunk_id not in chunker.chunk_metadata
-        assert chunk_id not in chunker.chunk_timeouts
+        assert len(chunker.reassembly.pending) == 0
+        assert chunker.reassembly.pending_bytes == 0
+    
+    def test_out_of_order_and_corrupted_chunks(self):
+        """Chunks reassemble in any order and corrupted chunks are dropped"""
+        chunker = MessageChunker(max_message_size=100)
+        content = "Ünïcode text " * 20
+        chunks = chunker.chunk_message(Message(content=content, sender_id="!12345678"))
+        
+        corrupted = Message(content=chunks[0].content[:-1] + "?", sender_id="!12345678")
+        assert chunker.process_chunk(corrupted) is None
+        assert chunker.reassembly.get_stats()['corrupted'] == 1
+        
+        results = [chunker.process_chunk(chunk) for chunk in reversed(chunks)]
+        assert results[-1].content == content
+        assert all(result is None for result in results[:-1])
     
     def test_non_chunk_message_passthrough(self):
         """Test non-chunk message passthrough"""
@@ -369,7 +208,7 @@ class TestQueueManager:
         manager = QueueManager()
         
         assert manager.max_queue_size == 1000
-        assert isinstance(manager.rate_limiter, RateLimiter)
+        assert isinstance(manager.rate_limiter, HierarchicalRateLimiter)
         assert isinstance(manager.chunker, MessageChunker)
         assert not manager.running
     
@@ -568,6 +407,51 @@ class TestQueueManager:
         assert 'queue_size' in outbound_stats
         assert 'average_wait_time' in outbound_stats
 
+    
+    @pytest.mark.asyncio
+    async def test_idle_queue_makes_no_wakeups(self, queue_manager):
+        """Processors sleep until work arrives instead of polling"""
+        await asyncio.sleep(0.5)
+        
+        assert queue_manager.get_stats()['wakeups'] == {'outbound': 0, 'inbound': 0, 'retry': 0}
+    
+    @pytest.mark.asyncio
+    async def test_enqueue_wakes_outbound_processor(self, queue_manager):
+        """A queued message is sent without waiting for a poll interval"""
+        sent = asyncio.Event()
+        
+        async def mock_processor(message):
+            sent.set()
+        
+        queue_manager.set_outbound_processor(mock_processor)
+        await queue_manager.queue_outbound_message(Message(content="test", sender_id="!12345678"))
+        
+        await asyncio.wait_for(sent.wait(), timeout=0.05)
+    
+    @pytest.mark.asyncio
+    async def test_retry_sent_when_due(self):
+        """Retries are moved back to the outbound queue by a timer, not a poll"""
+        manager = QueueManager(retry_delay=0.1)
+        attempts = []
+        
+        async def failing_once(message):
+            attempts.append(datetime.utcnow())
+            if len(attempts) == 1:
+                raise Exception("Send failed")
+        
+        manager.set_outbound_processor(failing_once)
+        await manager.start()
+        try:
+            await manager.queue_outbound_message(Message(content="test", sender_id="!12345678"))
+            await asyncio.sleep(0.3)
+            
+            assert len(attempts) == 2
+            gap = (attempts[1] - attempts[0]).total_seconds()
+            assert 0.1 <= gap < 0.2
+            assert manager.stats['outbound'].messages_processed == 1
+        finally:
+            await manager.stop()
+
 
 class TestQueueManagerIntegration:
     """Integration tests for queue manager"""
@@ -0,0 +1,249 @@
+"""
+Unit tests for the hierarchical rate limiter
+
+Tests monotonic token buckets, the global -> channel -> sender hierarchy,
+bounded sender state and delay-until-allowed mode.
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.rate_limiter import (
+    TokenBucket, RateLimitTier, BoundedBucketMap, HierarchicalRateLimiter, create_rate_limiter
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTokenBucket:
+    """Test monotonic token bucket"""
+
+    def test_token_consumption(self, clock):
+        bucket = TokenBucket(capacity=5.0, refill_rate=1.0, clock=clock)
+
+        assert bucket.can_consume(3.0)
+        assert bucket.consume(3.0)
+        assert bucket.tokens == 2.0
+
+        assert not bucket.can_consume(3.0)
+        assert not bucket.consume(3.0)
+        assert bucket.tokens == 2.0
+
+    def test_token_refill(self, clock):
+        bucket = TokenBucket(capacity=5.0, refill_rate=1.0, tokens=0.0, clock=clock)
+
+        clock.advance(2)
+        bucket.refill()
+        assert bucket.tokens == 2.0
+
+        clock.advance(10)
+        bucket.refill()
+        assert bucket.tokens == 5.0
+
+    def test_wait_time_calculation(self, clock):
+        bucket = TokenBucket(capacity=5.0, refill_rate=2.0, tokens=1.0, clock=clock)
+
+        assert bucket.get_wait_time(1.0) == 0.0
+        assert bucket.get_wait_time(3.0) == 1.0
+
+    def test_clock_going_backwards_is_ignored(self, clock):
+        bucket = TokenBucket(capacity=5.0, refill_rate=1.0, tokens=1.0, clock=clock)
+
+        clock.advance(-100)
+        bucket.refill()
+        assert bucket.tokens == 1.0
+
+
+class TestBoundedBucketMap:
+    """Test bounded LRU/TTL sender state"""
+
+    def test_lru_eviction(self, clock):
+        buckets = BoundedBucketMap(max_size=3, clock=clock)
+        factory = lambda: TokenBucket(1, 1, clock=clock)
+
+        for key in "abc":
+            buckets.get(key, factory)
+        buckets.get("a", factory)
+        buckets.get("d", factory)
+
+        assert list(buckets) == ["c", "a", "d"]
+        assert buckets.evictions == 1
+
+    def test_idle_entries_expire(self, clock):
+        buckets = BoundedBucketMap(max_size=100, ttl=10, clock=clock)
+        factory = lambda: TokenBucket(1, 1, clock=clock)
+
+        buckets.get("old", factory)
+        clock.advance(5)
+        buckets.get("new", factory)
+        clock.advance(6)
+
+        assert buckets.expire() == 1
+        assert list(buckets) == ["new"]
+
+
+class TestHierarchicalRateLimiter:
+    """Test hierarchical rate limiting"""
+
+    def make_limiter(self, clock, **kwargs):
+        return HierarchicalRateLimiter(
+            global_tier=RateLimitTier(10, 1.0),
+            channel_tier=RateLimitTier(4, 1.0),
+            sender_tier=RateLimitTier(2, 0.2),
+            sender_tiers={'emergency': RateLimitTier(5, 2.0)},
+            clock=clock,
+            **kwargs
+        )
+
+    def test_sender_limit(self, clock):
+        limiter = self.make_limiter(clock)
+
+        assert limiter.try_acquire(sender="!a")
+        assert limiter.try_acquire(sender="!a")
+        assert not limiter.try_acquire(sender="!a")
+        assert limiter.try_acquire(sender="!b")
+
+        assert limiter.get_stats()['limited_sender'] == 1
+
+    def test_blocked_sender_does_not_consume_global_tokens(self, clock):
+        limiter = self.make_limiter(clock)
+
+        limiter.try_acquire(sender="!a")
+        limiter.try_acquire(sender="!a")
+        for _ in range(5):
+            limiter.try_acquire(sender="!a")
+
+        assert limiter.global_bucket.tokens == 8.0
+
+    def test_channel_limit(self, clock):
+        limiter = self.make_limiter(clock)
+
+        allowed = [limiter.try_acquire(sender=f"!{i}", channel=0) for i in range(6)]
+
+        assert allowed == [True] * 4 + [False] * 2
+        assert limiter.try_acquire(sender="!x", channel=1)
+
+    def test_global_limit(self, clock):
+        limiter = self.make_limiter(clock)
+
+        allowed = [limiter.try_acquire(sender=f"!{i}") for i in range(12)]
+
+        assert allowed.count(True) == 10
+        assert limiter.get_wait_time(sender="!new") == 1.0
+
+    def test_emergency_tier(self, clock):
+        limiter = self.make_limiter(clock)
+
+        allowed = [limiter.try_acquire(sender="!a", tier='emergency') for _ in range(6)]
+
+        assert allowed.count(True) == 5
+        # Emergency traffic has its own bucket and does not use the normal sender limit
+        assert limiter.try_acquire(sender="!a")
+
+    def test_sender_state_is_bounded(self, clock):
+        limiter = self.make_limiter(clock, max_senders=100)
+        limiter.global_bucket = None
+
+        for i in range(1000):
+            limiter.try_acquire(sender=f"!{i:08x}")
+
+        stats = limiter.get_stats()
+        assert stats['active_senders'] == 100
+        assert stats['sender_evictions'] == 900
+
+    def test_default_ttl_is_lossless(self, clock):
+        """Senders are forgotten only after their bucket would have refilled"""
+        limiter = self.make_limiter(clock)
+        limiter.try_acquire(sender="!a")
+        limiter.try_acquire(sender="!a")
+
+        assert limiter.senders.ttl == 10.0  # slowest tier: 2 tokens at 0.2/s
+
+        clock.advance(9)
+        assert limiter.sweep() == 0
+        clock.advance(2)
+        assert limiter.sweep() == 1
+
+    def test_read_only_checks_do_not_allocate(self, clock):
+        limiter = self.make_limiter(clock, max_senders=2)
+        limiter.try_acquire(sender="!a")
+        limiter.try_acquire(sender="!b")
+
+        for i in range(10):
+            assert limiter.can_send(sender=f"!probe{i}", channel=i)
+            assert limiter.get_wait_time(sender=f"!probe{i}") == 0.0
+
+        assert list(limiter.senders) == ["!a", "!b"]
+        assert len(limiter.channels) == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_rejects_more_than_capacity(self):
+        limiter = HierarchicalRateLimiter(sender_tier=RateLimitTier(2, 1.0))
+
+        assert not await asyncio.wait_for(limiter.acquire(sender="!a", tokens=3), timeout=1.0)
+        assert limiter.get_stats()['delay_timeouts'] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_until_allowed(self):
+        limiter = HierarchicalRateLimiter(sender_tier=RateLimitTier(1, 20.0))
+
+        assert await limiter.acquire(sender="!a")
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        assert await limiter.acquire(sender="!a")
+
+        assert loop.time() - start >= 0.04
+        assert limiter.get_stats()['delayed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_gives_up_after_max_wait(self):
+        limiter = HierarchicalRateLimiter(sender_tier=RateLimitTier(1, 0.1))
+
+        assert await limiter.acquire(sender="!a")
+        assert not await limiter.acquire(sender="!a", max_wait=1.0)
+        assert limiter.get_stats()['delay_timeouts'] == 1
+
+
+class TestCreateRateLimiter:
+    """Test configuration handling"""
+
+    def test_defaults(self):
+        limiter = create_rate_limiter()
+
+        assert limiter.global_tier == RateLimitTier(10.0, 1.0)
+        assert limiter.sender_tier == RateLimitTier(5.0, 0.2)
+        assert 'emergency' in limiter.sender_tiers
+        assert limiter.senders.max_size == 10000
+
+    def test_overrides_and_disabled_levels(self):
+        limiter = create_rate_limiter({
+            'global': False,
+            'sender': {'capacity': 3},
+            'max_senders': 50
+        })
+
+        assert limiter.global_bucket is None
+        assert limiter.sender_tier == RateLimitTier(3.0, 0.2)
+        assert limiter.senders.max_size == 50
+
+    def test_invalid_config_uses_defaults(self):
+        limiter = create_rate_limiter(228)
+
+        assert limiter.global_tier == RateLimitTier(10.0, 1.0)
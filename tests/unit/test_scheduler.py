@@ -26,7 +26,7 @@ class TestBroadcastScheduler:
         assert len(scheduler.message_templates) > 0  # Default templates
         assert scheduler.broadcast_history == []
         assert scheduler.history_limit == 1000
-        assert scheduler.check_interval == 60
+        assert scheduler.jobs == {}
         assert scheduler.is_running is False
     
     def test_default_templates(self, scheduler):
@@ -406,16 +406,65 @@ class TestBroadcastScheduler:
     async def test_start_stop_scheduler(self, scheduler):
         """Test starting and stopping scheduler"""
         assert scheduler.is_running is False
-        assert scheduler.scheduler_task is None
+        broadcast_id = scheduler.schedule_broadcast(
+            name="Later",
+            content="Later message",
+            scheduled_time=datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+        assert scheduler.jobs == {}
         
         # Start scheduler
         await scheduler.start()
         assert scheduler.is_running is True
-        assert scheduler.scheduler_task is not None
+        assert broadcast_id in scheduler.jobs
         
         # Stop scheduler
+        job = scheduler.jobs[broadcast_id]
         await scheduler.stop()
         assert scheduler.is_running is False
+        assert job.cancelled
+        assert scheduler.jobs == {}
+    
+    @pytest.mark.asyncio
+    async def test_due_broadcast_sent_by_job(self, scheduler):
+        """Test a due broadcast is sent by its job and then unscheduled"""
+        scheduler.message_sender = AsyncMock(return_value=True)
+        await scheduler.start()
+        try:
+            broadcast_id = scheduler.schedule_broadcast(
+                name="Now",
+                content="Now message",
+                scheduled_time=datetime.now(timezone.utc)
+            )
+            assert broadcast_id in scheduler.jobs
+            
+            for _ in range(50):
+                if scheduler.message_sender.called:
+                    break
+                await asyncio.sleep(0.02)
+            await asyncio.sleep(0.02)
+            
+            scheduler.message_sender.assert_called_once()
+            assert scheduler.get_broadcast(broadcast_id).send_count == 1
+            assert broadcast_id not in scheduler.jobs
+        finally:
+            await scheduler.stop()
+    
+    @pytest.mark.asyncio
+    async def test_cancel_and_delete_unschedule_job(self, scheduler):
+        """Test cancelling or deleting a broadcast removes its job"""
+        await scheduler.start()
+        try:
+            later = datetime.now(timezone.utc) + timedelta(hours=1)
+            first = scheduler.schedule_broadcast(name="A", content="a", scheduled_time=later)
+            second = scheduler.schedule_broadcast(name="B", content="b", scheduled_time=later)
+            
+            scheduler.cancel_broadcast(first)
+            scheduler.delete_broadcast(second)
+            
+            assert scheduler.jobs == {}
+        finally:
+            await scheduler.stop()
     
     def test_get_templates_by_category(self, scheduler):
         """Test getting templates by category"""
@@ -44,7 +44,7 @@ class TestSchedulingService(BaseTestCase):
         """Test service start and stop"""
         await self.service.start()
         self.assertTrue(self.service.running)
-        self.assertIsNotNone(self.service.scheduler_task)
+        self.assertIsNotNone(self.service.cleanup_job)
         
         await self.service.stop()
         self.assertFalse(self.service.running)
@@ -339,8 +339,8 @@ class TestSchedulingService(BaseTestCase):
         task.next_run = datetime.now(timezone.utc) - timedelta(seconds=1)
         self.service._save_task(task)
         
-        # Check scheduled tasks (should deactivate failing task)
-        await self.service._check_scheduled_tasks()
+        # Run the due task (should deactivate failing task)
+        await self.service._run_scheduled_task(task_id)
         
         # Verify task was deactivated
         updated_task = self.service.get_task(task_id)
@@ -0,0 +1,197 @@
+"""
+Unit tests for the concurrent service dispatcher
+
+Tests signature resolution, concurrent fan-out, per-service timeouts,
+bulkheads and per-service retries.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.core.service_dispatcher import (
+    ServiceDispatcher, resolve_call_style,
+    CALL_CONTEXT, CALL_MESSAGE, CALL_MESSAGE_USER, CALL_MESSAGE_CONTEXT, CALL_NONE
+)
+
+
+class MessageOnlyService:
+    def __init__(self):
+        self.calls = []
+
+    async def handle_message(self, message):
+        self.calls.append(message)
+        return None
+
+
+class MessageUserService:
+    async def handle_message(self, message, user):
+        return ('user', user)
+
+
+class MessageContextService:
+    async def handle_message(self, message, context):
+        return ('context', context)
+
+
+class ContextService:
+    async def handle_message_with_context(self, message, context):
+        return context
+
+
+class SlowService:
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def handle_message(self, message):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return 'done'
+
+
+class TestSignatureResolution:
+    """Test handler call style resolution"""
+
+    @pytest.mark.parametrize("service,expected", [
+        (MessageOnlyService(), CALL_MESSAGE),
+        (MessageUserService(), CALL_MESSAGE_USER),
+        (MessageContextService(), CALL_MESSAGE_CONTEXT),
+        (ContextService(), CALL_CONTEXT),
+        (object(), CALL_NONE),
+        (AsyncMock(), CALL_MESSAGE),
+    ])
+    def test_resolve_call_style(self, service, expected):
+        assert resolve_call_style(service) == expected
+
+    @pytest.mark.asyncio
+    async def test_handlers_called_with_resolved_arguments(self):
+        dispatcher = ServiceDispatcher()
+        context = {'interface_id': 'test'}
+        targets = [('user', MessageUserService()), ('ctx', MessageContextService()), ('full', ContextService())]
+
+        outcomes = await dispatcher.dispatch("msg", "alice", context, targets)
+
+        assert [o.result for o in outcomes] == [('user', 'alice'), ('context', context), context]
+
+
+class TestServiceDispatcher:
+    """Test concurrent dispatch behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_services_run_concurrently(self):
+        """Dispatch time is bounded by the slowest service, not the sum"""
+        dispatcher = ServiceDispatcher()
+        targets = [(f"s{i}", SlowService(0.1)) for i in range(5)]
+
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        outcomes = await dispatcher.dispatch("msg", None, {}, targets)
+        elapsed = loop.time() - start
+
+        assert all(o.success for o in outcomes)
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_hung_service_times_out_without_blocking_others(self):
+        """A hung handler times out while other results are delivered immediately"""
+        dispatcher = ServiceDispatcher(default_timeout=0.2, max_retries=0)
+        delivered = []
+
+        async def on_result(name, result, message):
+            delivered.append((name, asyncio.get_event_loop().time()))
+
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        outcomes = await dispatcher.dispatch(
+            "msg", None, {}, [('weather', SlowService(10)), ('bbs', SlowService(0))], on_result
+        )
+
+        weather, bbs = outcomes
+        assert weather.timed_out and not weather.success
+        assert bbs.success
+        assert delivered[0][0] == 'bbs'
+        assert delivered[0][1] - start < 0.1
+
+        stats = dispatcher.get_stats()['services']
+        assert stats['weather']['timeouts'] == 1
+        assert stats['bbs']['successes'] == 1
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_limits_concurrency(self):
+        """Concurrent calls to one service never exceed its limit"""
+        dispatcher = ServiceDispatcher(max_concurrency=2)
+        service = SlowService(0.05)
+
+        await asyncio.gather(*(dispatcher.dispatch("msg", None, {}, [('ai', service)]) for _ in range(6)))
+
+        assert service.max_active == 2
+        assert dispatcher.get_stats()['services']['ai']['successes'] == 6
+
+    @pytest.mark.asyncio
+    async def test_service_overrides(self):
+        dispatcher = ServiceDispatcher(service_overrides={'ai': {'timeout': 5, 'max_concurrency': 1}})
+        dispatcher.register('ai', MessageOnlyService())
+
+        stats = dispatcher.get_stats()['services']['ai']
+        assert stats['timeout'] == 5
+        assert stats['max_concurrency'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_service_retried_alone(self):
+        """Only the failing service is retried; healthy services are called once"""
+        dispatcher = ServiceDispatcher(max_retries=2, retry_delay=0.01)
+        healthy = MessageOnlyService()
+        flaky = AsyncMock()
+        flaky.handle_message.side_effect = [Exception("boom"), Exception("boom"), "ok"]
+        results = []
+
+        async def on_result(name, result, message):
+            results.append((name, result))
+
+        await dispatcher.dispatch("msg", None, {}, [('bbs', healthy), ('flaky', flaky)], on_result)
+        for _ in range(50):
+            if ('flaky', 'ok') in results:
+                break
+            await asyncio.sleep(0.01)
+
+        assert len(healthy.calls) == 1
+        assert flaky.handle_message.call_count == 3
+        assert ('flaky', 'ok') in results
+
+        stats = dispatcher.get_stats()['services']['flaky']
+        assert stats['failures'] == 2
+        assert stats['retries_scheduled'] == 2
+        assert stats['consecutive_failures'] == 0
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted(self):
+        dispatcher = ServiceDispatcher(max_retries=1, retry_delay=0.01)
+        failing = AsyncMock()
+        failing.handle_message.side_effect = Exception("down")
+
+        await dispatcher.dispatch("msg", None, {}, [('down', failing)])
+        await asyncio.sleep(0.1)
+
+        stats = dispatcher.get_stats()['services']['down']
+        assert failing.handle_message.call_count == 2
+        assert stats['retries_exhausted'] == 1
+        assert stats['retries_pending'] == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_pending_retries(self):
+        dispatcher = ServiceDispatcher(retry_delay=60)
+        failing = AsyncMock()
+        failing.handle_message.side_effect = Exception("down")
+
+        await dispatcher.dispatch("msg", None, {}, [('down', failing)])
+        assert dispatcher.get_stats()['retries_pending'] == 1
+
+        await dispatcher.stop()
+        assert dispatcher.get_stats()['retries_pending'] == 0
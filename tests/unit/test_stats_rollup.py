@@ -0,0 +1,189 @@
+"""
+Unit tests for statistics rollups
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core.database import DatabaseManager
+from src.core.stats_rollup import StatsRollup, backfill_rollups, bucket_start, window_period
+
+
+NOW = datetime(2024, 6, 1, 12, 30, 15)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "stats.db"))
+    for node_id, short_name in (("!a", "ALFA"), ("!b", "BRAV")):
+        db.upsert_user({'node_id': node_id, 'short_name': short_name})
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def rollup(db):
+    return StatsRollup(db)
+
+
+def network_rows(db, period):
+    rows = db.execute_query(
+        "SELECT * FROM network_stats_rollup WHERE period = ? ORDER BY bucket", (period,)
+    )
+    return [dict(row) for row in rows]
+
+
+class TestBuckets:
+    """Test bucket keys and window periods"""
+
+    def test_bucket_start(self):
+        assert bucket_start(NOW, 'minute') == '2024-06-01T12:30:00'
+        assert bucket_start(NOW, 'hour') == '2024-06-01T12:00:00'
+        assert bucket_start(NOW, 'day') == '2024-06-01T00:00:00'
+
+    def test_aware_times_use_utc(self):
+        aware = NOW.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=5)))
+
+        assert bucket_start(aware, 'hour') == '2024-06-01T12:00:00'
+
+    def test_window_period(self):
+        assert window_period(timedelta(hours=1)) == 'minute'
+        assert window_period(timedelta(days=1)) == 'hour'
+        assert window_period(timedelta(days=30)) == 'day'
+        assert window_period(None) == 'day'
+
+
+class TestRecording:
+    """Test counting packets into node and network buckets"""
+
+    def test_counts_flushed_to_every_period(self, rollup, db):
+        rollup.record_packet("!a", snr=4.0, rssi=-90, timestamp=NOW)
+        rollup.record_packet("!a", snr=6.0, battery_level=80, timestamp=NOW)
+        rollup.record_message("!a", timestamp=NOW)
+        rollup.record_packet("!b", snr=-2.0, battery_level=40, timestamp=NOW)
+
+        assert rollup.flush() == 6
+
+        for period in ('minute', 'hour', 'day'):
+            (row,) = network_rows(db, period)
+            assert row['bucket'] == bucket_start(NOW, period)
+            assert row['active_nodes'] == 2
+            assert (row['packets'], row['messages']) == (3, 1)
+            assert (row['snr_sum'], row['snr_count']) == (8.0, 3)
+            assert (row['battery_sum'], row['battery_count']) == (120, 2)
+
+    def test_later_flushes_add_to_buckets(self, rollup, db):
+        rollup.record_packet("!a", timestamp=NOW)
+        rollup.flush()
+        rollup.record_packet("!a", timestamp=NOW)
+        rollup.record_packet("!b", timestamp=NOW)
+        rollup.flush()
+
+        (row,) = network_rows(db, 'hour')
+        assert (row['active_nodes'], row['packets']) == (2, 3)
+
+    def test_failed_flush_is_retried(self, rollup, db, monkeypatch):
+        rollup.record_packet("!a", timestamp=NOW)
+        transaction = db.transaction
+        monkeypatch.setattr(db, 'transaction', lambda: (_ for _ in ()).throw(RuntimeError("disk I/O error")))
+
+        assert rollup.flush() == 0
+
+        monkeypatch.setattr(db, 'transaction', transaction)
+        rollup.record_packet("!a", timestamp=NOW)
+        rollup.flush()
+
+        assert network_rows(db, 'day')[0]['packets'] == 2
+        assert rollup.get_stats()['flush_failures'] == 1
+
+
+class TestReads:
+    """Test summaries and leaderboards"""
+
+    @pytest.fixture
+    def history(self, rollup):
+        rollup.record_packet("!a", snr=10.0, battery_level=90, timestamp=NOW - timedelta(hours=20))
+        rollup.record_packet("!a", snr=2.0, battery_level=70, timestamp=NOW - timedelta(minutes=5))
+        rollup.record_message("!a", timestamp=NOW - timedelta(minutes=5))
+        rollup.record_message("!a", timestamp=NOW - timedelta(minutes=5))
+        rollup.record_packet("!b", snr=8.0, battery_level=50, timestamp=NOW - timedelta(hours=3))
+        rollup.record_message("!b", timestamp=NOW - timedelta(hours=3))
+        rollup.record_message("!b", timestamp=NOW - timedelta(days=3))
+        rollup.flush()
+        return rollup
+
+    def test_summary_windows(self, history):
+        last_hour = history.summary(timedelta(hours=1), now=NOW)
+        assert (last_hour.period, last_hour.messages, last_hour.active_nodes) == ('minute', 2, 1)
+
+        last_day = history.summary(timedelta(days=1), now=NOW)
+        assert (last_day.period, last_day.messages, last_day.active_nodes) == ('hour', 3, 2)
+        assert last_day.average_snr == pytest.approx(20.0 / 3)
+        assert last_day.average_battery == pytest.approx(70.0)
+
+        everything = history.summary(now=NOW)
+        assert (everything.messages, everything.packets) == (4, 3)
+
+    def test_leaderboards(self, history):
+        day = timedelta(days=1)
+
+        messages = history.top_nodes('messages', day, now=NOW)
+        assert [(row['short_name'], row['value']) for row in messages] == [("ALFA", 2), ("BRAV", 1)]
+
+        snr = history.top_nodes('snr', day, now=NOW)
+        assert [(row['node_id'], row['value']) for row in snr] == [("!b", 8.0), ("!a", 6.0)]
+
+        battery = history.top_nodes('battery', day, now=NOW)
+        assert [(row['node_id'], row['value']) for row in battery] == [("!a", 70), ("!b", 50)]
+
+        with pytest.raises(ValueError):
+            history.top_nodes('altitude', day)
+
+    def test_series(self, history):
+        series = history.series(timedelta(hours=4), now=NOW)
+
+        assert [row['bucket'] for row in series] == ['2024-06-01T09:00:00', '2024-06-01T12:00:00']
+        assert series[1]['messages'] == 2
+
+    def test_prune_keeps_day_buckets(self, history, db):
+        deleted = history.prune(now=NOW + timedelta(days=100))
+
+        assert deleted > 0
+        assert network_rows(db, 'minute') == network_rows(db, 'hour') == []
+        assert len(network_rows(db, 'day')) == 3
+
+
+class TestBackfill:
+    """Test rebuilding rollups from stored history"""
+
+    def test_backfill_matches_live_counts(self, rollup, db):
+        messages = [("!a", NOW - timedelta(minutes=2), 5.0), ("!a", NOW - timedelta(hours=2), None),
+                    ("!b", NOW - timedelta(days=3), -3.0)]
+        db.execute_many(
+            "INSERT INTO message_history (sender_id, content, timestamp, snr) VALUES (?, 'hi', ?, ?)",
+            [(sender, moment.isoformat(), snr) for sender, moment, snr in messages]
+        )
+        for sender, moment, snr in messages:
+            rollup.record_packet(sender, snr=snr, timestamp=moment)
+            rollup.record_message(sender, timestamp=moment)
+        rollup.flush()
+        live = {period: network_rows(db, period) for period in ('minute', 'hour', 'day')}
+
+        rows = backfill_rollups(db, now=NOW)
+
+        assert rows == 2 + 3 + 2
+        for period in ('hour', 'day'):
+            assert network_rows(db, period) == live[period]
+        # Minute buckets are only rebuilt within their retention
+        assert network_rows(db, 'minute') == live['minute'][1:]
+
+    def test_backfill_adds_current_battery(self, db):
+        db.execute_update(
+            "UPDATE users SET battery_level = 55, last_seen = ? WHERE node_id = '!a'", (NOW.isoformat(),)
+        )
+
+        backfill_rollups(db, now=NOW)
+
+        (row,) = network_rows(db, 'hour')
+        assert (row['active_nodes'], row['battery_sum'], row['packets']) == (1, 55, 0)
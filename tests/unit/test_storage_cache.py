@@ -0,0 +1,247 @@
+"""
+Unit tests for the plugin storage cache
+"""
+
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+import pytest_asyncio
+
+from src.core.database import DatabaseManager, DatabaseError
+from src.core.enhanced_plugin import PluginStorage
+from src.core.plugin_manager import PluginManager
+from src.core.storage_cache import PluginStorageCache, _prefix_upper_bound
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "storage.db"))
+    yield db
+    db.close()
+
+
+@pytest_asyncio.fixture
+async def cache(db):
+    cache = PluginStorageCache(db, write_delay=0.05, sweep_interval=0)
+    yield cache
+    await cache.close()
+
+
+def stored_rows(db, plugin_name="weather"):
+    rows = db.execute_query(
+        "SELECT key, value FROM plugin_storage WHERE plugin_name = ? ORDER BY key", (plugin_name,)
+    )
+    return {row['key']: json.loads(row['value']) for row in rows}
+
+
+class TestReads:
+    """Test read-through caching"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_reads_served_from_cache(self, cache, db):
+        db.execute_update(
+            "INSERT INTO plugin_storage (plugin_name, key, value) VALUES ('weather', 'city', '\"Oslo\"')"
+        )
+
+        assert cache.get("weather", "city") == '"Oslo"'
+        assert cache.get("weather", "city") == '"Oslo"'
+        assert cache.get("weather", "missing") is None
+        assert cache.get("weather", "missing") is None
+
+        assert cache.stats.db_reads == 2
+        assert cache.stats.hits == 2
+
+    @pytest.mark.asyncio
+    async def test_get_many_uses_one_query(self, cache):
+        await cache.set_many("weather", {"a": "1", "b": "2"})
+        await cache.flush()
+        cache.entries.clear()
+
+        assert cache.get_many("weather", ["a", "b", "c"]) == {"a": "1", "b": "2"}
+        assert cache.stats.db_reads == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_keys_not_returned(self, cache):
+        await cache.set_many("weather", {"a": "1"}, ttl=0.05)
+        assert cache.get("weather", "a") == "1"
+
+        await asyncio.sleep(0.1)
+
+        assert cache.get("weather", "a") is None
+        cache.entries.clear()
+        assert cache.get("weather", "a") is None
+
+    @pytest.mark.asyncio
+    async def test_plugins_isolated(self, cache):
+        await cache.set_many("weather", {"key": "1"})
+        await cache.set_many("bbs", {"key": "2"})
+
+        assert cache.get("weather", "key") == "1"
+        assert cache.get("bbs", "key") == "2"
+
+
+class TestWrites:
+    """Test write coalescing and commits"""
+
+    @pytest.mark.asyncio
+    async def test_writes_coalesced_into_one_commit(self, cache, db):
+        for count in range(10):
+            await cache.set_many("weather", {"count": str(count)})
+        await cache.set_many("weather", {"other": "1"})
+
+        assert stored_rows(db) == {}
+        assert cache.get("weather", "count") == "9"
+
+        await asyncio.sleep(0.15)
+
+        assert stored_rows(db) == {"count": 9, "other": 1}
+        assert cache.stats.flushes == 1
+        assert cache.stats.rows_written == 2
+        assert cache.stats.coalesced == 9
+
+    @pytest.mark.asyncio
+    async def test_no_delay_commits_each_write(self, db):
+        cache = PluginStorageCache(db, write_delay=0, sweep_interval=0)
+
+        await cache.set_many("weather", {"a": "1"})
+
+        assert stored_rows(db) == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_max_pending_commits_early(self, db):
+        cache = PluginStorageCache(db, write_delay=60, max_pending=3, sweep_interval=0)
+
+        await cache.set_many("weather", {"a": "1", "b": "2", "c": "3"})
+
+        assert len(stored_rows(db)) == 3
+
+    @pytest.mark.asyncio
+    async def test_pending_write_survives_eviction(self, db):
+        cache = PluginStorageCache(db, max_entries=1, write_delay=60, sweep_interval=0)
+        db.execute_update(
+            "INSERT INTO plugin_storage (plugin_name, key, value) VALUES ('weather', 'a', '\"old\"')"
+        )
+
+        await cache.set_many("weather", {"a": '"new"'})
+        cache.get("weather", "b")
+
+        assert ("weather", "a") not in cache.entries
+        assert cache.get("weather", "a") == '"new"'
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_delete_many_counts_present_keys(self, cache, db):
+        await cache.set_many("weather", {"a": "1", "b": "2"})
+        await cache.flush()
+
+        assert await cache.delete_many("weather", ["a", "b", "c"]) == 2
+        assert cache.get("weather", "a") is None
+
+        await cache.flush()
+        assert stored_rows(db) == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_is_retried(self, cache, db):
+        write_batch = cache._write_batch
+        calls = []
+
+        def failing(batch):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                raise RuntimeError("disk I/O error")
+            write_batch(batch)
+
+        cache._write_batch = failing
+        await cache.set_many("weather", {"a": "1"})
+
+        with pytest.raises(DatabaseError):
+            await cache.flush()
+        assert cache.get("weather", "a") == "1"
+
+        await cache.flush()
+        assert stored_rows(db) == {"a": 1}
+        assert cache.stats.write_errors == 1
+
+
+class TestScanAndSweep:
+    """Test prefix scans and expired row sweeping"""
+
+    @pytest.mark.asyncio
+    async def test_scan_merges_pending_writes(self, cache):
+        await cache.set_many("weather", {"user:a": "1", "user:b": "2", "users": "3", "other": "4"})
+        await cache.flush()
+        await cache.set_many("weather", {"user:c": "5"})
+        await cache.delete_many("weather", ["user:a"])
+
+        assert cache.scan("weather", "user:") == {"user:b": "2", "user:c": "5"}
+        assert list(cache.scan("weather", "user:", values=False)) == ["user:b", "user:c"]
+
+    @pytest.mark.asyncio
+    async def test_scan_prefix_is_literal(self, cache):
+        await cache.set_many("weather", {"50%_off": "1", "50xxoff": "2"})
+        await cache.flush()
+
+        assert list(cache.scan("weather", "50%_")) == ["50%_off"]
+
+    @pytest.mark.asyncio
+    async def test_sweep_deletes_expired_rows(self, cache, db):
+        await cache.set_many("weather", {"old": "1"}, ttl=0.05)
+        await cache.set_many("weather", {"kept": "2"}, ttl=60)
+        await cache.set_many("weather", {"forever": "3"})
+        await cache.flush()
+        await asyncio.sleep(0.1)
+
+        assert await cache.sweep() == 1
+
+        assert stored_rows(db) == {"kept": 2, "forever": 3}
+        assert ("weather", "old") not in cache.entries
+
+    def test_sweep_uses_expiry_index(self, db):
+        plan = db.execute_query(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM plugin_storage WHERE expires_at <= ? LIMIT 500",
+            ("2024-01-01T00:00:00",)
+        )
+
+        assert any('idx_plugin_storage_expires' in row[-1] for row in plan)
+
+    def test_prefix_upper_bound(self):
+        assert _prefix_upper_bound("ab") == "ac"
+        assert _prefix_upper_bound("") is None
+        assert _prefix_upper_bound("a\U0010ffff") == "b"
+
+
+class TestPluginStorage:
+    """Test PluginStorage on top of the cache"""
+
+    @pytest_asyncio.fixture
+    async def storage(self, cache, db):
+        storage = PluginStorage("weather", Mock(spec=PluginManager))
+        storage.db, storage.cache = db, cache
+        return storage
+
+    @pytest.mark.asyncio
+    async def test_bulk_operations(self, storage):
+        await storage.store_many({"a": {"n": 1}, "b": [1, 2]})
+
+        assert await storage.retrieve_many(["a", "b", "c"]) == {"a": {"n": 1}, "b": [1, 2]}
+        assert await storage.scan() == {"a": {"n": 1}, "b": [1, 2]}
+        assert await storage.delete_many(["a", "c"]) == 1
+        assert await storage.list_keys() == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_values_not_shared_between_reads(self, storage):
+        await storage.store_data("state", {"count": 1})
+
+        (await storage.retrieve_data("state"))["count"] = 99
+
+        assert await storage.retrieve_data("state") == {"count": 1}
+
+    @pytest.mark.asyncio
+    async def test_flush_persists(self, storage, db):
+        await storage.store_data("count", 5)
+        await storage.flush()
+
+        assert stored_rows(db) == {"count": 5}
+        assert storage.get_stats()['pending_writes'] == 0
@@ -0,0 +1,179 @@
+"""
+Unit tests for per-message pipeline tracing
+
+Tests sampling, span recording and context propagation, bounded
+retention of recent and slow traces, JSON export, and the spans added by
+the queue manager, service dispatcher and plugin command handler.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.models.message import Message
+from src.core.metrics import MetricsRegistry
+from src.core.plugin_command_handler import PluginCommandHandler
+from src.core.queue_manager import QueueManager
+from src.core.service_dispatcher import ServiceDispatcher
+from src.core.tracing import Tracer, create_tracer, initialize_tracer
+
+
+NO_RATE_LIMIT = {'global': False, 'channel': False, 'sender': False, 'tiers': {'emergency': False}}
+
+
+@pytest.fixture
+def tracer():
+    """A fresh global tracer"""
+    return initialize_tracer({})
+
+
+class TestTracer:
+    """Test sampling, spans and retention"""
+
+    def test_sampling_is_deterministic(self):
+        tracer = Tracer(sample_rate=0.25)
+        ids = [f"msg-{i}" for i in range(4000)]
+
+        decisions = [tracer.sampled(message_id) for message_id in ids]
+
+        assert decisions == [tracer.sampled(message_id) for message_id in ids]
+        assert 0.2 < sum(decisions) / len(ids) < 0.3
+        assert not any(Tracer(sample_rate=0).sampled(message_id) for message_id in ids[:100])
+        assert not Tracer(enabled=False).start_trace(Message(content="x"))
+
+    def test_spans_recorded_on_current_trace(self):
+        tracer = Tracer()
+        metric = MetricsRegistry(namespace='test').histogram('stage_seconds', 'Stage').labels()
+        message = Message(content="hello")
+
+        with tracer.span('outside', metric):
+            pass
+        with tracer.activate(tracer.start_trace(message, interface='serial0')) as trace:
+            with tracer.span('classify', metric):
+                time.sleep(0.01)
+            with pytest.raises(ValueError):
+                with tracer.span('handler'):
+                    raise ValueError("boom")
+            tracer.record_span('queue_wait', 0.5)
+
+        assert message.metadata['trace_id'] == message.id
+        assert tracer.trace_of(message) is trace
+        assert [span.name for span in trace.spans] == ['classify', 'handler', 'queue_wait']
+        assert trace.spans[0].duration >= 0.01
+        assert trace.spans[1].error == 'ValueError'
+        assert trace.attributes['interface'] == 'serial0'
+        assert metric.histogram.count == 2  # metric is fed with or without a trace
+        assert tracer.current() is None
+
+    @pytest.mark.asyncio
+    async def test_context_follows_tasks(self):
+        tracer = Tracer()
+        trace = tracer.start_trace(Message(content="hello"))
+
+        async def handler():
+            with tracer.span('service:bbs'):
+                await asyncio.sleep(0)
+
+        with tracer.activate(trace):
+            reply = Message(content="reply")
+            tracer.attach(reply)
+            await asyncio.gather(asyncio.create_task(handler()), handler())
+
+        assert [span.name for span in trace.spans] == ['service:bbs', 'service:bbs']
+        assert tracer.trace_of(reply) is trace
+
+    def test_retention_bounded_and_slow_traces_kept(self):
+        tracer = Tracer(max_traces=10, max_slow_traces=2, slow_threshold=1.0, max_spans=3)
+        slow = tracer.start_trace(Message(content="slow"))
+        tracer.record_span('transmit', 2.0, trace=slow)
+
+        for i in range(50):
+            trace = tracer.start_trace(Message(content=str(i)))
+            for _ in range(5):
+                tracer.record_span('classify', 0.001, trace=trace)
+
+        assert len(tracer.traces) == 10
+        assert slow.trace_id not in tracer.traces
+        assert tracer.get_trace(slow.trace_id) is slow
+        assert tracer.slowest(1) == [slow]
+        assert len(trace.spans) == 3 and trace.dropped_spans == 2
+        assert tracer.stage_breakdown()['classify']['count'] == 250  # dropped spans still count
+
+    def test_export_is_json(self):
+        tracer = Tracer()
+        trace = tracer.start_trace(Message(content="hello", sender_id="!abcd"))
+        tracer.record_span('classify', 0.002, trace=trace, rule='weather')
+
+        exported = json.loads(json.dumps(tracer.export()))
+
+        assert exported[0]['trace_id'] == trace.trace_id
+        assert exported[0]['attributes']['sender_id'] == "!abcd"
+        assert exported[0]['spans'][0]['attributes'] == {'rule': 'weather'}
+        assert tracer.export(['missing']) == []
+
+    def test_create_from_config(self):
+        tracer = create_tracer({'sample_rate': 0.1, 'max_traces': 20, 'slow_threshold': 2})
+
+        assert (tracer.sample_rate, tracer.max_traces, tracer.slow_threshold) == (0.1, 20, 2.0)
+
+
+class TestComponentSpans:
+    """Test spans added by pipeline components"""
+
+    @pytest.mark.asyncio
+    async def test_queue_manager_spans(self, tracer):
+        manager = QueueManager(rate_limit_config=NO_RATE_LIMIT)
+        manager.chunker.framer.max_size = 60
+        sent = []
+
+        async def processor(chunk):
+            sent.append(chunk)
+
+        manager.set_outbound_processor(processor)
+        await manager.start()
+        request = Message(content="wx")
+        with tracer.activate(tracer.start_trace(request)) as trace:
+            await manager.queue_outbound_message(Message(content="y" * 150))
+        for _ in range(100):
+            if manager.get_stats()['outbound']['messages_processed']:
+                break
+            await asyncio.sleep(0.01)
+        await manager.stop()
+
+        names = [span.name for span in trace.spans]
+        assert names[0] == 'outbound_queue_wait'
+        assert names.count('transmit') == len(sent) > 1
+        assert names.count('rate_limit') == len(sent)
+        assert all(chunk.metadata['trace_id'] == request.id for chunk in sent)
+
+    @pytest.mark.asyncio
+    async def test_untraced_outbound_message_starts_trace(self, tracer):
+        manager = QueueManager(rate_limit_config=NO_RATE_LIMIT)
+        message = Message(content="scheduled broadcast")
+
+        await manager.queue_outbound_message(message)
+
+        assert tracer.trace_of(message).attributes['direction'] == 'outbound'
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_and_plugin_spans(self, tracer):
+        class BBSService:
+            async def handle_message(self, message):
+                return None
+
+        async def ping(args, context):
+            return "pong"
+
+        handler = PluginCommandHandler()
+        handler.register_command('ping_plugin', 'ping', ping)
+        dispatcher = ServiceDispatcher()
+        message = Message(content="ping")
+
+        with tracer.activate(tracer.start_trace(message)) as trace:
+            assert await handler.route_command(message) == "pong"
+            await dispatcher.dispatch(message, None, {}, [('bbs', BBSService())])
+
+        assert [span.name for span in trace.spans] == ['plugin:ping_plugin', 'service:bbs']
+        assert trace.spans[0].attributes == {'command': 'ping'}
@@ -355,6 +355,34 @@ class TestWebAdminService:
         assert config["host"] == "0.0.0.0"
         assert config["port"] == 8080
         assert config["debug"] is False
+    
+    def test_metrics_endpoint(self, web_service):
+        """Test Prometheus and OpenMetrics scraping"""
+        from fastapi.testclient import TestClient
+        from core.metrics import get_metrics_registry
+        
+        get_metrics_registry().counter('web_test_scrapes_total', 'Test counter').inc()
+        client = TestClient(web_service.app)
+        
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "zephyrgate_web_test_scrapes_total 1" in response.text
+        
+        response = client.get("/metrics", headers={"Accept": "application/openmetrics-text"})
+        assert response.headers["content-type"].startswith("application/openmetrics-text")
+        assert response.text.endswith("# EOF\n")
+    
+    def test_metrics_endpoint_token(self, config, mock_plugin_manager):
+        """Test that a configured metrics token is required"""
+        from fastapi.testclient import TestClient
+        
+        service = WebAdminService({**config, "metrics_token": "scrape"}, mock_plugin_manager)
+        client = TestClient(service.app)
+        
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer scrapes"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer scrape"}).status_code == 200
 
 
 class TestPydanticModels: